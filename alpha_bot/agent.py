@@ -1,13 +1,16 @@
 """Alpha-Bot 核心逻辑"""
 
-from typing import Optional
+import asyncio
+from typing import Optional, Dict, Any, Union
 from loguru import logger
 
 from .models.types import TaskStatus, ExecutionResult
-from .executor.shell import ShellExecutor
+from .executor import ShellExecutor, create_executor
 from .ui.console import ConsoleUI
 from .skills import SkillManager
 from .context.task_context import TaskContext
+from .context.prompt_builder import PromptBuilder
+from .llm.usage import track_usage
 
 class AlphaBot:
     """
@@ -21,7 +24,8 @@ class AlphaBot:
         auto_execute: bool = False,
         working_dir: Optional[str] = None,
         direct_mode: bool = False,
-        enable_persistence: bool = True
+        enable_persistence: bool = True,
+        executor: Union[ShellExecutor, str, None] = None
     ):
         """
         初始化 Agent
@@ -31,12 +35,17 @@ class AlphaBot:
             working_dir: 工作目录
             direct_mode: 是否强制使用直接LLM模式（翻译、总结等任务）
             enable_persistence: 是否启用技能持久化
+            executor: 命令执行器实例，或执行器名称 "subprocess" / "persistent"
+                （常驻 bash 会话，cd、export 等在步骤之间保留），默认 SHELL_EXECUTOR 环境变量
         """
         self.auto_execute = auto_execute
         self.force_direct_mode = direct_mode
         
         # 初始化组件
-        self.executor = ShellExecutor(working_dir=working_dir)
+        if isinstance(executor, ShellExecutor):
+            self.executor = executor
+        else:
+            self.executor = create_executor(executor, working_dir=working_dir)
         self.ui = ConsoleUI()
         
         # 添加取消标志
@@ -65,11 +74,33 @@ class AlphaBot:
         # 显示任务
         self.ui.print_task(task)
         
-        # 重置技能状态
+        # 重置技能状态和 shell 会话
         self.skill_manager.reset_all()
+        self.executor.reset()
         
-        # 执行任务使用技能系统
-        return self._run_with_skills(task, context)
+        # 执行任务使用技能系统，LLM 用量记到 context.usage
+        with track_usage(context.usage):
+            return self._run_with_skills(task, context)
+    
+    async def arun(self, task: str) -> TaskContext:
+        """
+        run 的协程版本：技能选择和 LLM 调用在事件循环中进行，
+        命令执行和用户确认放到线程池中，不阻塞事件循环
+        
+        Args:
+            task: 任务描述
+            
+        Returns:
+            TaskContext: 任务执行上下文
+        """
+        context = TaskContext(task_description=task)
+        context.status = TaskStatus.RUNNING
+        self.cancelled = False
+        self.ui.print_task(task)
+        self.skill_manager.reset_all()
+        self.executor.reset()
+        with track_usage(context.usage):
+            return await self._arun_with_skills(task, context)
     
     def _run_with_skills(self, task: str, context: TaskContext) -> TaskContext:
         """
@@ -82,27 +113,11 @@ class AlphaBot:
         Returns:
             TaskContext: 任务执行上下文
         """
-        # Track skill responses for context
-        
         # 主循环：不断调用技能直到任务完成
         while context.status == TaskStatus.RUNNING:
-            # 检查是否被取消
-            if self.cancelled:
-                context.status = TaskStatus.CANCELLED
-                self.skill_manager.reset_all()
-                self.ui.print_cancelled()
+            skill_context = self._begin_iteration(context)
+            if skill_context is None:
                 break
-                
-            context.iteration += 1
-            self.ui.print_step(context.iteration)
-            
-            # 准备上下文
-            skill_context = {
-                'last_result': context.last_result,
-                'iteration': context.iteration,
-                'history': context.history,
-                'memory_bank': context.memory_bank,
-            }
             
             # 使用技能管理器执行任务
             try:
@@ -111,41 +126,122 @@ class AlphaBot:
                     context=skill_context,
                 )
             except Exception as e:
-                self.ui.print_error(f"技能执行失败: {e}")
-                context.status = TaskStatus.FAILED
-                
-                # Trigger auto hint learning even on failure to learn from mistakes
-                self._trigger_auto_hint_learning(context, task)
-                
+                self._handle_skill_failure(context, task, e)
                 break
             
-            # 显示响应（跳过所有字段，因为已经流式显示了）
-            self.ui.print_skill_response(response, skip_all=True)
-            
-            # Determine if task is complete based on skill selector's assessment
-            # Use task_complete field which is set by the skill selector
-            task_complete = response.task_complete if response.task_complete is not None else False
-            
-            
-            # 获取要执行的命令
-            command = response.command.strip() if response.command else ""
+            if self._handle_skill_response(context, task, response):
+                break
+        
+        return context
+    
+    async def _arun_with_skills(self, task: str, context: TaskContext) -> TaskContext:
+        """
+        _run_with_skills 的协程版本
+        
+        Args:
+            task: 任务描述
+            context: 任务上下文
             
-            # 如果任务完成且没有命令需要执行，直接退出
-            if task_complete and not command:
-                context.status = TaskStatus.COMPLETED
-                self.ui.print_complete()
-                self.skill_manager.reset_all()
-                self._trigger_auto_hint_learning(context, task)
+        Returns:
+            TaskContext: 任务执行上下文
+        """
+        loop = asyncio.get_running_loop()
+        while context.status == TaskStatus.RUNNING:
+            skill_context = self._begin_iteration(context)
+            if skill_context is None:
                 break
             
-            # 如果没有命令，跳过
-            if not command:
-                self.ui.print_warning("改技能没有需要执行的命令。")
-                context.add_result(ExecutionResult(command="", returncode=0, stdout="", stderr="改技能没有需要执行的命令", skill_response=response))
-                continue
+            try:
+                response = await self.skill_manager.aexecute(
+                    task,
+                    context=skill_context,
+                )
+            except Exception as e:
+                # 失败时的提示学习可能读写文件（AUTO_HINT_BACKGROUND=false），同样放到线程池中
+                await loop.run_in_executor(None, self._handle_skill_failure, context, task, e)
+                break
+
+            # 用户确认和 shell 命令都是阻塞操作，放到线程池中执行
+            if await loop.run_in_executor(None, self._handle_skill_response, context, task, response):
+                break
+        
+        return context
+    
+    def _begin_iteration(self, context: TaskContext) -> Optional[Dict[str, Any]]:
+        """
+        开始新一轮迭代
+        
+        Returns:
+            传给技能的上下文；任务已被取消时返回 None
+        """
+        # 检查是否被取消
+        if self.cancelled:
+            context.status = TaskStatus.CANCELLED
+            self.skill_manager.reset_all()
+            self.ui.print_cancelled()
+            return None
             
-            # 处理用户确认（只有危险操作才需要确认）
-            action = self._handle_user_confirmation(command, response)
+        context.iteration += 1
+        self.ui.print_step(context.iteration)
+        
+        # 准备上下文
+        return {
+            'last_result': context.last_result,
+            'iteration': context.iteration,
+            'history': context.history,
+            'memory_bank': context.memory_bank,
+            'direct_mode': self.force_direct_mode,
+            # 本轮迭代的历史 prompt 只构建一次，技能选择器和技能共用
+            'prompt_builder': PromptBuilder(context.history, context.memory_bank),
+        }
+    
+    def _handle_skill_failure(self, context: TaskContext, task: str, e: Exception):
+        """技能执行抛出异常时标记任务失败"""
+        self.ui.print_error(f"技能执行失败: {e}")
+        context.status = TaskStatus.FAILED
+        
+        # Trigger auto hint learning even on failure to learn from mistakes
+        self._trigger_auto_hint_learning(context, task)
+    
+    def _handle_skill_response(self, context: TaskContext, task: str, response) -> bool:
+        """
+        处理一轮技能响应：确认并执行命令、记录结果
+        
+        Returns:
+            bool: 是否结束主循环
+        """
+        # 显示响应（跳过所有字段，因为已经流式显示了）
+        self.ui.print_skill_response(response, skip_all=True)
+        
+        # Determine if task is complete based on skill selector's assessment
+        # Use task_complete field which is set by the skill selector
+        task_complete = response.task_complete if response.task_complete is not None else False
+        
+        
+        # 获取要执行的命令（批量模式：多条互相独立的命令，逐条确认和编辑）
+        command = response.command.strip() if response.command else ""
+        batch = [c.strip() for c in (getattr(response, 'commands', None) or []) if c and c.strip()]
+        commands = batch or ([command] if command else [])
+        
+        # 如果任务完成且没有命令需要执行，直接退出
+        if task_complete and not commands:
+            context.status = TaskStatus.COMPLETED
+            self.ui.print_complete()
+            self.skill_manager.reset_all()
+            self._trigger_auto_hint_learning(context, task)
+            return True
+        
+        # 如果没有命令，跳过
+        if not commands:
+            self.ui.print_warning("改技能没有需要执行的命令。")
+            context.add_result(ExecutionResult(command="", returncode=0, stdout="", stderr="改技能没有需要执行的命令", skill_response=response))
+            return False
+        
+        # 处理用户确认（只有危险操作才需要确认）：批量时每条命令单独确认、编辑或跳过
+        approved = []
+        for index, command in enumerate(commands, 1):
+            label = f"[{index}/{len(commands)}] " if len(commands) > 1 else ""
+            action = self._handle_user_confirmation(command, response, label)
             
             if action == "quit":
                 context.status = TaskStatus.CANCELLED
@@ -154,7 +250,7 @@ class AlphaBot:
                 # Trigger auto hint learning even on cancellation to capture partial learning
                 self._trigger_auto_hint_learning(context, task)
                 
-                break
+                return True
             elif action == "skip":
                 # 跳过时，告诉技能用户选择跳过
                 skip_result = ExecutionResult(
@@ -168,40 +264,53 @@ class AlphaBot:
                 continue
             elif action.startswith("edit:"):
                 command = action[5:]
-            
-            # 执行命令
-            with self.ui.executing_animation(command):
-                result = self.executor.execute(command)
-            context.add_result(ExecutionResult(command=command, returncode=result.returncode, stdout=result.stdout, stderr=result.stderr, skill_response=response))
+            approved.append(command)
+        
+        # 全部被跳过
+        if not approved:
+            return False
+        
+        # 执行命令（批量时在有界进程池中并行执行，每条命令各自一条执行结果，实时输出带命令序号）
+        commands = approved
+        if len(commands) > 1:
+            with self.ui.executing_animation(f"{len(commands)} 条命令并行: " + "; ".join(commands)):
+                results = self.executor.execute_many(commands, on_output=self.ui.print_output_chunk)
+        else:
+            with self.ui.executing_animation(commands[0]):
+                results = [self.executor.execute(commands[0], on_output=self.ui.print_output_chunk)]
+        
+        for result in results:
+            context.add_result(ExecutionResult(command=result.command, returncode=result.returncode, stdout=result.stdout, stderr=result.stderr, skill_response=response, output_file=result.output_file))
             
             # 显示执行结果
             self.ui.print_result(result)
+        
+        # 如果有错误分析，在执行结果后显示
+        if response.error_analysis:
+            self.ui.print_error_analysis(response.error_analysis)
+        
+        # 如果任务标记为完成，在执行完最后一条命令后退出
+        if task_complete:
+            context.status = TaskStatus.COMPLETED
+            self.ui.print_complete()
             
-            # 如果有错误分析，在执行结果后显示
-            if response.error_analysis:
-                self.ui.print_error_analysis(response.error_analysis)
+            # Trigger auto hint learning after successful task completion
+            self._trigger_auto_hint_learning(context, task)
             
-                # 如果任务标记为完成，在执行完最后一条命令后退出
-            if task_complete:
-                context.status = TaskStatus.COMPLETED
-                self.ui.print_complete()
-                
-                # Trigger auto hint learning after successful task completion
-                self._trigger_auto_hint_learning(context, task)
-                
-                # 任务完成后清理技能状态，特别是浏览器技能
-                self.skill_manager.reset_all()
-                break
+            # 任务完成后清理技能状态，特别是浏览器技能
+            self.skill_manager.reset_all()
+            return True
         
-        return context
+        return False
     
-    def _handle_user_confirmation(self, command: str, response) -> str:
+    def _handle_user_confirmation(self, command: str, response, label: str = "") -> str:
         """
         处理用户确认（只有危险操作才需要确认）
         
         Args:
             command: 待执行的命令
             response: 技能响应（包含危险判断）
+            label: 批量模式下的命令序号，如 "[2/3] "，警告中会显示是哪条命令
             
         Returns:
             str: 操作指令
@@ -218,8 +327,11 @@ class AlphaBot:
         if not response.is_dangerous:
             return "execute"
         
-        # 危险操作，显示警告并要求确认
-        self.ui.print_danger_warning(response.danger_reason)
+        # 危险操作，显示警告并要求确认（批量时危险判断针对整批，逐条列出命令让用户确认）
+        reason = response.danger_reason
+        if label:
+            reason = f"{reason}\n\n📋 命令 {label}{command}" if reason else f"命令 {label}{command}"
+        self.ui.print_danger_warning(reason)
         choice = self.ui.prompt_action()
         
         if choice == "q":
@@ -232,6 +344,11 @@ class AlphaBot:
         else:  # "y"
             return "execute"
     
+    def close(self):
+        """释放执行器（常驻 bash 进程组、线程池）和技能管理器持有的资源"""
+        self.executor.close()
+        self.skill_manager.close()
+    
     def run_interactive(self):
         """运行交互模式"""
         self.ui.print_welcome()
@@ -265,12 +382,13 @@ class AlphaBot:
             
             # Only trigger learning if we have sufficient history
             if len(context.history) >= 2:
-                auto_hint_system.process_task_completion(
+                # Learning runs on the hint system's background worker, the task does not wait for it
+                if auto_hint_system.submit_task_completion(
                     context.history, 
                     self.skill_manager.skills, 
                     task_description
-                )
-                logger.info("Auto hint learning triggered after task completion")
+                ):
+                    logger.info("Auto hint learning queued after task completion")
             else:
                 logger.info("Insufficient execution history for hint learning")
         except Exception as e:
@@ -4,6 +4,8 @@ from .types import HintPattern, HintCategory, HintMetadata
 from .analyzer import ExecutionResultAnalyzer
 from .generator import HintGenerator
 from .persistence import HintPersistenceManager
+from .storage import HintStore, create_hint_store
+from .sqlite_store import SQLiteHintStore
 # Import system after other modules to avoid circular imports
 
 def get_auto_hint_system(enable_persistence=True):
@@ -23,6 +25,9 @@ __all__ = [
     'ExecutionResultAnalyzer',
     'HintGenerator',
     'HintPersistenceManager',
+    'HintStore',
+    'SQLiteHintStore',
+    'create_hint_store',
     'get_auto_hint_system',
     'initialize_auto_hint_system'
 ]
\ No newline at end of file
@@ -31,15 +31,34 @@ class ExecutionResultAnalyzer:
         Returns:
             ExecutionAnalysisResult containing discovered patterns and insights
         """
+        return self.analyze_histories([history], skills)
+    
+    def analyze_histories(self, histories: List[List[ExecutionResult]], skills) -> ExecutionAnalysisResult:
+        """
+        Analyze the histories of several tasks together
+        
+        Frequency counts (commands, errors, skill usage) are merged across tasks so
+        patterns recurring in several tasks reach the thresholds, while step sequences
+        are only followed within one task's history.
+        
+        Args:
+            histories: One execution history per task
+            skills: List of available skills
+            
+        Returns:
+            ExecutionAnalysisResult containing discovered patterns and insights
+        """
+        histories = [history for history in histories if history]
+        history = [result for task_history in histories for result in task_history]
         if not history:
             return ExecutionAnalysisResult()
         
-        logger.info(f"Analyzing execution history with {len(history)} steps")
+        logger.info(f"Analyzing execution history with {len(history)} steps from {len(histories)} task(s)")
         
         # Extract patterns by different dimensions
         command_patterns = self._extract_command_patterns(history)
         error_patterns = self._extract_error_patterns(history)
-        success_patterns = self._extract_success_patterns(history)
+        success_patterns = self._extract_success_patterns(histories)
         skill_usage_patterns = self._extract_skill_usage_patterns(history, skills)
         
         # Combine all patterns
@@ -51,7 +70,7 @@ class ExecutionResultAnalyzer:
         failure_patterns = [p for p in filtered_patterns if p.category == HintCategory.FAILURE_PATTERN]
         
         # Generate insights
-        improvement_opportunities = self._generate_improvement_opportunities(history, failure_patterns)
+        improvement_opportunities = self._generate_improvement_opportunities(histories, failure_patterns)
         skill_insights = self._generate_skill_insights(history, skills)
         
         result = ExecutionAnalysisResult(
@@ -129,25 +148,26 @@ class ExecutionResultAnalyzer:
         
         return patterns
     
-    def _extract_success_patterns(self, history: List[ExecutionResult]) -> List[HintPattern]:
-        """Extract patterns from successful executions"""
+    def _extract_success_patterns(self, histories: List[List[ExecutionResult]]) -> List[HintPattern]:
+        """Extract patterns from successful executions (sequences never span two tasks)"""
         patterns = []
         
         # Find successful command sequences
         success_sequences = []
-        current_sequence = []
-        
-        for result in history:
-            if result.success:
-                current_sequence.append(result)
-            else:
-                if len(current_sequence) >= 2:  # At least 2 consecutive successes
-                    success_sequences.append(current_sequence)
-                current_sequence = []
-        
-        # Don't forget the last sequence
-        if len(current_sequence) >= 2:
-            success_sequences.append(current_sequence)
+        for history in histories:
+            current_sequence = []
+            
+            for result in history:
+                if result.success:
+                    current_sequence.append(result)
+                else:
+                    if len(current_sequence) >= 2:  # At least 2 consecutive successes
+                        success_sequences.append(current_sequence)
+                    current_sequence = []
+            
+            # Don't forget the last sequence
+            if len(current_sequence) >= 2:
+                success_sequences.append(current_sequence)
         
         # Create patterns from successful sequences
         for i, sequence in enumerate(success_sequences):
@@ -215,24 +235,26 @@ class ExecutionResultAnalyzer:
                 filtered.append(pattern)
         return filtered
     
-    def _generate_improvement_opportunities(self, history: List[ExecutionResult], 
+    def _generate_improvement_opportunities(self, histories: List[List[ExecutionResult]], 
                                           failure_patterns: List[HintPattern]) -> List[str]:
         """Generate improvement opportunities based on failure analysis"""
         opportunities = []
+        history = [result for task_history in histories for result in task_history]
         
         # Analyze common failure types
         if failure_patterns:
             opportunities.append("Identify and address common failure patterns in execution")
         
-        # Check for repeated failures
-        consecutive_failures = 0
+        # Check for repeated failures (within one task)
         max_consecutive_failures = 0
-        for result in history:
-            if not result.success:
-                consecutive_failures += 1
-                max_consecutive_failures = max(max_consecutive_failures, consecutive_failures)
-            else:
-                consecutive_failures = 0
+        for task_history in histories:
+            consecutive_failures = 0
+            for result in task_history:
+                if not result.success:
+                    consecutive_failures += 1
+                    max_consecutive_failures = max(max_consecutive_failures, consecutive_failures)
+                else:
+                    consecutive_failures = 0
         
         if max_consecutive_failures > 2:
             opportunities.append(f"Address pattern of {max_consecutive_failures} consecutive failures")
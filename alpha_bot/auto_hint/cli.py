@@ -174,6 +174,36 @@ def add_hint(skill: str, title: str, content: str, category: str):
         click.echo(f"Error adding hint: {e}")
 
 
+@auto_hint.command()
+@click.option('--path', required=True, type=click.Path(), help='Directory with hint_*.md files and hints_metadata.json')
+def import_hints(path: str):
+    """Import hints from the markdown layout into the SQLite store"""
+    try:
+        system = get_auto_hint_system()
+        if not hasattr(system.persistence, "import_markdown"):
+            click.echo("Import requires the sqlite backend (AUTO_HINT_BACKEND=sqlite)")
+            return
+        count = system.persistence.import_markdown(path)
+        click.echo(f"Imported {count} hints from {path}")
+    except Exception as e:
+        click.echo(f"Error importing hints: {e}")
+
+
+@auto_hint.command()
+@click.option('--path', required=True, type=click.Path(), help='Directory to write hint_*.md files to')
+def export_hints(path: str):
+    """Export hints from the SQLite store to the markdown layout"""
+    try:
+        system = get_auto_hint_system()
+        if not hasattr(system.persistence, "export_markdown"):
+            click.echo("Export requires the sqlite backend (AUTO_HINT_BACKEND=sqlite)")
+            return
+        count = system.persistence.export_markdown(path)
+        click.echo(f"Exported {count} hints to {path}")
+    except Exception as e:
+        click.echo(f"Error exporting hints: {e}")
+
+
 @auto_hint.command()
 @click.option('--path', type=click.Path(), help='Path to save statistics')
 def stats(path: Optional[str]):
@@ -15,6 +15,7 @@ class AutoHintConfig:
     # Persistence settings
     enable_persistence: bool = True
     hints_storage_path: Optional[str] = None
+    storage_backend: str = "files"       # "files" (hint_*.md + hints_metadata.json) or "sqlite"
     
     # Analysis settings
     min_history_length: int = 3
@@ -23,6 +24,16 @@ class AutoHintConfig:
     min_confidence_threshold: float = 0.7
     success_rate_threshold: float = 0.8
     
+    # Lookup settings
+    content_cache_size: int = 256        # hint contents kept in memory for prompt injection
+    usage_flush_interval: float = 30.0   # seconds before buffered usage/effectiveness updates are written
+    usage_flush_threshold: int = 50      # buffered updates that trigger a write right away; 1 writes every update
+    
+    # Retrieval settings
+    retrieval: str = "bm25"              # "bm25": hints relevant to the task and last error; "effectiveness": global top hints
+    retrieval_budget_ms: float = 20.0    # time budget for scoring one lookup
+    retrieval_refresh: float = 300.0     # seconds before the retrieval index is rebuilt (picks up hints saved by other processes)
+    
     # Generation settings
     max_hints_per_category: int = 5
     max_hints_per_skill: int = 3
@@ -31,6 +42,13 @@ class AutoHintConfig:
     auto_cleanup_enabled: bool = True
     cleanup_max_age_days: int = 30
     cleanup_min_effectiveness: float = 0.3
+    
+    # Background learning settings
+    background_learning: bool = True     # learn on a worker thread instead of at task completion
+    learning_queue_size: int = 32        # completed tasks waiting to be learned from; extra ones are dropped
+    learning_batch_size: int = 8         # histories analyzed together in one pass
+    learning_batch_wait: float = 0.5     # seconds to wait for more histories before a pass
+    generation_workers: int = 4          # concurrent hint generation LLM calls
 
 
 def load_auto_hint_config() -> AutoHintConfig:
@@ -48,7 +66,8 @@ def load_auto_hint_config() -> AutoHintConfig:
     
     hints_path = os.getenv("AUTO_HINT_STORAGE_PATH")
     if hints_path:
-        config.hints_storage_path = hints_path
+        config.hints_storage_path = os.path.expanduser(hints_path)
+    config.storage_backend = os.getenv("AUTO_HINT_BACKEND", "files").lower()
     
     # Analysis settings
     try:
@@ -60,6 +79,22 @@ def load_auto_hint_config() -> AutoHintConfig:
     except ValueError:
         pass  # Use defaults if conversion fails
     
+    # Lookup settings
+    try:
+        config.content_cache_size = int(os.getenv("AUTO_HINT_CONTENT_CACHE", "256"))
+        config.usage_flush_interval = float(os.getenv("AUTO_HINT_FLUSH_INTERVAL", "30"))
+        config.usage_flush_threshold = int(os.getenv("AUTO_HINT_FLUSH_THRESHOLD", "50"))
+    except ValueError:
+        pass
+    
+    # Retrieval settings
+    config.retrieval = os.getenv("AUTO_HINT_RETRIEVAL", "bm25").lower()
+    try:
+        config.retrieval_budget_ms = float(os.getenv("AUTO_HINT_RETRIEVAL_BUDGET_MS", "20"))
+        config.retrieval_refresh = float(os.getenv("AUTO_HINT_RETRIEVAL_REFRESH", "300"))
+    except ValueError:
+        pass
+    
     # Generation settings
     try:
         config.max_hints_per_category = int(os.getenv("AUTO_HINT_MAX_PER_CATEGORY", "5"))
@@ -75,6 +110,16 @@ def load_auto_hint_config() -> AutoHintConfig:
     except ValueError:
         pass
     
+    # Background learning settings
+    config.background_learning = os.getenv("AUTO_HINT_BACKGROUND", "true").lower() == "true"
+    try:
+        config.learning_queue_size = int(os.getenv("AUTO_HINT_QUEUE_SIZE", "32"))
+        config.learning_batch_size = int(os.getenv("AUTO_HINT_BATCH_SIZE", "8"))
+        config.learning_batch_wait = float(os.getenv("AUTO_HINT_BATCH_WAIT", "0.5"))
+        config.generation_workers = int(os.getenv("AUTO_HINT_LLM_WORKERS", "4"))
+    except ValueError:
+        pass
+    
     return config
 
 
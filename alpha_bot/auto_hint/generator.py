@@ -1,11 +1,12 @@
 """Hint Generator - Generate hints content from discovered patterns"""
 
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 from loguru import logger
 
-from ..llm.openai_client import OpenAIClient
+from ..llm.registry import get_llm_client
 from .types import HintPattern, HintCategory, HintMetadata, ExecutionAnalysisResult
 
 
@@ -14,11 +15,12 @@ class HintGenerator:
     Generates hints content from discovered patterns using LLM
     """
     
-    def __init__(self, enable_llm=True):
+    def __init__(self, enable_llm=True, max_workers: int = 4):
         self.enable_llm = enable_llm
+        self.max_workers = max(1, max_workers)  # Concurrent LLM calls per generate_hints_from_analysis
         try:
             if enable_llm:
-                self.llm = OpenAIClient()
+                self.llm = get_llm_client()
             else:
                 self.llm = None
         except Exception:
@@ -38,20 +40,43 @@ class HintGenerator:
         Returns:
             List of generated hints with metadata
         """
-        hints = []
+        pending = []
         
-        # Generate hints for different categories
-        hints.extend(self._generate_success_hints(analysis_result.success_patterns, task_description))
-        hints.extend(self._generate_failure_hints(analysis_result.failure_patterns, task_description))
-        hints.extend(self._generate_best_practice_hints(analysis_result, task_description))
-        hints.extend(self._generate_troubleshooting_hints(analysis_result.failure_patterns, task_description))
+        # Collect hints for different categories; content is generated below
+        pending.extend(self._generate_success_hints(analysis_result.success_patterns, task_description))
+        pending.extend(self._generate_failure_hints(analysis_result.failure_patterns, task_description))
+        pending.extend(self._generate_best_practice_hints(analysis_result, task_description))
+        pending.extend(self._generate_troubleshooting_hints(analysis_result.failure_patterns, task_description))
         
+        hints = self._generate_contents(pending)
         logger.info(f"Generated {len(hints)} hints from analysis")
         return hints
     
+    def _generate_contents(self, pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run the content generators of pending hints, concurrently when there are several
+        
+        Each pending hint carries a zero-argument "generate" callable (one LLM call);
+        hints whose content comes back empty are dropped.
+        """
+        generators = [hint.pop("generate") for hint in pending]
+        if len(generators) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(generators)),
+                                    thread_name_prefix="hint-generation") as pool:
+                contents = list(pool.map(lambda generate: generate(), generators))
+        else:
+            contents = [generate() for generate in generators]
+        
+        hints = []
+        for hint, content in zip(pending, contents):
+            if content:
+                hint["content"] = content
+                hints.append(hint)
+        return hints
+    
     def _generate_success_hints(self, patterns: List[HintPattern], 
                                task_description: str) -> List[Dict[str, Any]]:
-        """Generate hints from successful patterns"""
+        """Collect hints from successful patterns (content is generated by _generate_contents)"""
         hints = []
         
         # Group patterns by skill
@@ -69,27 +94,26 @@ class HintGenerator:
             # Combine similar patterns
             combined_pattern = self._combine_patterns(skill_patterns_list)
             
-            hint_content = self._generate_success_hint_content(combined_pattern, task_description)
-            if hint_content:
-                metadata = HintMetadata(
-                    title=f"Success Pattern for {skill_name}",
-                    category=HintCategory.SUCCESS_PATTERN,
-                    skill_name=skill_name,
-                    pattern_id=combined_pattern.id
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": hint_content,
-                    "skill_name": skill_name,
-                    "category": "success_pattern"
-                })
+            metadata = HintMetadata(
+                title=f"Success Pattern for {skill_name}",
+                category=HintCategory.SUCCESS_PATTERN,
+                skill_name=skill_name,
+                pattern_id=combined_pattern.id,
+                keywords=combined_pattern.context_keywords
+            )
+            
+            hints.append({
+                "metadata": metadata,
+                "generate": lambda p=combined_pattern: self._generate_success_hint_content(p, task_description),
+                "skill_name": skill_name,
+                "category": "success_pattern"
+            })
         
         return hints
     
     def _generate_failure_hints(self, patterns: List[HintPattern], 
                                task_description: str) -> List[Dict[str, Any]]:
-        """Generate hints from failure patterns"""
+        """Collect hints from failure patterns (content is generated by _generate_contents)"""
         hints = []
         
         # Group by error type
@@ -107,27 +131,26 @@ class HintGenerator:
                 
             combined_pattern = self._combine_patterns(error_patterns_list)
             
-            hint_content = self._generate_failure_hint_content(combined_pattern, task_description)
-            if hint_content:
-                metadata = HintMetadata(
-                    title=f"Failure Pattern: {error_type}",
-                    category=HintCategory.FAILURE_PATTERN,
-                    skill_name=combined_pattern.skill_name,
-                    pattern_id=combined_pattern.id
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": hint_content,
-                    "skill_name": combined_pattern.skill_name,
-                    "category": "failure_pattern"
-                })
+            metadata = HintMetadata(
+                title=f"Failure Pattern: {error_type}",
+                category=HintCategory.FAILURE_PATTERN,
+                skill_name=combined_pattern.skill_name,
+                pattern_id=combined_pattern.id,
+                keywords=combined_pattern.context_keywords
+            )
+            
+            hints.append({
+                "metadata": metadata,
+                "generate": lambda p=combined_pattern: self._generate_failure_hint_content(p, task_description),
+                "skill_name": combined_pattern.skill_name,
+                "category": "failure_pattern"
+            })
         
         return hints
     
     def _generate_best_practice_hints(self, analysis_result: ExecutionAnalysisResult,
                                      task_description: str) -> List[Dict[str, Any]]:
-        """Generate best practice hints from overall analysis"""
+        """Collect best practice hints from overall analysis (content is generated by _generate_contents)"""
         hints = []
         
         # Analyze overall success patterns
@@ -136,20 +159,18 @@ class HintGenerator:
             per_skill_insights = analysis_result.skill_insights.get("per_skill", {})
             
             # Generate overall best practices
-            overall_hint = self._generate_overall_best_practices(overall_insights, per_skill_insights, task_description)
-            if overall_hint:
-                metadata = HintMetadata(
-                    title="Overall Best Practices",
-                    category=HintCategory.BEST_PRACTICE,
-                    skill_name="general"
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": overall_hint,
-                    "skill_name": "general",
-                    "category": "best_practice"
-                })
+            metadata = HintMetadata(
+                title="Overall Best Practices",
+                category=HintCategory.BEST_PRACTICE,
+                skill_name="general"
+            )
+            
+            hints.append({
+                "metadata": metadata,
+                "generate": lambda: self._generate_overall_best_practices(overall_insights, per_skill_insights, task_description),
+                "skill_name": "general",
+                "category": "best_practice"
+            })
             
             # Generate skill-specific best practices
             for skill_name, skill_stats in per_skill_insights.items():
@@ -157,26 +178,24 @@ class HintGenerator:
                     break
                     
                 if skill_stats["success_rate"] > 0.7:  # Only for reasonably successful skills
-                    skill_hint = self._generate_skill_best_practices(skill_name, skill_stats, task_description)
-                    if skill_hint:
-                        metadata = HintMetadata(
-                            title=f"Best Practices for {skill_name}",
-                            category=HintCategory.BEST_PRACTICE,
-                            skill_name=skill_name
-                        )
-                        
-                        hints.append({
-                            "metadata": metadata,
-                            "content": skill_hint,
-                            "skill_name": skill_name,
-                            "category": "best_practice"
-                        })
+                    metadata = HintMetadata(
+                        title=f"Best Practices for {skill_name}",
+                        category=HintCategory.BEST_PRACTICE,
+                        skill_name=skill_name
+                    )
+                    
+                    hints.append({
+                        "metadata": metadata,
+                        "generate": lambda n=skill_name, st=skill_stats: self._generate_skill_best_practices(n, st, task_description),
+                        "skill_name": skill_name,
+                        "category": "best_practice"
+                    })
         
         return hints
     
     def _generate_troubleshooting_hints(self, failure_patterns: List[HintPattern],
                                        task_description: str) -> List[Dict[str, Any]]:
-        """Generate troubleshooting hints"""
+        """Collect troubleshooting hints (content is generated by _generate_contents)"""
         hints = []
         
         if not failure_patterns:
@@ -194,20 +213,19 @@ class HintGenerator:
             if len(hints) >= self.max_hints_per_category:
                 break
                 
-            troubleshooting_guide = self._generate_troubleshooting_guide(skill_name, failures, task_description)
-            if troubleshooting_guide:
-                metadata = HintMetadata(
-                    title=f"Troubleshooting Guide for {skill_name}",
-                    category=HintCategory.TROUBLESHOOTING,
-                    skill_name=skill_name
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": troubleshooting_guide,
-                    "skill_name": skill_name,
-                    "category": "troubleshooting"
-                })
+            metadata = HintMetadata(
+                title=f"Troubleshooting Guide for {skill_name}",
+                category=HintCategory.TROUBLESHOOTING,
+                skill_name=skill_name,
+                keywords=list(dict.fromkeys(keyword for pattern in failures for keyword in pattern.context_keywords))
+            )
+            
+            hints.append({
+                "metadata": metadata,
+                "generate": lambda n=skill_name, f=failures: self._generate_troubleshooting_guide(n, f, task_description),
+                "skill_name": skill_name,
+                "category": "troubleshooting"
+            })
         
         return hints
     
@@ -420,7 +438,7 @@ class HintGenerator:
             category=base_pattern.category,
             skill_name=combined_skill_name,
             pattern_description=pattern_description,
-            context_keywords=base_pattern.context_keywords,
+            context_keywords=list(dict.fromkeys(keyword for pattern in patterns for keyword in pattern.context_keywords)),
             success_rate=avg_success_rate,
             frequency=total_frequency,
             confidence=min(1.0, total_frequency / 20.0),
@@ -0,0 +1,169 @@
+"""Hint Index - In-memory skill index for ranked hint lookup without disk reads"""
+
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+# (-effectiveness, -usage, insertion order, hint id): ascending order is best hint first
+RankKey = Tuple[float, int, int, str]
+
+
+class HintIndex:
+    """
+    Hint metadata grouped by skill, each group kept sorted by (effectiveness, usage)
+
+    Writes re-rank only the hint that changed (binary search in its skill's list),
+    so reading the top k hints of a skill is a slice of the first k entries.
+    Hint contents are kept in an LRU cache; load_content is only called on a miss,
+    which means a warm lookup does no disk I/O.
+
+    Ties keep insertion order, like a stable sort of the metadata would.
+    """
+
+    def __init__(self, load_content: Callable[[Dict[str, Any]], Optional[str]], content_cache_size: int = 256):
+        """
+        Args:
+            load_content: reads a hint's content given its metadata, None if missing
+            content_cache_size: hint contents kept in memory
+        """
+        self.load_content = load_content
+        self.content_cache_size = max(content_cache_size, 0)
+        self._lock = threading.RLock()
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._ranked: Dict[str, List[RankKey]] = {}
+        self._keys: Dict[str, RankKey] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._contents: "OrderedDict[str, str]" = OrderedDict()
+
+        # Statistics
+        self.content_hits = 0
+        self.content_misses = 0
+
+    def rebuild(self, metadata: Dict[str, Dict[str, Any]]):
+        """Index all hints from scratch (on load)"""
+        with self._lock:
+            self._metadata = {}
+            self._ranked = {}
+            self._keys = {}
+            self._order = {}
+            self._next_order = 0
+            self._contents.clear()
+            for hint_id, meta in metadata.items():
+                meta.setdefault("id", hint_id)
+                self.put(meta)
+
+    def put(self, meta: Dict[str, Any]):
+        """Add a hint or re-rank it after its metadata changed"""
+        hint_id = meta["id"]
+        with self._lock:
+            self._discard(hint_id)
+            order = self._order.get(hint_id)
+            if order is None:
+                order = self._order[hint_id] = self._next_order
+                self._next_order += 1
+            key = (
+                -float(meta.get("effectiveness_score", 0.0) or 0.0),
+                -int(meta.get("usage_count", 0) or 0),
+                order,
+                hint_id
+            )
+            self._metadata[hint_id] = meta
+            self._keys[hint_id] = key
+            bisect.insort(self._ranked.setdefault(self._skill(meta), []), key)
+
+    def remove(self, hint_id: str):
+        """Drop a hint from the index and the content cache"""
+        with self._lock:
+            self._discard(hint_id)
+            self._order.pop(hint_id, None)
+            self._contents.pop(hint_id, None)
+
+    def _discard(self, hint_id: str):
+        key = self._keys.pop(hint_id, None)
+        if key is None:
+            return
+        skill = self._skill(self._metadata.pop(hint_id))
+        ranked = self._ranked.get(skill, [])
+        position = bisect.bisect_left(ranked, key)
+        if position < len(ranked) and ranked[position] == key:
+            del ranked[position]
+        if not ranked:
+            self._ranked.pop(skill, None)
+
+    @staticmethod
+    def _skill(meta: Dict[str, Any]) -> str:
+        return meta.get("skill_name", "general")
+
+    def top(self, skill_name: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Best k hints of a skill, best first
+
+        Args:
+            skill_name: Name of the skill
+            k: Number of hints, None for all of them
+
+        Returns:
+            List of {"metadata", "content"} dicts; hints whose content is missing are skipped
+        """
+        hints = []
+        with self._lock:
+            for key in self._ranked.get(skill_name, ()):
+                if k is not None and len(hints) >= k:
+                    break
+                meta = self._metadata[key[3]]
+                content = self.content(meta)
+                if content is not None:
+                    hints.append({"metadata": meta, "content": content})
+        return hints
+
+    def content(self, meta: Dict[str, Any]) -> Optional[str]:
+        """Hint content from the LRU cache, loaded on a miss"""
+        hint_id = meta["id"]
+        with self._lock:
+            content = self._contents.get(hint_id)
+            if content is not None:
+                self._contents.move_to_end(hint_id)
+                self.content_hits += 1
+                return content
+            self.content_misses += 1
+            try:
+                content = self.load_content(meta)
+            except Exception as e:
+                logger.warning(f"Failed to load hint {meta.get('title', 'Unknown')}: {e}")
+                return None
+            if content is not None:
+                self.cache_content(hint_id, content)
+            return content
+
+    def cache_content(self, hint_id: str, content: str):
+        """Put a hint's content in the LRU cache, evicting the least recently used"""
+        with self._lock:
+            self._contents[hint_id] = content
+            self._contents.move_to_end(hint_id)
+            while len(self._contents) > self.content_cache_size:
+                self._contents.popitem(last=False)
+
+    def skills(self) -> List[str]:
+        """Skills that have at least one hint"""
+        with self._lock:
+            return list(self._ranked)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, hint_id: str) -> bool:
+        return hint_id in self._keys
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "indexed_hints": len(self._keys),
+            "indexed_skills": len(self._ranked),
+            "cached_contents": len(self._contents),
+            "content_hits": self.content_hits,
+            "content_misses": self.content_misses,
+        }
@@ -9,30 +9,53 @@ from pathlib import Path
 from loguru import logger
 
 from .types import HintMetadata, HintCategory
+from .index import HintIndex
+from .config import get_auto_hint_config
+from .storage import HintStore, default_hints_path, metadata_to_dict
 
 
-class HintPersistenceManager:
+class HintPersistenceManager(HintStore):
     """
     Manages persistence of generated hints including storage, retrieval, and versioning
+    
+    File backend: one hint_<hash>.md per hint plus hints_metadata.json. Meant for
+    a single process; see SQLiteHintStore for stores shared between processes.
     """
     
-    def __init__(self, base_path: Optional[str] = None):
+    backend = "files"
+    
+    def __init__(
+        self,
+        base_path: Optional[str] = None,
+        content_cache_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        flush_threshold: Optional[int] = None
+    ):
         """
         Initialize the persistence manager
         
         Args:
             base_path: Base directory for hints storage. If None, uses default path.
+            content_cache_size: Hint contents kept in memory. If None, uses AUTO_HINT_CONTENT_CACHE.
+            flush_interval: Seconds before buffered usage updates are written. If None, uses AUTO_HINT_FLUSH_INTERVAL.
+            flush_threshold: Buffered updates that force a write. If None, uses AUTO_HINT_FLUSH_THRESHOLD.
         """
         if base_path is None:
             # Default to skills/hints_generated directory
-            base_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), 
-                "skills", 
-                "hints_generated"
-            )
+            base_path = default_hints_path()
         
         self.base_path = Path(base_path)
         self.metadata_file = self.base_path / "hints_metadata.json"
+        config = get_auto_hint_config()
+        if content_cache_size is None:
+            content_cache_size = config.content_cache_size
+        # Lookups go through the index; hint files are only read on a content cache miss
+        self.index = HintIndex(self._read_hint_file, content_cache_size)
+        
+        # Write-behind for usage/effectiveness updates: they change metadata in memory
+        # and the file is rewritten once per flush instead of once per update
+        self._init_write_behind(flush_interval, flush_threshold)
+        self.flush_count = 0
         self._ensure_directories()
         self._load_metadata()
     
@@ -61,9 +84,26 @@ class HintPersistenceManager:
                 self.metadata = {}
         else:
             self.metadata = {}
+        self.index.rebuild(self.metadata)
+    
+    def _read_hint_file(self, hint_meta: Dict[str, Any]) -> Optional[str]:
+        """Read a hint's markdown file, None if it no longer exists"""
+        file_path = self._get_skill_directory(hint_meta.get("skill_name", "general")) / hint_meta["filename"]
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
     
     def _save_metadata(self):
-        """Save hints metadata to file"""
+        """Save hints metadata to file (including any buffered updates)"""
+        with self._lock:
+            self._write_metadata()
+            self._reset_pending()
+    
+    def _write_pending(self):
+        self._write_metadata()
+    
+    def _write_metadata(self):
         try:
             # Convert metadata to JSON-serializable format
             def make_serializable(obj):
@@ -88,8 +128,13 @@ class HintPersistenceManager:
             
             serializable_metadata = make_serializable(self.metadata)
             
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
+            # Write a temporary file and rename it over the old one, so a crash
+            # mid-write never leaves a truncated metadata file behind
+            tmp_file = self.metadata_file.with_name(f"{self.metadata_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(serializable_metadata, f, indent=2, ensure_ascii=False, default=str)
+            os.replace(tmp_file, self.metadata_file)
+            self.flush_count += 1
         except Exception as e:
             logger.error(f"Failed to save hints metadata: {e}")
     
@@ -103,6 +148,27 @@ class HintPersistenceManager:
         Returns:
             bool: True if saved successfully
         """
+        with self._lock:
+            if not self._store_hint(hint_data):
+                return False
+            self._save_metadata()
+            return True
+    
+    def save_hints(self, hints: List[Dict[str, Any]]) -> int:
+        """
+        Save several hints with a single metadata write
+        
+        Returns:
+            Number of hints saved
+        """
+        with self._lock:
+            saved_count = sum(1 for hint_data in hints if self._store_hint(hint_data))
+            if saved_count:
+                self._save_metadata()
+            return saved_count
+    
+    def _store_hint(self, hint_data: Dict[str, Any]) -> bool:
+        """Write a hint's file and add it to the in-memory metadata (without writing the metadata file)"""
         logger.info(f"Saving hint: {hint_data}")
         try:
             metadata = hint_data.get("metadata")
@@ -111,18 +177,7 @@ class HintPersistenceManager:
                 return False
             
             # Convert metadata to dict if it's a dataclass
-            if hasattr(metadata, '__dict__'):
-                metadata_dict = metadata.__dict__.copy()  # Create a copy to avoid modifying the original
-                # Convert enum fields to their values
-                if 'category' in metadata_dict and hasattr(metadata_dict['category'], 'value'):
-                    metadata_dict['category'] = metadata_dict['category'].value
-                # Convert datetime fields to ISO format strings
-                if 'created_at' in metadata_dict and hasattr(metadata_dict['created_at'], 'isoformat'):
-                    metadata_dict['created_at'] = metadata_dict['created_at'].isoformat()
-                if 'updated_at' in metadata_dict and hasattr(metadata_dict['updated_at'], 'isoformat'):
-                    metadata_dict['updated_at'] = metadata_dict['updated_at'].isoformat()
-            else:
-                metadata_dict = metadata
+            metadata_dict = metadata_to_dict(metadata)
             
             # Generate unique filename based on content hash
             # Use formatted hint data for hash generation
@@ -149,22 +204,24 @@ class HintPersistenceManager:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(hint_content)
             
-            # Update metadata
+            # Update metadata (buffered usage updates are written along with it)
             hint_id = metadata_dict.get("id", content_hash)
-            self.metadata[hint_id] = {
-                "id": hint_id,
-                "title": metadata_dict.get("title", ""),
-                "category": metadata_dict.get("category", "best_practice"),
-                "skill_name": metadata_dict.get("skill_name", "general"),
-                "filename": filename,
-                "created_at": metadata_dict.get("created_at", datetime.now().isoformat()),
-                "updated_at": datetime.now().isoformat(),
-                "usage_count": metadata_dict.get("usage_count", 0),
-                "effectiveness_score": metadata_dict.get("effectiveness_score", 0.0),
-                "content_hash": content_hash
-            }
-            
-            self._save_metadata()
+            with self._lock:
+                self.metadata[hint_id] = {
+                    "id": hint_id,
+                    "title": metadata_dict.get("title", ""),
+                    "category": metadata_dict.get("category", "best_practice"),
+                    "skill_name": metadata_dict.get("skill_name", "general"),
+                    "filename": filename,
+                    "created_at": metadata_dict.get("created_at", datetime.now().isoformat()),
+                    "updated_at": datetime.now().isoformat(),
+                    "usage_count": metadata_dict.get("usage_count", 0),
+                    "effectiveness_score": metadata_dict.get("effectiveness_score", 0.0),
+                    "keywords": list(metadata_dict.get("keywords") or []),
+                    "content_hash": content_hash
+                }
+                self.index.put(self.metadata[hint_id])
+                self.index.cache_content(hint_id, hint_content)
             logger.info(f"Saved hint: {metadata_dict.get('title', 'Untitled')} to {file_path}")
             return True
             
@@ -180,36 +237,25 @@ class HintPersistenceManager:
             skill_name: Name of the skill
             
         Returns:
-            List of hint dictionaries
+            List of hint dictionaries, most effective and most used first
         """
-        hints = []
-        skill_dir = self._get_skill_directory(skill_name)
-        
-        if not skill_dir.exists():
-            return hints
+        return self.index.top(skill_name)
+    
+    def top_hints_for_skill(self, skill_name: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Load the best hints for a specific skill
         
-        # Load hints from metadata
-        skill_hints = [
-            meta for meta in self.metadata.values()
-            if meta.get("skill_name") == skill_name
-        ]
+        Only the returned hints are touched, so the cost depends on limit rather
+        than on how many hints are stored; contents come from the in-memory cache.
         
-        # Read content for each hint
-        for hint_meta in skill_hints:
-            try:
-                file_path = skill_dir / hint_meta["filename"]
-                if file_path.exists():
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    hints.append({
-                        "metadata": hint_meta,
-                        "content": content
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to load hint {hint_meta.get('title', 'Unknown')}: {e}")
-        
-        return hints
+        Args:
+            skill_name: Name of the skill
+            limit: Maximum number of hints to return
+            
+        Returns:
+            List of hint dictionaries, most effective and most used first
+        """
+        return self.index.top(skill_name, max(limit, 0))
     
     def load_all_hints(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -220,11 +266,7 @@ class HintPersistenceManager:
         """
         all_hints = {}
         
-        # Get all skill directories
-        skill_dirs = [d for d in self.base_path.iterdir() if d.is_dir() and d.name != ".git"]
-        
-        for skill_dir in skill_dirs:
-            skill_name = skill_dir.name
+        for skill_name in self.index.skills():
             hints = self.load_hints_for_skill(skill_name)
             if hints:
                 all_hints[skill_name] = hints
@@ -235,27 +277,36 @@ class HintPersistenceManager:
         """
         Update usage count for a hint
         
+        The new count is used for ranking right away; the metadata file is
+        written by the next flush (see flush_interval / flush_threshold).
+        
         Args:
             hint_id: ID of the hint to update
         """
-        if hint_id in self.metadata:
+        with self._lock:
+            if hint_id not in self.metadata:
+                return
             self.metadata[hint_id]["usage_count"] = self.metadata[hint_id].get("usage_count", 0) + 1
             self.metadata[hint_id]["updated_at"] = datetime.now().isoformat()
-            self._save_metadata()
+            self.index.put(self.metadata[hint_id])
+            self._mark_dirty()
             logger.debug(f"Updated usage count for hint {hint_id}")
     
     def update_hint_effectiveness(self, hint_id: str, score: float):
         """
-        Update effectiveness score for a hint
+        Update effectiveness score for a hint (buffered like update_hint_usage)
         
         Args:
             hint_id: ID of the hint to update
             score: Effectiveness score (0.0-1.0)
         """
-        if hint_id in self.metadata:
+        with self._lock:
+            if hint_id not in self.metadata:
+                return
             self.metadata[hint_id]["effectiveness_score"] = score
             self.metadata[hint_id]["updated_at"] = datetime.now().isoformat()
-            self._save_metadata()
+            self.index.put(self.metadata[hint_id])
+            self._mark_dirty()
             logger.debug(f"Updated effectiveness score for hint {hint_id}: {score}")
     
     def delete_hint(self, hint_id: str) -> bool:
@@ -281,8 +332,10 @@ class HintPersistenceManager:
                 file_path.unlink()
             
             # Remove from metadata
-            del self.metadata[hint_id]
-            self._save_metadata()
+            with self._lock:
+                del self.metadata[hint_id]
+                self.index.remove(hint_id)
+                self._save_metadata()
             
             logger.info(f"Deleted hint: {hint_meta.get('title', 'Unknown')}")
             return True
@@ -312,10 +365,14 @@ class HintPersistenceManager:
             hints_by_category[category] = hints_by_category.get(category, 0) + 1
         
         return {
+            "backend": self.backend,
             "total_hints": total_hints,
             "hints_by_skill": hints_by_skill,
             "hints_by_category": hints_by_category,
-            "storage_path": str(self.base_path)
+            "storage_path": str(self.base_path),
+            "index": self.index.get_stats(),
+            "pending_updates": self._pending_updates,
+            "metadata_writes": self.flush_count
         }
     
     def cleanup_old_hints(self, max_age_days: int = 30, min_effectiveness: float = 0.3) -> int:
@@ -0,0 +1,143 @@
+"""Hint Retrieval - Rank a skill's hints by relevance to the current task (BM25, fully offline)"""
+
+import re
+import math
+import time
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+from .storage import parse_hint_markdown
+
+
+_WORD = re.compile(r"[a-z0-9_]+")
+_CJK = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+_STOP_WORDS = frozenset(
+    "an and are as at be by for from has have if in into is it its of on or so that the "
+    "then this to was were will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into retrieval terms
+
+    Latin text becomes lowercase words (stop words and single letters dropped);
+    Chinese has no spaces, so each run of CJK characters becomes its bigrams.
+    """
+    text = text.lower()
+    tokens = [word for word in _WORD.findall(text) if len(word) > 1 and word not in _STOP_WORDS]
+    for run in _CJK.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def hint_text(hint: Dict[str, Any]) -> str:
+    """The text a hint is indexed by: title, pattern keywords and content"""
+    metadata = hint.get("metadata", {})
+    keywords = " ".join(str(keyword) for keyword in metadata.get("keywords") or [])
+    return f"{metadata.get('title', '')}\n{keywords}\n{parse_hint_markdown(hint.get('content', ''))}"
+
+
+class _SkillIndex:
+    """Inverted index of one skill's hints"""
+
+    def __init__(self, hints: List[Dict[str, Any]], k1: float, b: float):
+        self.hints = hints
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for doc, hint in enumerate(hints):
+            counts: Dict[str, int] = {}
+            for term in tokenize(hint_text(hint)):
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((doc, tf))
+            lengths.append(sum(counts.values()))
+        average = (sum(lengths) / len(lengths)) if lengths else 0.0
+        # Per-document part of the BM25 denominator, computed once
+        self.norms = [k1 * (1 - b + b * length / average) if average else k1 for length in lengths]
+        self.boosts = [1.0 + float(hint.get("metadata", {}).get("effectiveness_score", 0.0) or 0.0) for hint in hints]
+
+
+class HintRetriever:
+    """
+    BM25 index over hints, partitioned by skill
+
+    search() scores only the hints of the requested skill that share a term with
+    the query. Scores are multiplied by (1 + effectiveness_score), so among
+    similarly relevant hints the proven ones win. Query terms are processed
+    rarest first, and when a time budget is given the remaining (most common,
+    least informative) terms are skipped once it is used up.
+
+    The index is immutable; rebuild it from the store when hints change.
+    """
+
+    def __init__(self, hints_by_skill: Dict[str, List[Dict[str, Any]]], k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            hints_by_skill: Hints grouped by skill, as returned by HintStore.load_all_hints
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.k1 = k1
+        self._skills = {skill: _SkillIndex(hints, k1, b) for skill, hints in hints_by_skill.items() if hints}
+        self.size = sum(len(index.hints) for index in self._skills.values())
+        self.built_at = time.monotonic()
+
+        # Statistics
+        self.searches = 0
+        self.budget_cuts = 0
+
+    def search(
+        self,
+        query: str,
+        skill_name: str,
+        limit: int,
+        budget: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Hints of a skill most relevant to the query, best first
+
+        Args:
+            query: Task description, last error, ...
+            skill_name: Only this skill's hints are considered
+            limit: Maximum number of hints to return
+            budget: Seconds the scoring may take, None for no limit
+
+        Returns:
+            Matching hints; empty if no hint shares a term with the query
+        """
+        self.searches += 1
+        index = self._skills.get(skill_name)
+        if index is None or limit <= 0:
+            return []
+        terms = [term for term in set(tokenize(query)) if term in index.postings]
+        terms.sort(key=lambda term: len(index.postings[term]))
+        deadline = None if budget is None else time.perf_counter() + budget
+        total = len(index.hints)
+        k1 = self.k1
+        norms = index.norms
+        scores: Dict[int, float] = {}
+        for term in terms:
+            if deadline is not None and scores and time.perf_counter() > deadline:
+                self.budget_cuts += 1
+                break
+            postings = index.postings[term]
+            df = len(postings)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for doc, tf in postings:
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norms[doc])
+        boosts = index.boosts
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1] * boosts[item[0]], -item[0]))
+        return [index.hints[doc] for doc, _ in best]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "indexed_hints": self.size,
+            "indexed_skills": len(self._skills),
+            "age_seconds": round(time.monotonic() - self.built_at, 1),
+            "searches": self.searches,
+            "budget_cuts": self.budget_cuts,
+        }
@@ -0,0 +1,387 @@
+"""SQLite Hint Store - Hint persistence shared safely between processes"""
+
+import json
+import sqlite3
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from .storage import HintStore, default_hints_path, metadata_to_dict, parse_hint_markdown
+
+
+_COLUMNS = (
+    "id", "title", "category", "skill_name", "content_hash",
+    "created_at", "updated_at", "usage_count", "effectiveness_score", "keywords", "content",
+)
+_SELECT = "SELECT " + ", ".join(f"h.{column}" for column in _COLUMNS) + " FROM hints h"
+_RANK = "h.effectiveness_score DESC, h.usage_count DESC, h.rowid"
+
+
+class SQLiteHintStore(HintStore):
+    """
+    Hint store backed by one SQLite database
+
+    Every alpha-bot process (and every thread) can use the same database: writes
+    are transactions in WAL mode, so readers never block and concurrent savers do
+    not overwrite each other. Usage/effectiveness updates are buffered like the
+    file backend and flushed as one transaction of relative increments
+    (usage_count = usage_count + n), so counts from several processes add up.
+
+    Ranked lookups use the (skill_name, effectiveness_score, usage_count) index,
+    search_hints uses an FTS5 index over title and content when SQLite has it.
+    import_markdown / export_markdown convert from / to the hint_*.md layout.
+    """
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        flush_threshold: Optional[int] = None,
+        busy_timeout: float = 10.0
+    ):
+        """
+        Args:
+            path: Database file, or a directory to create hints.sqlite3 in. If None, uses the default hints directory.
+            flush_interval: Seconds before buffered usage updates are written. If None, uses AUTO_HINT_FLUSH_INTERVAL.
+            flush_threshold: Buffered updates that force a write. If None, uses AUTO_HINT_FLUSH_THRESHOLD.
+            busy_timeout: Seconds to wait for another process's write transaction
+        """
+        if path is None:
+            path = default_hints_path()
+        if path != ":memory:" and Path(path).suffix not in (".sqlite3", ".sqlite", ".db"):
+            path = str(Path(path) / "hints.sqlite3")
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._init_write_behind(flush_interval, flush_threshold)
+        self._usage_deltas: Dict[str, int] = {}
+        self._scores: Dict[str, float] = {}
+        self._updated_at: Dict[str, str] = {}
+
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS hints ("
+            "id TEXT PRIMARY KEY, title TEXT NOT NULL DEFAULT '', "
+            "category TEXT NOT NULL DEFAULT 'best_practice', skill_name TEXT NOT NULL DEFAULT 'general', "
+            "content TEXT NOT NULL DEFAULT '', content_hash TEXT, created_at TEXT, updated_at TEXT, "
+            "usage_count INTEGER NOT NULL DEFAULT 0, effectiveness_score REAL NOT NULL DEFAULT 0, "
+            "keywords TEXT NOT NULL DEFAULT '[]');"
+            "CREATE INDEX IF NOT EXISTS idx_hints_rank "
+            "ON hints(skill_name, effectiveness_score DESC, usage_count DESC);"
+            "CREATE INDEX IF NOT EXISTS idx_hints_category ON hints(category);"
+            "CREATE INDEX IF NOT EXISTS idx_hints_effectiveness ON hints(effectiveness_score);"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(hints)")}
+        if "keywords" not in columns:
+            self._conn.execute("ALTER TABLE hints ADD COLUMN keywords TEXT NOT NULL DEFAULT '[]'")
+        self.fts = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self) -> bool:
+        """Create the full-text index and its sync triggers; False if this SQLite has no FTS5"""
+        try:
+            self._conn.executescript(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS hints_fts "
+                "USING fts5(title, content, content='hints', content_rowid='rowid');"
+                "CREATE TRIGGER IF NOT EXISTS hints_fts_insert AFTER INSERT ON hints BEGIN "
+                "INSERT INTO hints_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content); END;"
+                "CREATE TRIGGER IF NOT EXISTS hints_fts_delete AFTER DELETE ON hints BEGIN "
+                "INSERT INTO hints_fts(hints_fts, rowid, title, content) "
+                "VALUES ('delete', old.rowid, old.title, old.content); END;"
+                "CREATE TRIGGER IF NOT EXISTS hints_fts_update AFTER UPDATE OF title, content ON hints BEGIN "
+                "INSERT INTO hints_fts(hints_fts, rowid, title, content) "
+                "VALUES ('delete', old.rowid, old.title, old.content); "
+                "INSERT INTO hints_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content); END;"
+            )
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, hint search falls back to scanning: {e}")
+            return False
+
+    # ----------------------------------------------------------------- writes
+
+    def save_hint(self, hint_data: Dict[str, Any]) -> bool:
+        """
+        Save a generated hint (replaces a hint with the same id)
+
+        Args:
+            hint_data: Dictionary containing hint metadata and content
+
+        Returns:
+            bool: True if saved successfully
+        """
+        return self.save_hints([hint_data]) == 1
+
+    def save_hints(self, hints: List[Dict[str, Any]]) -> int:
+        """Save several hints in one transaction, returns the number saved"""
+        rows = [row for row in (self._hint_row(hint_data) for hint_data in hints) if row is not None]
+        if not rows:
+            return 0
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO hints (id, title, category, skill_name, content_hash, created_at, updated_at, "
+                    "usage_count, effectiveness_score, keywords, content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET title = excluded.title, category = excluded.category, "
+                    "skill_name = excluded.skill_name, content_hash = excluded.content_hash, "
+                    "updated_at = excluded.updated_at, usage_count = excluded.usage_count, "
+                    "effectiveness_score = excluded.effectiveness_score, keywords = excluded.keywords, "
+                    "content = excluded.content",
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save hints: {e}")
+            return 0
+        logger.info(f"Saved {len(rows)} hints to {self.path}")
+        return len(rows)
+
+    def _hint_row(self, hint_data: Dict[str, Any]) -> Optional[tuple]:
+        metadata = hint_data.get("metadata")
+        if not metadata:
+            logger.error("Hint data missing metadata")
+            return None
+        metadata_dict = metadata_to_dict(metadata)
+        content = hint_data.get("content", "")
+        skill_name = metadata_dict.get("skill_name") or "general"
+        content_hash = hashlib.md5(
+            json.dumps([skill_name, metadata_dict.get("title", ""), content], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:12]
+        now = datetime.now().isoformat()
+        return (
+            metadata_dict.get("id") or content_hash,
+            metadata_dict.get("title", ""),
+            metadata_dict.get("category", "best_practice"),
+            skill_name,
+            content_hash,
+            metadata_dict.get("created_at") or now,
+            now,
+            int(metadata_dict.get("usage_count", 0) or 0),
+            float(metadata_dict.get("effectiveness_score", 0.0) or 0.0),
+            json.dumps(list(metadata_dict.get("keywords") or []), ensure_ascii=False),
+            content,
+        )
+
+    def update_hint_usage(self, hint_id: str):
+        """
+        Update usage count for a hint (buffered until the next flush)
+
+        Args:
+            hint_id: ID of the hint to update
+        """
+        with self._lock:
+            self._usage_deltas[hint_id] = self._usage_deltas.get(hint_id, 0) + 1
+            self._updated_at[hint_id] = datetime.now().isoformat()
+            self._mark_dirty()
+
+    def update_hint_effectiveness(self, hint_id: str, score: float):
+        """
+        Update effectiveness score for a hint (buffered until the next flush)
+
+        Args:
+            hint_id: ID of the hint to update
+            score: Effectiveness score (0.0-1.0)
+        """
+        with self._lock:
+            self._scores[hint_id] = score
+            self._updated_at[hint_id] = datetime.now().isoformat()
+            self._mark_dirty()
+
+    def _write_pending(self):
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE hints SET usage_count = usage_count + ?, updated_at = ? WHERE id = ?",
+                    [(delta, self._updated_at[hint_id], hint_id) for hint_id, delta in self._usage_deltas.items()]
+                )
+                self._conn.executemany(
+                    "UPDATE hints SET effectiveness_score = ?, updated_at = ? WHERE id = ?",
+                    [(score, self._updated_at[hint_id], hint_id) for hint_id, score in self._scores.items()]
+                )
+        except sqlite3.Error as e:
+            # Keep the buffered updates for the next flush
+            logger.error(f"Failed to write hint usage updates: {e}")
+            raise
+        self._usage_deltas.clear()
+        self._scores.clear()
+        self._updated_at.clear()
+
+    def flush(self) -> bool:
+        try:
+            return super().flush()
+        except sqlite3.Error:
+            return False
+
+    def delete_hint(self, hint_id: str) -> bool:
+        """
+        Delete a hint
+
+        Args:
+            hint_id: ID of the hint to delete
+
+        Returns:
+            bool: True if deleted successfully
+        """
+        with self._lock, self._conn:
+            self._usage_deltas.pop(hint_id, None)
+            self._scores.pop(hint_id, None)
+            deleted = self._conn.execute("DELETE FROM hints WHERE id = ?", (hint_id,)).rowcount
+        return deleted > 0
+
+    def cleanup_old_hints(self, max_age_days: int = 30, min_effectiveness: float = 0.3) -> int:
+        """
+        Clean up old or ineffective hints
+
+        Args:
+            max_age_days: Maximum age in days before considering for cleanup
+            min_effectiveness: Minimum effectiveness score to keep hint
+
+        Returns:
+            Number of hints deleted
+        """
+        self.flush()
+        cutoff_date = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._lock, self._conn:
+            deleted_count = self._conn.execute(
+                "DELETE FROM hints WHERE effectiveness_score < ? AND (created_at < ? OR usage_count = 0)",
+                (min_effectiveness, cutoff_date)
+            ).rowcount
+        if deleted_count > 0:
+            logger.info(f"Cleaned up {deleted_count} old/ineffective hints")
+        return deleted_count
+
+    # ------------------------------------------------------------------ reads
+
+    @staticmethod
+    def _hint(row) -> Dict[str, Any]:
+        metadata = dict(zip(_COLUMNS[:-1], row[:-1]))
+        metadata["filename"] = f"hint_{metadata['content_hash']}.md"
+        metadata["keywords"] = json.loads(metadata["keywords"] or "[]")
+        return {"metadata": metadata, "content": row[-1]}
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._hint(row) for row in rows]
+
+    def load_hints_for_skill(self, skill_name: str) -> List[Dict[str, Any]]:
+        """
+        Load all hints for a specific skill
+
+        Returns:
+            List of hint dictionaries, most effective and most used first
+        """
+        return self._query(f"{_SELECT} WHERE h.skill_name = ? ORDER BY {_RANK}", (skill_name,))
+
+    def top_hints_for_skill(self, skill_name: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Load the best hints for a specific skill (an index range scan of limit rows)
+
+        Returns:
+            List of hint dictionaries, most effective and most used first
+        """
+        if limit <= 0:
+            return []
+        return self._query(f"{_SELECT} WHERE h.skill_name = ? ORDER BY {_RANK} LIMIT ?", (skill_name, limit))
+
+    def load_all_hints(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Load all hints grouped by skill
+
+        Returns:
+            Dictionary mapping skill names to lists of hints
+        """
+        all_hints: Dict[str, List[Dict[str, Any]]] = {}
+        for hint in self._query(f"{_SELECT} ORDER BY h.skill_name, {_RANK}"):
+            all_hints.setdefault(hint["metadata"]["skill_name"], []).append(hint)
+        return all_hints
+
+    def search_hints(self, query: str, skill_name: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over hint titles and contents, best match first
+
+        Args:
+            query: Words to look for (all of them must match)
+            skill_name: Only search this skill's hints
+            limit: Maximum number of hints to return
+        """
+        words = query.split()
+        if not self.fts or not words:
+            return super().search_hints(query, skill_name, limit)
+        match = " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+        sql = f"{_SELECT} JOIN hints_fts ON hints_fts.rowid = h.rowid WHERE hints_fts MATCH ?"
+        params: tuple = (match,)
+        if skill_name is not None:
+            sql += " AND h.skill_name = ?"
+            params += (skill_name,)
+        return self._query(f"{sql} ORDER BY bm25(hints_fts) LIMIT ?", params + (limit,))
+
+    def get_hint_statistics(self) -> Dict[str, Any]:
+        """
+        Get statistics about stored hints
+
+        Returns:
+            Dictionary with statistics
+        """
+        with self._lock:
+            hints_by_skill = dict(self._conn.execute("SELECT skill_name, COUNT(*) FROM hints GROUP BY skill_name"))
+            hints_by_category = dict(self._conn.execute("SELECT category, COUNT(*) FROM hints GROUP BY category"))
+        return {
+            "backend": self.backend,
+            "total_hints": sum(hints_by_skill.values()),
+            "hints_by_skill": hints_by_skill,
+            "hints_by_category": hints_by_category,
+            "storage_path": self.path,
+            "full_text_search": self.fts,
+            "pending_updates": self._pending_updates,
+        }
+
+    # --------------------------------------------------------- import/export
+
+    def import_markdown(self, base_path: str) -> int:
+        """
+        Import hints stored by the file backend (hint_*.md + hints_metadata.json)
+
+        Usage counts and effectiveness scores are kept; hints already in the
+        database with the same id are replaced.
+
+        Returns:
+            Number of hints imported
+        """
+        from .persistence import HintPersistenceManager
+        source = HintPersistenceManager(base_path, flush_interval=0, flush_threshold=1)
+        hints = [
+            {"metadata": hint["metadata"], "content": parse_hint_markdown(hint["content"])}
+            for skill_hints in source.load_all_hints().values()
+            for hint in skill_hints
+        ]
+        imported = self.save_hints(hints)
+        logger.info(f"Imported {imported} hints from {base_path}")
+        return imported
+
+    def export_markdown(self, base_path: str) -> int:
+        """
+        Export all hints to the file backend's layout under base_path
+
+        Returns:
+            Number of hints exported
+        """
+        from .persistence import HintPersistenceManager
+        self.flush()
+        target = HintPersistenceManager(base_path, flush_interval=0, flush_threshold=1)
+        hints = [hint for skill_hints in self.load_all_hints().values() for hint in skill_hints]
+        exported = target.save_hints(hints)
+        logger.info(f"Exported {exported} hints to {base_path}")
+        return exported
+
+    def close(self):
+        """Write buffered updates and close the database"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
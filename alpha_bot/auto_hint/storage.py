@@ -0,0 +1,211 @@
+"""Hint Storage - Interface shared by the hint persistence backends"""
+
+import os
+import atexit
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from .config import get_auto_hint_config
+
+
+def default_hints_path() -> str:
+    """Default storage directory: skills/hints_generated inside the package"""
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), "skills", "hints_generated")
+
+
+def metadata_to_dict(metadata: Any) -> Dict[str, Any]:
+    """Convert HintMetadata (or a metadata dict) to a plain dict with string category and dates"""
+    if not hasattr(metadata, '__dict__'):
+        return metadata
+    metadata_dict = metadata.__dict__.copy()  # Create a copy to avoid modifying the original
+    # Convert enum fields to their values
+    if 'category' in metadata_dict and hasattr(metadata_dict['category'], 'value'):
+        metadata_dict['category'] = metadata_dict['category'].value
+    # Convert datetime fields to ISO format strings
+    for key in ('created_at', 'updated_at'):
+        if key in metadata_dict and hasattr(metadata_dict[key], 'isoformat'):
+            metadata_dict[key] = metadata_dict[key].isoformat()
+    return metadata_dict
+
+
+def parse_hint_markdown(text: str) -> str:
+    """Extract the content section from a hint_*.md file written by the file backend"""
+    start = text.find("\n## Content\n")
+    if start < 0:
+        return text
+    body = text[start + len("\n## Content\n"):]
+    end = body.rfind("\n---\n")
+    if end >= 0:
+        body = body[:end]
+    return body.strip("\n")
+
+
+class HintStore(ABC):
+    """
+    Storage backend for generated hints
+
+    Hints are passed around as {"metadata": dict, "content": str}. Usage and
+    effectiveness updates may be buffered (write-behind): backends call
+    _mark_dirty() per buffered update and implement _write_pending(), which
+    runs after flush_interval seconds, after flush_threshold updates, on
+    flush() and at process exit.
+    """
+
+    backend = ""
+
+    def _init_write_behind(self, flush_interval: Optional[float] = None, flush_threshold: Optional[int] = None):
+        config = get_auto_hint_config()
+        self.flush_interval = config.usage_flush_interval if flush_interval is None else flush_interval
+        self.flush_threshold = config.usage_flush_threshold if flush_threshold is None else flush_threshold
+        self._lock = threading.RLock()
+        self._pending_updates = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._atexit_registered = False
+
+    def _mark_dirty(self):
+        """Count a buffered update and schedule or trigger the write"""
+        self._pending_updates += 1
+        if self._pending_updates >= self.flush_threshold:
+            self.flush()
+            return
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+        if self._flush_timer is None and self.flush_interval > 0:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _reset_pending(self):
+        """Forget buffered updates after they have been written (call with the lock held)"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._pending_updates = 0
+
+    @property
+    def pending_updates(self) -> int:
+        """Usage/effectiveness updates not yet written"""
+        return self._pending_updates
+
+    def flush(self) -> bool:
+        """
+        Write buffered usage/effectiveness updates
+
+        Returns:
+            bool: True if there was anything to write
+        """
+        with self._lock:
+            if not self._pending_updates:
+                return False
+            logger.debug(f"Flushing {self._pending_updates} buffered hint updates")
+            self._write_pending()
+            self._reset_pending()
+            return True
+
+    @abstractmethod
+    def _write_pending(self):
+        """Write the buffered updates (called with the lock held)"""
+        pass
+
+    @abstractmethod
+    def save_hint(self, hint_data: Dict[str, Any]) -> bool:
+        """Save a generated hint, returns True if saved"""
+        pass
+
+    def save_hints(self, hints: List[Dict[str, Any]]) -> int:
+        """Save several hints, returns the number saved"""
+        return sum(1 for hint_data in hints if self.save_hint(hint_data))
+
+    @abstractmethod
+    def load_hints_for_skill(self, skill_name: str) -> List[Dict[str, Any]]:
+        """All hints of a skill, most effective and most used first"""
+        pass
+
+    @abstractmethod
+    def top_hints_for_skill(self, skill_name: str, limit: int) -> List[Dict[str, Any]]:
+        """The best limit hints of a skill"""
+        pass
+
+    @abstractmethod
+    def load_all_hints(self) -> Dict[str, List[Dict[str, Any]]]:
+        """All hints grouped by skill"""
+        pass
+
+    def search_hints(self, query: str, skill_name: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Hints whose title or content contain every word of the query
+
+        Args:
+            query: Words to look for
+            skill_name: Only search this skill's hints
+            limit: Maximum number of hints to return
+        """
+        words = query.lower().split()
+        if skill_name is not None:
+            candidates = self.load_hints_for_skill(skill_name)
+        else:
+            candidates = [hint for hints in self.load_all_hints().values() for hint in hints]
+        matches = []
+        for hint in candidates:
+            text = f"{hint['metadata'].get('title', '')}\n{hint['content']}".lower()
+            if all(word in text for word in words):
+                matches.append(hint)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    @abstractmethod
+    def update_hint_usage(self, hint_id: str):
+        """Increment the usage count of a hint"""
+        pass
+
+    @abstractmethod
+    def update_hint_effectiveness(self, hint_id: str, score: float):
+        """Set the effectiveness score (0.0-1.0) of a hint"""
+        pass
+
+    @abstractmethod
+    def delete_hint(self, hint_id: str) -> bool:
+        """Delete a hint, returns True if it existed"""
+        pass
+
+    @abstractmethod
+    def get_hint_statistics(self) -> Dict[str, Any]:
+        """Counts by skill and category plus backend details"""
+        pass
+
+    @abstractmethod
+    def cleanup_old_hints(self, max_age_days: int = 30, min_effectiveness: float = 0.3) -> int:
+        """Delete old or unused hints below min_effectiveness, returns the number deleted"""
+        pass
+
+    def close(self):
+        """Write buffered updates and release resources"""
+        self.flush()
+
+
+def create_hint_store(
+    base_path: Optional[str] = None,
+    backend: Optional[str] = None,
+    **kwargs
+) -> HintStore:
+    """
+    Create the configured hint storage backend
+
+    Args:
+        base_path: Storage directory (or the database file for the sqlite backend)
+        backend: "files" or "sqlite". If None, uses AUTO_HINT_BACKEND.
+        **kwargs: Passed to the backend (flush_interval, flush_threshold, ...)
+    """
+    backend = (backend or get_auto_hint_config().storage_backend or "files").lower()
+    if backend == "sqlite":
+        from .sqlite_store import SQLiteHintStore
+        return SQLiteHintStore(base_path, **kwargs)
+    if backend != "files":
+        logger.warning(f"Unknown hint storage backend {backend}, using files")
+    from .persistence import HintPersistenceManager
+    return HintPersistenceManager(base_path, **kwargs)
@@ -1,8 +1,11 @@
 """Auto Hint System - Main system that orchestrates hint extraction and generation"""
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from loguru import logger
+import time
 import threading
+import contextvars
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 from ..models.types import ExecutionResult
@@ -10,7 +13,10 @@ from ..models.types import ExecutionResult
 from .types import ExecutionAnalysisResult
 from .analyzer import ExecutionResultAnalyzer
 from .generator import HintGenerator
-from .persistence import HintPersistenceManager
+from .storage import create_hint_store
+from .retrieval import HintRetriever
+from .config import get_auto_hint_config
+from .worker import HintLearningWorker, LearningJob
 
 
 class AutoHintSystem:
@@ -33,12 +39,13 @@ class AutoHintSystem:
             hints_path: Custom path for hints storage (optional)
         """
         self.enable_persistence = enable_persistence
+        config = get_auto_hint_config()
         self.analyzer = ExecutionResultAnalyzer()
         # Initialize generator with LLM support based on persistence setting
-        self.generator = HintGenerator(enable_llm=enable_persistence)
+        self.generator = HintGenerator(enable_llm=enable_persistence, max_workers=config.generation_workers)
         
         if enable_persistence:
-            self.persistence = HintPersistenceManager(hints_path)
+            self.persistence = create_hint_store(hints_path or config.hints_storage_path)
         else:
             self.persistence = None
         
@@ -52,12 +59,57 @@ class AutoHintSystem:
         self._hints_cache = {}
         self._cache_timestamp = {}
         self.cache_ttl = timedelta(hours=1)  # Cache for 1 hour
+        
+        # Background learning: task completion only enqueues the history
+        self.background_learning = config.background_learning
+        self.learning_worker = HintLearningWorker(
+            self._learn_from_jobs,
+            max_queue=config.learning_queue_size,
+            batch_size=config.learning_batch_size,
+            batch_wait=config.learning_batch_wait
+        )
+        
+        # Relevance retrieval: a BM25 index over all hints, (re)built on a background thread
+        self.retrieval = config.retrieval
+        self.retrieval_budget = config.retrieval_budget_ms / 1000
+        self.retrieval_refresh = config.retrieval_refresh
+        self._retriever: Optional[HintRetriever] = None
+        self._retriever_stale = True
+        self._retriever_thread: Optional[threading.Thread] = None
+        self._retriever_lock = threading.Lock()
+    
+    def submit_task_completion(self, history: List[ExecutionResult],
+                               skills,
+                               task_description: str = "") -> bool:
+        """
+        Hand a completed task to the background learning worker
+        
+        Returns immediately; analysis, the hint generation LLM calls and saving
+        happen on the worker thread. Falls back to process_task_completion when
+        background learning is disabled (AUTO_HINT_BACKGROUND=false).
+        
+        Args:
+            history: Complete execution history for the task
+            skills: List of available skills
+            task_description: Original task description
+            
+        Returns:
+            bool: True if the task was queued (or, synchronously, if hints were saved)
+        """
+        if not self.background_learning:
+            return self.process_task_completion(history, skills, task_description)
+        
+        with self._lock:
+            self.task_completion_count += 1
+            if not self._should_analyze(history):
+                return False
+        return self.learning_worker.submit(history, skills, task_description)
     
     def process_task_completion(self, history: List[ExecutionResult], 
                               skills,
                               task_description: str = "") -> bool:
         """
-        Process completed task and potentially extract hints
+        Process completed task and potentially extract hints (synchronously)
         
         This should be called when a task completes successfully or after sufficient
         execution history has accumulated.
@@ -76,43 +128,74 @@ class AutoHintSystem:
             # Check if we should trigger analysis
             if not self._should_analyze(history):
                 return False
+        
+        return self._learn_from_jobs([LearningJob(history, skills, task_description)]) > 0
+    
+    def _learn_from_jobs(self, jobs: List[LearningJob]) -> int:
+        """
+        Analyze a batch of completed tasks in one pass and save the generated hints
+        
+        Each task's history is analyzed on its own (step sequences stay within a task)
+        and only the frequency counts are merged, so patterns that recur across tasks
+        reach the analyzer's thresholds together. The hint generation LLM calls of the
+        batch run concurrently.
+        
+        Returns:
+            Number of hints saved
+        """
+        try:
+            logger.info(f"Starting automatic hint extraction process for {len(jobs)} task(s)...")
             
-            try:
-                logger.info("Starting automatic hint extraction process...")
-                
-                # Step 1: Analyze execution history
-                analysis_result = self.analyzer.analyze_history(history, skills)
-                
-                if not analysis_result.patterns:
-                    logger.info("No significant patterns found in execution history")
-                    return False
-                
-                # Step 2: Generate hints from analysis
-                generated_hints = self.generator.generate_hints_from_analysis(
-                    analysis_result, task_description
-                )
-                
-                if not generated_hints:
-                    logger.info("No hints generated from analysis")
-                    return False
-                
-                # Step 3: Save hints (if persistence enabled)
-                saved_count = 0
-                if self.enable_persistence and self.persistence:
-                    for hint_data in generated_hints:
-                        if self.persistence.save_hint(hint_data):
-                            saved_count += 1
-                
-                logger.info(f"Auto hint extraction completed: {saved_count}/{len(generated_hints)} hints saved")
-                
-                # Clear cache to force reload on next access
-                self._clear_cache()
-                
-                return saved_count > 0
-                
-            except Exception as e:
-                logger.error(f"Error during hint extraction: {e}")
-                return False
+            # Step 1: Analyze execution history
+            analysis_result = self.analyzer.analyze_histories([job.history for job in jobs], jobs[-1].skills)
+            
+            if not analysis_result.patterns:
+                logger.info("No significant patterns found in execution history")
+                return 0
+            
+            # Step 2: Generate hints from analysis
+            generated_hints = self.generator.generate_hints_from_analysis(
+                analysis_result, self._describe_tasks(jobs)
+            )
+            
+            if not generated_hints:
+                logger.info("No hints generated from analysis")
+                return 0
+            
+            # Step 3: Save hints (if persistence enabled)
+            saved_count = 0
+            if self.enable_persistence and self.persistence:
+                with self._lock:
+                    saved_count = self.persistence.save_hints(generated_hints)
+                    
+                    # Clear cache to force reload on next access
+                    self._clear_cache()
+            
+            logger.info(f"Auto hint extraction completed: {saved_count}/{len(generated_hints)} hints saved")
+            return saved_count
+            
+        except Exception as e:
+            logger.error(f"Error during hint extraction: {e}")
+            return 0
+    
+    @staticmethod
+    def _describe_tasks(jobs: List[LearningJob]) -> str:
+        """Task context for hint generation: the description, or one line per task of a batch"""
+        descriptions = list(dict.fromkeys(job.task_description for job in jobs if job.task_description))
+        if len(descriptions) <= 1:
+            return descriptions[0] if descriptions else ""
+        return f"{len(descriptions)} separate tasks\n" + "\n".join(f"- {description}" for description in descriptions)
+    
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued background learning to finish"""
+        return self.learning_worker.drain(timeout)
+    
+    def shutdown(self, timeout: Optional[float] = 30.0) -> bool:
+        """Finish queued background learning, stop the worker thread and write buffered hint updates"""
+        finished = self.learning_worker.shutdown(timeout)
+        if self.persistence:
+            self.persistence.flush()
+        return finished
     
     def get_hints_for_skill(self, skill_name: str, max_hints: int = 5) -> List[Dict[str, Any]]:
         """
@@ -128,31 +211,75 @@ class AutoHintSystem:
         if not self.enable_persistence or not self.persistence:
             return []
         
-        # Check cache first
-        cache_key = f"skill_{skill_name}"
-        if self._is_cache_valid(cache_key):
-            return self._hints_cache[cache_key][:max_hints]
-        
         try:
-            # Load hints from persistence
-            hints = self.persistence.load_hints_for_skill(skill_name)
-            
-            # Sort by effectiveness and usage (most effective and frequently used first)
-            hints.sort(key=lambda x: (
-                x.get("metadata", {}).get("effectiveness_score", 0),
-                x.get("metadata", {}).get("usage_count", 0)
-            ), reverse=True)
-            
-            # Cache the results
-            self._hints_cache[cache_key] = hints
-            self._cache_timestamp[cache_key] = datetime.now()
-            
-            return hints[:max_hints]
+            # The persistence index keeps each skill's hints ranked by effectiveness
+            # and usage, so this reads only the first max_hints entries
+            return self.persistence.top_hints_for_skill(skill_name, max_hints)
             
         except Exception as e:
             logger.error(f"Error loading hints for skill {skill_name}: {e}")
             return []
     
+    def get_relevant_hints(self, skill_name: str, query: str, max_hints: int = 3) -> List[Dict[str, Any]]:
+        """
+        Get the hints of a skill most relevant to the current task
+        
+        Falls back to get_hints_for_skill when retrieval is disabled, the query is
+        empty or the index has not been built yet (lookups never wait for a build).
+        Once the index exists, only hints sharing terms with the query are returned,
+        possibly none.
+        
+        Args:
+            skill_name: Name of the skill
+            query: Task description plus the last error, if any
+            max_hints: Maximum number of hints to return
+            
+        Returns:
+            List of hint dictionaries, most relevant first
+        """
+        if not self.enable_persistence or not self.persistence:
+            return []
+        if self.retrieval != "bm25" or not query.strip():
+            return self.get_hints_for_skill(skill_name, max_hints)
+        
+        retriever = self._current_retriever()
+        if retriever is None:
+            return self.get_hints_for_skill(skill_name, max_hints)
+        try:
+            return retriever.search(query, skill_name, max_hints, self.retrieval_budget)
+        except Exception as e:
+            logger.error(f"Error retrieving hints for skill {skill_name}: {e}")
+            return []
+    
+    def _current_retriever(self) -> Optional[HintRetriever]:
+        """The retrieval index, scheduling a rebuild when it is missing, stale or old"""
+        retriever = self._retriever
+        expired = retriever is not None and self.retrieval_refresh > 0 and \
+            time.monotonic() - retriever.built_at > self.retrieval_refresh
+        if retriever is None or self._retriever_stale or expired:
+            with self._retriever_lock:
+                if self._retriever_thread is None or not self._retriever_thread.is_alive():
+                    self._retriever_stale = False
+                    self._retriever_thread = threading.Thread(
+                        target=self.rebuild_retrieval_index, name="hint-retrieval-index", daemon=True
+                    )
+                    self._retriever_thread.start()
+        return retriever
+    
+    def rebuild_retrieval_index(self) -> Optional[HintRetriever]:
+        """Build the retrieval index from all stored hints now"""
+        if not self.persistence:
+            return None
+        try:
+            start = time.perf_counter()
+            retriever = HintRetriever(self.persistence.load_all_hints())
+            self._retriever = retriever
+            logger.debug(f"Built hint retrieval index: {retriever.size} hints in {time.perf_counter() - start:.2f}s")
+            return retriever
+        except Exception as e:
+            logger.warning(f"Failed to build hint retrieval index: {e}")
+            return None
+    
     def get_all_hints(self) -> Dict[str, List[Dict[str, Any]]]:
         """
         Get all hints grouped by skill
@@ -188,6 +315,10 @@ class AutoHintSystem:
         Args:
             hint_id: ID of the hint that was used
         """
+        deferred = _deferred_hint_usage.get()
+        if deferred is not None:
+            deferred.append((self, hint_id))
+            return
         if self.enable_persistence and self.persistence:
             try:
                 self.persistence.update_hint_usage(hint_id)
@@ -218,11 +349,16 @@ class AutoHintSystem:
         stats = {
             "enabled": self.enable_persistence,
             "task_completion_count": self.task_completion_count,
+            "background_learning": self.learning_worker.get_stats(),
             "analysis_interval": self.analysis_interval,
             "min_history_length": self.min_history_length,
             "cache_info": {
                 "cached_items": len(self._hints_cache),
                 "cache_keys": list(self._hints_cache.keys())
+            },
+            "retrieval": {
+                "mode": self.retrieval,
+                **(self._retriever.get_stats() if self._retriever else {"indexed_hints": 0})
             }
         }
         
@@ -307,6 +443,7 @@ class AutoHintSystem:
         """Clear all cached hints"""
         self._hints_cache.clear()
         self._cache_timestamp.clear()
+        self._retriever_stale = True
         logger.debug("Hints cache cleared")
     
     def enable(self):
@@ -343,6 +480,32 @@ class AutoHintSystem:
 # Global instance
 _auto_hint_system: Optional[AutoHintSystem] = None
 
+_deferred_hint_usage: contextvars.ContextVar[Optional[List[Tuple[AutoHintSystem, str]]]] = contextvars.ContextVar(
+    "alpha_bot_deferred_hint_usage", default=None
+)
+
+
+@contextmanager
+def defer_hint_usage() -> Iterator[List[Tuple[AutoHintSystem, str]]]:
+    """
+    Collect record_hint_usage calls made in the current context instead of recording them
+
+    Used for skill calls whose output may be thrown away (speculative execution);
+    pass the collected list to commit_hint_usage once the output is kept.
+    """
+    used: List[Tuple[AutoHintSystem, str]] = []
+    token = _deferred_hint_usage.set(used)
+    try:
+        yield used
+    finally:
+        _deferred_hint_usage.reset(token)
+
+
+def commit_hint_usage(used: List[Tuple[AutoHintSystem, str]]):
+    """Record hint usage collected by defer_hint_usage"""
+    for system, hint_id in used:
+        system.record_hint_usage(hint_id)
+
 
 def get_auto_hint_system(enable_persistence: bool = True) -> AutoHintSystem:
     """
@@ -56,6 +56,7 @@ class HintMetadata:
     updated_at: datetime = field(default_factory=datetime.now)
     usage_count: int = 0                     # 使用次数
     effectiveness_score: float = 0.0         # 有效性评分
+    keywords: List[str] = field(default_factory=list)  # 检索关键词（来自 HintPattern.context_keywords）
     
     def __post_init__(self):
         if isinstance(self.category, str):
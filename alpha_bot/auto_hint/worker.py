@@ -0,0 +1,181 @@
+"""Hint Learning Worker - Learn hints from completed tasks off the task's critical path"""
+
+import time
+import queue
+import atexit
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from ..models.types import ExecutionResult
+
+
+@dataclass
+class LearningJob:
+    """A completed task waiting to be learned from"""
+    history: List[ExecutionResult]
+    skills: Any
+    task_description: str = ""
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+_STOP = object()
+
+
+class HintLearningWorker:
+    """
+    Background thread that runs hint learning for completed tasks
+
+    Task completion only enqueues a copy of the history (bounded queue; when it is
+    full the job is dropped rather than blocking the task). The worker collects up
+    to batch_size jobs, waiting at most batch_wait seconds for more after the first,
+    and hands the batch to learn(jobs) - one analysis pass for all of them.
+
+    shutdown() lets queued jobs finish; it is registered with atexit when the
+    thread starts so learning in flight is not lost when the process exits.
+    """
+
+    def __init__(
+        self,
+        learn: Callable[[List[LearningJob]], int],
+        max_queue: int = 32,
+        batch_size: int = 8,
+        batch_wait: float = 0.5
+    ):
+        """
+        Args:
+            learn: processes a batch of jobs, returns the number of hints saved
+            max_queue: jobs waiting to be processed
+            batch_size: max jobs per learning pass
+            batch_wait: seconds to wait for more jobs before starting a pass
+        """
+        self.learn = learn
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+
+        # Statistics
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.batches = 0
+        self.hints_saved = 0
+        self.last_error: Optional[str] = None
+
+    def submit(self, history: List[ExecutionResult], skills: Any, task_description: str = "") -> bool:
+        """
+        Queue a completed task for learning without waiting for it
+
+        Returns:
+            bool: False if the queue is full or the worker has been shut down
+        """
+        if self._stopped:
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(LearningJob(list(history), skills, task_description))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Hint learning queue is full, skipping this task")
+            return False
+        self.submitted += 1
+        return True
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="hint-learning", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch: List[LearningJob]):
+        try:
+            self.hints_saved += self.learn(batch) or 0
+        except Exception as e:
+            self.last_error = str(e)
+            logger.opt(exception=e).error("Hint learning pass failed")
+        finally:
+            self.batches += 1
+            self.processed += len(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or being processed"""
+        return self._queue.unfinished_tasks
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued job has been processed
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Stop accepting jobs, finish the queued ones and stop the thread
+
+        Returns:
+            bool: False if the worker did not finish within the timeout
+        """
+        self._stopped = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return False
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"Hint learning worker still busy after {timeout}s, {self.pending} jobs unfinished")
+            return False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "batches": self.batches,
+            "hints_saved": self.hints_saved,
+            "last_error": self.last_error,
+        }
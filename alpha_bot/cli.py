@@ -22,6 +22,7 @@ def main():
   %(prog)s -a "统计代码行数"       # 自动执行模式
   %(prog)s -l "翻译这段文字为英文"  # 直接LLM模式
   %(prog)s --web                  # 启动Web界面
+  %(prog)s --web --async          # 启动Web界面（asyncio 后端，需要 web-async 可选依赖）
         """
     )
     
@@ -56,6 +57,17 @@ def main():
         action="store_true",
         help="启动Web界面"
     )
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="Web界面使用 asyncio/ASGI 后端（有界工作池 + 准入队列）"
+    )
+    parser.add_argument(
+        "--persistent-shell",
+        action="store_true",
+        help="同一个任务的命令在同一个 bash 会话中执行（cd、export、激活的虚拟环境在步骤之间保留）"
+    )
     parser.add_argument(
         "--no-persistence",
         action="store_true",
@@ -65,7 +77,15 @@ def main():
     args = parser.parse_args()
     
     # 启动Web服务器
-    if args.web:
+    if args.web and args.async_mode:
+        try:
+            from alpha_bot.web.async_server import run_async_web_server
+            run_async_web_server(host='localhost', port=5000)
+        except ImportError as e:
+            print(f"错误: 无法启动Web服务器 - {e}")
+            print("提示: asyncio 后端需要 web-async 可选依赖，请运行 pip install \"alphabot-ai[web-async]\"")
+            sys.exit(1)
+    elif args.web:
         try:
             from alpha_bot.web.server import run_web_server
             run_web_server(host='localhost', port=5000, debug=False)
@@ -80,7 +100,8 @@ def main():
                 auto_execute=args.auto,
                 working_dir=args.workdir,
                 direct_mode=args.llm,
-                enable_persistence=not args.no_persistence
+                enable_persistence=not args.no_persistence,
+                executor="persistent" if args.persistent_shell else None
             )
         except Exception as e:
             logger.opt(exception=e).error("初始化失败")
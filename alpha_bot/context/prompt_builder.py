@@ -0,0 +1,266 @@
+"""Prompt 组装 - 按 token 预算拼接任务、执行历史和记忆摘要"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from ..memory.bank import MemoryBank
+from ..models.types import ExecutionResult
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@lru_cache(maxsize=4)
+def _encoding(name: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"Unknown tokenizer {name}, falling back to approximate token counts: {e}")
+        return None
+
+
+def _tokenizer():
+    return _encoding(os.getenv("PROMPT_TOKENIZER", "cl100k_base"))
+
+
+def _approx_tokens(text: str) -> int:
+    # 没有 tiktoken 时的估算：CJK 字符约 1 token/字，其他字符约 4 字符/token
+    wide = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def count_tokens(text: str) -> int:
+    """计算文本的 token 数（安装了 tiktoken 时精确计算，否则估算）"""
+    if not text:
+        return 0
+    encoding = _tokenizer()
+    if encoding is None:
+        return _approx_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    截断到 max_tokens 以内，保留开头和结尾
+
+    命令出错时信息通常在开头（用法、路径）或结尾（错误堆栈、汇总），两端都保留。
+    """
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return f"...(输出已截断，省略 {total} tokens)..."
+    encoding = _tokenizer()
+    half = max_tokens // 2
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = encoding.decode(tokens[:half])
+        tail = encoding.decode(tokens[-(max_tokens - half):])
+    else:
+        # 按比例换算成字符数
+        keep = max(len(text) * max_tokens // total, 2)
+        head = text[:keep // 2]
+        tail = text[-(keep - keep // 2):]
+    return f"{head}\n...(输出已截断，省略约 {total - max_tokens} tokens)...\n{tail}"
+
+
+@dataclass
+class PromptBudget:
+    """执行历史部分的 token 预算"""
+    history_tokens: int = 6000      # 历史 + 记忆摘要的总预算（不含任务本身）
+    step_output_tokens: int = 2500  # 单步命令输出的上限
+    min_output_tokens: int = 200    # 剩余预算不足以放下这么多输出时，整步丢弃而不是再压缩
+    memory_tokens: int = 800        # 记忆摘要的上限
+    max_steps: int = 3              # 最多包含的最近步骤数（批量执行的同一批命令不拆开）
+    memory_summaries: int = 2       # 最多包含的记忆摘要数
+
+    @classmethod
+    def from_env(cls) -> "PromptBudget":
+        """从环境变量加载配置"""
+        budget = cls()
+        try:
+            budget.history_tokens = int(os.getenv("PROMPT_HISTORY_TOKENS", budget.history_tokens))
+            budget.step_output_tokens = int(os.getenv("PROMPT_STEP_OUTPUT_TOKENS", budget.step_output_tokens))
+            budget.memory_tokens = int(os.getenv("PROMPT_MEMORY_TOKENS", budget.memory_tokens))
+            budget.max_steps = int(os.getenv("PROMPT_HISTORY_STEPS", budget.max_steps))
+        except ValueError:
+            logger.warning("Invalid prompt budget configuration in environment, using defaults")
+        return budget
+
+
+def render_step(result: ExecutionResult, include_response: bool = True, max_output_tokens: Optional[int] = None) -> str:
+    """
+    格式化单步执行结果
+
+    Args:
+        include_response: 是否包含技能选择和思考过程（同一批量响应的后续命令不再重复）
+        max_output_tokens: 命令输出的 token 上限，None 时沿用 get_output_for_llm 的字符截断
+    """
+    parts = []
+    response = result.skill_response
+    if include_response and response is not None:
+        parts.append(f"技能选择: {response.skill_name}\n")
+        parts.append(f"技能选择原因: {response.select_reason}\n")
+        if response.thinking:
+            parts.append(f"技能执行思考过程: {response.thinking}\n")
+        if response.next_step:
+            parts.append(f"下一步计划: {response.next_step}\n")
+    if result.command:
+        if max_output_tokens is None:
+            output = result.get_output_for_llm()
+        else:
+            output = truncate_tokens(result.output, max_output_tokens)
+            if result.output_file:
+                output += f"\n(完整输出已保存到 {result.output_file}，可以用 grep/tail 等命令查看)"
+        parts.append(f"执行命令: {result.command}\n")
+        parts.append(f"返回码: {result.returncode}\n")
+        parts.append(f"命令输出:\n{output}\n")
+    if include_response and response is not None and response.direct_response:
+        parts.append(f"直接响应: {response.direct_response}\n")
+    return "".join(parts)
+
+
+def step_fragment(result: ExecutionResult, include_response: bool, max_output_tokens: int) -> Tuple[str, int]:
+    """渲染好的单步片段和 token 数，缓存在 ExecutionResult 上（历史步骤在后续迭代中不会变化）"""
+    key = (include_response, max_output_tokens)
+    cached = result.prompt_fragments.get(key)
+    if cached is None:
+        text = render_step(result, include_response, max_output_tokens)
+        cached = result.prompt_fragments[key] = (text, count_tokens(text))
+    return cached
+
+
+class PromptBuilder:
+    """
+    一轮迭代的执行历史 prompt
+
+    Agent 每轮迭代创建一个，放在技能上下文的 'prompt_builder' 中，选择器和技能共用，
+    历史部分只渲染一次。预算不够时按优先级裁剪：
+
+    1. 任务描述 - 从不裁剪
+    2. 最近一步 - 输出按剩余预算压缩
+    3. 更早的步骤 - 从最旧的开始整步丢弃
+    4. 记忆摘要 - 最先丢弃
+    """
+
+    def __init__(
+        self,
+        history: List[ExecutionResult],
+        memory_bank: Optional[MemoryBank] = None,
+        budget: Optional[PromptBudget] = None
+    ):
+        self.history = history
+        self.memory_bank = memory_bank
+        self.budget = budget or PromptBudget.from_env()
+        self._length = len(history)
+        self._cache: Dict[bool, str] = {}
+        self.tokens: Dict[bool, int] = {}
+
+    def matches(self, history: List[ExecutionResult]) -> bool:
+        """是否可以用于这份历史（同一个列表且之后没有新增结果）"""
+        return history is self.history and len(history) == self._length
+
+    def history_message(self, task: str = "", include_memory: bool = False) -> str:
+        """
+        构建完整的执行历史消息
+
+        Args:
+            task: 当前任务，附加在历史之后
+            include_memory: 是否包含记忆摘要（技能选择器使用）
+        """
+        if not self.history and not task:
+            return "- 历史执行记录: 无\n"
+        if not self.history:
+            return build_task_message(task)
+        body = self._body(include_memory)
+        if task:
+            return f"{body}\n\n用户当前的任务是：{task}"
+        return body
+
+    def history_blocks(self, task: str = "", include_memory: bool = False) -> List[str]:
+        """
+        任务和执行历史作为两个片段，任务在前
+
+        任务片段在整个任务期间不变（第一步也是同样的文本），执行历史每一步都变；
+        按这个顺序发送时，前缀缓存可以覆盖到任务为止（见 llm.base.build_messages）。
+        """
+        blocks = [build_task_message(task)] if task else []
+        if self.history:
+            blocks.append(self._body(include_memory))
+        return blocks or [self.history_message()]
+
+    def _body(self, include_memory: bool) -> str:
+        body = self._cache.get(include_memory)
+        if body is None:
+            body = self._cache[include_memory] = self._render(include_memory)
+        return body
+
+    def _window_start(self) -> int:
+        # 最近 max_steps 条结果；批量执行的多条命令共用一个技能响应，要么全部显示要么都不显示
+        history = self.history
+        start = max(len(history) - max(self.budget.max_steps, 1), 0)
+        while start > 0 and history[start].skill_response is not None and \
+                history[start - 1].skill_response is history[start].skill_response:
+            start -= 1
+        return start
+
+    def _render(self, include_memory: bool) -> str:
+        history = self.history
+        budget = self.budget
+        remaining = budget.history_tokens
+
+        # 从最新的一步往前放，放不下就停止（更早的步骤一起丢弃）
+        start = self._window_start()
+        chosen: Dict[int, int] = {}     # index -> 输出 token 上限
+        for index in range(len(history) - 1, start - 1, -1):
+            # 按包含技能响应的版本计费，裁剪后它可能成为第一条
+            limit = budget.step_output_tokens
+            _, cost = step_fragment(history[index], True, limit)
+            if cost > remaining and not chosen:
+                # 最近一步总要保留，压缩输出以适应预算
+                overhead = cost - count_tokens(truncate_tokens(history[index].output, limit))
+                limit = max(remaining - overhead, budget.min_output_tokens)
+                _, cost = step_fragment(history[index], True, limit)
+            if cost > remaining and chosen:
+                break
+            chosen[index] = limit
+            remaining -= cost
+
+        memory_str = ""
+        memory_limit = min(budget.memory_tokens, remaining)
+        if include_memory and self.memory_bank and budget.memory_summaries > 0 and memory_limit >= budget.min_output_tokens:
+            summaries = self.memory_bank.get_summaries()[-budget.memory_summaries:]
+            if summaries:
+                memory_str = truncate_tokens("- 记忆摘要:\n" + "".join(
+                    f"  摘要: {summary.title} - {summary.content}\n" for summary in summaries
+                ), memory_limit)
+
+        first = min(chosen)
+        skipped = first - start
+        history_str = "历史任务执行摘要:\n" + memory_str + "最近任务执行历史:\n"
+        if skipped:
+            history_str += f"(为控制长度省略了更早的 {skipped} 步)\n"
+            logger.debug(f"Prompt budget dropped {skipped} history steps")
+        previous = None
+        for index in range(first, len(history)):
+            result = history[index]
+            status = "成功" if result.success else "失败"
+            history_str += f"\n第{index + 1}步 - 命令执行{status}：\n"
+            same_response = result.skill_response is not None and result.skill_response is previous
+            history_str += step_fragment(result, not same_response, chosen[index])[0]
+            previous = result.skill_response
+        self.tokens[include_memory] = count_tokens(history_str)
+        return history_str
+
+
+def build_task_message(task: str) -> str:
+    """构建任务消息"""
+    return f"请帮我完成以下任务: {task}"
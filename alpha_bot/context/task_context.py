@@ -4,6 +4,7 @@ from typing import Optional, List
 from ..models.types import TaskStatus, ExecutionResult
 from ..memory.bank import MemoryBank
 from ..memory.types import MemoryEntry
+from ..llm.usage import TokenUsage
 
 
 
@@ -15,6 +16,7 @@ class TaskContext:
     iteration: int = 0
     history: List[ExecutionResult] = field(default_factory=list)
     memory_bank: MemoryBank = field(default_factory=MemoryBank)
+    usage: TokenUsage = field(default_factory=TokenUsage)    # 本任务的 LLM token 用量（含前缀缓存命中）
     
     def add_result(self, result: ExecutionResult):
         """添加执行结果到历史"""
@@ -27,7 +29,7 @@ class TaskContext:
             memory_entry = MemoryEntry(
                 skill_name=result.skill_response.skill_name,
                 thinking=result.skill_response.thinking,
-                command=result.skill_response.command,
+                command=result.command or result.skill_response.command,
                 result=result.get_output_for_llm(max_length=2000),  # Use truncated output to avoid memory bloat
                 step_number=len(self.history)
             )
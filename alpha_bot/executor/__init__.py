@@ -1,5 +1,25 @@
 """命令执行器"""
 
+import os
+from typing import Optional
+
 from .shell import ShellExecutor
+from .persistent import PersistentShellExecutor
+
+
+def create_executor(kind: Optional[str] = None, working_dir: Optional[str] = None) -> ShellExecutor:
+    """
+    按名称创建执行器
+
+    Args:
+        kind: "subprocess"（每条命令一个新进程）或 "persistent"（整个任务共用一个 bash），
+            默认 SHELL_EXECUTOR 环境变量，未设置时为 "subprocess"
+        working_dir: 工作目录
+    """
+    kind = (kind or os.getenv("SHELL_EXECUTOR", "subprocess")).lower()
+    if kind == "persistent":
+        return PersistentShellExecutor(working_dir=working_dir)
+    return ShellExecutor(working_dir=working_dir)
+
 
-__all__ = ["ShellExecutor"]
+__all__ = ["ShellExecutor", "PersistentShellExecutor", "create_executor"]
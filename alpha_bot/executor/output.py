@@ -0,0 +1,145 @@
+"""命令输出缓冲 - 按字节限制内存，只保留开头和结尾"""
+
+import os
+import time
+import codecs
+import tempfile
+from typing import Callable, Dict, Optional
+
+
+class HeadTailBuffer:
+    """
+    有界输出缓冲
+
+    前 head_bytes 字节和最后 tail_bytes 字节保留在内存中，中间部分丢弃
+    （完整输出由 OutputSpool 写入临时文件）。命令出错时信息通常在开头（用法、
+    路径）或结尾（错误堆栈、汇总），两端都保留比只截开头更有用。
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024):
+        self.head_bytes = max_bytes // 2
+        self.tail_bytes = max_bytes - self.head_bytes
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total_bytes = 0
+
+    def write(self, data: bytes):
+        self.total_bytes += len(data)
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._tail += data
+            excess = len(self._tail) - self.tail_bytes
+            if excess > 0:
+                del self._tail[:excess]
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.total_bytes - len(self._head) - len(self._tail)
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped_bytes > 0
+
+    def getvalue(self) -> str:
+        if not self.truncated:
+            # 头尾相接，整体解码避免边界上的多字节字符被拆开
+            return (self._head + self._tail).decode("utf-8", errors="replace")
+        head = self._head.decode("utf-8", errors="replace")
+        tail = self._tail.decode("utf-8", errors="replace")
+        return f"{head}\n...(省略中间 {self.dropped_bytes} 字节)...\n{tail}"
+
+
+class OutputSpool:
+    """
+    完整输出的临时文件
+
+    stdout 和 stderr 按到达顺序写入同一个文件。输出没有超出内存缓冲时
+    文件会被删除（discard），超出时保留，路径记录在 ExecutionResult.output_file。
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        directory = directory or os.getenv("EXECUTOR_SPOOL_DIR") or None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="alpha_bot_output_", suffix=".log", dir=directory)
+        self._file = os.fdopen(fd, "wb")
+        self.bytes_written = 0
+
+    def write(self, data: bytes):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        self.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class ChunkForwarder:
+    """
+    把实时输出转发给 UI，按时间间隔合并
+
+    callback(stream, text) 每个 stream 至多每 interval 秒调用一次，flush(final=True) 发送剩余内容。
+    使用增量解码器，多字节字符跨两次 read 时不会被拆坏。
+    """
+
+    def __init__(self, callback: Callable[[str, str], None], interval: float = 0.1):
+        self.callback = callback
+        self.interval = interval
+        self._decoders: Dict[str, codecs.IncrementalDecoder] = {}
+        self._pending: Dict[str, str] = {}
+        self._last_flush = float("-inf")
+
+    def write(self, stream: str, data: bytes):
+        decoder = self._decoders.get(stream)
+        if decoder is None:
+            decoder = self._decoders[stream] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        text = decoder.decode(data)
+        if text:
+            self._pending[stream] = self._pending.get(stream, "") + text
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self, final: bool = False):
+        if final:
+            for stream, decoder in self._decoders.items():
+                text = decoder.decode(b"", final=True)
+                if text:
+                    self._pending[stream] = self._pending.get(stream, "") + text
+        pending, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        for stream, text in pending.items():
+            self.callback(stream, text)
+
+
+class LabeledOutput:
+    """
+    给实时输出的每一行加上前缀（并行执行多条命令时区分输出来自哪条命令）
+
+    按 stream 分别记录当前是否在行首，一行被拆在两次回调之间时不会重复加前缀。
+    """
+
+    def __init__(self, callback: Callable[[str, str], None], label: str):
+        self.callback = callback
+        self.label = label
+        self._at_line_start: Dict[str, bool] = {}
+
+    def __call__(self, stream: str, text: str):
+        if not text:
+            return
+        ends_line = text.endswith("\n")
+        body = text[:-1] if ends_line else text
+        labeled = body.replace("\n", "\n" + self.label) + ("\n" if ends_line else "")
+        if self._at_line_start.get(stream, True):
+            labeled = self.label + labeled
+        self._at_line_start[stream] = ends_line
+        self.callback(stream, labeled)
@@ -0,0 +1,319 @@
+"""常驻 Shell 执行器 - 同一个任务的所有命令在同一个 bash 进程中执行"""
+
+import os
+import time
+import uuid
+import shlex
+import signal
+import shutil
+import weakref
+import tempfile
+import selectors
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from ..models.types import ExecutionResult
+from .output import ChunkForwarder, HeadTailBuffer, OutputSpool
+from .shell import ShellExecutor
+
+
+def _terminate(process: subprocess.Popen, script_dir: str):
+    """结束 shell 进程组并删除命令脚本目录（也用作 weakref.finalize 回调）"""
+    if process.poll() is None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        try:
+            pipe.close()
+        except OSError:
+            pass
+    shutil.rmtree(script_dir, ignore_errors=True)
+
+
+class PersistentShellExecutor(ShellExecutor):
+    """
+    常驻 bash 会话执行器
+
+    ShellExecutor 每条命令启动一个新的 /bin/sh，cd、export、source venv/bin/activate、
+    shell 函数在步骤之间都会丢失。这里整个任务共用一个 bash 进程：
+
+    - 命令写入临时脚本，用 `. script < /dev/null` 在当前 shell 中执行
+      （语法错误不会吞掉后续内容，命令也读不到会话的 stdin）
+    - 执行完后向 stdout / stderr 各打印一行带随机 token 的结束标记，
+      stdout 的标记行带上退出码和当前目录
+    - 超时或输出超限时向进程组发送 SIGINT（bash 中 trap 了 INT，会话本身不受影响），
+      INTERRUPT_GRACE 秒内仍未结束才杀掉整个会话，下一条命令自动启动新会话
+    - 命令中执行 exit 等导致 shell 退出时同样自动重启
+
+    AlphaBot 每个任务开始时调用 reset()，会话状态不会跨任务保留。
+    """
+
+    INTERRUPT_GRACE = 3.0
+
+    def __init__(self, working_dir: Optional[str] = None, timeout: int = 60, shell: str = "bash", **kwargs):
+        """
+        Args:
+            working_dir: 初始工作目录
+            timeout: 默认超时时间（秒）
+            shell: shell 程序，需要支持 trap 和 `.`（bash / zsh）
+            **kwargs: buffer_bytes、max_output_bytes，同 ShellExecutor
+        """
+        kwargs.pop("streaming", None)
+        super().__init__(working_dir=working_dir, timeout=timeout, streaming=True, **kwargs)
+        self.shell = shell
+        self.initial_dir = self.working_dir
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._script_dir: Optional[str] = None
+        self._finalizer = None
+        self.sessions_started = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self):
+        self._end_session()
+        self._script_dir = tempfile.mkdtemp(prefix="alpha_bot_shell_")
+        self._process = subprocess.Popen(
+            [self.shell, "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.working_dir,
+            env={**os.environ, "LANG": "en_US.UTF-8"},
+            start_new_session=True
+        )
+        self._finalizer = weakref.finalize(self, _terminate, self._process, self._script_dir)
+        # SIGINT 只打断正在运行的命令，不结束会话
+        self._send("trap ':' INT\n")
+        self.sessions_started += 1
+        logger.debug(f"Started persistent shell (pid {self._process.pid}) in {self.working_dir}")
+
+    def _send(self, text: str):
+        self._process.stdin.write(text.encode("utf-8"))
+        self._process.stdin.flush()
+
+    def execute(
+        self,
+        command: str,
+        timeout: Optional[int] = None,
+        on_output: Optional[Callable[[str, str], None]] = None
+    ) -> ExecutionResult:
+        """
+        在常驻会话中执行命令
+
+        Args:
+            command: 要执行的命令
+            timeout: 超时时间（秒），默认使用实例配置
+            on_output: 实时输出回调 (stream, text)
+        """
+        timeout = timeout or self.timeout
+        if self.is_dangerous(command):
+            return ExecutionResult(
+                command=command,
+                returncode=-1,
+                stdout="",
+                stderr="拒绝执行: 检测到潜在危险命令"
+            )
+
+        with self._lock:
+            try:
+                if not self.alive:
+                    self._start()
+                return self._run(command, timeout, on_output)
+            except OSError as e:
+                self._end_session()
+                return ExecutionResult(
+                    command=command,
+                    returncode=-1,
+                    stdout="",
+                    stderr=f"执行错误: {str(e)}"
+                )
+
+    def _run(self, command: str, timeout: int, on_output: Optional[Callable[[str, str], None]]) -> ExecutionResult:
+        marker = f"__ALPHA_BOT_DONE_{uuid.uuid4().hex}__"
+        marker_bytes = marker.encode()
+        script = os.path.join(self._script_dir, "command.sh")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(command + "\n")
+        self._send(
+            f". {shlex.quote(script)} < /dev/null\n"
+            "__alpha_bot_rc=$?\n"
+            f"printf '\\n{marker} %s %s\\n' \"$__alpha_bot_rc\" \"$PWD\"\n"
+            f"printf '\\n{marker}\\n' >&2\n"
+        )
+
+        spool = OutputSpool()
+        buffers = {"stdout": HeadTailBuffer(self.buffer_bytes), "stderr": HeadTailBuffer(self.buffer_bytes)}
+        forwarder = ChunkForwarder(on_output) if on_output else None
+        pending: Dict[str, bytearray] = {"stdout": bytearray(), "stderr": bytearray()}
+        # 标记可能被拆在两次 read 之间，末尾这么多字节暂不输出
+        keep = len(marker_bytes) + 1
+        status_line = None
+        stop_reason = None
+        shell_exited = False
+        session_lost = False
+
+        def emit(stream: str, data: bytes):
+            if not data or stop_reason == "output_limit":
+                return
+            buffers[stream].write(data)
+            spool.write(data)
+            if forwarder:
+                forwarder.write(stream, data)
+
+        selector = selectors.DefaultSelector()
+        selector.register(self._process.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(self._process.stderr, selectors.EVENT_READ, "stderr")
+        deadline = time.monotonic() + timeout
+        interrupt_deadline = None
+
+        try:
+            while selector.get_map():
+                now = time.monotonic()
+                if stop_reason is None and now >= deadline:
+                    stop_reason = "timeout"
+                if stop_reason is not None and interrupt_deadline is None:
+                    self._interrupt()
+                    interrupt_deadline = now + self.INTERRUPT_GRACE
+                if interrupt_deadline is not None and now >= interrupt_deadline:
+                    session_lost = True
+                    break
+                wait = (interrupt_deadline or deadline) - now
+                for key, _ in selector.select(min(max(wait, 0.0), 0.5)):
+                    stream = key.data
+                    data = os.read(key.fd, self.READ_SIZE)
+                    if not data:
+                        shell_exited = True
+                        break
+                    buffer = pending[stream]
+                    buffer += data
+                    index = buffer.find(marker_bytes)
+                    if index < 0:
+                        if len(buffer) > keep:
+                            emit(stream, bytes(buffer[:-keep]))
+                            del buffer[:-keep]
+                    else:
+                        if stream == "stdout":
+                            line_end = buffer.find(b"\n", index)
+                            if line_end < 0:
+                                continue    # 状态行还没收全
+                            status_line = buffer[index + len(marker_bytes):line_end].decode("utf-8", "replace")
+                        # 去掉 printf 在标记前补的换行
+                        emit(stream, bytes(buffer[:index - 1] if index > 0 else b""))
+                        buffer.clear()
+                        selector.unregister(key.fileobj)
+                    if 0 < self.max_output_bytes < spool.bytes_written and stop_reason is None:
+                        stop_reason = "output_limit"
+                if shell_exited:
+                    break
+        finally:
+            selector.close()
+            if forwarder:
+                forwarder.flush(final=True)
+            spool.close()
+
+        returncode = -1
+        if status_line is not None:
+            code, _, cwd = status_line.strip().partition(" ")
+            try:
+                returncode = int(code)
+            except ValueError:
+                pass
+            if cwd and os.path.isdir(cwd):
+                self.working_dir = cwd
+
+        notes = []
+        if stop_reason == "timeout":
+            returncode = -1
+            notes.append(f"命令执行超时 (>{timeout}秒)，已中断")
+        elif stop_reason == "output_limit":
+            returncode = -1
+            notes.append(f"输出超过 {self.max_output_bytes / (1024 * 1024):g}MB，命令已被终止")
+        if shell_exited:
+            self._process.wait()
+            returncode = self._process.returncode if status_line is None else returncode
+            notes.append("shell 会话已退出，下一条命令将在新的会话中执行（cd、export 等状态已丢失）")
+            self._end_session()
+        elif session_lost:
+            notes.append("命令没有响应中断，shell 会话已重启（cd、export 等状态已丢失）")
+            self._end_session()
+
+        stdout = buffers["stdout"].getvalue()
+        stderr = buffers["stderr"].getvalue()
+        if notes:
+            stderr = "\n".join(([stderr.rstrip("\n")] if stderr else []) + notes)
+
+        output_file = None
+        if stop_reason == "output_limit" or any(buffer.truncated for buffer in buffers.values()):
+            output_file = self._keep_spool(spool)
+        else:
+            spool.discard()
+
+        return ExecutionResult(
+            command=command,
+            returncode=returncode,
+            stdout=stdout if stdout else ("" if notes else "成功执行命令"),
+            stderr=stderr,
+            output_file=output_file
+        )
+
+    def execute_many(
+        self,
+        commands: List[str],
+        timeout: Optional[int] = None,
+        on_output: Optional[Callable[[str, str], None]] = None
+    ) -> List[ExecutionResult]:
+        """
+        依次在会话中执行多条命令
+
+        一个 bash 会话同一时间只能运行一条命令；并行执行需要新进程，会丢失会话中的
+        export、激活的虚拟环境等状态，所以这里逐条执行（仍然省掉了多轮 LLM 调用）。
+        输出同样带有命令序号前缀。
+        """
+        callbacks = self._labeled_callbacks(commands, on_output)
+        return [self.execute(command, timeout, callback) for command, callback in zip(commands, callbacks)]
+
+    def _interrupt(self):
+        """向会话的进程组发送 SIGINT（打断前台命令，bash 自身 trap 了 INT）"""
+        try:
+            os.killpg(self._process.pid, signal.SIGINT)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def change_directory(self, path: str) -> bool:
+        """更改工作目录（会话已启动时同步到 shell）"""
+        if not super().change_directory(path):
+            return False
+        if self.alive:
+            self.execute(f"cd {shlex.quote(self.working_dir)}")
+        return True
+
+    def reset(self):
+        """结束当前会话并回到初始目录，下一条命令启动新会话"""
+        with self._lock:
+            self.close()
+            self.working_dir = self.initial_dir
+
+    def close(self):
+        """结束 shell 进程，删除保留的输出文件"""
+        super().close()
+        self._end_session()
+
+    def _end_session(self):
+        """结束 shell 进程（会话重启时调用，本任务保留的输出文件不受影响）"""
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._process = None
+        self._script_dir = None
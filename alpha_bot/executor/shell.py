@@ -1,10 +1,17 @@
 """Shell 命令执行器"""
 
 import os
+import time
+import signal
+import selectors
+import threading
 import subprocess
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional
 
 from ..models.types import ExecutionResult
+from .output import ChunkForwarder, HeadTailBuffer, LabeledOutput, OutputSpool
 
 
 class ShellExecutor:
@@ -22,9 +29,52 @@ class ShellExecutor:
         "chown -R",
     ]
     
-    def __init__(self, working_dir: Optional[str] = None, timeout: int = 60):
+    READ_SIZE = 64 * 1024
+    
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        timeout: int = 60,
+        streaming: Optional[bool] = None,
+        buffer_bytes: Optional[int] = None,
+        max_output_bytes: Optional[int] = None,
+        max_parallel: Optional[int] = None,
+        max_spool_files: Optional[int] = None
+    ):
+        """
+        Args:
+            working_dir: 工作目录
+            timeout: 默认超时时间（秒）
+            streaming: 是否流式读取输出，默认 EXECUTOR_STREAMING（true）
+            buffer_bytes: stdout / stderr 各自在内存中保留的字节数（开头一半 + 结尾一半），
+                默认 EXECUTOR_BUFFER_BYTES（65536）
+            max_output_bytes: 输出总量超过该值时终止命令，默认 EXECUTOR_MAX_OUTPUT_MB（256MB），0 表示不限制
+            max_parallel: execute_many 同时运行的命令数，默认 EXECUTOR_MAX_PARALLEL（4）
+            max_spool_files: 最多保留的完整输出文件数，超出时删除最早的，默认 EXECUTOR_MAX_SPOOL_FILES（8），
+                0 表示不限制；reset() / close() 时全部删除
+        """
         self.working_dir = working_dir or os.getcwd()
         self.timeout = timeout
+        if streaming is None:
+            streaming = os.getenv("EXECUTOR_STREAMING", "true").lower() == "true"
+        self.streaming = streaming
+        try:
+            self.buffer_bytes = buffer_bytes or int(os.getenv("EXECUTOR_BUFFER_BYTES", 64 * 1024))
+            if max_output_bytes is None:
+                max_output_bytes = int(float(os.getenv("EXECUTOR_MAX_OUTPUT_MB", 256)) * 1024 * 1024)
+            if max_spool_files is None:
+                max_spool_files = int(os.getenv("EXECUTOR_MAX_SPOOL_FILES", 8))
+        except ValueError:
+            self.buffer_bytes = buffer_bytes or 64 * 1024
+            max_output_bytes = 256 * 1024 * 1024
+            max_spool_files = 8
+        self.max_output_bytes = max_output_bytes
+        self.max_spool_files = max_spool_files
+        self.max_parallel = max_parallel or int(os.getenv("EXECUTOR_MAX_PARALLEL", "4"))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # 保留下来的完整输出文件（任务的后续步骤还会用 grep/tail 查看），按创建顺序
+        self._spool_files: Deque[str] = deque()
+        self._spool_lock = threading.Lock()
     
     def is_dangerous(self, command: str) -> bool:
         """检查命令是否危险"""
@@ -34,13 +84,19 @@ class ShellExecutor:
                 return True
         return False
     
-    def execute(self, command: str, timeout: Optional[int] = None) -> ExecutionResult:
+    def execute(
+        self,
+        command: str,
+        timeout: Optional[int] = None,
+        on_output: Optional[Callable[[str, str], None]] = None
+    ) -> ExecutionResult:
         """
         执行 shell 命令
         
         Args:
             command: 要执行的命令
             timeout: 超时时间（秒），默认使用实例配置
+            on_output: 实时输出回调 (stream, text)，stream 为 "stdout" 或 "stderr"（仅流式模式）
             
         Returns:
             ExecutionResult: 执行结果
@@ -56,6 +112,9 @@ class ShellExecutor:
                 stderr="拒绝执行: 检测到潜在危险命令"
             )
         
+        if self.streaming:
+            return self._execute_streaming(command, timeout, on_output)
+        
         try:
             result = subprocess.run(
                 command,
@@ -87,6 +146,201 @@ class ShellExecutor:
                 stderr=f"执行错误: {str(e)}"
             )
     
+    def execute_many(
+        self,
+        commands: List[str],
+        timeout: Optional[int] = None,
+        on_output: Optional[Callable[[str, str], None]] = None
+    ) -> List[ExecutionResult]:
+        """
+        并行执行多条互相独立的命令
+        
+        最多 max_parallel 条同时运行（线程池中每个线程等待一个子进程），
+        每条命令单独做危险检查和超时控制。多条命令时 on_output 收到的每行输出
+        都带有命令序号前缀 "[i] "（从 1 开始）。
+        
+        Returns:
+            与 commands 顺序一致的执行结果
+        """
+        callbacks = self._labeled_callbacks(commands, on_output)
+        if len(commands) <= 1 or self.max_parallel <= 1:
+            return [self.execute(command, timeout, callback) for command, callback in zip(commands, callbacks)]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="shell")
+        futures = [
+            self._pool.submit(self.execute, command, timeout, callback)
+            for command, callback in zip(commands, callbacks)
+        ]
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def _labeled_callbacks(
+        commands: List[str],
+        on_output: Optional[Callable[[str, str], None]]
+    ) -> List[Optional[Callable[[str, str], None]]]:
+        """每条命令各自的输出回调（多条命令时给输出加上序号）"""
+        if on_output is None or len(commands) <= 1:
+            return [on_output] * len(commands)
+        return [LabeledOutput(on_output, f"[{i}] ") for i in range(1, len(commands) + 1)]
+    
+    def _execute_streaming(
+        self,
+        command: str,
+        timeout: int,
+        on_output: Optional[Callable[[str, str], None]] = None
+    ) -> ExecutionResult:
+        """
+        用 Popen 边执行边读取输出
+        
+        stdout / stderr 各自只在内存中保留开头和结尾（HeadTailBuffer），完整输出写入
+        临时文件；输出超出缓冲时文件保留下来，路径放在 ExecutionResult.output_file。
+        输出总量超过 max_output_bytes 或超时时终止整个进程组。
+        """
+        spool = None
+        try:
+            spool = OutputSpool()
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                cwd=self.working_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env={**os.environ, "LANG": "en_US.UTF-8"},
+                start_new_session=True      # 超时时连同子进程一起终止
+            )
+        except Exception as e:
+            # Popen 失败时临时文件不会再用到
+            if spool is not None:
+                spool.discard()
+            return ExecutionResult(
+                command=command,
+                returncode=-1,
+                stdout="",
+                stderr=f"执行错误: {str(e)}"
+            )
+        
+        buffers = {"stdout": HeadTailBuffer(self.buffer_bytes), "stderr": HeadTailBuffer(self.buffer_bytes)}
+        forwarder = ChunkForwarder(on_output) if on_output else None
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(process.stderr, selectors.EVENT_READ, "stderr")
+        deadline = time.monotonic() + timeout
+        stop_reason = None
+        
+        try:
+            while selector.get_map() and stop_reason is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    stop_reason = "timeout"
+                    break
+                for key, _ in selector.select(min(remaining, 0.5)):
+                    data = os.read(key.fd, self.READ_SIZE)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        continue
+                    buffers[key.data].write(data)
+                    spool.write(data)
+                    if forwarder:
+                        forwarder.write(key.data, data)
+                    if 0 < self.max_output_bytes < spool.bytes_written:
+                        stop_reason = "output_limit"
+                        break
+            
+            if stop_reason is None:
+                try:
+                    process.wait(timeout=max(deadline - time.monotonic(), 0.1))
+                except subprocess.TimeoutExpired:
+                    stop_reason = "timeout"
+            if stop_reason is not None:
+                self._kill(process)
+        except BaseException:
+            # KeyboardInterrupt 等：子进程在独立的会话中，不会收到终端的信号，需要手动终止
+            self._kill(process)
+            spool.discard()
+            raise
+        finally:
+            selector.close()
+            process.stdout.close()
+            process.stderr.close()
+            if forwarder:
+                forwarder.flush(final=True)
+            spool.close()
+        
+        stdout = buffers["stdout"].getvalue()
+        stderr = buffers["stderr"].getvalue()
+        returncode = process.returncode
+        if stop_reason == "timeout":
+            returncode = -1
+            stderr += f"\n命令执行超时 (>{timeout}秒)" if stderr else f"命令执行超时 (>{timeout}秒)"
+        elif stop_reason == "output_limit":
+            returncode = -1
+            message = f"输出超过 {self.max_output_bytes / (1024 * 1024):g}MB，命令已被终止"
+            stderr += f"\n{message}" if stderr else message
+        
+        output_file = None
+        if stop_reason == "output_limit" or any(buffer.truncated for buffer in buffers.values()):
+            output_file = self._keep_spool(spool)
+        else:
+            spool.discard()
+        
+        return ExecutionResult(
+            command=command,
+            returncode=returncode,
+            stdout=stdout if stdout else ("" if stop_reason else "成功执行命令"),
+            stderr=stderr,
+            output_file=output_file
+        )
+    
+    @staticmethod
+    def _kill(process: subprocess.Popen):
+        """终止命令及其子进程"""
+        if process.poll() is not None:
+            return
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+    
+    def _keep_spool(self, spool: OutputSpool) -> str:
+        """登记保留的输出文件，超过 max_spool_files 时删除最早的文件"""
+        with self._spool_lock:
+            self._spool_files.append(spool.path)
+            while 0 < self.max_spool_files < len(self._spool_files):
+                self._unlink(self._spool_files.popleft())
+        return spool.path
+    
+    def _delete_spool_files(self):
+        """删除本执行器保留的全部输出文件"""
+        with self._spool_lock:
+            paths, self._spool_files = self._spool_files, deque()
+        for path in paths:
+            self._unlink(path)
+    
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    def reset(self):
+        """任务开始时调用（每条命令都是独立进程，只需删除上一个任务的输出文件）"""
+        self._delete_spool_files()
+    
+    def close(self):
+        """释放资源（execute_many 的线程池、保留的输出文件）"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self._delete_spool_files()
+    
     def change_directory(self, path: str) -> bool:
         """更改工作目录"""
         try:
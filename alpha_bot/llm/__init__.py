@@ -2,5 +2,26 @@
 
 from .base import BaseLLMClient
 from .openai_client import OpenAIClient
+from .async_openai_client import AsyncOpenAIClient
+from .cache import CacheConfig, LLMResponseCache, get_llm_cache, configure_llm_cache
+from .usage import TokenUsage, track_usage, record_usage
+from .registry import LLMClientRegistry, PoolConfig, get_llm_registry, get_llm_client, get_async_llm_client, configure_llm_pool
 
-__all__ = ["BaseLLMClient", "OpenAIClient"]
+__all__ = [
+    "BaseLLMClient",
+    "OpenAIClient",
+    "AsyncOpenAIClient",
+    "LLMClientRegistry",
+    "PoolConfig",
+    "get_llm_registry",
+    "get_llm_client",
+    "get_async_llm_client",
+    "configure_llm_pool",
+    "CacheConfig",
+    "LLMResponseCache",
+    "get_llm_cache",
+    "configure_llm_cache",
+    "TokenUsage",
+    "track_usage",
+    "record_usage",
+]
@@ -0,0 +1,150 @@
+"""OpenAI 异步 LLM 客户端"""
+
+import os
+import asyncio
+from typing import Optional, Callable, AsyncIterator, Tuple
+from openai import AsyncOpenAI
+
+from .base import BaseLLMClient, UserInput, build_messages, stream_usage_kwargs
+from .cache import LLMResponseCache, get_llm_cache
+from .usage import record_usage
+
+
+class AsyncOpenAIClient(BaseLLMClient):
+    """
+    基于 openai.AsyncOpenAI 的异步客户端
+
+    流式响应在事件循环中逐块读取，不会为每个进行中的 LLM 流占用一个线程。
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        client: Optional[AsyncOpenAI] = None,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        super().__init__()
+        # 传入 client 时复用其连接池（见 llm.registry），否则单独创建
+        self.client = client or AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url or os.getenv("OPENAI_API_BASE")
+        )
+        self.model = model or os.getenv("MODEL_NAME", "gpt-4")
+        # 未指定时使用全局响应缓存（LLM_CACHE_ENABLED 开启时）
+        self.cache = cache
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_input: UserInput,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        response_class=None,
+        model: Optional[str] = None
+    ):
+        """同步调用入口，仅能在没有运行中的事件循环时使用"""
+        return asyncio.run(self.agenerate(system_prompt, user_input, stream_callback, response_class=response_class, model=model))
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: UserInput,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        response_class=None,
+        model: Optional[str] = None
+    ):
+        """
+        异步生成响应
+
+        Args:
+            system_prompt: 系统提示词
+            user_input: 用户消息
+            stream_callback: 流式输出回调函数，接收每个 token
+            response_class: 响应类，用于直接解析JSON到指定类型
+            model: 本次调用使用的模型，默认使用客户端的模型
+        """
+        cache = self.cache if self.cache is not None else get_llm_cache()
+        cache_key = None
+        if cache is not None:
+            cache_key = LLMResponseCache.make_key(
+                model or self.model,
+                self._build_messages(system_prompt, user_input),
+                0.1,
+                {"type": "json_object"} if response_class else None
+            )
+            response_text = cache.get(cache_key)
+            if response_text is not None:
+                if stream_callback:
+                    stream_callback(response_text)
+                return self._parse_response(response_text, response_class)
+
+        if stream_callback:
+            response_text = ""
+            finish_reason = None
+            async for token, reason in self._astream_chunks(system_prompt, user_input, response_class, model):
+                if reason:
+                    finish_reason = reason
+                if token:
+                    response_text += token
+                    stream_callback(token)
+        else:
+            response = await self.client.chat.completions.create(
+                model=model or self.model,
+                messages=self._build_messages(system_prompt, user_input),
+                temperature=0.1,
+                response_format={"type": "json_object"} if response_class else None
+            )
+            record_usage(response.usage)
+            response_text = response.choices[0].message.content
+            finish_reason = response.choices[0].finish_reason
+
+        if cache is not None and self._is_cacheable(response_text, finish_reason, response_class):
+            cache.set(cache_key, response_text, model=model or self.model)
+        return self._parse_response(response_text, response_class)
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_input: UserInput,
+        response_class=None,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """异步逐 token 输出响应内容"""
+        async for token, _ in self._astream_chunks(system_prompt, user_input, response_class, model):
+            if token:
+                yield token
+
+    async def _astream_chunks(
+        self,
+        system_prompt: str,
+        user_input: UserInput,
+        response_class=None,
+        model: Optional[str] = None
+    ) -> AsyncIterator[Tuple[Optional[str], Optional[str]]]:
+        """逐块输出 (内容, finish_reason)，agenerate 据 finish_reason 判断响应是否完整"""
+        stream = await self.client.chat.completions.create(
+            model=model or self.model,
+            messages=self._build_messages(system_prompt, user_input),
+            temperature=0.1,
+            response_format={"type": "json_object"} if response_class else None,
+            stream=True,
+            **stream_usage_kwargs()
+        )
+
+        try:
+            async for chunk in stream:
+                # include_usage 时最后一个 chunk 只有 usage，没有 choices
+                if getattr(chunk, "usage", None):
+                    record_usage(chunk.usage)
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content, chunk.choices[0].finish_reason
+        finally:
+            # 任务被取消或调用方提前退出时立即断开连接，服务端停止生成
+            close = getattr(stream, "close", None)
+            if close is not None:
+                await close()
+
+    def _build_messages(self, system_prompt: str, user_input: UserInput):
+        """构建 API 请求消息"""
+        return build_messages(system_prompt, user_input)
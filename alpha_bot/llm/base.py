@@ -1,17 +1,112 @@
 """LLM 客户端基类"""
 
+import os
+import json
+import asyncio
+import functools
+import contextvars
 from abc import ABC, abstractmethod
-from typing import Optional, List, Callable
+from typing import Any, Dict, Optional, List, Callable, AsyncIterator, Sequence, Union
 
 from ..models.types import LLMResponse, ExecutionResult, Message
 
 
+# 用户消息：字符串，或按稳定程度从高到低排列的片段（技能说明、提示、任务、执行历史）
+UserInput = Union[str, Sequence[str]]
+
+
+def prompt_layout() -> str:
+    """
+    消息布局（LLM_PROMPT_LAYOUT）
+
+    - split（默认）：每个片段单独一条 user 消息，稳定的片段在前，服务端前缀缓存可以稳定命中
+    - joined：所有片段合并成一条 user 消息
+    """
+    return os.getenv("LLM_PROMPT_LAYOUT", "split").strip().lower()
+
+
+def build_messages(system_prompt: str, user_input: UserInput, layout: Optional[str] = None) -> List[Dict[str, str]]:
+    """构建 API 请求消息"""
+    blocks = [user_input] if isinstance(user_input, str) else [block for block in user_input if block]
+    messages = [Message(role="system", content=system_prompt)]
+    if (layout or prompt_layout()) == "joined" or len(blocks) <= 1:
+        messages.append(Message(role="user", content="\n\n".join(blocks)))
+    else:
+        messages.extend(Message(role="user", content=block) for block in blocks)
+    return [{"role": m.role, "content": m.content} for m in messages]
+
+
+def stream_usage_kwargs() -> Dict[str, Any]:
+    """流式请求的 usage 参数（LLM_STREAM_USAGE=false 时不请求，个别兼容接口不支持 stream_options）"""
+    if os.getenv("LLM_STREAM_USAGE", "true").lower() in ("0", "false", "no"):
+        return {}
+    return {"stream_options": {"include_usage": True}}
+
+
 class BaseLLMClient(ABC):
     """LLM 客户端基类"""
-    
+
     def __init__(self):
         pass
-    
+
     @abstractmethod
-    def generate(self, system_prompt: str, user_prompt: str, stream_callback: Optional[Callable[[str], None]] = None, response_class=None):
+    def generate(self, system_prompt: str, user_prompt: UserInput, stream_callback: Optional[Callable[[str], None]] = None, response_class=None, model: Optional[str] = None):
         pass
+
+    async def agenerate(self, system_prompt: str, user_prompt: UserInput, stream_callback: Optional[Callable[[str], None]] = None, response_class=None, model: Optional[str] = None):
+        """
+        generate 的协程版本
+
+        默认实现把同步的 generate 放到线程池中执行，原生异步的客户端应当覆盖此方法。
+        """
+        loop = asyncio.get_running_loop()
+        # 带上当前上下文，用量统计（llm.usage）才能记到发起调用的任务上
+        return await loop.run_in_executor(
+            None,
+            contextvars.copy_context().run,
+            functools.partial(self.generate, system_prompt, user_prompt, stream_callback, response_class=response_class, model=model)
+        )
+
+    async def astream(self, system_prompt: str, user_prompt: UserInput, response_class=None, model: Optional[str] = None) -> AsyncIterator[str]:
+        """异步逐 token 输出响应内容"""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support astream")
+        yield  # pragma: no cover - makes this an async generator
+
+    def _is_cacheable(self, response_text: Optional[str], finish_reason: Optional[str], response_class=None) -> bool:
+        """
+        判断响应能否写入缓存
+
+        只缓存正常结束（finish_reason 为 stop）的响应：被截断（length）或中途断开（没有 finish_reason）
+        的输出不完整；指定了 response_class 时还要求是合法 JSON，否则重试时会一直命中同一个坏响应。
+        """
+        if not response_text or finish_reason != "stop":
+            return False
+        if response_class is None:
+            return True
+        try:
+            json.loads(response_text)
+        except json.JSONDecodeError:
+            return False
+        return True
+
+    def _parse_response(self, response_text: str, response_class=None):
+        """把 LLM 原始输出解析为 response_class 实例（未指定时返回 LLMResponse）"""
+        if response_class is None:
+            return LLMResponse.from_json(response_text)
+
+        try:
+            parsed_data = json.loads(response_text)
+            # Handle both dict instantiation and from_dict/from_json methods
+            if hasattr(response_class, 'from_dict'):
+                return response_class.from_dict(parsed_data)
+            elif hasattr(response_class, 'from_json'):
+                return response_class.from_json(response_text)
+            else:
+                # Assume it's a dataclass or simple class that accepts kwargs
+                return response_class(**parsed_data)
+        except json.JSONDecodeError:
+            # If parsing fails, return error response
+            if hasattr(response_class, 'from_dict'):
+                return response_class.from_dict({"thinking": "Failed to parse LLM response as JSON", "direct_response": f"Error: Invalid JSON response from LLM: {response_text}"})
+            else:
+                return response_class(thinking="Failed to parse LLM response as JSON", direct_response=f"Error: Invalid JSON response from LLM: {response_text}")
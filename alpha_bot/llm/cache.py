@@ -0,0 +1,272 @@
+"""LLM 响应缓存 - 内存 LRU + SQLite 磁盘两级缓存"""
+
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from loguru import logger
+
+
+@dataclass
+class CacheConfig:
+    """LLM 响应缓存配置"""
+    enabled: bool = False                 # 默认关闭，需要显式开启
+    path: Optional[str] = None            # SQLite 文件路径，默认 ~/.alpha_bot/llm_cache.sqlite3
+    memory_entries: int = 256             # 内存 LRU 最大条目数
+    max_disk_mb: float = 200.0            # 磁盘缓存最大体积（MB）
+    ttl: float = 7 * 24 * 3600            # 过期时间（秒），<= 0 表示永不过期
+
+    @classmethod
+    def from_env(cls) -> "CacheConfig":
+        """从环境变量加载缓存配置"""
+        config = cls()
+        config.enabled = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+        path = os.getenv("LLM_CACHE_PATH")
+        config.path = os.path.expanduser(path) if path else None
+        try:
+            config.memory_entries = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", config.memory_entries))
+            config.max_disk_mb = float(os.getenv("LLM_CACHE_MAX_DISK_MB", config.max_disk_mb))
+            config.ttl = float(os.getenv("LLM_CACHE_TTL", config.ttl))
+        except ValueError:
+            logger.warning("Invalid LLM cache configuration in environment, using defaults")
+        return config
+
+
+class LLMResponseCache:
+    """
+    按内容寻址的 LLM 响应缓存
+
+    缓存键是 (model, messages, temperature, response_format) 的 SHA-256，
+    命中时直接返回上一次的原始响应文本，不再请求 API。
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        """
+        初始化缓存
+
+        Args:
+            config: 缓存配置，默认从环境变量加载
+        """
+        self.config = config or CacheConfig.from_env()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        path = self.config.path or str(Path.home() / ".alpha_bot" / "llm_cache.sqlite3")
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            if path != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            # 磁盘层不可用时只使用内存层
+            logger.warning(f"LLM disk cache unavailable at {path}: {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """根据请求内容计算缓存键"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "response_format": response_format,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.config.ttl > 0 and now - created_at > self.config.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查询缓存
+
+        Returns:
+            缓存的响应文本，未命中或已过期时返回 None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return response
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        response, created_at = row
+                        if not self._expired(created_at, now):
+                            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                            self._conn.commit()
+                            self._remember(key, response, created_at)
+                            self.hits += 1
+                            return response
+                        self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"LLM disk cache read failed: {e}")
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str, model: Optional[str] = None):
+        """写入缓存（内存层和磁盘层）"""
+        if response is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, response, len(response.encode("utf-8")), now, now)
+                )
+                self._evict_disk()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM disk cache write failed: {e}")
+
+    def _remember(self, key: str, response: str, created_at: float):
+        """放入内存 LRU，超出容量时淘汰最久未使用的条目"""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > max(self.config.memory_entries, 0):
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        """删除过期条目，并按最近访问时间淘汰到体积上限以内"""
+        if self.config.ttl > 0:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.config.ttl,))
+
+        max_bytes = int(self.config.max_disk_mb * 1024 * 1024)
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= max_bytes:
+            return
+
+        freed = 0
+        stale_keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"):
+            if total - freed <= max_bytes:
+                break
+            stale_keys.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", stale_keys)
+        self.evictions += len(stale_keys)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            disk_entries, disk_bytes = 0, 0
+            if self._conn is not None:
+                disk_entries, disk_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+                ).fetchone()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def close(self):
+        """关闭磁盘连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global instance
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_loaded = False
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    获取全局 LLM 响应缓存
+
+    Returns:
+        LLMResponseCache instance，未通过 LLM_CACHE_ENABLED 开启时返回 None
+    """
+    global _llm_cache, _llm_cache_loaded
+
+    if not _llm_cache_loaded:
+        with _llm_cache_lock:
+            if not _llm_cache_loaded:
+                config = CacheConfig.from_env()
+                if config.enabled:
+                    _llm_cache = LLMResponseCache(config)
+                    logger.info(f"LLM response cache enabled at {_llm_cache.path}")
+                _llm_cache_loaded = True
+
+    return _llm_cache
+
+
+def configure_llm_cache(config: CacheConfig) -> Optional[LLMResponseCache]:
+    """
+    使用指定配置替换全局 LLM 响应缓存
+
+    Args:
+        config: 缓存配置，enabled=False 时关闭缓存
+    """
+    global _llm_cache, _llm_cache_loaded
+    with _llm_cache_lock:
+        if _llm_cache is not None:
+            _llm_cache.close()
+        _llm_cache = LLMResponseCache(config) if config.enabled else None
+        _llm_cache_loaded = True
+    return _llm_cache
@@ -2,11 +2,13 @@
 
 import os
 import json
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Tuple
 from loguru import logger
 from openai import OpenAI
 
-from .base import BaseLLMClient
+from .base import BaseLLMClient, UserInput, build_messages, stream_usage_kwargs
+from .cache import LLMResponseCache, get_llm_cache
+from .usage import record_usage
 from ..models.types import LLMResponse, ExecutionResult, Message
 
 
@@ -17,93 +19,122 @@ class OpenAIClient(BaseLLMClient):
         self,
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        client: Optional[OpenAI] = None,
+        cache: Optional[LLMResponseCache] = None
     ):
         super().__init__()
-        self.client = OpenAI(
+        # 传入 client 时复用其连接池（见 llm.registry），否则单独创建
+        self.client = client or OpenAI(
             api_key=api_key or os.getenv("OPENAI_API_KEY"),
             base_url=base_url or os.getenv("OPENAI_API_BASE")
         )
         self.model = model or os.getenv("MODEL_NAME", "gpt-4")
+        # 未指定时使用全局响应缓存（LLM_CACHE_ENABLED 开启时）
+        self.cache = cache
     
     def generate(
         self,
         system_prompt: str, 
-        user_input: str, 
+        user_input: UserInput, 
         stream_callback: Optional[Callable[[str], None]] = None,
-        response_class=None
+        response_class=None,
+        model: Optional[str] = None
     ):
         """
         生成下一步命令
         
         Args:
-            user_input: 用户输入的任务描述
+            user_input: 用户消息，或按稳定程度从高到低排列的片段列表（见 build_messages）
             last_result: 上一次命令执行的结果
             stream_callback: 流式输出回调函数，接收每个 token
             history: 历史执行结果列表
             response_class: 响应类，用于直接解析JSON到指定类型
+            model: 本次调用使用的模型，默认使用客户端的模型
         """
         # 构建 messages from scratch for each call
-        messages = [
-            Message(role="system", content=system_prompt),
-            Message(role="user", content=user_input)    
-        ]
+        messages = build_messages(system_prompt, user_input)
         
-        # 调用 API - 使用流式输出
-        if stream_callback:
-            response_text = self._generate_with_stream(messages, stream_callback, response_class)
-        else:
-            response_text = self._generate_without_stream(messages, response_class)
+        # 命中缓存时直接复用上一次的响应
+        cache = self.cache if self.cache is not None else get_llm_cache()
+        cache_key = None
+        response_text = None
+        if cache is not None:
+            cache_key = LLMResponseCache.make_key(
+                model or self.model,
+                messages,
+                0.1,
+                {"type": "json_object"} if response_class else None
+            )
+            response_text = cache.get(cache_key)
+            if response_text is not None:
+                logger.debug(f"LLM cache hit: {cache_key[:12]}")
+                if stream_callback:
+                    stream_callback(response_text)
         
-        # 如果指定了响应类，则直接解析并返回对象
-        if response_class is not None:
-            import json
-            try:
-                parsed_data = json.loads(response_text)
-                # Handle both dict instantiation and from_dict/from_json methods
-                if hasattr(response_class, 'from_dict'):
-                    return response_class.from_dict(parsed_data)
-                elif hasattr(response_class, 'from_json'):
-                    return response_class.from_json(response_text)
-                else:
-                    # Assume it's a dataclass or simple class that accepts kwargs
-                    return response_class(**parsed_data)
-            except json.JSONDecodeError:
-                # If parsing fails, return error response
-                if hasattr(response_class, 'from_dict'):
-                    return response_class.from_dict({"thinking": "Failed to parse LLM response as JSON", "direct_response": f"Error: Invalid JSON response from LLM: {response_text}"})
-                else:
-                    return response_class(thinking="Failed to parse LLM response as JSON", direct_response=f"Error: Invalid JSON response from LLM: {response_text}")
+        # 调用 API - 使用流式输出
+        if response_text is None:
+            if stream_callback:
+                response_text, finish_reason = self._generate_with_stream(messages, stream_callback, response_class, model)
+            else:
+                response_text, finish_reason = self._generate_without_stream(messages, response_class, model)
+            if cache is not None and self._is_cacheable(response_text, finish_reason, response_class):
+                cache.set(cache_key, response_text, model=model or self.model)
         
-        # 否则返回原始的 LLMResponse
-        return LLMResponse.from_json(response_text)
+        # 如果指定了响应类，则直接解析并返回对象，否则返回原始的 LLMResponse
+        return self._parse_response(response_text, response_class)
     
-    def _generate_with_stream(self, messages, callback: Callable[[str], None], response_class) -> str:
-        """使用流式输出生成响应"""
+    def _generate_with_stream(self, messages, callback: Callable[[str], None], response_class, model: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """使用流式输出生成响应，返回响应内容和 finish_reason（流中途断开时为 None）"""
         stream = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": m.role, "content": m.content} for m in messages],
+            model=model or self.model,
+            messages=messages,
             temperature=0.1,
             response_format={"type": "json_object"} if response_class else None,
-            stream=True
+            stream=True,
+            **stream_usage_kwargs()
         )
         
+        # 回调提供 bind_stream 时把流交给它，调用方可以中途关闭请求（见 skills.skill_manager._SpeculativeStream）
+        bind_stream = getattr(callback, "bind_stream", None)
+        if bind_stream is not None:
+            bind_stream(stream)
+        
         full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                token = chunk.choices[0].delta.content
-                full_response += token
-                callback(token)
+        finish_reason = None
+        try:
+            for chunk in stream:
+                # include_usage 时最后一个 chunk 只有 usage，没有 choices
+                if getattr(chunk, "usage", None):
+                    record_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                if chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                if chunk.choices[0].delta.content:
+                    token = chunk.choices[0].delta.content
+                    full_response += token
+                    callback(token)
+        finally:
+            # 回调抛出异常提前退出时立即断开连接，服务端停止生成
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
         
-        return full_response
+        if finish_reason is None:
+            # 流被中途关闭（例如推测执行未命中时 _SpeculativeStream.cancel），内容不完整
+            logger.debug("LLM stream ended without finish_reason, response is incomplete")
+        return full_response, finish_reason
     
-    def _generate_without_stream(self, messages, response_class) -> str:
-        """不使用流式输出生成响应"""
+    def _generate_without_stream(self, messages, response_class, model: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """不使用流式输出生成响应，返回响应内容和 finish_reason"""
         response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": m.role, "content": m.content} for m in messages],
+            model=model or self.model,
+            messages=messages,
             temperature=0.1,
             response_format={"type": "json_object"} if response_class else None
         )
-        return response.choices[0].message.content
+        record_usage(response.usage)
+        choice = response.choices[0]
+        return choice.message.content, choice.finish_reason
     
\ No newline at end of file
@@ -0,0 +1,276 @@
+"""LLM 客户端注册表 - 进程内共享的 OpenAI 连接池"""
+
+import os
+import threading
+import importlib.util
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Any
+
+from loguru import logger
+from openai import OpenAI, AsyncOpenAI
+
+from .openai_client import OpenAIClient
+from .async_openai_client import AsyncOpenAIClient
+
+
+@dataclass
+class PoolConfig:
+    """HTTP 连接池配置"""
+    max_connections: int = 100            # 最大并发连接数
+    max_keepalive_connections: int = 20   # 最大保活连接数
+    keepalive_expiry: float = 30.0        # 保活连接空闲过期时间（秒）
+    http2: bool = True                    # 是否启用 HTTP/2（需要安装 h2）
+    timeout: float = 600.0                # 请求超时时间（秒）
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """从环境变量加载连接池配置"""
+        config = cls()
+        try:
+            config.max_connections = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", config.max_connections))
+            config.max_keepalive_connections = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", config.max_keepalive_connections))
+            config.keepalive_expiry = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", config.keepalive_expiry))
+            config.timeout = float(os.getenv("LLM_TIMEOUT", config.timeout))
+        except ValueError:
+            logger.warning("Invalid LLM pool configuration in environment, using defaults")
+        config.http2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+        return config
+
+
+class LLMClientRegistry:
+    """
+    进程内 LLM 客户端注册表
+
+    所有技能、技能选择器、技能生成器和 Web 会话共享同一个 HTTP 连接池，
+    避免每个组件各自创建 openai.OpenAI 实例（以及各自的 TLS 连接池）。
+    """
+
+    def __init__(self, pool_config: Optional[PoolConfig] = None):
+        """
+        初始化注册表
+
+        Args:
+            pool_config: 连接池配置，默认从环境变量加载
+        """
+        self.pool_config = pool_config or PoolConfig.from_env()
+        self._lock = threading.Lock()
+        self._http_client = None
+        self._async_http_client = None
+        self._sdk_clients: Dict[Tuple[Optional[str], Optional[str]], OpenAI] = {}
+        self._clients: Dict[Tuple[Optional[str], Optional[str], Optional[str]], OpenAIClient] = {}
+        self._async_sdk_clients: Dict[Tuple[Optional[str], Optional[str]], AsyncOpenAI] = {}
+        self._async_clients: Dict[Tuple[Optional[str], Optional[str], Optional[str]], AsyncOpenAIClient] = {}
+
+    def _http_client_kwargs(self) -> Dict[str, Any]:
+        """构建 httpx 客户端参数（同步/异步连接池共用）"""
+        import httpx
+
+        http2 = self.pool_config.http2 and importlib.util.find_spec("h2") is not None
+        if self.pool_config.http2 and not http2:
+            logger.debug("h2 is not installed, LLM connection pool falls back to HTTP/1.1")
+
+        return {
+            "http2": http2,
+            "timeout": self.pool_config.timeout,
+            "limits": httpx.Limits(
+                max_connections=self.pool_config.max_connections,
+                max_keepalive_connections=self.pool_config.max_keepalive_connections,
+                keepalive_expiry=self.pool_config.keepalive_expiry,
+            ),
+        }
+
+    def _get_http_client(self):
+        """获取（或创建）共享的 httpx 连接池"""
+        if self._http_client is None:
+            import httpx
+            self._http_client = httpx.Client(**self._http_client_kwargs())
+        return self._http_client
+
+    def _get_async_http_client(self):
+        """获取（或创建）共享的异步 httpx 连接池"""
+        if self._async_http_client is None:
+            import httpx
+            self._async_http_client = httpx.AsyncClient(**self._http_client_kwargs())
+        return self._async_http_client
+
+    def get_sdk_client(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> OpenAI:
+        """
+        获取共享连接池上的 openai.OpenAI 实例
+
+        Args:
+            api_key: API Key，默认使用 OPENAI_API_KEY
+            base_url: API 地址，默认使用 OPENAI_API_BASE
+        """
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        base_url = base_url or os.getenv("OPENAI_API_BASE")
+        key = (api_key, base_url)
+
+        with self._lock:
+            sdk_client = self._sdk_clients.get(key)
+            if sdk_client is None:
+                sdk_client = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=self._get_http_client()
+                )
+                self._sdk_clients[key] = sdk_client
+            return sdk_client
+
+    def get_client(
+        self,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None
+    ) -> OpenAIClient:
+        """
+        获取共享的 OpenAIClient
+
+        Args:
+            model: 默认模型名称，默认使用 MODEL_NAME
+            api_key: API Key
+            base_url: API 地址
+        """
+        key = (model, api_key, base_url)
+        client = self._clients.get(key)
+        if client is None:
+            sdk_client = self.get_sdk_client(api_key, base_url)
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = OpenAIClient(model=model, client=sdk_client)
+                    self._clients[key] = client
+        return client
+
+    def get_async_client(
+        self,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None
+    ) -> AsyncOpenAIClient:
+        """
+        获取共享异步连接池上的 AsyncOpenAIClient
+
+        异步连接池绑定在首次使用它的事件循环上，同一进程内应只在一个事件循环中使用。
+
+        Args:
+            model: 默认模型名称，默认使用 MODEL_NAME
+            api_key: API Key
+            base_url: API 地址
+        """
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        base_url = base_url or os.getenv("OPENAI_API_BASE")
+        key = (model, api_key, base_url)
+
+        with self._lock:
+            client = self._async_clients.get(key)
+            if client is None:
+                sdk_client = self._async_sdk_clients.get((api_key, base_url))
+                if sdk_client is None:
+                    sdk_client = AsyncOpenAI(
+                        api_key=api_key,
+                        base_url=base_url,
+                        http_client=self._get_async_http_client()
+                    )
+                    self._async_sdk_clients[(api_key, base_url)] = sdk_client
+                client = AsyncOpenAIClient(model=model, client=sdk_client)
+                self._async_clients[key] = client
+            return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取注册表统计信息"""
+        return {
+            "sdk_clients": len(self._sdk_clients),
+            "clients": len(self._clients),
+            "async_sdk_clients": len(self._async_sdk_clients),
+            "async_clients": len(self._async_clients),
+            "pool": {
+                "max_connections": self.pool_config.max_connections,
+                "max_keepalive_connections": self.pool_config.max_keepalive_connections,
+                "keepalive_expiry": self.pool_config.keepalive_expiry,
+                "http2": self.pool_config.http2,
+            },
+        }
+
+    def close(self):
+        """关闭共享连接池（异步连接池请使用 aclose）"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            self._sdk_clients.clear()
+            self._clients.clear()
+
+    async def aclose(self):
+        """关闭同步和异步共享连接池"""
+        self.close()
+        async_http_client = self._async_http_client
+        with self._lock:
+            self._async_http_client = None
+            self._async_sdk_clients.clear()
+            self._async_clients.clear()
+        if async_http_client is not None:
+            await async_http_client.aclose()
+
+
+# Global instance
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMClientRegistry:
+    """
+    获取（或创建）全局 LLM 客户端注册表
+
+    Returns:
+        LLMClientRegistry instance
+    """
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry()
+
+    return _registry
+
+
+def get_llm_client(model: Optional[str] = None) -> OpenAIClient:
+    """
+    从全局注册表借用一个共享连接池的 LLM 客户端
+
+    Args:
+        model: 默认模型名称（也可以在 generate 调用时按次覆盖）
+
+    Returns:
+        OpenAIClient instance
+    """
+    return get_llm_registry().get_client(model=model)
+
+
+def get_async_llm_client(model: Optional[str] = None) -> AsyncOpenAIClient:
+    """
+    从全局注册表借用一个共享异步连接池的 LLM 客户端
+
+    Args:
+        model: 默认模型名称（也可以在 agenerate 调用时按次覆盖）
+
+    Returns:
+        AsyncOpenAIClient instance
+    """
+    return get_llm_registry().get_async_client(model=model)
+
+
+def configure_llm_pool(pool_config: PoolConfig) -> LLMClientRegistry:
+    """
+    使用指定的连接池配置重建全局注册表
+
+    Args:
+        pool_config: 连接池配置
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+        _registry = LLMClientRegistry(pool_config)
+    logger.info("Global LLM client registry configured")
+    return _registry
@@ -0,0 +1,81 @@
+"""LLM token 用量统计 - 按任务累计 prompt / completion / 命中服务端前缀缓存的 token 数"""
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class TokenUsage:
+    """一个任务的 LLM 用量"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0      # prompt 中命中服务端前缀缓存的部分
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def add(self, usage: Any):
+        """累加一次 API 响应的 usage（OpenAI SDK 对象或 dict）"""
+        if usage is None:
+            return
+        self.calls += 1
+        self.prompt_tokens += _field(usage, "prompt_tokens") or 0
+        self.completion_tokens += _field(usage, "completion_tokens") or 0
+        self.cached_tokens += cached_tokens(usage)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cached_tokens': self.cached_tokens,
+            'cache_hit_rate': round(self.cache_hit_rate, 4),
+        }
+
+
+def _field(obj: Any, name: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def cached_tokens(usage: Any) -> int:
+    """
+    usage 中命中前缀缓存的 token 数
+
+    OpenAI 放在 prompt_tokens_details.cached_tokens，DeepSeek 等兼容接口用 prompt_cache_hit_tokens。
+    """
+    details = _field(usage, "prompt_tokens_details")
+    cached = _field(details, "cached_tokens") if details is not None else None
+    if cached is None:
+        cached = _field(usage, "prompt_cache_hit_tokens")
+    return cached or 0
+
+
+_current_usage: contextvars.ContextVar[Optional[TokenUsage]] = contextvars.ContextVar("alpha_bot_llm_usage", default=None)
+
+
+@contextmanager
+def track_usage(usage: TokenUsage) -> Iterator[TokenUsage]:
+    """
+    在当前上下文中累计 LLM 用量
+
+    LLM 客户端是进程内共享的，用 contextvar 区分并发执行的任务；
+    在线程池中调用 LLM 时需要用 contextvars.copy_context().run 传递上下文。
+    """
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_usage(usage: Any):
+    """把一次 API 响应的 usage 记到当前任务上（没有在统计中时忽略）"""
+    current = _current_usage.get()
+    if current is not None:
+        current.add(usage)
@@ -37,6 +37,11 @@ class CommandSkillResponse:
     is_dangerous: bool = False
     danger_reason: str = ""
     direct_response: str = ""  # For AI processing mode
+    commands: List[str] = None  # Batched mode: independent commands run in parallel
+
+    def __post_init__(self):
+        if self.commands is None:
+            self.commands = []
 
 @dataclass
 class DirectLLMSkillResponse:
@@ -62,6 +67,27 @@ class BrowserSkillResponse:
     explanation: str = ""
 
 
+@dataclass
+class FusedSelectionResponse:
+    """Dataclass for the fused select-and-act LLM response (selection + the selected skill's output)"""
+    selected_skill: str = ""
+    confidence: float = 0.8
+    reasoning: str = ""
+    task_complete: bool = False
+    payload: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FusedSelectionResponse":
+        payload = data.get("payload")
+        return cls(
+            selected_skill=data.get("selected_skill") or "",
+            confidence=float(data.get("confidence", 0.8) or 0.0),
+            reasoning=data.get("reasoning", "") or data.get("thinking", ""),
+            task_complete=bool(data.get("task_complete", False)),
+            payload=payload if isinstance(payload, dict) else None,
+        )
+
+
 @dataclass
 class SkillExecutionResponse:
     thinking: str = ""  # Reasoning process
@@ -72,6 +98,7 @@ class SkillExecutionResponse:
     is_dangerous: bool = False  # Safety flag
     danger_reason: str = ""  # Danger explanation
     error_analysis: str = ""  # Error analysis if previous command failed
+    commands: List[str] = None  # Independent commands to run in parallel (instead of command)
     
     # Direct response fields (for LLM/content processing skills)
     direct_response: str = ""  # Direct content output
@@ -85,6 +112,8 @@ class SkillExecutionResponse:
     service_status: str = ""  # Status of service interaction
 
     def __post_init__(self):
+        if self.commands is None:
+            self.commands = []
         if self.generated_files is None:
             self.generated_files = []
         if self.file_metadata is None:
@@ -112,6 +141,9 @@ class ExecutionResult:
     stdout: str
     stderr: str
     skill_response: Optional[SkillResponse] = None
+    output_file: Optional[str] = None  # 输出过长时完整内容所在的临时文件（流式执行）
+    # 渲染好的 prompt 片段缓存 (include_response, max_output_tokens) -> (text, tokens)，见 context/prompt_builder.py
+    prompt_fragments: Dict[Any, Any] = field(default_factory=dict, repr=False, compare=False)
     
     @property
     def success(self) -> bool:
@@ -135,10 +167,17 @@ class ExecutionResult:
         return output
     
     def get_output_for_llm(self, max_length: int = 10000) -> str:
-        """获取用于LLM处理的输出（更大的限制）"""
+        """获取用于LLM处理的输出（更大的限制，保留开头和结尾）"""
         output = self.output
         if len(output) > max_length:
-            return output[:max_length] + f"\n...(输出已截断，仅显示前{max_length}字符)"
+            half = max_length // 2
+            output = (
+                output[:half]
+                + f"\n...(输出已截断，省略中间{len(output) - max_length}字符)...\n"
+                + output[-half:]
+            )
+        if self.output_file:
+            output += f"\n(完整输出已保存到 {self.output_file}，可以用 grep/tail 等命令查看)"
         return output
 
 
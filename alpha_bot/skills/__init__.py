@@ -4,21 +4,33 @@ This module provides a flexible skill system that allows the agent to have
 various capabilities beyond just shell command generation.
 """
 
+from importlib import import_module
+
 from .base_skill import BaseSkill
 from .skill_manager import SkillManager
 from .skill_selector import SkillSelector
-from .command_skill import CommandSkill
-from .direct_llm_skill import DirectLLMSkill
-from .ppt_skill import PPTSkill
-from .image_skill import ImageSkill
-from .browser_skill import BrowserSkill
-from .wechat_skill import WeChatSkill
-from .feishu_skill import FeishuSkill
+from .skill_registry import SkillDescriptor, LazySkill, BUILTIN_SKILLS
+
+# Concrete skills are imported on first attribute access so that importing
+# alpha_bot does not pull in every skill's dependencies
+_LAZY_SKILLS = {
+    descriptor.name: descriptor.import_path.partition(":")[0]
+    for descriptor in BUILTIN_SKILLS
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SKILLS:
+        return getattr(import_module(_LAZY_SKILLS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'BaseSkill', 
     'SkillManager',
     'SkillSelector',
+    'SkillDescriptor',
+    'LazySkill',
     'CommandSkill',
     'DirectLLMSkill',
     'PPTSkill',
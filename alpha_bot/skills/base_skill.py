@@ -1,12 +1,14 @@
 """Base skill interface for Alpha-Bot capabilities"""
 
+import asyncio
+import functools
+import contextvars
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
 from alpha_bot.models.types import SkillExecutionResponse
-# Import auto hint system in __init__ to avoid circular import
 from alpha_bot.auto_hint import get_auto_hint_system
 
 
@@ -18,13 +20,49 @@ class BaseSkill(ABC):
     Skills can generate commands, process content, create files, call APIs, etc.
     """
     
+    # Response dataclass of this skill's LLM output. Skills that set it can be
+    # answered inside the selector's fused select-and-act call; None means the
+    # skill needs its own LLM call (e.g. BrowserSkill needs the page structure).
+    FUSED_RESPONSE_CLASS = None
+    
     def __init__(self):
         self.name = self.__class__.__name__
         self.capabilities = self.get_capabilities()
-        # Initialize auto hint system (delayed import to avoid circular import)
-        self.auto_hint_system = None
-        # Initialize auto hint system
-        self.auto_hint_system = get_auto_hint_system()
+        # Auto hint system is loaded on first access (it reads hint metadata from disk)
+        self._auto_hint_system = None
+        # Async LLM client is borrowed lazily on first aexecute (see allm)
+        self._allm = None
+    
+    @property
+    def auto_hint_system(self):
+        """Shared auto hint system, initialized on first use"""
+        if self._auto_hint_system is None:
+            self._auto_hint_system = get_auto_hint_system()
+        return self._auto_hint_system
+    
+    @auto_hint_system.setter
+    def auto_hint_system(self, value):
+        self._auto_hint_system = value
+    
+    @property
+    def supports_fused_selection(self) -> bool:
+        """Whether the selector may produce this skill's output in the same LLM call"""
+        return self.FUSED_RESPONSE_CLASS is not None
+    
+    def get_fused_instructions(self) -> str:
+        """Instructions and output schema shown to the selector in fused mode"""
+        return getattr(self, 'SYSTEM_PROMPT', '')
+    
+    def from_fused_payload(self, payload: Dict[str, Any]) -> SkillExecutionResponse:
+        """
+        Convert the payload of a fused selection into this skill's response
+        
+        Skills setting FUSED_RESPONSE_CLASS must provide _to_execution_response,
+        the same conversion their execute uses.
+        """
+        known_fields = {f.name for f in fields(self.FUSED_RESPONSE_CLASS)}
+        parsed = self.FUSED_RESPONSE_CLASS(**{k: v for k, v in payload.items() if k in known_fields})
+        return self._to_execution_response(parsed)
     
     @abstractmethod
     def get_capabilities(self) -> List[str]:
@@ -56,6 +94,41 @@ class BaseSkill(ABC):
         """
         pass
     
+    async def aexecute(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> SkillExecutionResponse:
+        """
+        Coroutine variant of execute
+        
+        The default implementation runs execute in the default thread pool.
+        Skills whose work is an LLM call should override it and await
+        self.allm.agenerate so no thread is held for the whole stream.
+        
+        Args:
+            task: The task description
+            context: Execution context (history, last result, etc.)
+            **kwargs: Additional skill-specific parameters
+            
+        Returns:
+            SkillExecutionResponse with the result
+        """
+        loop = asyncio.get_running_loop()
+        # copy_context keeps per-task LLM usage accounting (llm.usage) working in the thread
+        return await loop.run_in_executor(
+            None, contextvars.copy_context().run, functools.partial(self.execute, task, context, **kwargs)
+        )
+    
+    @property
+    def allm(self):
+        """Async LLM client borrowed from the shared registry"""
+        if getattr(self, '_allm', None) is None:
+            from alpha_bot.llm.registry import get_async_llm_client
+            self._allm = get_async_llm_client()
+        return self._allm
+    
     def get_description(self) -> str:
         """
         Get human-readable description of what this skill does
@@ -73,39 +146,59 @@ class BaseSkill(ABC):
         """
         pass
     
-    def _build_hints_info(self) -> str:
+    def _build_hints_info(self, task: str = "", context: Optional[Dict[str, Any]] = None) -> str:
         """
         Build hints information for this skill
         
         This method can be overridden by subclasses to provide
         skill-specific hints. By default, it loads auto-generated hints.
         
+        Args:
+            task: The task description, used to pick relevant hints
+            context: Execution context (its last_result is used to pick relevant hints)
+            
         Returns:
             Formatted hints string
         """
-        return self._load_auto_hints()
+        return self._load_auto_hints(task, context)
     
-    def _load_auto_hints(self) -> str:
+    @staticmethod
+    def _hint_query(task: str, context: Optional[Dict[str, Any]]) -> str:
+        """
+        Text that auto hints are matched against: the task, plus the command and
+        error of the last step when it failed
+        
+        While steps succeed the query (and so the hints block at the start of the
+        prompt) stays the same for the whole task, keeping the prompt prefix cacheable.
+        """
+        parts = [task or ""]
+        last_result = (context or {}).get('last_result')
+        if last_result is not None and getattr(last_result, 'command', None) and not last_result.success:
+            parts.append(last_result.command)
+            parts.append((last_result.stderr or last_result.stdout or "")[-500:])
+        return "\n".join(part for part in parts if part)
+    
+    def _load_auto_hints(self, task: str = "", context: Optional[Dict[str, Any]] = None) -> str:
         """
         Load auto-generated hints from the hint system
         
+        Args:
+            task: The task description, used to pick relevant hints
+            context: Execution context (its last_result is used to pick relevant hints)
+            
         Returns:
             Formatted hints string
         """
         try:
-            # Lazy initialize auto hint system
-            if self.auto_hint_system is None:
-                from alpha_bot.auto_hint import get_auto_hint_system
-                self.auto_hint_system = get_auto_hint_system()
-            
             # Get skill name for hint lookup
             skill_name = self.__class__.__name__
+            query = self._hint_query(task, context)
             
             # Load hints for this skill
-            skill_hints = self.auto_hint_system.get_hints_for_skill(skill_name, max_hints=2)
+            skill_hints = self.auto_hint_system.get_relevant_hints(skill_name, query, max_hints=2)
             
             # Load general hints (cross-skill patterns)
-            general_hints = self.auto_hint_system.get_hints_for_skill("general", max_hints=1)
+            general_hints = self.auto_hint_system.get_relevant_hints("general", query, max_hints=1)
             
             # Combine both types of hints
             hints = skill_hints + general_hints
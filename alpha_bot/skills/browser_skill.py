@@ -2,14 +2,14 @@
 
 from typing import Optional, List, Dict, Any
 import time
-from bs4 import BeautifulSoup, Tag
 from loguru import logger
 from .base_skill import BaseSkill, SkillExecutionResponse
 from ..models.types import BrowserSkillResponse
 from .utils import format_one_step_message
 
-from ..llm.openai_client import OpenAIClient
-from ..auto_hint import get_auto_hint_system
+from ..llm.registry import get_llm_client
+from .browser_worker import get_browser_worker
+from .page_snapshot import PageSnapshotter
 import json
 import tempfile
 import os
@@ -41,6 +41,9 @@ class BrowserSkill(BaseSkill):
     _state_file = '/tmp/alpha_bot_browser_state/state.json'  # Shared state file for cross-process coordination
     _lock_file = '/tmp/alpha_bot_browser_state/lock'  # Lock file for cross-process synchronization
     
+    # Page structure extraction, keeps the previous snapshot to send diffs
+    _page_snapshotter = PageSnapshotter()
+    
     # Operation history to track all browser operations
     _operation_history = []     # List of all operations performed
     
@@ -62,7 +65,9 @@ class BrowserSkill(BaseSkill):
 
 **上下文信息说明：**
 - 浏览器操作历史：包含之前所有已完成的浏览器操作，帮助你了解当前任务进展
-- 当前页面信息：包含当前页面的URL、标题、HTML结构和可见文本内容，用于生成针对性的操作代码
+- 当前页面信息：包含当前页面的URL、标题、可交互元素列表和可见文本内容，用于生成针对性的操作代码
+  - 每个元素形如 `[12] button "登录" css=button#login`，优先用 `page.locator('[data-ab-id="12"]')` 定位
+  - URL 未变化时只给出与上一步相比新增（+）、变化（~）、移除（-）的元素，未变化的元素仅列出 id 和文本
 - 上一步执行结果：包含上一步操作的执行结果和输出信息
 
 **导航操作最佳实践：**
@@ -165,8 +170,11 @@ except Exception as e:
     
     def __init__(self):
         super().__init__()
-        self.llm = OpenAIClient()
-        self.auto_hint_system = get_auto_hint_system()
+        self.llm = get_llm_client()
+        self.worker = get_browser_worker()
+        # 最近一次获取的页面信息（worker 模式下来自 worker 进程）
+        self._page_url: Optional[str] = None
+        self._page_structure: Optional[str] = None
     
     @classmethod
     def get_or_create_browser(cls):
@@ -179,6 +187,14 @@ except Exception as e:
         import os
         import fcntl
         
+        # 同一进程内已经连接过（browser worker 中的后续步骤），直接复用页面
+        if cls._session_active and cls._browser_page is not None:
+            try:
+                if not cls._browser_page.is_closed():
+                    return cls._browser_page
+            except Exception:
+                pass
+        
         # 确保状态目录存在
         os.makedirs(os.path.dirname(cls._state_file), exist_ok=True)
         
@@ -748,6 +764,7 @@ except Exception as e:
             cls._browser_page = None
             cls._browser_process = None
             cls._session_active = False
+            cls._page_snapshotter.reset()
 
             # 删除endpoint文件
             if os.path.exists(cls._ws_endpoint_file):
@@ -802,6 +819,8 @@ except Exception as e:
     
     @classmethod
     def clean_html(cls, full_html: str) -> str:
+        # bs4/lxml are only needed once a page is scraped; keep them off the startup path
+        from bs4 import BeautifulSoup, Tag
         soup = BeautifulSoup(full_html, 'lxml')  # 用 lxml 解析器，速度快
 
         # Step 1: 去除完全无关的标签（头去尾的核心）
@@ -863,6 +882,13 @@ except Exception as e:
         if not cls._browser_page:
             return "浏览器页面未初始化，无法获取页面结构"
 
+        # 默认在页面内用 JS 提取可交互元素（BROWSER_PAGE_STRUCTURE=html 使用原来的整页 HTML 清洗）
+        if os.getenv("BROWSER_PAGE_STRUCTURE", "snapshot").lower() != "html":
+            try:
+                return cls._page_snapshotter.describe(cls._browser_page)
+            except Exception as e:
+                logger.warning(f"Page snapshot extraction failed, falling back to HTML: {e}")
+
         try:
             page = cls._browser_page
             title = page.title()
@@ -886,8 +912,11 @@ except Exception as e:
     
     def reset(self):
         """重置技能状态（会被 agent 调用）"""
-        # 关闭浏览器
+        # 关闭 browser worker（它会先清理自己持有的浏览器连接），再关闭浏览器
+        self.worker.shutdown()
         self.cleanup_browser()
+        self._page_url = None
+        self._page_structure = None
         # Clear operation history
         self.clear_operation_history()
     
@@ -924,23 +953,22 @@ except Exception as e:
         # Get the reasoning for why this skill was selected (though browser skill doesn't modify its behavior based on this)
         selection_reasoning = kwargs.get('selection_reasoning', '')
         
-        self.get_current_page()
+        self._refresh_page_info()
 
         # Build context information
         context_info = self._build_context_info(context)
         
-        hints_info = self._build_hints_info()
-
-        # Build user message
-        user_message = f"""用户任务：{task}
-
-{context_info}
+        hints_info = self._build_hints_info(task, context)
 
-{hints_info}
-
-请生成 Playwright 代码来完成这个浏览器操作任务。"""
+        # Build user message blocks, most stable first: hints, task, then page state
+        # (see llm.base.build_messages)
+        user_message = [
+            hints_info,
+            f"用户任务：{task}",
+            f"{context_info}\n\n请生成 Playwright 代码来完成这个浏览器操作任务。",
+        ]
         logger.info(f"Browser Skill System Prompt: {self.SYSTEM_PROMPT}")
-        logger.info(f"Browser Skill User Message: {user_message}") 
+        logger.info(f"Browser Skill User Message: {chr(10).join(block for block in user_message if block)}") 
         # Call LLM to generate browser automation code
         try:
             response_data = self.llm.generate(
@@ -1030,7 +1058,28 @@ except Exception as e:
                 direct_response=f"错误: {str(e)}\n\n详细信息：\n{error_details}"
             )
     
-    def _build_hints_info(self) -> str:
+    def _refresh_page_info(self):
+        """
+        获取当前页面的 URL 和结构
+
+        browser worker 可用时向 worker 查询（它持有页面，查询只需一次 socket 往返），
+        并确保 worker 已启动以执行本步生成的代码；否则像之前一样在本进程中通过 CDP 重连。
+        """
+        if self.worker.ensure_started():
+            info = self.worker.page_info()
+            if info and info.get("url"):
+                self._page_url = info["url"]
+                self._page_structure = info.get("structure")
+            else:
+                self._page_url = None
+                self._page_structure = "浏览器页面未初始化，无法获取页面结构"
+            return
+
+        self.get_current_page()
+        self._page_url = self._browser_page.url if self._browser_page else None
+        self._page_structure = self.get_current_page_structure()
+
+    def _build_hints_info(self, task: str = "", context: Optional[Dict[str, Any]] = None) -> str:
         """Build hints information from both static files and auto-generated hints"""
         hints_content = []
         
@@ -1041,7 +1090,7 @@ except Exception as e:
             hints_content.append(static_hints)
         
         # 2. Load auto-generated hints
-        auto_hints = self._load_auto_hints()
+        auto_hints = self._load_auto_hints(task, context)
         if auto_hints:
             hints_content.append("\n自动生成的提示信息：")
             hints_content.append(auto_hints)
@@ -1062,9 +1111,9 @@ except Exception as e:
                 with open(md_file, 'r', encoding='utf-8') as f:
                     content = f.read()
                     # 从浏览器页面URL中提取域名信息
-                    if self._browser_page and self._browser_page.url:
+                    if self._page_url:
                         from urllib.parse import urlparse
-                        current_domain = urlparse(self._browser_page.url).netloc
+                        current_domain = urlparse(self._page_url).netloc
                         logger.info(f"Current domain: {current_domain}")
                         if current_domain and current_domain in content:
                             all_content.append(f"--- Content from {os.path.relpath(md_file, hints_dir)} ---\n{content}\n")
@@ -1073,10 +1122,10 @@ except Exception as e:
         
         return "\n".join(all_content) if all_content else ""
     
-    def _load_auto_hints(self) -> str:
-        """Load auto-generated hints from the hint system"""
+    def _load_auto_hints(self, task: str = "", context: Optional[Dict[str, Any]] = None) -> str:
+        """Load auto-generated hints relevant to the task from the hint system"""
         try:
-            hints = self.auto_hint_system.get_hints_for_skill("BrowserSkill", max_hints=3)
+            hints = self.auto_hint_system.get_relevant_hints("BrowserSkill", self._hint_query(task, context), max_hints=3)
             
             if not hints:
                 return ""
@@ -1119,7 +1168,7 @@ except Exception as e:
                 info_parts.append(f"步骤 {op['step']}: {op['operation']}")
         
         # Add current page structure
-        page_structure = self.get_current_page_structure()
+        page_structure = self._page_structure
         if page_structure:
             info_parts.append(f"\n{page_structure}")
         
@@ -1236,5 +1285,9 @@ if __name__ == "__main__":
         # Make it executable
         os.chmod(temp_file, 0o755)
         
+        # Submit the file to the browser worker when it is running
+        if self.worker.enabled:
+            return self.worker.build_command(temp_file)
+        
         # Return command to execute the file
         return f"python3 {temp_file}"
@@ -0,0 +1,395 @@
+"""Browser Worker - 常驻进程持有 Playwright 连接，逐步执行 BrowserSkill 生成的代码
+
+之前每一步都由 ShellExecutor 启动一个新的 python3 解释器：重新导入 playwright、
+sync_playwright().start()、再经过状态文件 + fcntl 锁通过 CDP 重连浏览器，每步要花掉数秒。
+现在由一个常驻 worker 进程持有 Playwright 连接和当前页面，生成的代码通过 Unix socket
+提交给它执行，stdout/stderr 实时回传。
+
+协议：每条消息是一行 JSON。
+    请求  {"op": "exec", "path": "/tmp/xxx.py", "cwd": "/work/dir", "timeout": 55}
+          {"op": "page_info"} / {"op": "ping"} / {"op": "shutdown"}
+    响应  {"type": "stdout" | "stderr", "data": "..."}（仅 exec，可多条）
+          {"type": "result", ...}（每个请求以一条 result 结束）
+
+ShellExecutor 执行的命令是 browser_worker_client.py（只依赖标准库，启动只需几十毫秒），
+它把代码文件提交给 worker 并转发输出；worker 不可用时直接在本进程中运行代码文件。
+
+启动 worker：python -m alpha_bot.skills.browser_worker --socket PATH
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import signal
+import socket
+import argparse
+import threading
+import traceback
+import subprocess
+import importlib.util
+from typing import Optional, Dict, Any, Callable
+
+from loguru import logger
+
+
+STATE_DIR = '/tmp/alpha_bot_browser_state'
+CLIENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'browser_worker_client.py')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def default_socket_path() -> str:
+    """worker socket 路径，默认 /tmp/alpha_bot_browser_state/worker-<uid>.sock"""
+    return os.getenv("BROWSER_WORKER_SOCKET") or os.path.join(STATE_DIR, f"worker-{os.getuid()}.sock")
+
+
+def _send(stream, message: Dict[str, Any]):
+    stream.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+class _StreamForwarder:
+    """替换 worker 中的 sys.stdout / sys.stderr，把输出逐块转发给客户端"""
+
+    def __init__(self, stream, kind: str):
+        self._stream = stream
+        self._kind = kind
+        self.broken = False
+
+    def write(self, data: str) -> int:
+        if data and not self.broken:
+            try:
+                _send(self._stream, {"type": self._kind, "data": data})
+            except OSError:
+                # 客户端已断开（例如被 ShellExecutor 超时杀掉），继续执行但丢弃输出
+                self.broken = True
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+class _ExecTimeout(BaseException):
+    """代码执行超时（继承 BaseException，避免被生成代码里的 except Exception 吞掉）"""
+
+
+class BrowserWorkerServer:
+    """
+    常驻 worker 进程
+
+    在主线程中串行处理请求：Playwright 同步 API 绑定在创建它的线程上，
+    所有代码都必须在同一个线程里执行。
+    """
+
+    def __init__(self, socket_path: str, idle_timeout: float = 1800.0):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._running = False
+
+    def serve(self):
+        """监听 socket 并处理请求，直到收到 shutdown 或空闲超时"""
+        # 导入 BrowserSkill 时一并完成 playwright 等重模块的导入，之后每步都不再需要
+        from alpha_bot.skills.browser_skill import BrowserSkill
+        self.skill_class = BrowserSkill
+
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server.listen(4)
+        if self.idle_timeout > 0:
+            server.settimeout(self.idle_timeout)
+
+        logger.info(f"Browser worker listening on {self.socket_path} (pid {os.getpid()})")
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    logger.info("Browser worker idle timeout, shutting down")
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    stream = conn.makefile("rwb")
+                    try:
+                        self._handle(stream)
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"Browser worker connection error: {e}")
+                    finally:
+                        try:
+                            stream.close()
+                        except OSError:
+                            pass
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+        if self._running:
+            # 空闲超时退出：shutdown 请求已经清理过浏览器，这里只处理超时的情况
+            self._running = False
+            self._shutdown_browser()
+
+    def _handle(self, stream):
+        line = stream.readline()
+        if not line:
+            return
+        request = json.loads(line.decode("utf-8"))
+        op = request.get("op")
+
+        if op == "exec":
+            returncode = self._exec_file(request["path"], request.get("timeout"), stream, request.get("cwd"))
+            _send(stream, {"type": "result", "returncode": returncode})
+        elif op == "page_info":
+            _send(stream, {"type": "result", **self._page_info()})
+        elif op == "ping":
+            _send(stream, {"type": "result", "pid": os.getpid()})
+        elif op == "shutdown":
+            self._shutdown_browser()
+            self._running = False
+            _send(stream, {"type": "result", "ok": True})
+        else:
+            _send(stream, {"type": "result", "error": f"unknown op: {op}"})
+
+    def _exec_file(self, path: str, timeout: Optional[float], stream, cwd: Optional[str] = None) -> int:
+        """
+        在 worker 中执行代码文件（与 python3 path 语义相同：__name__ == "__main__"）
+
+        worker 的工作目录是项目根目录，执行期间切换到调用方（ShellExecutor）的工作目录，
+        并像 python3 path 一样设置 sys.argv 和 sys.path[0]，执行结束后全部恢复。
+        """
+        stdout = _StreamForwarder(stream, "stdout")
+        stderr = _StreamForwarder(stream, "stderr")
+        saved = sys.stdout, sys.stderr
+        saved_cwd, saved_argv, saved_path = os.getcwd(), sys.argv, sys.path[:]
+
+        def on_timeout(signum, frame):
+            raise _ExecTimeout()
+
+        previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, float(timeout))
+        sys.stdout, sys.stderr = stdout, stderr
+        returncode = 0
+        try:
+            if cwd:
+                os.chdir(cwd)
+            sys.argv = [path]
+            sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+            code = compile(source, path, "exec")
+            exec(code, {"__name__": "__main__", "__file__": path, "__builtins__": __builtins__})
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                returncode = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except _ExecTimeout:
+            print(f"执行超时 (>{timeout}秒)", file=sys.stderr)
+            returncode = -1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+            sys.stdout, sys.stderr = saved
+            sys.argv, sys.path[:] = saved_argv, saved_path
+            try:
+                os.chdir(saved_cwd)
+            except OSError as e:
+                logger.warning(f"Browser worker failed to restore cwd: {e}")
+        return returncode
+
+    def _page_info(self) -> Dict[str, Any]:
+        """当前页面的 URL、标题和结构（供下一步生成代码使用）"""
+        skill_class = self.skill_class
+        page = skill_class._browser_page
+        if page is None:
+            return {"url": None, "title": None, "structure": None}
+        try:
+            return {
+                "url": page.url,
+                "title": page.title(),
+                "structure": skill_class.get_current_page_structure(),
+            }
+        except Exception as e:
+            return {"url": None, "title": None, "structure": None, "error": str(e)}
+
+    def _shutdown_browser(self):
+        try:
+            self.skill_class.cleanup_browser()
+        except Exception as e:
+            logger.warning(f"Browser worker cleanup failed: {e}")
+
+
+class BrowserWorkerClient:
+    """
+    Agent 进程侧的 worker 管理器
+
+    负责按需启动 worker、查询页面信息、生成提交代码的命令以及关闭 worker。
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.pid_file = self.socket_path + ".pid"
+        self.enabled = (
+            os.getenv("BROWSER_WORKER_ENABLED", "true").lower() == "true"
+            and importlib.util.find_spec("playwright") is not None
+        )
+        try:
+            self.exec_timeout = float(os.getenv("BROWSER_WORKER_EXEC_TIMEOUT", "55"))
+            self.idle_timeout = float(os.getenv("BROWSER_WORKER_IDLE_TIMEOUT", "1800"))
+        except ValueError:
+            self.exec_timeout, self.idle_timeout = 55.0, 1800.0
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+
+    def request(
+        self,
+        op: str,
+        timeout: float = 10.0,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        **params
+    ) -> Optional[Dict[str, Any]]:
+        """
+        发送一个请求并等待 result
+
+        Returns:
+            result 消息，worker 不可用时返回 None
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                stream = sock.makefile("rwb")
+                _send(stream, {"op": op, **params})
+                for line in stream:
+                    message = json.loads(line.decode("utf-8"))
+                    if message.get("type") == "result":
+                        return message
+                    if on_output:
+                        on_output(message.get("type"), message.get("data", ""))
+        except (OSError, ValueError):
+            return None
+        return None
+
+    def is_alive(self) -> bool:
+        """worker 是否在运行并能响应"""
+        if not os.path.exists(self.socket_path):
+            return False
+        return self.request("ping", timeout=2.0) is not None
+
+    def ensure_started(self) -> bool:
+        """
+        确保 worker 正在运行（不等待其就绪，客户端脚本会等待 socket 可连接）
+
+        Returns:
+            worker 已在运行或已启动时返回 True
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return True
+            if self.is_alive():
+                return True
+
+            os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+            env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT, os.getenv("PYTHONPATH")]))}
+            log_file = open(os.path.join(os.path.dirname(self.socket_path), "worker.log"), "ab")
+            try:
+                self._process = subprocess.Popen(
+                    [sys.executable, "-m", "alpha_bot.skills.browser_worker",
+                     "--socket", self.socket_path, "--idle-timeout", str(self.idle_timeout)],
+                    cwd=PROJECT_ROOT,
+                    env=env,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=log_file,
+                    start_new_session=True,
+                )
+            except OSError as e:
+                logger.warning(f"Failed to start browser worker: {e}")
+                return False
+            finally:
+                log_file.close()
+
+            with open(self.pid_file, "w") as f:
+                f.write(str(self._process.pid))
+            logger.info(f"Browser worker started (pid {self._process.pid})")
+            return True
+
+    def build_command(self, code_file: str) -> str:
+        """生成提交代码文件给 worker 执行的 shell 命令"""
+        return " ".join(shlex.quote(part) for part in [
+            sys.executable, CLIENT_SCRIPT, self.socket_path, code_file, str(self.exec_timeout)
+        ])
+
+    def page_info(self) -> Optional[Dict[str, Any]]:
+        """获取 worker 中当前页面的 URL、标题和结构，worker 未运行时返回 None"""
+        if not os.path.exists(self.socket_path):
+            return None
+        return self.request("page_info", timeout=30.0)
+
+    def shutdown(self, timeout: float = 10.0):
+        """关闭 worker（worker 会先清理浏览器）"""
+        with self._lock:
+            if os.path.exists(self.socket_path):
+                self.request("shutdown", timeout=timeout)
+            if self._process is not None:
+                try:
+                    self._process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+                self._process = None
+            if os.path.exists(self.pid_file):
+                os.unlink(self.pid_file)
+
+
+# Global instance
+_browser_worker: Optional[BrowserWorkerClient] = None
+_browser_worker_lock = threading.Lock()
+
+
+def get_browser_worker() -> BrowserWorkerClient:
+    """
+    获取全局 browser worker 客户端
+
+    Returns:
+        BrowserWorkerClient instance
+    """
+    global _browser_worker
+
+    if _browser_worker is None:
+        with _browser_worker_lock:
+            if _browser_worker is None:
+                _browser_worker = BrowserWorkerClient()
+
+    return _browser_worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alpha Bot persistent browser worker")
+    parser.add_argument("--socket", default=default_socket_path(), help="Unix socket path")
+    parser.add_argument("--idle-timeout", type=float, default=1800.0,
+                        help="Exit after this many seconds without requests (<= 0 to disable)")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    BrowserWorkerServer(args.socket, idle_timeout=args.idle_timeout).serve()
+    logger.info(f"Browser worker exited after {time.time() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
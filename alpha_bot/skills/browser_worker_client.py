@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Submit a BrowserSkill step to the persistent browser worker (see browser_worker.py)
+
+Usage: python3 browser_worker_client.py SOCKET CODE_FILE [TIMEOUT]
+
+只依赖标准库，也不导入 alpha_bot 包，这样 ShellExecutor 每步启动它只需几十毫秒。
+worker 的输出原样转发到本进程的 stdout/stderr，退出码与代码在 worker 中的执行结果一致。
+worker 不可用（未启动、已退出）时直接在本进程中运行代码文件，行为与之前的 python3 CODE_FILE 相同。
+"""
+
+import os
+import sys
+import json
+import time
+import runpy
+import socket
+
+# worker 刚启动时需要先导入 playwright，最多等待这么久（秒）
+CONNECT_WAIT = float(os.getenv("BROWSER_WORKER_CONNECT_WAIT", "15"))
+
+
+def _worker_starting(socket_path: str) -> bool:
+    """pid 文件中记录的 worker 进程是否还活着"""
+    try:
+        with open(socket_path + ".pid") as f:
+            os.kill(int(f.read().strip()), 0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _connect(socket_path: str):
+    deadline = time.time() + CONNECT_WAIT
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            return sock
+        except OSError:
+            sock.close()
+            if time.time() >= deadline or not _worker_starting(socket_path):
+                return None
+            time.sleep(0.05)
+
+
+def _run_locally(code_file: str) -> int:
+    # 与 python3 CODE_FILE 一致：argv 和 sys.path[0] 指向代码文件
+    sys.argv = [code_file]
+    sys.path[0] = os.path.dirname(os.path.abspath(code_file))
+    runpy.run_path(code_file, run_name="__main__")
+    return 0
+
+
+def main(argv) -> int:
+    if len(argv) < 3:
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        return 2
+    socket_path, code_file = argv[1], argv[2]
+    timeout = float(argv[3]) if len(argv) > 3 else None
+
+    sock = _connect(socket_path)
+    if sock is None:
+        return _run_locally(code_file)
+
+    with sock:
+        stream = sock.makefile("rwb")
+        # worker 在自己的工作目录中运行，生成代码中的相对路径要按本进程（ShellExecutor）的工作目录解析
+        request = {"op": "exec", "path": os.path.abspath(code_file), "cwd": os.getcwd(), "timeout": timeout}
+        stream.write((json.dumps(request) + "\n").encode("utf-8"))
+        stream.flush()
+
+        for line in stream:
+            message = json.loads(line.decode("utf-8"))
+            kind = message.get("type")
+            if kind == "stdout":
+                sys.stdout.write(message["data"])
+                sys.stdout.flush()
+            elif kind == "stderr":
+                sys.stderr.write(message["data"])
+                sys.stderr.flush()
+            elif kind == "result":
+                return int(message.get("returncode", 1))
+
+    print("browser worker 连接中断", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,13 +1,15 @@
 """Command Generation Skill - Generate shell commands with LLM"""
 
+import os
 import json
 from typing import List, Optional, Dict, Any, Callable
 
 from loguru import logger
 from .base_skill import BaseSkill, SkillExecutionResponse
+from ..models.types import CommandSkillResponse
 from ..llm.base import BaseLLMClient
-from ..llm.openai_client import OpenAIClient
-from ..skills.utils import build_full_history_message
+from ..llm.registry import get_llm_client
+from ..skills.utils import build_prompt_blocks
 
 
 class CommandSkill(BaseSkill):
@@ -65,12 +67,30 @@ class CommandSkill(BaseSkill):
 
 对于安全的操作（如 ls、cat、echo、mkdir、创建新文件等），is_dangerous 设为 false。"""
 
+    BATCH_PROMPT = """
+
+**批量模式（优先于规则1）：**
+如果接下来需要执行多条互相独立的命令（例如查看多个文件、检查多个主机、收集多项系统信息），
+可以把它们放在 "commands" 数组中一次返回，它们会被并行执行，每条命令的结果都会反馈给你：
+{{"thinking": "...", "command": "", "commands": ["cat a.txt", "cat b.txt", "ping -c 1 host"], ...}}
+- 只有互相之间没有依赖（不依赖彼此的输出或副作用、顺序无关）的命令才能放进 commands
+- commands 中的命令不能包含 cd、export 等需要影响后续命令的操作
+- 最多 {max_commands} 条；有依赖关系的命令仍然用 command 逐条执行
+- 任何一条命令是危险操作时 is_dangerous 设为 true"""
+
+    FUSED_RESPONSE_CLASS = CommandSkillResponse
+    
     def __init__(self):
         """
         Initialize command skill
         """
         super().__init__()
-        self.llm: BaseLLMClient = OpenAIClient()
+        self.llm: BaseLLMClient = get_llm_client()
+        # Batched mode: the LLM may return several independent commands in one step
+        self.batch_enabled = os.getenv("COMMAND_BATCH_ENABLED", "false").lower() == "true"
+        self.batch_max_commands = int(os.getenv("COMMAND_BATCH_MAX", "8"))
+        if self.batch_enabled:
+            self.SYSTEM_PROMPT = self.SYSTEM_PROMPT + self.BATCH_PROMPT.format(max_commands=self.batch_max_commands)
     
     def get_capabilities(self) -> List[str]:
         """Command skill provides command generation capability"""
@@ -97,46 +117,77 @@ class CommandSkill(BaseSkill):
         Returns:
             SkillExecutionResponse with command generation result
         """
+        # Call LLM to generate response with direct parsing using CommandSkillResponse dataclass
+        try:
+            from ..models.types import CommandSkillResponse
+            user_prompt = self._build_user_prompt(task, context)
+            llm_response = self.llm.generate(self.SYSTEM_PROMPT, user_prompt, stream_callback, response_class=CommandSkillResponse)
+            return self._to_execution_response(llm_response)
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def aexecute(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> SkillExecutionResponse:
+        """Coroutine variant of execute, streaming through the async LLM client"""
+        try:
+            from ..models.types import CommandSkillResponse
+            user_prompt = self._build_user_prompt(task, context)
+            llm_response = await self.allm.agenerate(self.SYSTEM_PROMPT, user_prompt, stream_callback, response_class=CommandSkillResponse)
+            return self._to_execution_response(llm_response)
+        except Exception as e:
+            return self._error_response(e)
+    
+    def _build_user_prompt(self, task: str, context: Optional[Dict[str, Any]]) -> List[str]:
+        """Build the user prompt blocks (hints, task, execution history)"""
         if context is None:
             context = {}
             
         # Get execution context from context
-        last_result = context.get('last_result')
         history = context.get('history', [])
             
-        # Get the reasoning for why this skill was selected (though command skill doesn't modify its behavior based on this)
-        selection_reasoning = kwargs.get('selection_reasoning', '')
-            
         # Build hints information
-        hints_info = self._build_hints_info()
+        hints_info = self._build_hints_info(task, context)
             
-        # Call LLM to generate response with direct parsing using CommandSkillResponse dataclass
-        try:
-            from ..models.types import CommandSkillResponse
-            # Generate and directly parse into CommandSkillResponse
-            user_prompt = build_full_history_message(history, task)
-            
-            # Add hints to user prompt if available
-            if hints_info:
-                user_prompt = f"{user_prompt}\n\n{hints_info}"
-            logger.info(f"Command Skill LLM USER Prompt: {user_prompt}")
-            llm_response = self.llm.generate(self.SYSTEM_PROMPT, user_prompt, stream_callback, response_class=CommandSkillResponse)
-            
-            return SkillExecutionResponse(
-                thinking=llm_response.thinking,
-                command=llm_response.command,
-                explanation=llm_response.explanation,
-                next_step=llm_response.next_step,
-                is_dangerous=llm_response.is_dangerous,
-                danger_reason=llm_response.danger_reason,
-                error_analysis=llm_response.error_analysis,
-                # Don't set task_complete here - skill selector will decide
-            )
-        except Exception as e:
-            return SkillExecutionResponse(
-                thinking=f"LLM call failed: {str(e)}",
-                direct_response=f"Error: Failed to generate command from LLM: {str(e)}"
-            )
+        # 稳定的片段在前，多轮迭代之间可以命中服务端前缀缓存
+        user_prompt = build_prompt_blocks(history, task, hints_info, context=context)
+        logger.info(f"Command Skill LLM USER Prompt: {chr(10).join(user_prompt)}")
+        return user_prompt
+    
+    def _to_execution_response(self, llm_response) -> SkillExecutionResponse:
+        """Convert the parsed CommandSkillResponse into a SkillExecutionResponse"""
+        return SkillExecutionResponse(
+            thinking=llm_response.thinking,
+            command=llm_response.command,
+            commands=self._batch_commands(llm_response),
+            explanation=llm_response.explanation,
+            next_step=llm_response.next_step,
+            is_dangerous=llm_response.is_dangerous,
+            danger_reason=llm_response.danger_reason,
+            error_analysis=llm_response.error_analysis,
+            # Don't set task_complete here - skill selector will decide
+        )
+    
+    def _batch_commands(self, llm_response) -> List[str]:
+        """Independent commands of a batched response (empty unless batched mode is on)"""
+        commands = getattr(llm_response, 'commands', None)
+        if not self.batch_enabled or not isinstance(commands, list):
+            return []
+        commands = [c.strip() for c in commands if isinstance(c, str) and c.strip()]
+        if len(commands) > self.batch_max_commands:
+            logger.warning(f"Batched response has {len(commands)} commands, running the first {self.batch_max_commands}")
+        return commands[:self.batch_max_commands]
+    
+    def _error_response(self, e: Exception) -> SkillExecutionResponse:
+        """Build the response returned when the LLM call fails"""
+        return SkillExecutionResponse(
+            thinking=f"LLM call failed: {str(e)}",
+            direct_response=f"Error: Failed to generate command from LLM: {str(e)}"
+        )
     
     def reset(self):
         """Reset LLM conversation state"""
@@ -1,11 +1,12 @@
 """Direct LLM Processing Skill - Direct content processing with LLM"""
 
 import json
-from typing import List, Optional, Dict, Any, Callable
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from .base_skill import BaseSkill, SkillExecutionResponse
+from ..models.types import DirectLLMSkillResponse
 from ..llm.base import BaseLLMClient
-from ..llm.openai_client import OpenAIClient
-from ..skills.utils import build_full_history_message
+from ..llm.registry import get_llm_client
+from ..skills.utils import build_prompt_blocks
 
 
 class DirectLLMSkill(BaseSkill):
@@ -28,12 +29,14 @@ class DirectLLMSkill(BaseSkill):
 1. 如果当前信息足够，直接执行用户要求的任务
 2. 提供清晰、准确、有用的回答"""
 
+    FUSED_RESPONSE_CLASS = DirectLLMSkillResponse
+    
     def __init__(self):
         """
         Initialize direct LLM skill
         """
         super().__init__()
-        self.llm: BaseLLMClient = OpenAIClient()
+        self.llm: BaseLLMClient = get_llm_client()
     
     def get_capabilities(self) -> List[str]:
         """Direct LLM skill provides LLM processing capability"""
@@ -60,22 +63,42 @@ class DirectLLMSkill(BaseSkill):
         Returns:
             SkillExecutionResponse with direct LLM processing result
         """
+        # Call LLM to generate response with direct parsing using DirectLLMSkillResponse dataclass
+        try:
+            from ..models.types import DirectLLMSkillResponse
+            system_prompt, user_prompt = self._build_prompts(task, context, kwargs.get('selection_reasoning', ''))
+            llm_response = self.llm.generate(system_prompt, user_prompt, stream_callback, response_class=DirectLLMSkillResponse)
+            return self._to_execution_response(llm_response)
+        except Exception as e:
+            print(f"LLM call failed: {str(e)}")
+            return self._error_response(e)
+    
+    async def aexecute(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> SkillExecutionResponse:
+        """Coroutine variant of execute, streaming through the async LLM client"""
+        try:
+            from ..models.types import DirectLLMSkillResponse
+            system_prompt, user_prompt = self._build_prompts(task, context, kwargs.get('selection_reasoning', ''))
+            llm_response = await self.allm.agenerate(system_prompt, user_prompt, stream_callback, response_class=DirectLLMSkillResponse)
+            return self._to_execution_response(llm_response)
+        except Exception as e:
+            print(f"LLM call failed: {str(e)}")
+            return self._error_response(e)
+    
+    def _build_prompts(self, task: str, context: Optional[Dict[str, Any]], selection_reasoning: str = "") -> Tuple[str, List[str]]:
+        """Build the (system prompt, user prompt blocks) pair for the LLM call"""
         if context is None:
             context = {}
             
         # Get execution context from context
-        last_result = context.get('last_result')
         history = context.get('history', [])
-            
-        # Get the reasoning for why this skill was selected
-        selection_reasoning = kwargs.get('selection_reasoning', '')
                 
-        # Create the enhanced prompt by adding the selection reasoning to the system prompt
-        # Add the selection reasoning to the original prompt
         enhanced_prompt = self.SYSTEM_PROMPT
-        if selection_reasoning:
-            # Append the selection reasoning to the existing prompt
-            enhanced_prompt += f"\n\n**技能选择背景**:\n技能选择器选择了你（DirectLLMSkill）来处理这个任务，理由是：{selection_reasoning}"
         
         # Ensure the prompt contains the word 'json' in lowercase to meet OpenAI API requirements
         # The API requires 'json' to be present when using response_format='json_object'
@@ -83,51 +106,55 @@ class DirectLLMSkill(BaseSkill):
         enhanced_prompt += "\n\n(Note: json format required)"
         
         # Build hints information
-        hints_info = self._build_hints_info()
+        hints_info = self._build_hints_info(task, context)
             
-        # Call LLM to generate response with direct parsing using DirectLLMSkillResponse dataclass
-        try:
-            from ..models.types import DirectLLMSkillResponse
-            # Generate and directly parse into DirectLLMSkillResponse
-            user_prompt = build_full_history_message(history, task)
-            
-            # Add hints to user prompt if available
-            if hints_info:
-                user_prompt = f"{user_prompt}\n\n{hints_info}"
-            llm_response = self.llm.generate(enhanced_prompt, user_prompt, stream_callback, response_class=DirectLLMSkillResponse)
-            
-            # If the response is already parsed (when response_class is provided), use it directly
-            if hasattr(llm_response, 'direct_response'):  # It's already a DirectLLMSkillResponse object
-                parsed_response = llm_response
-            else:
-                # Fallback to raw JSON parsing if needed
-                import json
-                try:
-                    parsed_data = json.loads(llm_response.raw_json)
-                    # Create DirectLLMSkillResponse manually
-                    parsed_response = DirectLLMSkillResponse(
-                        thinking=parsed_data.get("thinking", ""),
-                        direct_response=parsed_data.get("direct_response", "")
-                    )
-                except json.JSONDecodeError:
-                    return SkillExecutionResponse(
-                        thinking="Failed to parse LLM response as JSON",
-                        direct_response=f"Error: Invalid JSON response from LLM: {llm_response.raw_json if hasattr(llm_response, 'raw_json') else str(llm_response)}"
-                    )
-            
-            # Convert LLMResponse to SkillExecutionResponse
-            # Individual skills no longer decide task completion - that's handled by the skill selector
-            return SkillExecutionResponse(
-                thinking=parsed_response.thinking,
-                direct_response=parsed_response.direct_response,
-                # Don't set task_complete here - skill selector will decide
-            )
-        except Exception as e:
-            print(f"LLM call failed: {str(e)}")
-            return SkillExecutionResponse(
-                thinking=f"LLM call failed: {str(e)}",
-                direct_response=f"Error: Failed to process content with LLM: {str(e)}"
+        user_prompt = build_prompt_blocks(history, task, hints_info, context=context)
+        
+        # The selection reasoning changes every step, so it goes after the task rather
+        # than into the system prompt, keeping the cacheable prefix stable
+        if selection_reasoning:
+            user_prompt.insert(
+                len(user_prompt) - 1 if history else len(user_prompt),
+                f"**技能选择背景**:\n技能选择器选择了你（DirectLLMSkill）来处理这个任务，理由是：{selection_reasoning}"
             )
+        return enhanced_prompt, user_prompt
+    
+    def _to_execution_response(self, llm_response) -> SkillExecutionResponse:
+        """Convert the LLM response into a SkillExecutionResponse"""
+        from ..models.types import DirectLLMSkillResponse
+        
+        # If the response is already parsed (when response_class is provided), use it directly
+        if hasattr(llm_response, 'direct_response'):  # It's already a DirectLLMSkillResponse object
+            parsed_response = llm_response
+        else:
+            # Fallback to raw JSON parsing if needed
+            try:
+                parsed_data = json.loads(llm_response.raw_json)
+                # Create DirectLLMSkillResponse manually
+                parsed_response = DirectLLMSkillResponse(
+                    thinking=parsed_data.get("thinking", ""),
+                    direct_response=parsed_data.get("direct_response", "")
+                )
+            except json.JSONDecodeError:
+                return SkillExecutionResponse(
+                    thinking="Failed to parse LLM response as JSON",
+                    direct_response=f"Error: Invalid JSON response from LLM: {llm_response.raw_json if hasattr(llm_response, 'raw_json') else str(llm_response)}"
+                )
+        
+        # Convert LLMResponse to SkillExecutionResponse
+        # Individual skills no longer decide task completion - that's handled by the skill selector
+        return SkillExecutionResponse(
+            thinking=parsed_response.thinking,
+            direct_response=parsed_response.direct_response,
+            # Don't set task_complete here - skill selector will decide
+        )
+    
+    def _error_response(self, e: Exception) -> SkillExecutionResponse:
+        """Build the response returned when the LLM call fails"""
+        return SkillExecutionResponse(
+            thinking=f"LLM call failed: {str(e)}",
+            direct_response=f"Error: Failed to process content with LLM: {str(e)}"
+        )
     
     def reset(self):
         """Reset LLM conversation state"""
@@ -4,7 +4,7 @@ import subprocess
 import json
 from typing import List, Optional, Dict, Any, Callable
 from .base_skill import BaseSkill, SkillExecutionResponse
-from ..skills.utils import build_full_history_message
+from ..skills.utils import build_prompt_blocks
 
 
 class FeishuSkill(BaseSkill):
@@ -99,8 +99,8 @@ AppleScript参考：
         """
         super().__init__()
         # Import LLM client
-        from ..llm.openai_client import OpenAIClient
-        self.llm = OpenAIClient()
+        from ..llm.registry import get_llm_client
+        self.llm = get_llm_client()
 
     def get_capabilities(self) -> List[str]:
         """Feishu skill provides GUI automation capability for Feishu messaging"""
@@ -138,17 +138,14 @@ AppleScript参考：
         selection_reasoning = kwargs.get('selection_reasoning', '')
         
         # Build hints information
-        hints_info = self._build_hints_info()
+        hints_info = self._build_hints_info(task, context)
 
         # Call LLM to generate response with direct parsing
         try:
             from ..models.types import CommandSkillResponse
             # Generate and directly parse into CommandSkillResponse
-            user_prompt = build_full_history_message(history, task)
-            
-            # Add hints to user prompt if available
-            if hints_info:
-                user_prompt = f"{user_prompt}\n\n{hints_info}"
+            # 提示、任务、执行历史分成片段，稳定的在前（见 llm.base.build_messages）
+            user_prompt = build_prompt_blocks(history, task, hints_info, context=context)
             llm_response = self.llm.generate(self.SYSTEM_PROMPT, user_prompt, stream_callback, response_class=CommandSkillResponse)
 
             # If the response is already parsed (when response_class is provided), use it directly
@@ -0,0 +1,251 @@
+"""Page Snapshot - 在浏览器内提取紧凑的可交互元素列表，并与上一步做差分
+
+替代 page.content() + BeautifulSoup 清洗整页 HTML 的方式：提取在页面中用 JS 完成，
+只返回可交互元素（链接、按钮、输入框……）和标题，每个元素带一个稳定 id（写入
+data-ab-id 属性）、角色、文本和选择器提示。URL 未变化时只把变化的部分交给 LLM。
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Any, Optional
+
+
+# 在页面中执行：给可见的可交互元素分配稳定 id，返回 {url, title, elements, text}
+EXTRACT_JS = r"""
+([maxElements, maxText]) => {
+    const MASKED_VALUE = '******';
+    const SELECTOR = [
+        'a[href]', 'button', 'input:not([type=hidden])', 'select', 'textarea', 'summary',
+        '[role=button]', '[role=link]', '[role=tab]', '[role=menuitem]', '[role=checkbox]',
+        '[role=radio]', '[role=combobox]', '[role=textbox]', '[role=option]', '[role=searchbox]',
+        '[onclick]', '[contenteditable=""]', '[contenteditable=true]', 'h1', 'h2', 'h3'
+    ].join(',');
+    const TAG_ROLES = {A: 'link', BUTTON: 'button', SELECT: 'combobox', TEXTAREA: 'textbox',
+                       SUMMARY: 'button', H1: 'heading', H2: 'heading', H3: 'heading'};
+    const INPUT_ROLES = {checkbox: 'checkbox', radio: 'radio', submit: 'button', button: 'button',
+                         reset: 'button', image: 'button', search: 'searchbox'};
+
+    const clean = (text, limit) => (text || '').replace(/\s+/g, ' ').trim().slice(0, limit || 80);
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 && rect.height === 0) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const roleOf = (el) => el.getAttribute('role') || TAG_ROLES[el.tagName]
+        || (el.tagName === 'INPUT' ? (INPUT_ROLES[el.type] || 'textbox') : el.tagName.toLowerCase());
+    // 密码、验证码、银行卡等凭据字段：值不进入快照（也不作为名称），只标记是否已填写
+    const SECRET_AUTOCOMPLETE = /(^|\s)(current-password|new-password|one-time-code|cc-number|cc-csc|cc-exp\S*)(\s|$)/;
+    const secret = (el) => (el.tagName === 'INPUT' && el.type === 'password')
+        || SECRET_AUTOCOMPLETE.test((el.getAttribute('autocomplete') || '').toLowerCase());
+    const nameOf = (el) => clean(el.getAttribute('aria-label') || el.innerText || el.getAttribute('placeholder')
+        || el.getAttribute('title') || el.getAttribute('alt') || el.getAttribute('name') || (secret(el) ? '' : el.value));
+    const quote = (value) => JSON.stringify(value);
+    const hintOf = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (el.id) return tag + '#' + CSS.escape(el.id);
+        for (const attr of ['name', 'aria-label', 'placeholder', 'data-testid']) {
+            const value = el.getAttribute(attr);
+            if (value && value.length <= 60) return tag + '[' + attr + '=' + quote(value) + ']';
+        }
+        const href = el.getAttribute('href');
+        if (href && href.length <= 80 && !href.startsWith('javascript:')) return tag + '[href=' + quote(href) + ']';
+        return '';
+    };
+
+    if (window.__alphaBotNextId === undefined) window.__alphaBotNextId = 1;
+    const elements = [];
+    for (const el of document.querySelectorAll(SELECTOR)) {
+        if (elements.length >= maxElements) break;
+        if (!visible(el)) continue;
+        let id = el.getAttribute('data-ab-id');
+        if (!id) {
+            id = String(window.__alphaBotNextId++);
+            el.setAttribute('data-ab-id', id);
+        }
+        const item = {id: Number(id), role: roleOf(el), name: nameOf(el), selector: hintOf(el)};
+        if (el.tagName === 'A') item.href = clean(el.getAttribute('href'), 120);
+        if (el.tagName !== 'BUTTON' && typeof el.value === 'string' && el.value) {
+            item.value = secret(el) ? MASKED_VALUE : clean(el.value);
+        }
+        if (el.disabled) item.disabled = true;
+        if (el.checked) item.checked = true;
+        elements.push(item);
+    }
+    const text = document.body ? document.body.innerText.replace(/\n\s*\n+/g, '\n').slice(0, maxText) : '';
+    return {url: location.href, title: document.title, elements: elements, text: text};
+}
+"""
+
+
+@dataclass
+class PageElement:
+    """页面中的一个可交互元素（或标题）"""
+    id: int
+    role: str
+    name: str = ""
+    selector: str = ""
+    href: str = ""
+    value: str = ""
+    disabled: bool = False
+    checked: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PageElement":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def signature(self) -> tuple:
+        """除 id 外的全部内容，用于判断元素是否变化"""
+        return (self.role, self.name, self.selector, self.href, self.value, self.disabled, self.checked)
+
+    def render(self, compact: bool = False) -> str:
+        line = f"[{self.id}] {self.role}"
+        if self.name:
+            line += f' "{self.name}"'
+        if compact:
+            return line
+        if self.value:
+            line += f' value="{self.value}"'
+        if self.href:
+            line += f" href={self.href}"
+        if self.disabled:
+            line += " disabled"
+        if self.checked:
+            line += " checked"
+        if self.selector:
+            line += f" css={self.selector}"
+        return line
+
+
+@dataclass
+class PageSnapshot:
+    """一次提取的结果"""
+    url: str
+    title: str = ""
+    elements: List[PageElement] = field(default_factory=list)
+    text: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PageSnapshot":
+        return cls(
+            url=data.get("url", ""),
+            title=data.get("title", ""),
+            elements=[PageElement.from_dict(item) for item in data.get("elements", [])],
+            text=data.get("text", ""),
+        )
+
+
+@dataclass
+class SnapshotDiff:
+    """同一 URL 下两次快照之间的差异"""
+    added: List[PageElement] = field(default_factory=list)
+    changed: List[PageElement] = field(default_factory=list)
+    removed: List[PageElement] = field(default_factory=list)
+    unchanged: List[PageElement] = field(default_factory=list)
+    title_changed: bool = False
+    text_changed: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed or self.title_changed or self.text_changed)
+
+
+def diff_snapshots(previous: PageSnapshot, current: PageSnapshot) -> SnapshotDiff:
+    """按稳定 id 比较两次快照"""
+    previous_by_id = {element.id: element for element in previous.elements}
+    current_ids = set()
+    diff = SnapshotDiff(
+        title_changed=previous.title != current.title,
+        text_changed=previous.text != current.text,
+    )
+    for element in current.elements:
+        current_ids.add(element.id)
+        old = previous_by_id.get(element.id)
+        if old is None:
+            diff.added.append(element)
+        elif old.signature() != element.signature():
+            diff.changed.append(element)
+        else:
+            diff.unchanged.append(element)
+    diff.removed = [element for element in previous.elements if element.id not in current_ids]
+    return diff
+
+
+LOCATOR_HINT = "元素可以用 page.locator('[data-ab-id=\"ID\"]') 定位（ID 为方括号中的数字，同一页面内保持不变）"
+
+
+def render_snapshot(snapshot: PageSnapshot) -> str:
+    """完整渲染快照（第一次访问或 URL 变化时使用）"""
+    lines = [
+        "=== 当前页面信息 ===",
+        f"URL: {snapshot.url}",
+        f"标题: {snapshot.title}",
+        LOCATOR_HINT,
+        "",
+        f"=== 可交互元素（{len(snapshot.elements)} 个）===",
+    ]
+    lines.extend(element.render() for element in snapshot.elements)
+    if snapshot.text:
+        lines.extend(["", f"=== 页面文本（前 {len(snapshot.text)} 字符）===", snapshot.text])
+    return "\n".join(lines)
+
+
+def render_diff(snapshot: PageSnapshot, diff: SnapshotDiff) -> str:
+    """渲染与上一步的差异：变化的元素完整列出，未变化的元素只列 id、角色和文本；页面文本总是完整附上"""
+    lines = [
+        "=== 当前页面信息（URL 未变化，以下为与上一步相比的变化）===",
+        f"URL: {snapshot.url}",
+        f"标题: {snapshot.title}" + ("（已变化）" if diff.title_changed else ""),
+        LOCATOR_HINT,
+    ]
+    if diff.is_empty:
+        lines.append("\n页面元素和文本与上一步相同")
+    if diff.added:
+        lines.append(f"\n=== 新增元素（{len(diff.added)} 个）===")
+        lines.extend("+ " + element.render() for element in diff.added)
+    if diff.changed:
+        lines.append(f"\n=== 变化的元素（{len(diff.changed)} 个）===")
+        lines.extend("~ " + element.render() for element in diff.changed)
+    if diff.removed:
+        lines.append(f"\n=== 已移除的元素（{len(diff.removed)} 个）===")
+        lines.extend("- " + element.render(compact=True) for element in diff.removed)
+    if diff.unchanged:
+        lines.append(f"\n=== 未变化的元素（{len(diff.unchanged)} 个）===")
+        lines.extend(element.render(compact=True) for element in diff.unchanged)
+    # 页面文本每一步都发送（已截断到 max_text）：只发变化时，点击后页面没变的那一步 LLM 就看不到页面内容了
+    if snapshot.text:
+        state = "已变化" if diff.text_changed else "未变化"
+        lines.extend(["", f"=== 页面文本（{state}，前 {len(snapshot.text)} 字符）===", snapshot.text])
+    return "\n".join(lines)
+
+
+class PageSnapshotter:
+    """
+    页面结构提取器
+
+    缓存上一次的快照；URL 相同时返回差异，否则返回完整快照。
+    """
+
+    def __init__(self, max_elements: int = 300, max_text: int = 2000):
+        self.max_elements = max_elements
+        self.max_text = max_text
+        self._previous: Optional[PageSnapshot] = None
+
+    def capture(self, page) -> PageSnapshot:
+        """在页面中执行提取脚本"""
+        data = page.evaluate(EXTRACT_JS, [self.max_elements, self.max_text])
+        return PageSnapshot.from_dict(data)
+
+    def describe(self, page) -> str:
+        """提取当前页面，返回给 LLM 的页面结构描述"""
+        return self.describe_snapshot(self.capture(page))
+
+    def describe_snapshot(self, snapshot: PageSnapshot) -> str:
+        previous, self._previous = self._previous, snapshot
+        if previous is not None and previous.url == snapshot.url:
+            return render_diff(snapshot, diff_snapshots(previous, snapshot))
+        return render_snapshot(snapshot)
+
+    def reset(self):
+        """丢弃缓存的快照（浏览器关闭时调用）"""
+        self._previous = None
@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any, Callable
 from .base_skill import BaseSkill, SkillExecutionResponse
 from ..llm.base import BaseLLMClient
-from ..llm.openai_client import OpenAIClient
+from ..llm.registry import get_llm_client
 from ..skills.utils import build_full_history_message
 
 
@@ -43,7 +43,7 @@ class PPTSkill(BaseSkill):
         
         # Initialize LLM client for content generation
         try:
-            self.llm: BaseLLMClient = OpenAIClient()
+            self.llm: BaseLLMClient = get_llm_client()
             self.system_prompt = """你是一个专业的PPT内容策划师。用户会给你一个主题和任务要求，以及可能的历史交互信息。请为PowerPoint演示文稿生成合适的大纲和每页的详细内容。
 
 你的回复必须是一个JSON对象，格式如下：
@@ -107,7 +107,7 @@ class PPTSkill(BaseSkill):
         selection_reasoning = kwargs.get('selection_reasoning', '')
         
         # Build hints information
-        hints_info = self._build_hints_info()
+        hints_info = self._build_hints_info(task, context)
         
         if not self.initialized:
             return SkillExecutionResponse(
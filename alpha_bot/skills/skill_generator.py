@@ -6,19 +6,23 @@ from dataclasses import dataclass
 
 from loguru import logger
 from .base_skill import BaseSkill, SkillExecutionResponse
-from ..llm.openai_client import OpenAIClient
-from ..skills.utils import build_full_history_message
+from ..llm.registry import get_llm_client
+from ..skills.utils import build_prompt_blocks
 from .skill_persistence import SkillPersistence
 
 
 class SkillGenerator:
     """Generates skill classes from markdown descriptions"""
     
-    def __init__(self, enable_persistence: bool = True):
-        self.llm_client = OpenAIClient()
+    # Bump when the extraction prompt or generated code template changes,
+    # so persisted skills are regenerated on next start
+    GENERATOR_VERSION = "2"
+    
+    def __init__(self, enable_persistence: bool = True, persistence: Optional[SkillPersistence] = None):
+        self.llm_client = get_llm_client()
         self.enable_persistence = enable_persistence
         if enable_persistence:
-            self.persistence = SkillPersistence()
+            self.persistence = persistence or SkillPersistence()
         else:
             self.persistence = None
     
@@ -35,6 +39,8 @@ class SkillGenerator:
         """
         # Extract skill information from markdown using LLM if available
         parsed_info = self._parse_markdown_with_llm(markdown_text)
+        if not parsed_info:
+            raise ValueError(f"Failed to extract skill information for '{skill_name}'")
         
         # Create the skill class dynamically
         skill_instance = self._create_skill_class(
@@ -43,10 +49,16 @@ class SkillGenerator:
         
         # Save the skill class to file if persistence is enabled
         if self.enable_persistence and self.persistence:
-            self.persistence.save_skill_class(skill_instance, skill_name)
+            self.persistence.save_skill_class(
+                skill_instance, skill_name, source_hash=self.source_hash(markdown_text)
+            )
         
         return skill_instance
     
+    def source_hash(self, markdown_text: str) -> str:
+        """Hash identifying the compiled output of this generator for markdown_text"""
+        return SkillPersistence.compute_source_hash(markdown_text, self.GENERATOR_VERSION)
+    
     def _parse_markdown_with_llm(self, markdown_text: str) -> Dict[str, Any]:
         """Parse markdown text to extract skill information, using LLM when available"""
         return self._extract_with_llm(markdown_text)
@@ -113,7 +125,7 @@ Focus on extracting accurate information about what the skill should do based on
                 super().__init__()
                 self.system_prompt = parsed_info['system_prompt']
                 try:
-                    self.llm = OpenAIClient()
+                    self.llm = get_llm_client()
                 except Exception as e:
                     # If OpenAI client fails to initialize, create a placeholder
                     # The skill will rely on simpler command generation
@@ -138,7 +150,7 @@ Focus on extracting accurate information about what the skill should do based on
                 history = context.get('history', [])
                 
                 # Build user prompt with history
-                user_prompt = build_full_history_message(history, task)
+                user_prompt = build_prompt_blocks(history, task, context=context)
                 
                 # Call LLM to generate response if available, otherwise use simpler logic
                 try:
@@ -1,24 +1,98 @@
 """Skill Manager for routing tasks to appropriate skills"""
 import os
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from loguru import logger
 from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from .skill_selector import SkillSelector
+from .skill_router import SkillRouter
 from .base_skill import BaseSkill
 from ..models.types import SkillSelectResponse, SkillResponse
-from .command_skill import CommandSkill
-from .direct_llm_skill import DirectLLMSkill
-from .image_skill import ImageSkill
-from .ppt_skill import PPTSkill
-from .browser_skill import BrowserSkill
-from .wechat_skill import WeChatSkill
-from .feishu_skill import FeishuSkill
+from .skill_registry import BUILTIN_SKILLS, LazySkill
 from .skill_generator import SkillGenerator
 from .skill_persistence import SkillPersistence
+from ..auto_hint.system import defer_hint_usage, commit_hint_usage
 
 if TYPE_CHECKING:
     from ..ui.console import ConsoleUI
 
 
+class SpeculationCancelled(Exception):
+    """Raised inside a speculative skill's stream callback once the selector disagreed"""
+
+
+class _SpeculativeStream:
+    """
+    Stream callback for a speculatively started skill
+    
+    Tokens are buffered until the selector confirms the skill (attach), then
+    replayed in order and forwarded live. cancel closes the skill's LLM response
+    stream (handed over by the client through bind_stream), so the request is
+    dropped right away; a token still delivered after cancel raises
+    SpeculationCancelled.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._callback = None
+        self._cancelled = False
+        self._response_stream = None
+    
+    def bind_stream(self, response_stream):
+        """Called by the LLM client with the open response stream"""
+        with self._lock:
+            self._response_stream = response_stream
+            cancelled = self._cancelled
+        if cancelled:
+            self._close(response_stream)
+    
+    def __call__(self, token: str):
+        with self._lock:
+            if self._cancelled:
+                raise SpeculationCancelled()
+            if self._callback is None:
+                self._buffer.append(token)
+                return
+            self._callback(token)
+    
+    def attach(self, callback):
+        with self._lock:
+            for token in self._buffer:
+                callback(token)
+            self._buffer = []
+            self._callback = callback
+    
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            self._buffer = []
+            response_stream = self._response_stream
+        if response_stream is not None:
+            self._close(response_stream)
+    
+    @staticmethod
+    def _close(response_stream):
+        try:
+            response_stream.close()
+        except Exception as e:
+            logger.debug(f"Closing speculative LLM stream failed: {e}")
+
+
+def _run_speculative(call, *args, **kwargs):
+    """Run a speculative skill call; hint usage is collected and only recorded if the result is kept"""
+    with defer_hint_usage() as hint_usage:
+        return call(*args, **kwargs), hint_usage
+
+
+async def _arun_speculative(call, *args, **kwargs):
+    """Coroutine variant of _run_speculative"""
+    with defer_hint_usage() as hint_usage:
+        return await call(*args, **kwargs), hint_usage
+
+
 class SkillManager:
     """
     Manages all available skills and routes tasks to the appropriate skill
@@ -42,6 +116,16 @@ class SkillManager:
         self.skills: List[BaseSkill] = []
         self.default_skill: Optional[BaseSkill] = None
         self.skill_selector = SkillSelector()
+        # Rule-based fast path consulted before the LLM selector
+        self.router = SkillRouter()
+        # Fused select-and-act: one LLM call selects the skill and produces its output
+        self.fused_selection = os.getenv("SKILL_FUSED_SELECTION", "false").lower() == "true"
+        self.fused_max_skills = int(os.getenv("SKILL_FUSED_MAX_SKILLS", "3"))
+        self.fused_stats = {"fused": 0, "fallback": 0}
+        # Speculative execution: start the most likely skill while the selector runs
+        self.speculative_execution = os.getenv("SKILL_SPECULATIVE_EXECUTION", "false").lower() == "true"
+        self.speculation_stats = {"hits": 0, "misses": 0}
+        self._speculation_pool: Optional[ThreadPoolExecutor] = None
         self.ui = ui
         self.enable_persistence = enable_persistence
         if enable_persistence:
@@ -52,67 +136,84 @@ class SkillManager:
         self.register_dynamic_skill()
     
     def register_skill(self):
-        """注册所有可用技能"""
-        # 注册命令生成技能（默认技能）
-        command_skill = CommandSkill()
-        self.skills.append(command_skill)
-        self.default_skill = command_skill
-
-        # 注册直接LLM处理技能
-        direct_llm_skill = DirectLLMSkill()
-        self.skills.append(direct_llm_skill)
-        
-        # 注册PPT生成技能
-        ppt_skill = PPTSkill()
-        self.skills.append(ppt_skill)
-        
-        # 注册图片生成技能
-        image_skill = ImageSkill()
-        self.skills.append(image_skill)
-        
-        # 注册浏览器自动化技能
-        browser_skill = BrowserSkill()
-        self.skills.append(browser_skill)
-        
-        # 注册WeChat自动化技能
-        wechat_skill = WeChatSkill()
-        self.skills.append(wechat_skill)
-        
-        # 注册Feishu自动化技能
-        feishu_skill = FeishuSkill()
-        self.skills.append(feishu_skill)
-    
-    def register_dynamic_skill(self):
-        """Register dynamic skills"""
-        skill_generator = SkillGenerator(enable_persistence=self.enable_persistence)
-        custom_skills_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "custom_skills")
+        """
+        注册所有内置技能
+        
+        内置技能以 LazySkill 形式注册：技能选择只需要名称、能力和描述，
+        真正的技能类（及其依赖，如 bs4、python-pptx）在首次被选中时才导入和构造。
+        第一个技能（CommandSkill）为默认技能。
+        """
+        for descriptor in BUILTIN_SKILLS:
+            self.skills.append(LazySkill(descriptor))
+        self.default_skill = self.skills[0]
+    
+    def register_dynamic_skill(self, custom_skills_dir: Optional[str] = None):
+        """
+        Register dynamic skills
+        
+        Persisted skills whose recorded source hash matches the current markdown
+        (and generator version) are loaded without any LLM call; stale or missing
+        ones are regenerated in parallel.
+        
+        Args:
+            custom_skills_dir: Directory of skill markdown files, defaults to skills/custom_skills
+        """
+        skill_generator = SkillGenerator(enable_persistence=self.enable_persistence, persistence=self.persistence)
+        if custom_skills_dir is None:
+            custom_skills_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "custom_skills")
         logger.info(f"Load custom skills from directory: {custom_skills_dir}")
         
-        for file_name in os.listdir(custom_skills_dir):
-            if file_name.endswith(".md"):
-                skill_name = file_name[:-3]
-                
-                # Try to load from persisted Python file first
-                skill = None
-                if self.enable_persistence and self.persistence:
-                    if self.persistence.skill_exists(skill_name):
-                        skill_class = self.persistence.load_skill_class(skill_name)
-                        if skill_class:
-                            skill = skill_class()
-                            logger.info(f"Loaded skill '{skill_name}' from persisted file")
-                
-                # If not loaded from file, generate from markdown
-                if skill is None:
-                    file_content = open(os.path.join(custom_skills_dir, file_name), "r", encoding="utf-8").read()
-                    skill = skill_generator.parse_markdown_to_skill(file_content, skill_name)
-                    logger.info(f"Generated skill '{skill_name}' from markdown")
-                
-                logger.info(f"Registering dynamic skill:\n {skill.name=}\n, {skill.get_description()=}\n, {skill.get_capabilities()=}\n")
-                self.skills.append(skill)
+        loaded: Dict[str, BaseSkill] = {}
+        stale: Dict[str, str] = {}
+        skill_names = [file_name[:-3] for file_name in os.listdir(custom_skills_dir) if file_name.endswith(".md")]
+        
+        for skill_name in skill_names:
+            with open(os.path.join(custom_skills_dir, f"{skill_name}.md"), "r", encoding="utf-8") as f:
+                file_content = f.read()
+            
+            # Try to load from persisted Python file first
+            if self.enable_persistence and self.persistence:
+                if self.persistence.is_skill_fresh(skill_name, skill_generator.source_hash(file_content)):
+                    skill_class = self.persistence.load_skill_class(skill_name)
+                    if skill_class:
+                        loaded[skill_name] = skill_class()
+                        logger.info(f"Loaded skill '{skill_name}' from persisted file")
+                        continue
+                elif self.persistence.skill_exists(skill_name):
+                    logger.info(f"Markdown for skill '{skill_name}' changed, regenerating")
+            
+            stale[skill_name] = file_content
+        
+        # If not loaded from file, generate from markdown (one LLM call per skill, run concurrently)
+        if stale:
+            max_workers = min(len(stale), int(os.getenv("SKILL_GENERATION_WORKERS", "8")))
+            with ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="skill-gen") as pool:
+                futures = {
+                    pool.submit(skill_generator.parse_markdown_to_skill, file_content, skill_name): skill_name
+                    for skill_name, file_content in stale.items()
+                }
+                for future in as_completed(futures):
+                    skill_name = futures[future]
+                    try:
+                        loaded[skill_name] = future.result()
+                        logger.info(f"Generated skill '{skill_name}' from markdown")
+                    except Exception as e:
+                        logger.opt(exception=e).error(f"Failed to generate skill '{skill_name}': {e}")
+        
+        # Register in directory order so skill ordering stays stable
+        for skill_name in skill_names:
+            skill = loaded.get(skill_name)
+            if skill is None:
+                continue
+            logger.info(f"Registering dynamic skill:\n {skill.name=}\n, {skill.get_description()=}\n, {skill.get_capabilities()=}\n")
+            self.skills.append(skill)
     
     def select_skill(self, task: str, context: Optional[Dict[str, Any]] = None) -> Optional[SkillSelectResponse]:
         """
-        Select the best skill to handle the given task using LLM-based intelligent selection
+        Select the best skill to handle the given task
+        
+        Confident cases are resolved locally by the rule-based router; the rest
+        go through LLM-based intelligent selection.
         
         Args:
             task: The task description
@@ -121,28 +222,69 @@ class SkillManager:
         Returns:
             SkillSelectResponse with the selected skill and selection information, or default skill if no match found
         """
+        return self._route(task, context) or self._llm_select_skill(task, context)
+    
+    def _route(self, task: str, context: Optional[Dict[str, Any]] = None) -> Optional[SkillSelectResponse]:
+        """Rule-based fast path; None when the LLM selector has to decide"""
+        decision = self.router.route(task, self.skills, context)
+        if decision is not None:
+            return self._to_select_response(decision.skill, decision.confidence, decision.reasoning, decision.task_complete)
+        return None
+    
+    def _llm_select_skill(self, task: str, context: Optional[Dict[str, Any]] = None) -> SkillSelectResponse:
         # Use intelligent LLM-based selection
         try:
             with self.ui.skill_selection_animation():
-                selected_skill, confidence, reasoning, task_complete = self.skill_selector.select_skill(
-                    task, self.skills, context
-                )
-            if task_complete:
-                return SkillSelectResponse(skill=None, skill_name="none", task_complete=True, select_reason="Task completed")
-            if selected_skill:
-                self.ui.print_skill_selected(
-                    skill_name=selected_skill.name,
-                    confidence=confidence,
-                    reasoning=reasoning,
-                    capabilities=selected_skill.capabilities
-                )
-                return SkillSelectResponse(skill=selected_skill, skill_name=selected_skill.name, task_complete=task_complete, select_reason=reasoning)
+                selection = self.skill_selector.select_skill(task, self.skills, context)
+            return self._to_select_response(*selection)
         except Exception as e:
-            logger.opt(exception=e).error(f"Intelligent selection failed: {e}, using default skill")
-            if self.ui:
-                self.ui.print_error(f"Intelligent selection failed: {e}, using default skill")
-            else:
-                logger.warning(f"[SkillManager] Intelligent selection failed: {e}, using default skill")
+            return self._selection_fallback(e)
+    
+    async def aselect_skill(self, task: str, context: Optional[Dict[str, Any]] = None) -> Optional[SkillSelectResponse]:
+        """
+        Coroutine variant of select_skill
+        
+        Args:
+            task: The task description
+            context: Optional context for decision making
+            
+        Returns:
+            SkillSelectResponse with the selected skill and selection information
+        """
+        return self._route(task, context) or await self._allm_select_skill(task, context)
+    
+    async def _allm_select_skill(self, task: str, context: Optional[Dict[str, Any]] = None) -> SkillSelectResponse:
+        try:
+            with self.ui.skill_selection_animation():
+                selection = await self.skill_selector.aselect_skill(task, self.skills, context)
+            return self._to_select_response(*selection)
+        except Exception as e:
+            return self._selection_fallback(e)
+    
+    def _to_select_response(self, selected_skill, confidence, reasoning, task_complete) -> Optional[SkillSelectResponse]:
+        """Convert selector output to SkillSelectResponse and show it"""
+        if task_complete:
+            return SkillSelectResponse(skill=None, skill_name="none", task_complete=True, select_reason="Task completed")
+        if selected_skill:
+            self.ui.print_skill_selected(
+                skill_name=selected_skill.name,
+                confidence=confidence,
+                reasoning=reasoning,
+                capabilities=selected_skill.capabilities
+            )
+            return SkillSelectResponse(skill=selected_skill, skill_name=selected_skill.name, task_complete=task_complete, select_reason=reasoning)
+        return self._default_select_response()
+    
+    def _selection_fallback(self, e: Exception) -> SkillSelectResponse:
+        """Log a selection failure and fall back to the default skill"""
+        logger.opt(exception=e).error(f"Intelligent selection failed: {e}, using default skill")
+        if self.ui:
+            self.ui.print_error(f"Intelligent selection failed: {e}, using default skill")
+        else:
+            logger.warning(f"[SkillManager] Intelligent selection failed: {e}, using default skill")
+        return self._default_select_response()
+    
+    def _default_select_response(self) -> SkillSelectResponse:
         return SkillSelectResponse(skill=self.default_skill, skill_name=self.default_skill.name if self.default_skill else "unknown", task_complete=False, select_reason="Fallback due to selection error")
     
     def execute(
@@ -161,8 +303,214 @@ class SkillManager:
         Returns:
             SkillResponse from the executed skill
         """
-        # Select skill
-        skill_select_response = self.select_skill(task, context) 
+        # Select skill (in fused mode the selector may also produce the skill's output)
+        skill_select_response = self._route(task, context)
+        if skill_select_response is None and self.fused_selection:
+            fused = self._select_and_act(task, context)
+            if fused is not None:
+                skill_select_response, skill_exec_response = fused
+                if skill_exec_response is not None:
+                    return self._build_skill_response(skill_select_response, skill_exec_response)
+        if skill_select_response is None and self.speculative_execution:
+            speculative_skill = self._predict_skill(context)
+            if speculative_skill is not None:
+                return self._execute_speculative(task, context, speculative_skill)
+        if skill_select_response is None:
+            skill_select_response = self._llm_select_skill(task, context)
+        return self._execute_selected(task, context, skill_select_response)
+    
+    def _execute_selected(self, task: str, context: Optional[Dict[str, Any]], skill_select_response: Optional[SkillSelectResponse]) -> SkillResponse:
+        """Execute the skill chosen by the router/selector"""
+        early_response = self._check_selection(skill_select_response)
+        if early_response:
+            return early_response
+        # Execute the selected skill
+        try:
+            with self.ui.streaming_display() as stream_callback:
+                skill_exec_response = skill_select_response.skill.execute(task, context, stream_callback=stream_callback)
+                return self._build_skill_response(skill_select_response, skill_exec_response)
+        except Exception as e:
+            return self._execution_failed(skill_select_response, e)
+    
+    async def aexecute(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> SkillResponse:
+        """
+        Coroutine variant of execute
+        
+        Skills with a native aexecute stream on the event loop; the others
+        run their synchronous execute in the default thread pool.
+        
+        Args:
+            task: The task to execute
+            context: Execution context
+            
+        Returns:
+            SkillResponse from the executed skill
+        """
+        skill_select_response = self._route(task, context)
+        if skill_select_response is None and self.fused_selection:
+            fused = await self._aselect_and_act(task, context)
+            if fused is not None:
+                skill_select_response, skill_exec_response = fused
+                if skill_exec_response is not None:
+                    return self._build_skill_response(skill_select_response, skill_exec_response)
+        if skill_select_response is None and self.speculative_execution:
+            speculative_skill = self._predict_skill(context)
+            if speculative_skill is not None:
+                return await self._aexecute_speculative(task, context, speculative_skill)
+        if skill_select_response is None:
+            skill_select_response = await self._allm_select_skill(task, context)
+        return await self._aexecute_selected(task, context, skill_select_response)
+    
+    async def _aexecute_selected(self, task: str, context: Optional[Dict[str, Any]], skill_select_response: Optional[SkillSelectResponse]) -> SkillResponse:
+        """Coroutine variant of _execute_selected"""
+        early_response = self._check_selection(skill_select_response)
+        if early_response:
+            return early_response
+        try:
+            with self.ui.streaming_display() as stream_callback:
+                skill_exec_response = await skill_select_response.skill.aexecute(task, context, stream_callback=stream_callback)
+                return self._build_skill_response(skill_select_response, skill_exec_response)
+        except Exception as e:
+            return self._execution_failed(skill_select_response, e)
+    
+    def _predict_skill(self, context: Optional[Dict[str, Any]] = None) -> Optional[BaseSkill]:
+        """
+        Guess the skill the selector will pick: the previous step's skill, else the default skill
+        
+        Only skills whose output is a single side-effect-free LLM call
+        (supports_fused_selection) are started speculatively.
+        """
+        last_result = (context or {}).get('last_result')
+        skill = None
+        if last_result is not None and last_result.skill_response is not None:
+            skill = self.get_skill_by_name(last_result.skill_response.skill_name)
+        skill = skill or self.default_skill
+        if skill is None or not getattr(skill, 'supports_fused_selection', False):
+            return None
+        return skill
+    
+    def _execute_speculative(self, task: str, context: Optional[Dict[str, Any]], speculative_skill: BaseSkill) -> SkillResponse:
+        """Run the LLM selector and speculative_skill concurrently; keep the result if they agree"""
+        if self._speculation_pool is None:
+            self._speculation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="skill-speculation")
+        stream = _SpeculativeStream()
+        # copy_context so the speculative call's token usage is counted for this task
+        future = self._speculation_pool.submit(
+            contextvars.copy_context().run, _run_speculative, speculative_skill.execute, task, context, stream_callback=stream
+        )
+        
+        skill_select_response = self._llm_select_skill(task, context)
+        if self._speculation_hit(skill_select_response, speculative_skill):
+            try:
+                with self.ui.streaming_display() as stream_callback:
+                    stream.attach(stream_callback)
+                    skill_exec_response, hint_usage = future.result()
+                    commit_hint_usage(hint_usage)
+                    return self._build_skill_response(skill_select_response, skill_exec_response)
+            except Exception as e:
+                return self._execution_failed(skill_select_response, e)
+        
+        stream.cancel()
+        return self._execute_selected(task, context, skill_select_response)
+    
+    async def _aexecute_speculative(self, task: str, context: Optional[Dict[str, Any]], speculative_skill: BaseSkill) -> SkillResponse:
+        """Coroutine variant of _execute_speculative; a miss cancels the speculative task"""
+        stream = _SpeculativeStream()
+        speculative_task = asyncio.ensure_future(
+            _arun_speculative(speculative_skill.aexecute, task, context, stream_callback=stream)
+        )
+        
+        skill_select_response = await self._allm_select_skill(task, context)
+        if self._speculation_hit(skill_select_response, speculative_skill):
+            try:
+                with self.ui.streaming_display() as stream_callback:
+                    stream.attach(stream_callback)
+                    skill_exec_response, hint_usage = await speculative_task
+                    commit_hint_usage(hint_usage)
+                    return self._build_skill_response(skill_select_response, skill_exec_response)
+            except Exception as e:
+                return self._execution_failed(skill_select_response, e)
+        
+        stream.cancel()
+        speculative_task.cancel()
+        return await self._aexecute_selected(task, context, skill_select_response)
+    
+    def _speculation_hit(self, skill_select_response: SkillSelectResponse, speculative_skill: BaseSkill) -> bool:
+        """Record whether the selector agreed with the speculatively started skill"""
+        hit = not skill_select_response.task_complete and skill_select_response.skill is speculative_skill
+        self.speculation_stats["hits" if hit else "misses"] += 1
+        total = self.speculation_stats["hits"] + self.speculation_stats["misses"]
+        logger.info(
+            f"Speculative {speculative_skill.name} {'hit' if hit else 'miss'} "
+            f"(hit rate {self.speculation_stats['hits'] / total:.0%} over {total} steps)"
+        )
+        return hit
+    
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Speculative execution counters: hits, misses and hit rate"""
+        hits, misses = self.speculation_stats["hits"], self.speculation_stats["misses"]
+        return {
+            "enabled": self.speculative_execution,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+    
+    def _select_and_act(self, task: str, context: Optional[Dict[str, Any]] = None):
+        """
+        Run the fused select-and-act call
+        
+        Returns:
+            (SkillSelectResponse, SkillExecutionResponse or None), or None if the
+            fused call failed and the two-call path should be used
+        """
+        try:
+            with self.ui.streaming_display() as stream_callback:
+                selection = self.skill_selector.select_and_act(
+                    task, self.skills, context, stream_callback, max_fused_skills=self.fused_max_skills
+                )
+        except Exception as e:
+            logger.opt(exception=e).warning(f"Fused skill selection failed, falling back: {e}")
+            self.fused_stats["fallback"] += 1
+            return None
+        return self._from_fused_selection(*selection)
+    
+    async def _aselect_and_act(self, task: str, context: Optional[Dict[str, Any]] = None):
+        """Coroutine variant of _select_and_act"""
+        try:
+            with self.ui.streaming_display() as stream_callback:
+                selection = await self.skill_selector.aselect_and_act(
+                    task, self.skills, context, stream_callback, max_fused_skills=self.fused_max_skills
+                )
+        except Exception as e:
+            logger.opt(exception=e).warning(f"Fused skill selection failed, falling back: {e}")
+            self.fused_stats["fallback"] += 1
+            return None
+        return self._from_fused_selection(*selection)
+    
+    def _from_fused_selection(self, selected_skill, confidence, reasoning, task_complete, payload):
+        """Turn a fused selection into (select response, execution response or None)"""
+        skill_select_response = self._to_select_response(selected_skill, confidence, reasoning, task_complete)
+        if payload is None or skill_select_response.task_complete:
+            # Task complete, or the skill needs its own call (e.g. BrowserSkill)
+            if not skill_select_response.task_complete:
+                self.fused_stats["fallback"] += 1
+            return skill_select_response, None
+        try:
+            skill_exec_response = skill_select_response.skill.from_fused_payload(payload)
+        except Exception as e:
+            logger.opt(exception=e).warning(f"Invalid fused payload for {skill_select_response.skill_name}: {e}")
+            self.fused_stats["fallback"] += 1
+            return skill_select_response, None
+        self.fused_stats["fused"] += 1
+        return skill_select_response, skill_exec_response
+    
+    def _check_selection(self, skill_select_response: Optional[SkillSelectResponse]) -> Optional[SkillResponse]:
+        """Return a terminal SkillResponse when there is no skill to execute"""
         if not skill_select_response:
             return SkillResponse(
                 skill_name="error",
@@ -177,39 +525,40 @@ class SkillManager:
                 task_complete=True,
                 direct_response="Task completed."
             ) 
-        # Execute the selected skill
-        try:
-            with self.ui.streaming_display() as stream_callback:
-                skill_exec_response = skill_select_response.skill.execute(task, context, stream_callback=stream_callback)
-                skill_response = SkillResponse(
-                    skill=skill_select_response.skill,
-                    skill_name=skill_select_response.skill_name, 
-                    select_reason=skill_select_response.select_reason,
-                    task_complete=skill_select_response.task_complete, 
-                    thinking=skill_exec_response.thinking,
-                    command=skill_exec_response.command,
-                    explanation=skill_exec_response.explanation,
-                    next_step=skill_exec_response.next_step,
-                    is_dangerous=skill_exec_response.is_dangerous,
-                    danger_reason=skill_exec_response.danger_reason,
-                    error_analysis=skill_exec_response.error_analysis,
-                    direct_response=skill_exec_response.direct_response,
-                    generated_files=skill_exec_response.generated_files,
-                    file_metadata=skill_exec_response.file_metadata,
-                    api_response=skill_exec_response.api_response,
-                    service_status=skill_exec_response.service_status
-                )
-                return skill_response
-        except Exception as e:
-            logger.opt(exception=e).error(f"Skill execution failed: {str(e)}")
-            return SkillResponse(
-                skill=skill_select_response.skill,
-                skill_name=skill_select_response.skill_name,
-                select_reason=skill_select_response.select_reason,
-                thinking=f"Skill execution failed: {str(e)}",
-                task_complete=True,
-                direct_response=f"Error executing {skill_select_response.skill_name}: {str(e)}"
-            )
+        return None
+    
+    def _build_skill_response(self, skill_select_response: SkillSelectResponse, skill_exec_response) -> SkillResponse:
+        """Merge selection info and skill output into a SkillResponse"""
+        return SkillResponse(
+            skill=skill_select_response.skill,
+            skill_name=skill_select_response.skill_name, 
+            select_reason=skill_select_response.select_reason,
+            task_complete=skill_select_response.task_complete, 
+            thinking=skill_exec_response.thinking,
+            command=skill_exec_response.command,
+            commands=skill_exec_response.commands,
+            explanation=skill_exec_response.explanation,
+            next_step=skill_exec_response.next_step,
+            is_dangerous=skill_exec_response.is_dangerous,
+            danger_reason=skill_exec_response.danger_reason,
+            error_analysis=skill_exec_response.error_analysis,
+            direct_response=skill_exec_response.direct_response,
+            generated_files=skill_exec_response.generated_files,
+            file_metadata=skill_exec_response.file_metadata,
+            api_response=skill_exec_response.api_response,
+            service_status=skill_exec_response.service_status
+        )
+    
+    def _execution_failed(self, skill_select_response: SkillSelectResponse, e: Exception) -> SkillResponse:
+        logger.opt(exception=e).error(f"Skill execution failed: {str(e)}")
+        return SkillResponse(
+            skill=skill_select_response.skill,
+            skill_name=skill_select_response.skill_name,
+            select_reason=skill_select_response.select_reason,
+            thinking=f"Skill execution failed: {str(e)}",
+            task_complete=True,
+            direct_response=f"Error executing {skill_select_response.skill_name}: {str(e)}"
+        )
     
     def get_skill_by_name(self, name: str) -> Optional[BaseSkill]:
         """Get a skill by its name"""
@@ -238,3 +587,9 @@ class SkillManager:
         """Reset state for all skills"""
         for skill in self.skills:
             skill.reset()
+
+    def close(self):
+        """Release resources owned by this manager (the speculation thread pool)"""
+        if self._speculation_pool is not None:
+            self._speculation_pool.shutdown(wait=False)
+            self._speculation_pool = None
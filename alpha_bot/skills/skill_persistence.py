@@ -2,6 +2,8 @@
 
 import os
 import sys
+import hashlib
+import threading
 import importlib.util
 from pathlib import Path
 from typing import Optional, Type
@@ -13,6 +15,9 @@ from .base_skill import BaseSkill
 class SkillPersistence:
     """Handles saving and loading skill classes as Python files"""
     
+    # Marker line recording which markdown/generator version a file was compiled from
+    SOURCE_HASH_MARKER = "# source-sha256: "
+    
     def __init__(self, skills_dir: Optional[str] = None):
         """
         Initialize skill persistence
@@ -32,13 +37,32 @@ class SkillPersistence:
         self.skills_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Skill persistence directory: {self.skills_dir}")
     
-    def save_skill_class(self, skill_class: Type[BaseSkill], skill_name: str) -> bool:
+    @staticmethod
+    def compute_source_hash(markdown_text: str, generator_version: str) -> str:
+        """
+        Compute the cache key of a compiled skill
+        
+        Args:
+            markdown_text: Markdown description of the skill
+            generator_version: Version of the SkillGenerator that compiles it
+            
+        Returns:
+            SHA-256 hex digest of the generator version and markdown
+        """
+        digest = hashlib.sha256()
+        digest.update(generator_version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(markdown_text.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def save_skill_class(self, skill_class: Type[BaseSkill], skill_name: str, source_hash: Optional[str] = None) -> bool:
         """
         Save a skill class as a Python file
         
         Args:
             skill_class: The skill class to save
             skill_name: Name of the skill (will be used as filename)
+            source_hash: Hash of the markdown the skill was generated from
             
         Returns:
             True if saved successfully, False otherwise
@@ -50,10 +74,15 @@ class SkillPersistence:
             
             # Generate Python code for the class
             python_code = self._generate_skill_code(skill_class, skill_name)
+            if source_hash:
+                python_code = f"{self.SOURCE_HASH_MARKER}{source_hash}\n{python_code}"
             
-            # Write to file
-            with open(file_path, 'w', encoding='utf-8') as f:
+            # Write to a temp file and rename so a concurrent reader never sees a partial file
+            # (per thread, so concurrent writers of the same skill never share a temp file)
+            tmp_path = file_path.with_suffix(f".py.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 f.write(python_code)
+            os.replace(tmp_path, file_path)
             
             logger.info(f"Saved skill '{skill_name}' to {file_path}")
             return True
@@ -123,6 +152,40 @@ class SkillPersistence:
         file_path = self.skills_dir / f"{filename}.py"
         return file_path.exists()
     
+    def get_source_hash(self, skill_name: str) -> Optional[str]:
+        """
+        Read the source hash recorded in a persisted skill file
+        
+        Args:
+            skill_name: Name of the skill
+            
+        Returns:
+            The recorded hash, or None if the file is missing or predates hashing
+        """
+        filename = self._skill_name_to_filename(skill_name)
+        file_path = self.skills_dir / f"{filename}.py"
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                first_line = f.readline().strip()
+        except OSError:
+            return None
+        if first_line.startswith(self.SOURCE_HASH_MARKER):
+            return first_line[len(self.SOURCE_HASH_MARKER):]
+        return None
+    
+    def is_skill_fresh(self, skill_name: str, source_hash: str) -> bool:
+        """
+        Check whether the persisted skill was compiled from the given source
+        
+        Args:
+            skill_name: Name of the skill
+            source_hash: Hash of the current markdown and generator version
+            
+        Returns:
+            True if the persisted file exists and matches source_hash
+        """
+        return self.get_source_hash(skill_name) == source_hash
+    
     def _skill_name_to_filename(self, skill_name: str) -> str:
         """
         Convert skill name to filename (snake_case)
@@ -179,8 +242,8 @@ class SkillPersistence:
 from typing import List, Dict, Any, Optional
 from alpha_bot.skills.base_skill import BaseSkill
 from alpha_bot.models.types import SkillExecutionResponse
-from alpha_bot.llm.openai_client import OpenAIClient
-from alpha_bot.skills.utils import build_full_history_message
+from alpha_bot.llm.registry import get_llm_client
+from alpha_bot.skills.utils import build_prompt_blocks
 
 
 class {class_name}(BaseSkill):
@@ -190,7 +253,7 @@ class {class_name}(BaseSkill):
         super().__init__()
         self.system_prompt = """{escaped_prompt}"""
         try:
-            self.llm = OpenAIClient()
+            self.llm = get_llm_client()
         except Exception:
             self.llm = None
     
@@ -217,7 +280,7 @@ class {class_name}(BaseSkill):
         history = context.get('history', [])
         
         # Build user prompt with history
-        user_prompt = build_full_history_message(history, task)
+        user_prompt = build_prompt_blocks(history, task, context=context)
         
         # Call LLM to generate response
         try:
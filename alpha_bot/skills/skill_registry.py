@@ -0,0 +1,150 @@
+"""Skill Registry - lightweight descriptors for lazily loaded skills"""
+
+import asyncio
+import importlib
+import threading
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Type
+
+from loguru import logger
+
+from .base_skill import BaseSkill
+from ..models.types import SkillExecutionResponse
+
+
+@dataclass(frozen=True)
+class SkillDescriptor:
+    """
+    Everything the skill selector needs to know about a skill, without importing it
+
+    import_path has the form "package.module:ClassName".
+    """
+    name: str
+    capabilities: List[str] = field(default_factory=list)
+    description: str = ""
+    import_path: str = ""
+    fused: bool = False     # whether the class sets FUSED_RESPONSE_CLASS
+
+    def load_class(self) -> Type[BaseSkill]:
+        """Import and return the skill class"""
+        module_name, _, class_name = self.import_path.partition(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+
+
+class LazySkill:
+    """
+    Stand-in for a skill that is imported and constructed on first use
+
+    Exposes name, capabilities and get_description() from its descriptor so the
+    skill selector can list it; execute/aexecute (and any other attribute access)
+    load the real skill.
+    """
+
+    def __init__(self, descriptor: SkillDescriptor):
+        self._skill: Optional[BaseSkill] = None
+        self._lock = threading.Lock()
+        self.descriptor = descriptor
+        self.name = descriptor.name
+        self.capabilities = list(descriptor.capabilities)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the real skill has been constructed"""
+        return self._skill is not None
+
+    @property
+    def skill(self) -> BaseSkill:
+        """The real skill instance, constructed on first access"""
+        if self._skill is None:
+            with self._lock:
+                if self._skill is None:
+                    logger.debug(f"Loading skill {self.name} from {self.descriptor.import_path}")
+                    self._skill = self.descriptor.load_class()()
+        return self._skill
+
+    @property
+    def supports_fused_selection(self) -> bool:
+        return self.descriptor.fused
+
+    def get_capabilities(self) -> List[str]:
+        return self.capabilities
+
+    def get_description(self) -> str:
+        return self.descriptor.description
+
+    def execute(self, task: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> SkillExecutionResponse:
+        return self.skill.execute(task, context, **kwargs)
+
+    async def aexecute(self, task: str, context: Optional[Dict[str, Any]] = None, **kwargs) -> SkillExecutionResponse:
+        # Importing a skill module can be slow (bs4, python-pptx, ...), keep it off the event loop
+        if self._skill is None:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.skill)
+        return await self.skill.aexecute(task, context, **kwargs)
+
+    def reset(self):
+        """Reset the real skill; nothing to reset if it was never loaded"""
+        if self._skill is not None:
+            self._skill.reset()
+
+    def __getattr__(self, item):
+        # Only called for attributes not found on the proxy itself
+        if item.startswith("__") or item in ("_skill", "_lock", "descriptor"):
+            raise AttributeError(item)
+        return getattr(self.skill, item)
+
+    def __repr__(self) -> str:
+        return f"LazySkill({self.name!r}, loaded={self.is_loaded})"
+
+
+# Built-in skills, in registration order (the first one is the default skill).
+# Keep name/capabilities/description in sync with each class's get_capabilities/get_description.
+BUILTIN_SKILLS: List[SkillDescriptor] = [
+    SkillDescriptor(
+        name="CommandSkill",
+        capabilities=["command_generation"],
+        description="命令生成AI助手，专门生成和执行shell命令来完成任务",
+        import_path="alpha_bot.skills.command_skill:CommandSkill",
+        fused=True,
+    ),
+    SkillDescriptor(
+        name="DirectLLMSkill",
+        capabilities=["llm_processing"],
+        description="直接处理文本信息的AI助手，专门处理内容任务（翻译、总结、分析等），只能处理之前技能获取的纯文本信息",
+        import_path="alpha_bot.skills.direct_llm_skill:DirectLLMSkill",
+        fused=True,
+    ),
+    SkillDescriptor(
+        name="PPTSkill",
+        capabilities=["file_generation"],
+        description="专业PPT制作工具，可以根据需求创建PowerPoint演示文稿，支持自动生成标题页和内容页",
+        import_path="alpha_bot.skills.ppt_skill:PPTSkill",
+    ),
+    SkillDescriptor(
+        name="ImageSkill",
+        capabilities=["file_generation", "image_generation"],
+        description="AI图像生成工具，可以根据文字描述生成图片（支持DALL-E、Stable Diffusion等模型）",
+        import_path="alpha_bot.skills.image_skill:ImageSkill",
+    ),
+    SkillDescriptor(
+        name="BrowserSkill",
+        capabilities=["web_interaction", "web_automation", "browser_control"],
+        description=(
+            "BrowserSkill: 使用 Playwright 自动化 Chrome 浏览器操作，"
+            "包括网页导航、元素点击、表单填写、数据提取和截图等功能"
+        ),
+        import_path="alpha_bot.skills.browser_skill:BrowserSkill",
+    ),
+    SkillDescriptor(
+        name="WeChatSkill",
+        capabilities=["gui_automation"],
+        description="WeChat自动化助手：在macOS上通过AppleScript自动化WeChat桌面应用发送消息",
+        import_path="alpha_bot.skills.wechat_skill:WeChatSkill",
+    ),
+    SkillDescriptor(
+        name="FeishuSkill",
+        capabilities=["gui_automation"],
+        description="Feishu自动化助手：在macOS上通过AppleScript自动化Feishu/Lark桌面应用发送消息",
+        import_path="alpha_bot.skills.feishu_skill:FeishuSkill",
+    ),
+]
@@ -0,0 +1,251 @@
+"""Rule-based Skill Router - resolves confident skill selections without an LLM call"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Callable
+
+from loguru import logger
+
+from .base_skill import BaseSkill
+from ..models.types import ExecutionResult
+
+
+@dataclass
+class RouteDecision:
+    """Result of a routing rule (mirrors the SkillSelector tuple)"""
+    skill: Optional[BaseSkill]
+    confidence: float
+    reasoning: str
+    task_complete: bool = False
+    rule: str = ""
+
+
+# A rule inspects (task, skills, context) and returns a decision, or None to abstain
+RoutingRule = Callable[[str, List[BaseSkill], Dict[str, Any]], Optional[RouteDecision]]
+
+
+def _find_skill(skills: List[BaseSkill], name: str) -> Optional[BaseSkill]:
+    for skill in skills:
+        if skill.name.lower() == name.lower():
+            return skill
+    return None
+
+
+def direct_mode_rule(task: str, skills: List[BaseSkill], context: Dict[str, Any]) -> Optional[RouteDecision]:
+    """direct_mode（-l）：第一步交给 DirectLLMSkill，它给出回答后任务即完成"""
+    if not context.get('direct_mode'):
+        return None
+
+    last_result: Optional[ExecutionResult] = context.get('last_result')
+    if last_result and last_result.skill_response and last_result.skill_response.skill_name == "DirectLLMSkill" \
+            and last_result.skill_response.direct_response:
+        return RouteDecision(None, 1.0, "直接模式：DirectLLMSkill 已给出回答", task_complete=True)
+
+    skill = _find_skill(skills, "DirectLLMSkill")
+    if skill is None:
+        return None
+    return RouteDecision(skill, 1.0, "直接模式：使用 DirectLLMSkill 处理")
+
+
+class CompletedStepRule:
+    """
+    上一步命令执行成功，且技能没有给出下一步计划时，判定任务完成
+
+    只对响应格式中包含 next_step 的技能生效（其他技能的 next_step 恒为空）。
+
+    默认不启用：next_step 为空并不代表任务完成，例如"总结README.md文件"的第一步
+    cat README.md 没有下一步计划，但还需要 DirectLLMSkill 做总结。只在技能会明确
+    给出 next_step 的场景下通过 add_rule 注册。
+    """
+
+    def __init__(self, skill_names=("CommandSkill", "WeChatSkill")):
+        self.skill_names = set(skill_names)
+
+    def __call__(self, task: str, skills: List[BaseSkill], context: Dict[str, Any]) -> Optional[RouteDecision]:
+        last_result: Optional[ExecutionResult] = context.get('last_result')
+        if not last_result or not last_result.skill_response:
+            return None
+
+        response = last_result.skill_response
+        if response.skill_name not in self.skill_names:
+            return None
+        if last_result.command and last_result.success and not (response.next_step or "").strip():
+            return RouteDecision(None, 0.9, f"{response.skill_name} 的命令执行成功且没有下一步计划", task_complete=True)
+        return None
+
+
+class ExplicitPrefixRule:
+    """
+    任务以 @技能名 开头时直接使用该技能，例如 "@BrowserSkill 打开 github" 或 "@browser 打开 github"
+
+    只在第一步生效，后续步骤交给选择器根据执行进展判断。
+    """
+
+    def __init__(self, prefix: str = "@"):
+        self.prefix = prefix
+
+    def __call__(self, task: str, skills: List[BaseSkill], context: Dict[str, Any]) -> Optional[RouteDecision]:
+        if context.get('iteration', 1) > 1:
+            return None
+        stripped = task.lstrip()
+        if not stripped.startswith(self.prefix):
+            return None
+
+        parts = stripped[len(self.prefix):].split(maxsplit=1)
+        if not parts:
+            return None
+        requested = parts[0].rstrip(":：,，").lower()
+        for skill in skills:
+            name = skill.name.lower()
+            if requested in (name, name[:-len("skill")] if name.endswith("skill") else name):
+                return RouteDecision(skill, 1.0, f"任务显式指定了技能 {skill.name}")
+        return None
+
+
+class KeywordRule:
+    """
+    基于技能能力（get_capabilities）的关键词打分
+
+    每个命中的能力关键词计 1 分，技能名/别名命中计 2 分。只有唯一一个技能得分、
+    且得分足够高时才给出高置信度；否则交给 LLM 选择器。只在第一步生效。
+
+    任务涉及文件、路径或 shell 操作时（例如"把 ppt 目录下的文件打包成 zip"），
+    关键词只说明任务和某个技能有关，不代表该技能能完成它，交给 LLM 选择器。
+    """
+
+    # 文件名（README.md）、路径（./src、~/a、/tmp/x）
+    FILE_PATTERN = re.compile(r"[\w\-]+\.[a-z0-9]{1,5}\b|(?:^|\s)(?:~|\.{1,2})?/[\w.\-/]*")
+    URL_PATTERN = re.compile(r"(?:https?://|www\.)\S*")
+    SHELL_SIGNALS: List[str] = [
+        "目录", "文件", "路径", "打包", "压缩", "解压", "格式", "转成", "转换", "重命名", "复制", "移动",
+        "删除", "安装", "运行", "执行", "脚本", "zip", "tar", "grep", "ls", "cd",
+    ]
+
+    CAPABILITY_KEYWORDS: Dict[str, List[str]] = {
+        "command_generation": ["shell", "bash", "终端", "命令行"],
+        "llm_processing": ["翻译", "总结", "摘要", "润色", "translate", "summarize"],
+        "image_generation": ["图片", "图像", "image", "picture", "画一"],
+        "web_interaction": ["浏览器", "browser"],
+        "web_automation": ["网页", "网站", "http://", "https://"],
+        "browser_control": [],
+        "file_generation": [],
+        "gui_automation": ["发消息", "发送消息"],
+    }
+
+    SKILL_ALIASES: Dict[str, List[str]] = {
+        "PPTSkill": ["ppt", "幻灯片", "演示文稿", "powerpoint"],
+        "WeChatSkill": ["wechat", "微信"],
+        "FeishuSkill": ["feishu", "飞书", "lark"],
+    }
+
+    def _score(self, task: str, skill: BaseSkill) -> int:
+        score = 0
+        for capability in skill.get_capabilities():
+            score += sum(1 for keyword in self.CAPABILITY_KEYWORDS.get(capability, []) if keyword in task)
+        score += 2 * sum(1 for alias in self.SKILL_ALIASES.get(skill.name, []) if alias in task)
+        return score
+
+    def _has_shell_signal(self, text: str) -> bool:
+        # 网址中的域名和路径不算文件
+        text = self.URL_PATTERN.sub(" ", text)
+        if self.FILE_PATTERN.search(text):
+            return True
+        words = set(re.findall(r"[a-z]+", text))
+        return any(signal in words if signal.isascii() else signal in text for signal in self.SHELL_SIGNALS)
+
+    def __call__(self, task: str, skills: List[BaseSkill], context: Dict[str, Any]) -> Optional[RouteDecision]:
+        if context.get('iteration', 1) > 1:
+            return None
+
+        text = task.lower()
+        if self._has_shell_signal(text):
+            return None
+        scored = sorted(((self._score(text, skill), skill) for skill in skills), key=lambda item: -item[0])
+        if not scored or scored[0][0] == 0:
+            return None
+        best_score, best_skill = scored[0]
+        if len(scored) > 1 and scored[1][0] > 0:
+            # 多个技能都相关（例如"翻译这个网页"），需要 LLM 判断
+            return None
+        if best_skill.name == "DirectLLMSkill" and self.URL_PATTERN.search(text):
+            # DirectLLMSkill 无法自己获取网页内容，第一步需要先取数据
+            return None
+        confidence = min(0.95, 0.7 + 0.1 * best_score)
+        return RouteDecision(best_skill, confidence, f"任务关键词匹配 {best_skill.name} 的能力")
+
+
+class SkillRouter:
+    """
+    LLM 选择器之前的快速路由
+
+    按顺序执行规则，第一个置信度达到阈值的决策生效；都不满足时返回 None，
+    由 SkillSelector 走 LLM 选择。规则可以通过 add_rule 扩展。
+    """
+
+    def __init__(self, rules: Optional[List[RoutingRule]] = None, threshold: Optional[float] = None):
+        """
+        初始化路由器
+
+        Args:
+            rules: 路由规则列表，默认使用内置规则
+            threshold: 置信度阈值，默认读取 SKILL_ROUTER_THRESHOLD（0.85）
+        """
+        if rules is None:
+            # CompletedStepRule 默认不启用，见其说明
+            rules = [direct_mode_rule, ExplicitPrefixRule(), KeywordRule()]
+        self.rules: List[RoutingRule] = list(rules)
+        if threshold is None:
+            try:
+                threshold = float(os.getenv("SKILL_ROUTER_THRESHOLD", "0.85"))
+            except ValueError:
+                threshold = 0.85
+        self.threshold = threshold
+        self.enabled = os.getenv("SKILL_ROUTER_ENABLED", "true").lower() == "true"
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"routed": 0, "fallback": 0}
+
+    def add_rule(self, rule: RoutingRule, first: bool = False):
+        """注册一条路由规则"""
+        if first:
+            self.rules.insert(0, rule)
+        else:
+            self.rules.append(rule)
+
+    def route(self, task: str, skills: List[BaseSkill], context: Optional[Dict[str, Any]] = None) -> Optional[RouteDecision]:
+        """
+        尝试在本地决定技能
+
+        Returns:
+            RouteDecision，或 None（需要 LLM 选择器）
+        """
+        if not self.enabled:
+            return None
+
+        context = context or {}
+        for rule in self.rules:
+            try:
+                decision = rule(task, skills, context)
+            except Exception as e:
+                logger.warning(f"Skill routing rule {rule!r} failed: {e}")
+                continue
+            if decision is not None and decision.confidence >= self.threshold:
+                decision.rule = decision.rule or getattr(rule, "__name__", rule.__class__.__name__)
+                self._record(decision.rule)
+                logger.info(f"Skill routed by {decision.rule}: {decision.skill.name if decision.skill else 'task complete'} ({decision.confidence:.2f})")
+                return decision
+
+        self._record("fallback")
+        return None
+
+    def _record(self, key: str):
+        with self._lock:
+            if key != "fallback":
+                self.stats["routed"] += 1
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取路由统计（各规则命中次数和回退到 LLM 的次数）"""
+        with self._lock:
+            return dict(self.stats)
@@ -1,13 +1,16 @@
 """Intelligent Skill Selector using LLM"""
 
 import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 
 from loguru import logger
 
-from alpha_bot.llm.openai_client import OpenAIClient
+from alpha_bot.llm.registry import get_llm_client
+from ..llm.base import UserInput, build_messages
+from ..llm.usage import record_usage
+from ..auto_hint.system import defer_hint_usage, commit_hint_usage
 from .base_skill import BaseSkill
-from ..models.types import ExecutionResult
+from ..models.types import ExecutionResult, FusedSelectionResponse
 from .utils import build_full_history_message
 
 
@@ -22,6 +25,20 @@ class SkillSelector:
     3. Can switch skills dynamically during task execution
     """
     
+    SELECTION_RULES = """选择规则：
+1. 仔细分析任务的本质需求，和当前任务的进展情况
+2. 优先选择最专业的技能（例如：创建PPT就选PPTSkill，生成图片就选ImageSkill）
+3. 需要执行shell命令时，选择CommandSkill
+4. 需要直接处理文本（翻译、总结、分析等）时，选择DirectLLMSkill，如果任务有依赖的信息需要保证他依赖的数据已经准备完成（其他 skill 的 output 作为输入）
+5. confidence 应该反映你对选择的确信程度（0.0-1.0）
+6. 如果任务已经完成，设置task_complete为true，selected_skill为null或空字符串
+8. 参考之前的执行历史（包括思考过程和下一步计划）来做出更好的选择
+
+任务完成的判断标准：
+上一步执行技能的 命令输出 或者 直接响应 成功完成了 用户任务"""
+    
+    # 技能列表和规则在整个任务期间不变，放在前面；任务和执行上下文单独作为后面的片段
+    # （见 _selection_blocks），这样服务端前缀缓存可以覆盖整个技能列表
     SKILL_SELECTION_PROMPT = """你是一个智能技能选择器。根据用户任务和可用技能，选择最合适的技能来完成任务。
 
 可用技能列表：
@@ -35,22 +52,29 @@ class SkillSelector:
     "task_complete": false
 }}
 
-选择规则：
-1. 仔细分析任务的本质需求，和当前任务的进展情况
-2. 优先选择最专业的技能（例如：创建PPT就选PPTSkill，生成图片就选ImageSkill）
-3. 需要执行shell命令时，选择CommandSkill
-4. 需要直接处理文本（翻译、总结、分析等）时，选择DirectLLMSkill，如果任务有依赖的信息需要保证他依赖的数据已经准备完成（其他 skill 的 output 作为输入）
-5. confidence 应该反映你对选择的确信程度（0.0-1.0）
-6. 如果任务已经完成，设置task_complete为true，selected_skill为null或空字符串
-8. 参考之前的执行历史（包括思考过程和下一步计划）来做出更好的选择
+{selection_rules}"""
 
-任务完成的判断标准：
-上一步执行技能的 命令输出 或者 直接响应 成功完成了 用户任务
+    FUSED_SELECTION_PROMPT = """你是一个智能技能选择器和执行器。根据用户任务和可用技能，选择最合适的技能来完成任务；
+如果选中的技能在「可直接执行的技能」中，请同时按照该技能的说明，在 payload 字段中直接给出该技能的输出。
+
+可用技能列表：
+{skills_description}
+
+可直接执行的技能（payload 必须符合对应技能要求的 JSON 格式）：
+{fused_skills_description}
+
+你的回复必须是一个 JSON 对象，格式如下：
+{{
+    "selected_skill": "技能名称",
+    "confidence": 0.95,
+    "reasoning": "选择该技能的理由",
+    "task_complete": false,
+    "payload": {{"选中技能的 JSON 输出": "..."}}
+}}
 
-用户任务：{task}
+如果选中的技能不在「可直接执行的技能」中，或者任务已经完成，payload 设置为 null。
 
-当前执行上下文：
-{context}"""
+{selection_rules}"""
 
     def __init__(self):
         """
@@ -59,7 +83,9 @@ class SkillSelector:
         Args:
             llm_client: LLM client for intelligent selection
         """
-        self.llm = OpenAIClient()
+        self.llm = get_llm_client()
+        # Async client is borrowed lazily on first aselect_skill
+        self._allm = None
     
     def select_skill(
         self,
@@ -78,47 +104,211 @@ class SkillSelector:
         Returns:
             Tuple of (selected_skill, confidence, reasoning)
         """
-        # Build skills description for LLM
-        skills_description = self._build_skills_description(available_skills)
-        
-        # Build context description
-        context_description = self._build_context_description(context)
-        
-        # Create prompt
-        prompt = self.SKILL_SELECTION_PROMPT.format(
-            skills_description=skills_description,
-            task=task,
-            context=context_description
-        )
-        logger.info(f"Skill Selection LLM Prompt: {prompt}")
+        prompt = self._build_selection_prompt(task, available_skills, context)
         # Call LLM for skill selection
         try:
             response = self._call_llm_for_selection(prompt)
-            logger.info(f"Skill Selection LLM Response: {response}")
-            # Parse LLM response
-            selected_skill_name = response.get("selected_skill", "CommandSkill")
-            confidence = float(response.get("confidence", 0.8))
-            reasoning = response.get("reasoning", "LLM选择的技能")
-            task_complete = bool(response.get("task_complete", False))
-
-            if task_complete:
-                return None, confidence, reasoning, True
-
-            # Find the skill object
-            selected_skill = self._find_skill_by_name(available_skills, selected_skill_name)
-            
-            if selected_skill is None:
-                # Fallback to first skill (should be default CommandSkill)
-                selected_skill = available_skills[0]
-                confidence = 0.7
-                reasoning = f"未找到'{selected_skill_name}'，使用默认技能"
-            
-            return selected_skill, confidence, reasoning, task_complete
+            return self._parse_selection(response, available_skills)
+        except Exception as e:
+            # Fallback to first skill
+            return available_skills[0], 0.5, f"选择失败，使用默认技能: {str(e)}", False
+    
+    async def aselect_skill(
+        self,
+        task: str,
+        available_skills: List[BaseSkill],
+        context: Optional[Dict[str, Any]] = None
+    ) -> tuple[Optional[BaseSkill], float, str, bool]:
+        """
+        Coroutine variant of select_skill using the async LLM client
+        
+        Args:
+            task: Task description
+            available_skills: List of available skills
+            context: Execution context (history, iteration, etc.)
             
+        Returns:
+            Tuple of (selected_skill, confidence, reasoning, task_complete)
+        """
+        prompt = self._build_selection_prompt(task, available_skills, context)
+        try:
+            response = await self._acall_llm_for_selection(prompt)
+            return self._parse_selection(response, available_skills)
         except Exception as e:
             # Fallback to first skill
             return available_skills[0], 0.5, f"选择失败，使用默认技能: {str(e)}", False
     
+    def select_and_act(
+        self,
+        task: str,
+        available_skills: List[BaseSkill],
+        context: Optional[Dict[str, Any]] = None,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        max_fused_skills: int = 3
+    ) -> tuple[Optional[BaseSkill], float, str, bool, Optional[Dict[str, Any]]]:
+        """
+        Select a skill and produce its output in a single (streamed) LLM call
+        
+        Only skills with supports_fused_selection can be answered inline; for
+        other skills payload is None and the caller runs the skill as usual.
+        
+        Args:
+            task: Task description
+            available_skills: List of available skills
+            context: Execution context (history, iteration, etc.)
+            stream_callback: Optional streaming callback for real-time output
+            max_fused_skills: Max number of skills whose schemas are put in the prompt
+            
+        Returns:
+            Tuple of (selected_skill, confidence, reasoning, task_complete, payload)
+        """
+        system_prompt, prompt, hint_usage = self._build_fused_prompt(task, available_skills, context, max_fused_skills)
+        response = self.llm.generate(system_prompt, prompt, stream_callback, response_class=FusedSelectionResponse)
+        return self._parse_fused_selection(response, available_skills, hint_usage)
+    
+    async def aselect_and_act(
+        self,
+        task: str,
+        available_skills: List[BaseSkill],
+        context: Optional[Dict[str, Any]] = None,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        max_fused_skills: int = 3
+    ) -> tuple[Optional[BaseSkill], float, str, bool, Optional[Dict[str, Any]]]:
+        """Coroutine variant of select_and_act"""
+        if self._allm is None:
+            from alpha_bot.llm.registry import get_async_llm_client
+            self._allm = get_async_llm_client()
+        system_prompt, prompt, hint_usage = self._build_fused_prompt(task, available_skills, context, max_fused_skills)
+        response = await self._allm.agenerate(system_prompt, prompt, stream_callback, response_class=FusedSelectionResponse)
+        return self._parse_fused_selection(response, available_skills, hint_usage)
+    
+    def _build_fused_prompt(
+        self,
+        task: str,
+        available_skills: List[BaseSkill],
+        context: Optional[Dict[str, Any]],
+        max_fused_skills: int
+    ) -> Tuple[str, List[str], Dict[str, list]]:
+        """
+        Build (system_prompt, prompt blocks, hint usage) for the fused select-and-act call
+        
+        The hints each fused skill would put in its own prompt (static and auto
+        hints, see BaseSkill._build_hints_info) go into a block after the task.
+        Their usage is collected per skill and only recorded for the skill whose
+        payload is kept (see _parse_fused_selection).
+        """
+        fused_skills = [
+            skill for skill in available_skills
+            if getattr(skill, 'supports_fused_selection', False)
+        ][:max_fused_skills]
+        fused_skills_description = "\n\n".join(
+            f"### {skill.name}\n{skill.get_fused_instructions()}" for skill in fused_skills
+        ) or "无"
+        
+        prompt = self._selection_blocks(
+            self.FUSED_SELECTION_PROMPT.format(
+                selection_rules=self.SELECTION_RULES,
+                skills_description=self._build_skills_description(available_skills),
+                fused_skills_description=fused_skills_description
+            ),
+            task,
+            context
+        )
+        
+        # Hints depend on the task and the last result, so they go after the
+        # stable instructions block rather than into it
+        hint_sections = []
+        hint_usage: Dict[str, list] = {}
+        for skill in fused_skills:
+            with defer_hint_usage() as used:
+                hints_info = skill._build_hints_info(task, context)
+            hint_usage[skill.name] = used
+            if hints_info:
+                hint_sections.append(f"### {skill.name}\n{hints_info}")
+        if hint_sections:
+            prompt.insert(2, "可直接执行技能的提示：\n\n" + "\n\n".join(hint_sections))
+        
+        logger.info(f"Fused Skill Selection LLM Prompt: {chr(10).join(prompt)}")
+        return "You are a skill selector and executor. Always respond with valid JSON.", prompt, hint_usage
+    
+    def _parse_fused_selection(
+        self,
+        response: FusedSelectionResponse,
+        available_skills: List[BaseSkill],
+        hint_usage: Optional[Dict[str, list]] = None
+    ) -> tuple[Optional[BaseSkill], float, str, bool, Optional[Dict[str, Any]]]:
+        """Parse the fused response; payload is dropped for skills that cannot be answered inline"""
+        logger.info(f"Fused Skill Selection LLM Response: {response}")
+        if response.task_complete:
+            return None, response.confidence, response.reasoning, True, None
+        
+        selected_skill = self._find_skill_by_name(available_skills, response.selected_skill)
+        if selected_skill is None:
+            return available_skills[0], 0.7, f"未找到'{response.selected_skill}'，使用默认技能", False, None
+        
+        payload = response.payload if getattr(selected_skill, 'supports_fused_selection', False) else None
+        if payload is not None and hint_usage:
+            # The selected skill's hints went into this output
+            commit_hint_usage(hint_usage.get(selected_skill.name, []))
+        return selected_skill, response.confidence, response.reasoning, False, payload
+    
+    def _build_selection_prompt(
+        self,
+        task: str,
+        available_skills: List[BaseSkill],
+        context: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """Build the skill selection prompt blocks"""
+        # Build skills description for LLM
+        skills_description = self._build_skills_description(available_skills)
+        
+        # Create prompt
+        prompt = self._selection_blocks(
+            self.SKILL_SELECTION_PROMPT.format(
+                selection_rules=self.SELECTION_RULES,
+                skills_description=skills_description
+            ),
+            task,
+            context
+        )
+        logger.info(f"Skill Selection LLM Prompt: {chr(10).join(prompt)}")
+        return prompt
+    
+    def _selection_blocks(self, instructions: str, task: str, context: Optional[Dict[str, Any]]) -> List[str]:
+        """Selection prompt blocks, most stable first: skills and rules, task, execution context"""
+        return [
+            instructions,
+            f"用户任务：{task}",
+            f"当前执行上下文：\n{self._build_context_description(context)}",
+        ]
+    
+    def _parse_selection(
+        self,
+        response: Dict[str, Any],
+        available_skills: List[BaseSkill]
+    ) -> tuple[Optional[BaseSkill], float, str, bool]:
+        """Parse the LLM selection response into (skill, confidence, reasoning, task_complete)"""
+        logger.info(f"Skill Selection LLM Response: {response}")
+        # Parse LLM response
+        selected_skill_name = response.get("selected_skill", "CommandSkill")
+        confidence = float(response.get("confidence", 0.8))
+        reasoning = response.get("reasoning", "LLM选择的技能")
+        task_complete = bool(response.get("task_complete", False))
+
+        if task_complete:
+            return None, confidence, reasoning, True
+
+        # Find the skill object
+        selected_skill = self._find_skill_by_name(available_skills, selected_skill_name)
+        
+        if selected_skill is None:
+            # Fallback to first skill (should be default CommandSkill)
+            selected_skill = available_skills[0]
+            confidence = 0.7
+            reasoning = f"未找到'{selected_skill_name}'，使用默认技能"
+        
+        return selected_skill, confidence, reasoning, task_complete
+    
     def _build_skills_description(self, skills: List[BaseSkill]) -> str:
         """Build formatted description of all available skills"""
         descriptions = []
@@ -142,11 +332,11 @@ class SkillSelector:
         
         desc = f"- 当前步骤: 第{iteration}步\n"
         
-        desc += build_full_history_message(history, memory_bank=memory_bank)
+        desc += build_full_history_message(history, memory_bank=memory_bank, context=context)
         
         return desc
     
-    def _call_llm_for_selection(self, prompt: str) -> Dict[str, Any]:
+    def _call_llm_for_selection(self, prompt: UserInput) -> Dict[str, Any]:
         """
         Call LLM to get skill selection
         
@@ -156,38 +346,16 @@ class SkillSelector:
         Returns:
             Parsed JSON response
         """
-        from ..models.types import Message
-        
         # Real LLM call for skill selection
         try:
-            # Use a simple API call to get JSON response
-            messages = [
-                Message(role="system", content="You are a skill selector. Always respond with valid JSON."),
-                Message(role="user", content=prompt)
-            ]
-            
             # Call the LLM
             if hasattr(self.llm, 'client') and self.llm.client:
                 # OpenAI client
                 completion = self.llm.client.chat.completions.create(
-                    model=self.llm.model,
-                    messages=[{"role": m.role, "content": m.content} for m in messages],
-                    temperature=0.3,  # Lower temperature for more deterministic selection
-                    max_tokens=500
+                    **self._selection_request(prompt, self.llm.model)
                 )
-                response_text = completion.choices[0].message.content.strip()
-                
-                # Try to parse JSON from response
-                try:
-                    return json.loads(response_text)
-                except json.JSONDecodeError:
-                    # Try to extract JSON if wrapped in other text
-                    import re
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        return json.loads(json_match.group())
-                    else:
-                        raise ValueError(f"Cannot parse JSON from response: {response_text}")
+                record_usage(completion.usage)
+                return self._parse_json_response(completion.choices[0].message.content.strip())
             else:
                 # Fallback
                 return {
@@ -203,6 +371,56 @@ class SkillSelector:
                 "reasoning": f"LLM调用失败: {str(e)}，使用默认技能"
             }
     
+    async def _acall_llm_for_selection(self, prompt: UserInput) -> Dict[str, Any]:
+        """
+        Call the async LLM client to get skill selection
+        
+        Args:
+            prompt: Selection prompt
+            
+        Returns:
+            Parsed JSON response
+        """
+        try:
+            if self._allm is None:
+                from alpha_bot.llm.registry import get_async_llm_client
+                self._allm = get_async_llm_client()
+            completion = await self._allm.client.chat.completions.create(
+                **self._selection_request(prompt, self._allm.model)
+            )
+            record_usage(completion.usage)
+            return self._parse_json_response(completion.choices[0].message.content.strip())
+        except Exception as e:
+            return {
+                "selected_skill": "CommandSkill",
+                "confidence": 0.5,
+                "reasoning": f"LLM调用失败: {str(e)}，使用默认技能"
+            }
+    
+    def _selection_request(self, prompt: UserInput, model: str) -> Dict[str, Any]:
+        """Build chat completion arguments for a selection call"""
+        # Use a simple API call to get JSON response
+        return {
+            "model": model,
+            "messages": build_messages("You are a skill selector. Always respond with valid JSON.", prompt),
+            "temperature": 0.3,  # Lower temperature for more deterministic selection
+            "max_tokens": 500
+        }
+    
+    def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
+        """Parse the selection JSON, tolerating text around the object"""
+        # Try to parse JSON from response
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError:
+            # Try to extract JSON if wrapped in other text
+            import re
+            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            if json_match:
+                return json.loads(json_match.group())
+            else:
+                raise ValueError(f"Cannot parse JSON from response: {response_text}")
+    
     def _find_skill_by_name(self, skills: List[BaseSkill], name: str) -> Optional[BaseSkill]:
         """Find skill by name (case-insensitive)"""
         name_lower = name.lower()
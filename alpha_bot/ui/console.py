@@ -3,7 +3,6 @@
 from rich.live import Live
 from rich.panel import Panel
 from loguru import logger
-import re
 from contextlib import contextmanager
 from rich.console import Console
 from rich.panel import Panel
@@ -12,8 +11,10 @@ from rich.syntax import Syntax
 from rich.table import Table
 from rich.live import Live
 from rich.markdown import Markdown
+from rich.markup import escape
 
 from ..models.types import LLMResponse, ExecutionResult
+from .streaming_json import StreamingJSONParser
 from ..context.task_context import TaskContext
 
 
@@ -22,6 +23,7 @@ class ConsoleUI:
     
     def __init__(self):
         self.console = Console()
+        self._executing_status = None   # (status, label)，命令执行期间有效
     
     def print_welcome(self):
         """打印欢迎信息"""
@@ -52,86 +54,31 @@ class ConsoleUI:
         
         # 创建一个可变的内容容器
         class StreamingContent:
+            BROWSER_KEYWORDS = ('playwright', 'browser', 'chromium', '浏览器', 'goto', 'page.')
+
             def __init__(self):
-                self.buffer = ""
-                self.thinking = ""
-                self.command = ""
-                self.explanation = ""
-                self.next_step = ""
-                self.error_analysis = ""
-                self.direct_response = ""
-                self.code = ""
-                self.title = ""
-                self.outline = ""
-                                
-                # 记录每个字段当前已显示的长度
-                self.thinking_displayed = 0
-                self.command_displayed = 0
-                self.explanation_displayed = 0
-                self.next_step_displayed = 0
-                self.error_analysis_displayed = 0
-                self.direct_response_displayed = 0
-                self.code_displayed = 0
-                self.title_displayed = 0
-            
+                self.parser = StreamingJSONParser()
+                self.is_browser_task = False
+                self._tail = ""
+
             def add_token(self, token: str):
-                """添加新的 token 并实时提取字段内容"""
-                self.buffer += token
-                self._extract_fields()
-            
-            def _extract_fields(self):
-                """实时提取各个字段的内容（支持部分内容）"""
-                # 提取 thinking 字段
-                thinking_match = re.search(r'"thinking"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if thinking_match:
-                    raw_content = thinking_match.group(1)
-                    self.thinking = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 error_analysis 字段
-                error_match = re.search(r'"error_analysis"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if error_match:
-                    raw_content = error_match.group(1)
-                    self.error_analysis = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 command 字段
-                command_match = re.search(r'"command"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if command_match:
-                    raw_content = command_match.group(1)
-                    self.command = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 explanation 字段
-                explanation_match = re.search(r'"explanation"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if explanation_match:
-                    raw_content = explanation_match.group(1)
-                    self.explanation = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 next_step 字段
-                next_step_match = re.search(r'"next_step"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if next_step_match:
-                    raw_content = next_step_match.group(1)
-                    self.next_step = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 direct_response 字段
-                direct_response_match = re.search(r'"direct_response"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if direct_response_match:
-                    raw_content = direct_response_match.group(1)
-                    self.direct_response = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 code 字段
-                code_match = re.search(r'"code"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if code_match:
-                    raw_content = code_match.group(1)
-                    self.code = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 PPT skill title 字段
-                title_match = re.search(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if title_match:
-                    raw_content = title_match.group(1)
-                    self.title = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+                """添加新的 token 并增量解析字段内容"""
+                self.parser.feed(token)
+                if not self.is_browser_task:
+                    # 只检查新 token（带上一段尾部，处理跨 token 的关键词）
+                    window = (self._tail + token).lower()
+                    self.is_browser_task = any(keyword in window for keyword in self.BROWSER_KEYWORDS)
+                    self._tail = window[-16:]
 
-                outline_start_pos = self.buffer.find('"outline"')
-                if outline_start_pos != -1:
-                    self.outline = self.buffer[outline_start_pos:]
+            def __getattr__(self, name):
+                # thinking / command / code ... 直接读取解析器中的字段
+                if name in StreamingJSONParser.DEFAULT_FIELDS or name in StreamingJSONParser.DEFAULT_RAW_FIELDS:
+                    return self.parser.get(name)
+                raise AttributeError(name)
+
+            def __rich__(self):
+                # Live 按刷新频率渲染，不必每个 token 都重建显示内容
+                return self.get_display()
 
             def get_display(self):
                 """获取显示内容 - 只显示新增的内容"""
@@ -202,11 +149,8 @@ class ConsoleUI:
                 
                 # 如果什么都没有，显示思考中（带浏览器提示）
                 if not panels:
-                    # 检测是否是浏览器相关任务（根据buffer内容判断）
-                    is_browser_task = any(keyword in self.buffer.lower() for keyword in 
-                                         ['playwright', 'browser', 'chromium', '浏览器', 'goto', 'page.'])
-                    
-                    if is_browser_task:
+                    # 检测是否是浏览器相关任务（根据已收到的内容判断）
+                    if self.is_browser_task:
                         loading_text = "🌐 正在生成浏览器自动化代码..."
                     else:
                         loading_text = "💭 思考中..."
@@ -222,10 +166,9 @@ class ConsoleUI:
         
         content = StreamingContent()
         
-        with Live(content.get_display(), console=self.console, refresh_per_second=10, screen=False) as live:
+        with Live(content, console=self.console, refresh_per_second=10, screen=False):
             def update_callback(token: str):
                 content.add_token(token)
-                live.update(content.get_display())
             
             yield update_callback
     
@@ -234,11 +177,24 @@ class ConsoleUI:
         """显示命令执行中的动画"""
         # 截断过长的命令用于显示
         display_cmd = command if len(command) <= 50 else command[:47] + "..."
-        with self.console.status(
-            f"[bold yellow]⚙️  正在执行:[/bold yellow] [dim]{display_cmd}[/dim]",
-            spinner="bouncingBall"
-        ) as status:
-            yield status
+        label = f"[bold yellow]⚙️  正在执行:[/bold yellow] [dim]{display_cmd}[/dim]"
+        with self.console.status(label, spinner="bouncingBall") as status:
+            self._executing_status = (status, label)
+            try:
+                yield status
+            finally:
+                self._executing_status = None
+    
+    def print_output_chunk(self, stream: str, text: str):
+        """命令执行中的实时输出：在执行动画下方显示最新一行"""
+        current = self._executing_status
+        lines = [line for line in text.splitlines() if line.strip()]
+        if current is None or not lines:
+            return
+        status, label = current
+        last_line = lines[-1] if len(lines[-1]) <= 100 else lines[-1][:97] + "..."
+        style = "red" if stream == "stderr" else "dim"
+        status.update(f"{label}\n[{style}]{escape(last_line)}[/{style}]")
     
     def print_response(self, response: LLMResponse, skip_all: bool = False):
         """
@@ -261,6 +217,16 @@ class ConsoleUI:
                 padding=(1, 2)
             ))
         
+        # 批量模式：多条并行执行的独立命令
+        commands = getattr(response, 'commands', None) or []
+        if commands:
+            self.console.print(Panel(
+                Syntax("\n".join(commands), "bash", theme="monokai", line_numbers=True, word_wrap=True),
+                title=f"[bold green]✨ 生成的命令（{len(commands)} 条并行执行）[/bold green]",
+                border_style="green",
+                padding=(0, 1)
+            ))
+        
         # 生成的命令 - 高亮显示
         if response.command:
             self.console.print(Panel(
@@ -392,6 +358,10 @@ class ConsoleUI:
         table.add_row("成功命令", str(sum(1 for r in context.history if r.success)))
         table.add_row("失败命令", str(sum(1 for r in context.history if not r.success)))
         table.add_row("状态", context.status.value)
+        usage = getattr(context, 'usage', None)
+        if usage and usage.calls:
+            table.add_row("LLM 调用", str(usage.calls))
+            table.add_row("Prompt tokens", f"{usage.prompt_tokens}（缓存命中 {usage.cached_tokens}，{usage.cache_hit_rate:.0%}）")
         
         self.console.print(table)
     
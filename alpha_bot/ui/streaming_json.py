@@ -0,0 +1,223 @@
+"""Streaming JSON field parser - 逐 token 解析 LLM 的 JSON 响应，增量输出各字段内容"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 字符串中可以整段跳过的普通字符
+_PLAIN_CHARS = re.compile(r'[^"\\]+')
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+
+class StreamingJSONParser:
+    """
+    增量 JSON 字段解析器
+
+    以状态机方式处理每个 token，只扫描新到达的字符，总耗时与响应长度成线性关系
+    （原来的做法是每个 token 都对整个 buffer 重新跑一遍正则并重新反转义）。
+
+    - fields 中的字段：取第一次出现的字符串值，反转义后增量输出
+    - raw_fields 中的字段：从键名开始原样输出后续全部文本（例如 PPT 的 outline）
+
+    允许 JSON 前后有多余内容（例如 ```json 代码块标记），第一个 { 之前的内容会被忽略。
+
+    get / values / buffer 不修改解析状态，只读取只追加的片段列表，
+    可以在 feed 所在线程之外调用（例如 rich Live 的刷新线程）。
+    """
+
+    DEFAULT_FIELDS = (
+        "thinking", "command", "explanation", "next_step", "error_analysis",
+        "direct_response", "code", "title",
+    )
+    DEFAULT_RAW_FIELDS = ("outline",)
+
+    def __init__(self, fields: Iterable[str] = DEFAULT_FIELDS, raw_fields: Iterable[str] = DEFAULT_RAW_FIELDS):
+        self.fields = tuple(fields)
+        self.raw_fields = tuple(raw_fields)
+        self._parts: Dict[str, List[str]] = {name: [] for name in self.fields + self.raw_fields}
+        # 已拼接部分的缓存：{字段名: (已拼接的片段数, 拼接结果)}
+        self._joined: Dict[str, Tuple[int, str]] = {}
+        self._chunks: List[str] = []
+        self._joined_buffer: Tuple[int, str] = (0, "")
+        self.length = 0
+
+        self._stack: List[str] = []
+        self._started = False
+        self._in_string = False
+        self._is_key = False
+        self._expect_key = False
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[str] = None
+        self._key_parts: List[str] = []
+        self._last_key: Optional[str] = None
+        self._value_key: Optional[str] = None
+        self._active_field: Optional[str] = None
+        self._seen_fields = set()
+        self._raw_active: List[str] = []
+
+    def feed(self, chunk: str) -> Dict[str, str]:
+        """
+        处理一段新文本
+
+        Returns:
+            本次新增的内容，{字段名: 增量文本}，只包含有变化的字段
+        """
+        deltas: Dict[str, str] = {}
+        if not chunk:
+            return deltas
+        self._chunks.append(chunk)
+        self.length += len(chunk)
+
+        # 已经开始的原样字段，整段追加
+        for name in self._raw_active:
+            self._append(name, chunk, deltas)
+
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._in_string:
+                if self._escape or self._unicode is not None:
+                    i = self._consume_escape(chunk, i, deltas)
+                    continue
+                match = _PLAIN_CHARS.match(chunk, i)
+                if match:
+                    self._on_string_text(match.group(), deltas)
+                    i = match.end()
+                    continue
+                if chunk[i] == '\\':
+                    self._escape = True
+                else:
+                    self._end_string(chunk, i + 1, deltas)
+                i += 1
+                continue
+
+            char = chunk[i]
+            i += 1
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._stack.append('{')
+                    self._expect_key = True
+                continue
+            if not self._stack:
+                continue    # 根对象已经结束
+            if char == '"':
+                self._start_string()
+            elif char in '{[':
+                self._stack.append(char)
+                self._expect_key = char == '{'
+                self._value_key = None
+            elif char in '}]':
+                self._stack.pop()
+                self._expect_key = False
+                self._value_key = None
+            elif char == ',':
+                self._expect_key = self._stack[-1] == '{'
+                self._value_key = None
+            elif char == ':':
+                self._expect_key = False
+                self._value_key = self._last_key
+        return deltas
+
+    def _start_string(self):
+        self._in_string = True
+        self._is_key = self._expect_key
+        if self._is_key:
+            self._key_parts = []
+            return
+        name, self._value_key = self._value_key, None
+        if name in self.fields and name not in self._seen_fields:
+            self._seen_fields.add(name)
+            self._active_field = name
+
+    def _end_string(self, chunk: str, end: int, deltas: Dict[str, str]):
+        if self._high_surrogate is not None:
+            self._on_string_text("", deltas)
+        self._in_string = False
+        self._active_field = None
+        if not self._is_key:
+            return
+        self._last_key = "".join(self._key_parts)
+        name = self._last_key
+        if name in self.raw_fields and name not in self._seen_fields:
+            # 从键名开始原样输出（本 chunk 中键名之后的部分也要带上）
+            self._seen_fields.add(name)
+            self._raw_active.append(name)
+            self._append(name, f'"{name}"' + chunk[end:], deltas)
+
+    def _on_string_text(self, text: str, deltas: Dict[str, str]):
+        if self._high_surrogate is not None:
+            # 孤立的高位代理项，原样保留
+            text, self._high_surrogate = self._high_surrogate + text, None
+        if self._is_key:
+            self._key_parts.append(text)
+        elif self._active_field is not None:
+            self._append(self._active_field, text, deltas)
+
+    def _consume_escape(self, chunk: str, i: int, deltas: Dict[str, str]) -> int:
+        """处理转义序列（可能跨 token），返回新的位置"""
+        if self._unicode is None:
+            char = chunk[i]
+            self._escape = False
+            if char == 'u':
+                self._unicode = ""
+                return i + 1
+            self._on_string_text(_ESCAPES.get(char, char), deltas)
+            return i + 1
+
+        needed = 4 - len(self._unicode)
+        self._unicode += chunk[i:i + needed]
+        i += min(needed, len(chunk) - i)
+        if len(self._unicode) < 4:
+            return i
+
+        try:
+            code = int(self._unicode, 16)
+        except ValueError:
+            code = 0xFFFD
+        self._unicode = None
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = chr(code)
+        elif 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            high, self._high_surrogate = ord(self._high_surrogate), None
+            self._on_string_text(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)), deltas)
+        else:
+            self._on_string_text(chr(code), deltas)
+        return i
+
+    def _append(self, name: str, text: str, deltas: Dict[str, str]):
+        if not text:
+            return
+        self._parts[name].append(text)
+        deltas[name] = deltas.get(name, "") + text
+
+    @staticmethod
+    def _join(parts: List[str], cached: Tuple[int, str]) -> Tuple[int, str]:
+        """在缓存结果后拼接新增片段（先取长度，并发追加的片段留给下一次）"""
+        count = len(parts)
+        done, value = cached
+        if count > done:
+            value += "".join(parts[done:count])
+        return count, value
+
+    def get(self, name: str) -> str:
+        """获取字段当前的完整内容"""
+        parts = self._parts.get(name)
+        if not parts:
+            return ""
+        # 只替换缓存，不改动 _parts：feed 在另一个线程中追加的片段不会丢失
+        joined = self._join(parts, self._joined.get(name, (0, "")))
+        self._joined[name] = joined
+        return joined[1]
+
+    @property
+    def values(self) -> Dict[str, str]:
+        """所有字段的当前完整内容"""
+        return {name: self.get(name) for name in self._parts}
+
+    @property
+    def buffer(self) -> str:
+        """到目前为止收到的全部原始文本"""
+        self._joined_buffer = self._join(self._chunks, self._joined_buffer)
+        return self._joined_buffer[1]
@@ -0,0 +1,397 @@
+"""Async Web Server for Alpha-Bot UI - asyncio/ASGI backend (alpha-bot --web --async)
+
+The threaded server (web/server.py) runs tasks on a fixed pool of worker threads.
+Here tasks run as asyncio tasks (AlphaBot.arun) on a fixed number of worker
+coroutines; both share the scheduler in web/scheduler.py (bounded queue, priority
+lanes, per-session limit, pooled agents). Socket.IO runs on python-socketio's ASGI
+server, served by uvicorn.
+"""
+
+import os
+import json
+import asyncio
+from datetime import datetime
+from dataclasses import asdict
+from typing import Dict, Any, Optional, Callable, Awaitable
+from urllib.parse import parse_qs
+
+from loguru import logger
+
+from ..agent import AlphaBot
+from ..llm.registry import get_llm_registry
+from .scheduler import BATCH, INTERACTIVE, ScheduledTask, SessionAgentPool, TaskScheduler, _env_int
+from .history import history_page
+from .server import TaskHistoryMixin, WebUIWrapper
+from .streaming import StreamingFrameEmitter
+
+
+WEB_DIR = os.path.dirname(__file__)
+
+
+class EmitQueue:
+    """
+    Thread-safe, back-pressured Socket.IO emitter
+
+    emit() can be called from the event loop or from executor threads (commands,
+    skill callbacks); events are handed to a single sender coroutine. When more than
+    high_water events are waiting, streaming_delta frames are dropped: clients detect
+    the sequence gap and request a snapshot, so nothing is lost, the UI just skips frames.
+    Live command_output chunks are dropped too; the execution_result event still
+    carries the command's output.
+    """
+
+    DROPPABLE_EVENTS = {'streaming_delta', 'command_output'}
+
+    def __init__(self, sio, high_water: Optional[int] = None):
+        self.sio = sio
+        self.high_water = high_water or _env_int("WEB_EMIT_HIGH_WATER", 1000)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._sender = self.loop.create_task(self._send_loop())
+
+    async def stop(self):
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+
+    def emit(self, event: str, data: Optional[dict] = None, room: Optional[str] = None, to: Optional[str] = None):
+        """Queue an event (same signature subset as SocketIO.emit)"""
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._enqueue, (event, data, to or room))
+
+    def _enqueue(self, item):
+        if item[0] in self.DROPPABLE_EVENTS and self._queue.qsize() >= self.high_water:
+            self.dropped += 1
+            return
+        self._queue.put_nowait(item)
+
+    async def _send_loop(self):
+        while True:
+            event, data, to = await self._queue.get()
+            try:
+                await self.sio.emit(event, data, to=to)
+                self.sent += 1
+            except Exception as e:
+                logger.warning(f"Socket.IO emit {event} failed: {e}")
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+class AsyncTaskPool:
+    """
+    Fixed number of worker coroutines running tasks in TaskScheduler order
+
+    run(task) is awaited for each dispatched task; workers sleep on an event that is
+    set whenever a task is queued or finishes.
+    """
+
+    def __init__(self, scheduler: TaskScheduler, run: Callable[[ScheduledTask], Awaitable[Any]]):
+        self.scheduler = scheduler
+        self.run = run
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers = []
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.scheduler.max_running)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, session_id: str, payload: Any, lane: str = INTERACTIVE) -> Optional[ScheduledTask]:
+        """
+        Queue a task
+
+        Returns:
+            The scheduled task, or None if the queue is full (the caller should reject it)
+        """
+        task = self.scheduler.submit(session_id, payload, lane)
+        if task is not None and self._wakeup is not None:
+            self._wakeup.set()
+        return task
+
+    async def _worker(self):
+        while True:
+            task = self.scheduler.next_task()
+            if task is None:
+                # Nothing dispatchable; no await between next_task() and clear(), so no wakeup is lost
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                await self.run(task)
+            except Exception as e:
+                logger.opt(exception=e).error("Web task failed")
+            finally:
+                self.scheduler.done(task)
+                # A finished task may unblock a waiting task of the same session
+                self._wakeup.set()
+
+
+class AsyncWebUI(TaskHistoryMixin):
+    """Web UI on an asyncio event loop: same pages, REST API and Socket.IO events as WebUI"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        import socketio
+
+        self.sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+        # TaskHistoryMixin and WebUIWrapper emit through self.socketio
+        self.socketio = EmitQueue(self.sio)
+        self.scheduler = TaskScheduler(max_workers, max_queue)
+        self.agents = SessionAgentPool(self._create_agent, on_evict=self._forget_session)
+        self.pool = AsyncTaskPool(self.scheduler, self._run_task)
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.active_streams: Dict[str, StreamingFrameEmitter] = {}
+        self._load_task_history()
+        self._index_html: Optional[str] = None
+
+        self._setup_socket_handlers()
+        self.app = socketio.ASGIApp(
+            self.sio,
+            other_asgi_app=self._http_app,
+            static_files={'/static': os.path.join(WEB_DIR, 'static')},
+            on_startup=self._startup,
+            on_shutdown=self._shutdown,
+        )
+
+    async def _startup(self):
+        self.socketio.start()
+        self.pool.start()
+        if self.agents.sweeps:
+            self._sweeper = asyncio.create_task(self._sweep_agents())
+        logger.info(
+            f"Async web server started with {self.scheduler.max_running} workers, queue size {self.scheduler.max_queue}"
+        )
+
+    async def _shutdown(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        await self.pool.stop()
+        await self.socketio.stop()
+        # 所有会话共享同一个 LLM 连接池，服务退出时统一关闭
+        await get_llm_registry().aclose()
+
+    async def _sweep_agents(self):
+        """Evict idle agents periodically, acquire/release alone never expire an idle server's agents"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.agents.sweep_interval)
+            try:
+                # Evicted agents are closed (browser, shell), keep it off the event loop
+                await loop.run_in_executor(None, self.agents.evict)
+            except Exception as e:
+                logger.warning(f"Periodic agent eviction failed: {e}")
+
+    # ------------------------------------------------------------------ tasks
+
+    @staticmethod
+    def _create_agent() -> AlphaBot:
+        agent = AlphaBot(auto_execute=True)
+        # Many sessions run concurrently, keep their console output out of the server terminal
+        agent.ui.console.quiet = True
+        return agent
+
+    def _forget_session(self, session_id: str):
+        """Drop per-session state once the agent pool has evicted the session"""
+        if not self.scheduler.session_busy(session_id):
+            self.active_streams.pop(session_id, None)
+
+    def admit(self, session_id: str, task: str, lane: str = INTERACTIVE) -> Dict[str, Any]:
+        """Queue a task for a session, returns the status sent back to the client"""
+        scheduled = self.pool.submit(session_id, task, lane)
+        if scheduled is None:
+            return {'status': 'rejected', 'message': 'Server is busy, please retry later',
+                    'queue_depth': self.scheduler.queue_depth}
+        return {'status': 'queued', 'session_id': session_id, 'lane': scheduled.lane,
+                'queue_depth': self.scheduler.queue_depth}
+
+    async def _run_task(self, scheduled: ScheduledTask):
+        loop = asyncio.get_running_loop()
+        session_id, task = scheduled.session_id, scheduled.payload
+        # Acquiring may create an AlphaBot or close evicted ones (browser, shell), keep it off the event loop
+        agent = await loop.run_in_executor(None, self.agents.acquire, session_id)
+        start_time = datetime.now()
+        web_ui_wrapper = WebUIWrapper(agent.ui, session_id, self.socketio, self)
+        original_ui, original_skill_manager_ui = agent.ui, agent.skill_manager.ui
+        agent.ui = agent.skill_manager.ui = web_ui_wrapper
+        try:
+            context = await agent.arun(task)
+            self.socketio.emit('task_complete', {
+                'session_id': session_id,
+                'status': context.status.value,
+                'summary': {
+                    'iterations': context.iteration,
+                    'success_count': sum(1 for r in context.history if r.success),
+                    'failure_count': sum(1 for r in context.history if not r.success),
+                    'llm_usage': context.usage.to_dict()
+                }
+            })
+            await loop.run_in_executor(
+                None, self._save_task_from_context, session_id, context, start_time, web_ui_wrapper.execution_log
+            )
+        except Exception as e:
+            logger.opt(exception=e).error(f"Task failed for session {session_id}")
+            await loop.run_in_executor(
+                None, self._save_task_error, session_id, task, start_time, e, web_ui_wrapper.execution_log
+            )
+            self.socketio.emit('error', {'session_id': session_id, 'message': str(e)})
+        finally:
+            agent.ui, agent.skill_manager.ui = original_ui, original_skill_manager_ui
+            await loop.run_in_executor(None, self.agents.release, session_id, agent)
+
+    def stop(self, session_id: str) -> bool:
+        """Drop queued tasks of the session and ask its running agents to stop"""
+        removed = self.scheduler.cancel_queued(session_id)
+        running = self.agents.running_agents(session_id)
+        for agent in running:
+            agent.cancelled = True
+        return bool(removed or running)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'scheduler': self.scheduler.get_stats(),
+            'agents': self.agents.get_stats(),
+            'emit_pending': self.socketio.pending,
+            'emit_sent': self.socketio.sent,
+            'emit_dropped': self.socketio.dropped,
+        }
+
+    # -------------------------------------------------------------- socket.io
+
+    def _setup_socket_handlers(self):
+        sio = self.sio
+
+        @sio.event
+        async def connect(sid, environ):
+            logger.debug(f"Client connected: {sid}")
+
+        @sio.event
+        async def disconnect(sid):
+            logger.debug(f"Client disconnected: {sid}")
+
+        @sio.on('run_task_request')
+        async def run_task_request(sid, data):
+            task = data.get('task', '')
+            session_id = data.get('session_id', sid)
+            if not task:
+                await sio.emit('error', {'session_id': session_id, 'message': 'Task is required'}, to=sid)
+                return
+            result = self.admit(session_id, task, data.get('priority', INTERACTIVE))
+            if result['status'] == 'queued':
+                await sio.emit('task_queued', {
+                    'session_id': session_id, 'lane': result['lane'], 'queue_depth': result['queue_depth']
+                }, to=sid)
+            else:
+                await sio.emit('error', {'session_id': session_id, 'message': result['message']}, to=sid)
+
+        @sio.on('stop_task_request')
+        async def stop_task_request(sid, data):
+            session_id = data.get('session_id')
+            if self.stop(session_id):
+                self.socketio.emit('task_cancelled', {'session_id': session_id, 'message': 'Task cancellation requested'})
+            else:
+                await sio.emit('info', {'session_id': session_id, 'message': 'No active task found to stop'}, to=sid)
+
+        @sio.on('streaming_resync')
+        async def streaming_resync(sid, data):
+            session_id = data.get('session_id')
+            stream = self.active_streams.get(session_id)
+            if stream is not None:
+                await sio.emit('streaming_snapshot', {'session_id': session_id, **stream.snapshot()}, to=sid)
+
+    # ------------------------------------------------------------------- http
+
+    def _render_index(self) -> str:
+        if self._index_html is None:
+            from jinja2 import Environment, FileSystemLoader
+            env = Environment(loader=FileSystemLoader(os.path.join(WEB_DIR, 'templates')))
+            env.globals['url_for'] = lambda endpoint, filename='': f"/{endpoint}/{filename}"
+            self._index_html = env.get_template('index_refactored.html').render()
+        return self._index_html
+
+    async def _http_app(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        try:
+            status, payload = await self._route(
+                scope['method'], scope['path'], parse_qs(scope.get('query_string', b'').decode()), body
+            )
+        except Exception as e:
+            logger.opt(exception=e).error(f"{scope['method']} {scope['path']} failed")
+            status, payload = 500, {'error': str(e)}
+
+        if isinstance(payload, str):
+            content_type, data = b'text/html; charset=utf-8', payload.encode('utf-8')
+        else:
+            content_type, data = b'application/json', json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', content_type), (b'content-length', str(len(data)).encode())]})
+        await send({'type': 'http.response.body', 'body': data})
+
+    async def _route(self, method: str, path: str, query: Dict[str, list], body: bytes):
+        path = path.rstrip('/') or '/'
+        if method == 'GET' and path == '/':
+            return 200, self._render_index()
+        if method == 'GET' and path == '/test':
+            return 200, 'Test route working!'
+        if method == 'GET' and path == '/api/stats':
+            return 200, self.get_stats()
+        if method == 'POST' and path == '/api/run':
+            data = json.loads(body or b'{}')
+            if not data.get('task'):
+                return 400, {'error': 'Task is required'}
+            # REST callers are usually scripts, so they default to the batch lane
+            result = self.admit(data.get('session_id', 'default'), data['task'], data.get('priority', BATCH))
+            return (202 if result['status'] == 'queued' else 503), result
+        if method == 'POST' and path == '/api/history/clear':
+            self.history.clear()
+            return 200, {'message': 'Task history cleared successfully'}
+        if method == 'GET' and path == '/api/history':
+            args = {key: values[0] for key, values in query.items()}
+            return 200, history_page(self.history, args)
+        if path.startswith('/api/history/'):
+            task_id = path[len('/api/history/'):]
+            if method == 'GET':
+                task_record = self.history.get(task_id)
+                return (200, asdict(task_record)) if task_record else (404, {'error': 'Task not found'})
+            if method == 'DELETE':
+                if not self.history.delete(task_id):
+                    return 404, {'error': 'Task not found'}
+                return 200, {'message': 'Task deleted successfully'}
+        return 404, {'error': 'Not found'}
+
+
+def create_async_app(max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+    """Create the ASGI application (Socket.IO + REST API + static files)"""
+    return AsyncWebUI(max_workers, max_queue).app
+
+
+def run_async_web_server(host='localhost', port=5000, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+    """Run the async web server with uvicorn"""
+    import uvicorn
+
+    app = create_async_app(max_workers, max_queue)
+    print(f"Starting Alpha-Bot Web UI (async) at http://{host}:{port}")
+    uvicorn.run(app, host=host, port=port, log_level="warning")
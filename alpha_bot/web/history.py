@@ -0,0 +1,292 @@
+"""Task history store for the web UI - SQLite (WAL), execution logs stored out of line"""
+
+import os
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+@dataclass
+class TaskRecord:
+    """Data class for storing task execution records"""
+    id: str
+    task: str
+    status: str
+    start_time: str
+    end_time: str
+    duration: float
+    iterations: int
+    success_count: int
+    failure_count: int
+    execution_log: List[Dict[str, Any]]
+    summary: Dict[str, Any]
+    created_at: str = None
+    record_id: int = None       # unique per task; id is the session id and repeats
+
+
+_COLUMNS = (
+    "record_id", "id", "task", "status", "start_time", "end_time", "duration",
+    "iterations", "success_count", "failure_count", "summary", "created_at",
+)
+
+
+@dataclass
+class HistoryConfig:
+    """Task history retention configuration"""
+    path: Optional[str] = None      # SQLite 文件路径，默认 ~/.alpha_bot/task_history.sqlite3
+    max_age_days: float = 30.0      # 超过天数的记录被删除，<= 0 表示不按时间清理
+    max_records: int = 10000        # 最多保留的记录数，<= 0 表示不限制
+    max_log_mb: float = 200.0       # 执行日志总体积上限（MB），<= 0 表示不限制
+
+    @classmethod
+    def from_env(cls) -> "HistoryConfig":
+        """从环境变量加载配置"""
+        config = cls()
+        path = os.getenv("WEB_HISTORY_PATH")
+        config.path = os.path.expanduser(path) if path else None
+        try:
+            config.max_age_days = float(os.getenv("WEB_HISTORY_MAX_AGE_DAYS", config.max_age_days))
+            config.max_records = int(os.getenv("WEB_HISTORY_MAX_RECORDS", config.max_records))
+            config.max_log_mb = float(os.getenv("WEB_HISTORY_MAX_LOG_MB", config.max_log_mb))
+        except ValueError:
+            logger.warning("Invalid task history configuration in environment, using defaults")
+        return config
+
+
+class TaskHistoryStore:
+    """
+    Append-only task history
+
+    Each completed task is one INSERT (no rewrite of earlier records). Listing
+    reads only the summary columns, with filters and pagination done by SQLite;
+    execution logs live in a separate table and are loaded only for the detail view.
+    Retention drops the oldest records by age, count and total log size.
+    """
+
+    RETENTION_EVERY = 50    # appends between retention passes
+
+    def __init__(self, config: Optional[HistoryConfig] = None):
+        self.config = config or HistoryConfig.from_env()
+        self.path = self.config.path or str(Path.home() / ".alpha_bot" / "task_history.sqlite3")
+        self._lock = threading.Lock()
+        self._appends = 0
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "record_id INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, task TEXT NOT NULL, "
+            "status TEXT, start_time TEXT, end_time TEXT, duration REAL, iterations INTEGER, "
+            "success_count INTEGER, failure_count INTEGER, summary TEXT, created_at TEXT, "
+            "log_size INTEGER NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS task_logs (record_id INTEGER PRIMARY KEY, execution_log TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_tasks_start ON tasks(start_time);"
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, start_time);"
+            "CREATE INDEX IF NOT EXISTS idx_tasks_session ON tasks(id);"
+        )
+        self._conn.commit()
+        self.apply_retention()
+
+    # ----------------------------------------------------------------- writes
+
+    def append(self, record: TaskRecord) -> int:
+        """Store a task record, returns its record_id"""
+        log = json.dumps(record.execution_log or [], ensure_ascii=False)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO tasks (id, task, status, start_time, end_time, duration, iterations, "
+                "success_count, failure_count, summary, created_at, log_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.id, record.task, record.status, record.start_time, record.end_time,
+                    record.duration, record.iterations, record.success_count, record.failure_count,
+                    json.dumps(record.summary or {}, ensure_ascii=False),
+                    record.created_at or datetime.now().isoformat(), len(log.encode("utf-8")),
+                )
+            )
+            record.record_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO task_logs (record_id, execution_log) VALUES (?, ?)", (record.record_id, log)
+            )
+            self._conn.commit()
+            self._appends += 1
+            if self._appends % self.RETENTION_EVERY == 0:
+                self._apply_retention()
+        return record.record_id
+
+    def delete(self, task_id: str) -> bool:
+        """Delete a record by record_id, or every record of a session id"""
+        with self._lock:
+            where, params = self._match(task_id)
+            ids = [row[0] for row in self._conn.execute(f"SELECT record_id FROM tasks WHERE {where}", params)]
+            self._delete_ids(ids)
+            self._conn.commit()
+        return bool(ids)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.execute("DELETE FROM task_logs")
+            self._conn.commit()
+
+    def apply_retention(self) -> int:
+        """Drop records past max_age_days, beyond max_records or over max_log_mb, returns how many"""
+        with self._lock:
+            removed = self._apply_retention()
+        if removed:
+            logger.debug(f"Task history retention removed {removed} records")
+        return removed
+
+    def _apply_retention(self) -> int:
+        ids: List[int] = []
+        if self.config.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.config.max_age_days)).isoformat()
+            ids += [row[0] for row in self._conn.execute(
+                "SELECT record_id FROM tasks WHERE start_time < ?", (cutoff,)
+            )]
+        if self.config.max_records > 0:
+            # Newest first: everything after max_records goes
+            ids += [row[0] for row in self._conn.execute(
+                "SELECT record_id FROM tasks ORDER BY record_id DESC LIMIT -1 OFFSET ?", (self.config.max_records,)
+            )]
+        if self.config.max_log_mb > 0:
+            budget = int(self.config.max_log_mb * 1024 * 1024)
+            used = 0
+            for record_id, size in self._conn.execute("SELECT record_id, log_size FROM tasks ORDER BY record_id DESC"):
+                used += size
+                if used > budget:
+                    ids.append(record_id)
+        ids = sorted(set(ids))
+        self._delete_ids(ids)
+        self._conn.commit()
+        return len(ids)
+
+    def _delete_ids(self, ids: List[int]):
+        params = [(record_id,) for record_id in ids]
+        self._conn.executemany("DELETE FROM tasks WHERE record_id = ?", params)
+        self._conn.executemany("DELETE FROM task_logs WHERE record_id = ?", params)
+
+    def import_json(self, path: str) -> int:
+        """Import a legacy task_history.json (list of TaskRecord dicts), returns how many"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        records = [TaskRecord(**{k: v for k, v in item.items() if k != 'record_id'}) for item in data]
+        for record in sorted(records, key=lambda r: r.start_time or ""):
+            self.append(record)
+        return len(records)
+
+    # ------------------------------------------------------------------ reads
+
+    def query(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> Tuple[List[TaskRecord], int]:
+        """
+        List records newest first, without execution logs
+
+        Args:
+            since / until: ISO timestamps compared with start_time
+            search: substring of the task text (case-insensitive)
+
+        Returns:
+            (records of the page, total matching records)
+        """
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since:
+            clauses.append("start_time >= ?")
+            params.append(since)
+        if until:
+            clauses.append("start_time <= ?")
+            params.append(until)
+        if search:
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("task LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        page, per_page = max(page, 1), max(per_page, 1)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM tasks{where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM tasks{where} ORDER BY start_time DESC, record_id DESC "
+                "LIMIT ? OFFSET ?",
+                params + [per_page, (page - 1) * per_page]
+            ).fetchall()
+        return [self._to_record(row) for row in rows], total
+
+    def get(self, task_id: str, with_log: bool = True) -> Optional[TaskRecord]:
+        """Get a record by record_id, or the latest record of a session id"""
+        with self._lock:
+            where, params = self._match(task_id)
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM tasks WHERE {where} ORDER BY record_id DESC LIMIT 1", params
+            ).fetchone()
+            if row is None:
+                return None
+            record = self._to_record(row)
+            if with_log:
+                log_row = self._conn.execute(
+                    "SELECT execution_log FROM task_logs WHERE record_id = ?", (record.record_id,)
+                ).fetchone()
+                record.execution_log = json.loads(log_row[0]) if log_row else []
+        return record
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    @staticmethod
+    def _match(task_id: str) -> Tuple[str, tuple]:
+        # Numeric ids are record ids; anything else is a session id (what older clients send)
+        if str(task_id).isdigit():
+            return "record_id = ?", (int(task_id),)
+        return "id = ?", (task_id,)
+
+    @staticmethod
+    def _to_record(row) -> TaskRecord:
+        values = dict(zip(_COLUMNS, row))
+        values['summary'] = json.loads(values['summary']) if values['summary'] else {}
+        return TaskRecord(execution_log=[], **values)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def history_page(store: TaskHistoryStore, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    /api/history response for query arguments (shared by both web servers)
+
+    Supports page, per_page, status, since, until and q.
+    """
+    page = int(args.get('page') or 1)
+    per_page = min(int(args.get('per_page') or 20), 200)
+    records, total = store.query(
+        page, per_page,
+        status=args.get('status') or None,
+        since=args.get('since') or None,
+        until=args.get('until') or None,
+        search=args.get('q') or None,
+    )
+    return {
+        'tasks': [asdict(record) for record in records],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'total_pages': (total + per_page - 1) // per_page
+    }
@@ -0,0 +1,397 @@
+"""Task scheduling for the web servers - global cap, per-session limits, priority lanes, agent pool"""
+
+import os
+import time
+import threading
+import itertools
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)    # in priority order
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass
+class ScheduledTask:
+    """A task waiting for (or holding) a worker slot"""
+    session_id: str
+    payload: Any
+    lane: str = INTERACTIVE
+    seq: int = 0
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+    @property
+    def wait_time(self) -> float:
+        return (self.started_at or time.monotonic()) - self.submitted_at
+
+
+class WaitStats:
+    """Queue wait time of one lane (count, mean, max and recent percentiles)"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def _percentile(self, p: float) -> float:
+        if not self.recent:
+            return 0.0
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(p * len(values)))]
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self._percentile(0.5),
+            'p95': self._percentile(0.95),
+        }
+
+
+class TaskScheduler:
+    """
+    Admission and dispatch order for web tasks (execution is up to the caller)
+
+    - at most max_running tasks hold a worker slot at once
+    - at most session_limit of them belong to the same session
+    - interactive tasks are dispatched before batch tasks; FIFO within a lane
+    - at most max_queue tasks wait; submit() returns None beyond that
+
+    Thread-safe: the threaded server's worker threads and the async server's
+    worker coroutines both call next_task() / done().
+    """
+
+    def __init__(
+        self,
+        max_running: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        session_limit: Optional[int] = None
+    ):
+        """
+        Args:
+            max_running: global cap on running tasks, default WEB_MAX_WORKERS (32)
+            max_queue: waiting tasks across lanes, default WEB_MAX_QUEUE (256)
+            session_limit: running tasks per session, default WEB_SESSION_MAX_INFLIGHT (1)
+        """
+        self.max_running = max_running or _env_int("WEB_MAX_WORKERS", 32)
+        self.max_queue = max_queue or _env_int("WEB_MAX_QUEUE", 256)
+        self.session_limit = session_limit or _env_int("WEB_SESSION_MAX_INFLIGHT", 1)
+        self._lock = threading.Lock()
+        self._lanes: Dict[str, List[ScheduledTask]] = {lane: [] for lane in LANES}
+        self._running: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_stats: Dict[str, WaitStats] = {lane: WaitStats() for lane in LANES}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(tasks) for tasks in self._lanes.values())
+
+    def submit(self, session_id: str, payload: Any, lane: str = INTERACTIVE) -> Optional[ScheduledTask]:
+        """
+        Queue a task
+
+        Returns:
+            The scheduled task, or None if the queue is full
+        """
+        if lane not in self._lanes:
+            lane = INTERACTIVE
+        with self._lock:
+            if self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                return None
+            task = ScheduledTask(session_id, payload, lane, next(self._seq))
+            self._lanes[lane].append(task)
+            return task
+
+    def next_task(self) -> Optional[ScheduledTask]:
+        """
+        Take the next dispatchable task and give it a worker slot
+
+        Returns:
+            None if all slots are busy or every waiting task's session is at its limit
+        """
+        with self._lock:
+            if self.running >= self.max_running:
+                return None
+            for lane in LANES:
+                tasks = self._lanes[lane]
+                for index, task in enumerate(tasks):
+                    if self._running.get(task.session_id, 0) < self.session_limit:
+                        del tasks[index]
+                        task.started_at = time.monotonic()
+                        self.wait_stats[lane].record(task.wait_time)
+                        self._running[task.session_id] = self._running.get(task.session_id, 0) + 1
+                        self.running += 1
+                        return task
+            return None
+
+    def done(self, task: ScheduledTask):
+        """Release the worker slot held by a task"""
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            remaining = self._running.get(task.session_id, 0) - 1
+            if remaining > 0:
+                self._running[task.session_id] = remaining
+            else:
+                self._running.pop(task.session_id, None)
+
+    def cancel_queued(self, session_id: str) -> int:
+        """Drop a session's waiting tasks, returns how many were removed"""
+        with self._lock:
+            removed = 0
+            for lane in LANES:
+                kept = [task for task in self._lanes[lane] if task.session_id != session_id]
+                removed += len(self._lanes[lane]) - len(kept)
+                self._lanes[lane] = kept
+            return removed
+
+    def session_busy(self, session_id: str) -> bool:
+        """Whether the session has running or waiting tasks"""
+        with self._lock:
+            return self._running.get(session_id, 0) > 0 or any(
+                task.session_id == session_id for tasks in self._lanes.values() for task in tasks
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'max_workers': self.max_running,
+                'max_queue': self.max_queue,
+                'session_limit': self.session_limit,
+                'running': self.running,
+                'queue_depth': self.queue_depth,
+                'queued_by_lane': {lane: len(tasks) for lane, tasks in self._lanes.items()},
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'wait_time': {lane: stats.to_dict() for lane, stats in self.wait_stats.items()},
+            }
+
+
+class SessionAgentPool:
+    """
+    Live AlphaBot instances per session, bounded by count and idle time
+
+    Each running task borrows an agent (acquire/release). Idle agents are kept for
+    reuse until they have been idle for idle_ttl seconds, or until more than
+    max_agents exist, in which case the least recently used idle ones are dropped.
+    Agents that are in use are never evicted. Dropped agents are closed (close(),
+    if they have one) so their shell sessions and thread pools do not outlive them.
+
+    acquire/release evict as a side effect; without traffic nothing would expire,
+    so the servers also call evict every sweep_interval seconds (start_sweeper on
+    a timer thread, or a background task on the async server).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_agents: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+        sweep_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            factory: creates a new agent
+            max_agents: live agents across sessions, default WEB_MAX_AGENTS (64)
+            idle_ttl: seconds an idle agent is kept, default WEB_SESSION_IDLE_TTL (1800)
+            on_evict: called with the session id when its last agent is dropped
+            sweep_interval: seconds between periodic evictions, default WEB_SESSION_SWEEP_INTERVAL (60)
+        """
+        self.factory = factory
+        self.max_agents = max_agents or _env_int("WEB_MAX_AGENTS", 64)
+        self.idle_ttl = idle_ttl if idle_ttl is not None else _env_float("WEB_SESSION_IDLE_TTL", 1800)
+        self.sweep_interval = sweep_interval if sweep_interval is not None else _env_float("WEB_SESSION_SWEEP_INTERVAL", 60)
+        self.on_evict = on_evict
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+        self._lock = threading.Lock()
+        # (session_id, id(agent)) -> (agent, last_used), least recently used first
+        self._idle: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._in_use: Dict[str, List[Any]] = {}
+        self.created = 0
+        self.evicted = 0
+
+    def acquire(self, session_id: str) -> Any:
+        """Borrow an idle agent of the session, or create one"""
+        with self._lock:
+            key = next((key for key in reversed(self._idle) if key[0] == session_id), None)
+            agent = self._idle.pop(key)[0] if key is not None else None
+        if agent is None:
+            agent = self.factory()
+            self.created += 1
+        with self._lock:
+            self._in_use.setdefault(session_id, []).append(agent)
+        self.evict()
+        return agent
+
+    def release(self, session_id: str, agent: Any):
+        """Return a borrowed agent"""
+        with self._lock:
+            agents = self._in_use.get(session_id, [])
+            if agent in agents:
+                agents.remove(agent)
+            if not agents:
+                self._in_use.pop(session_id, None)
+            self._idle[(session_id, id(agent))] = (agent, time.monotonic())
+        self.evict()
+
+    def running_agents(self, session_id: str) -> List[Any]:
+        """Agents currently borrowed by the session"""
+        with self._lock:
+            return list(self._in_use.get(session_id, []))
+
+    def evict(self):
+        """Drop idle agents past idle_ttl, then least recently used ones above max_agents"""
+        now = time.monotonic()
+        dropped = []
+        with self._lock:
+            for key, (agent, last_used) in list(self._idle.items()):
+                if self.idle_ttl > 0 and now - last_used > self.idle_ttl:
+                    dropped.append((key, agent))
+                    del self._idle[key]
+            live = len(self._idle) + sum(len(agents) for agents in self._in_use.values())
+            while live > self.max_agents and self._idle:
+                key, (agent, _) = self._idle.popitem(last=False)
+                dropped.append((key, agent))
+                live -= 1
+            self.evicted += len(dropped)
+            gone = {
+                session_id for (session_id, _), _ in dropped
+                if session_id not in self._in_use and not any(key[0] == session_id for key in self._idle)
+            }
+        for _, agent in dropped:
+            self._close(agent)
+        for session_id in gone:
+            logger.debug(f"Evicted idle web session {session_id}")
+            if self.on_evict:
+                self.on_evict(session_id)
+
+    @property
+    def sweeps(self) -> bool:
+        """Whether periodic eviction is needed: idle agents expire and an interval is set"""
+        return self.idle_ttl > 0 and self.sweep_interval > 0
+
+    def start_sweeper(self):
+        """Call evict every sweep_interval seconds on a daemon thread (threaded server)"""
+        if self._sweeper is not None or not self.sweeps:
+            return
+        self._sweeper_stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="agent-pool-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the sweeper thread started by start_sweeper"""
+        self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _sweep_loop(self):
+        while not self._sweeper_stop.wait(self.sweep_interval):
+            try:
+                self.evict()
+            except Exception as e:
+                logger.warning(f"Periodic agent eviction failed: {e}")
+
+    @staticmethod
+    def _close(agent: Any):
+        close = getattr(agent, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"Failed to close evicted agent: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle) + sum(len(agents) for agents in self._in_use.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'live_agents': len(self._idle) + sum(len(agents) for agents in self._in_use.values()),
+                'idle_agents': len(self._idle),
+                'busy_sessions': len(self._in_use),
+                'max_agents': self.max_agents,
+                'created': self.created,
+                'evicted': self.evicted,
+            }
+
+
+class WorkerThreadPool:
+    """
+    Fixed worker threads running tasks in scheduler order (threaded server)
+
+    run(task) is called on a worker thread for each dispatched task.
+    """
+
+    def __init__(self, scheduler: TaskScheduler, run: Callable[[ScheduledTask], None]):
+        self.scheduler = scheduler
+        self.run = run
+        self._wakeup = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"web-worker-{i}", daemon=True)
+            for i in range(scheduler.max_running)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session_id: str, payload: Any, lane: str = INTERACTIVE) -> Optional[ScheduledTask]:
+        task = self.scheduler.submit(session_id, payload, lane)
+        if task is not None:
+            self.notify()
+        return task
+
+    def notify(self):
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._wakeup:
+                task = self.scheduler.next_task()
+                while task is None:
+                    self._wakeup.wait()
+                    task = self.scheduler.next_task()
+            try:
+                self.run(task)
+            except Exception as e:
+                logger.opt(exception=e).error("Web task failed")
+            finally:
+                self.scheduler.done(task)
+                # A finished task may unblock a waiting task of the same session
+                self.notify()
@@ -9,6 +9,11 @@ class AlphaBotWebUI {
         this.currentStreamingElement = null;
         this.skillSelectionElement = null;
         this.syntaxHighlightTimeout = null;
+        // Current LLM stream: fields are rebuilt from per-field deltas (see web/streaming.py)
+        this.stream = { id: null, seq: 0, fields: {}, resyncPending: false, renderPending: false };
+        // Live output of the running command (command_output events)
+        this.liveOutputElement = null;
+        this.liveOutputLimit = 20000;
         
         this.initializeElements();
         this.setupEventListeners();
@@ -53,6 +58,8 @@ class AlphaBotWebUI {
     setupSocketHandlers() {
         this.socket.on('connect', () => {
             console.log('Connected to server');
+            // Late join / reconnect: pick up a stream that is already in progress
+            this.requestStreamResync();
         });
         
         this.socket.on('task_history_updated', () => {
@@ -88,6 +95,9 @@ class AlphaBotWebUI {
             if (data.command) {
                 content += `<div class="panel panel-updating"><div class="panel-title">⚙️ Generated Command</div><pre class="shell-command"><code class="language-bash">${this.escapeHtml(data.command)}</code></pre></div>`;
             }
+            if (data.commands && data.commands.length) {
+                content += `<div class="panel"><div class="panel-title">⚙️ Generated Commands (${data.commands.length}, run in parallel)</div><pre class="shell-command"><code class="language-bash">${this.escapeHtml(data.commands.join('\n'))}</code></pre></div>`;
+            }
             if (data.explanation) {
                 content += `<div class="panel"><div class="panel-title">💬 Explanation</div>${this.escapeHtml(data.explanation)}</div>`;
             }
@@ -113,6 +123,7 @@ class AlphaBotWebUI {
         
         this.socket.on('execution_result', (data) => {
             if (data.session_id !== this.sessionId) return;
+            this.liveOutputElement = null;
             
             if (!window.lastExecutedCommand || window.lastExecutedCommand !== data.command) {
                 window.lastExecutedCommand = data.command;
@@ -152,63 +163,40 @@ class AlphaBotWebUI {
             this.submitBtn.disabled = false;
         });
         
-        // Real-time streaming updates
-        this.socket.on('streaming_update', (data) => {
+        // Real-time streaming updates: per-field deltas with sequence numbers
+        this.socket.on('task_queued', (data) => {
             if (data.session_id !== this.sessionId) return;
-            
-            let content = '';
-            
-            if (data.thinking) {
-                content += `<div class="panel"><div class="panel-title">💡 Thinking Process</div>${this.escapeHtml(data.thinking)}</div>`;
-            }
-            
-            if (data.command) {
-                content += `<div class="panel panel-updating"><div class="panel-title">⚙️ Generated Command</div><pre class="shell-command"><code class="language-bash">${this.escapeHtml(data.command)}</code></pre></div>`;
-            }
-            
-            if (data.explanation) {
-                content += `<div class="panel"><div class="panel-title">💬 Explanation</div>${this.escapeHtml(data.explanation)}</div>`;
-            }
-            
-            if (data.next_step) {
-                content += `<div class="panel"><div class="panel-title">📋 Next Step</div>${this.escapeHtml(data.next_step)}</div>`;
-            }
-            
-            if (data.direct_response) {
-                content += `<div class="panel"><div class="panel-title">💡 AI Response</div>${this.escapeHtml(data.direct_response)}</div>`;
+            if (data.queue_depth > 0) {
+                this.addLogEntry('Queued', `Waiting for a free worker (${data.queue_depth} task(s) in queue)`, 'info-message');
             }
-            
-            if (data.error_analysis) {
-                content += `<div class="panel"><div class="panel-title">🔍 Error Analysis</div>${this.escapeHtml(data.error_analysis)}</div>`;
+        });
+        
+        this.socket.on('streaming_started', (data) => {
+            if (data.session_id !== this.sessionId) return;
+            this.stream = { id: data.stream_id, seq: 0, fields: {}, resyncPending: false, renderPending: false };
+        });
+        
+        this.socket.on('streaming_delta', (data) => {
+            if (data.session_id !== this.sessionId) return;
+            if (data.stream_id !== this.stream.id || data.seq !== this.stream.seq + 1) {
+                // Missed a frame (or joined mid-stream): ask for the full values
+                this.requestStreamResync();
+                return;
             }
-            
-            if (data.code) {
-                content += `<div class="panel panel-updating"><div class="panel-title">💻 Generated Code</div><pre class="python-code"><code class="language-python">${this.escapeHtml(data.code)}</code></pre></div>`;
+            this.stream.seq = data.seq;
+            for (const [field, delta] of Object.entries(data.deltas)) {
+                this.stream.fields[field] = (this.stream.fields[field] || '') + delta;
             }
-            
-            if (content) {
-                if (!this.currentStreamingElement) {
-                    this.currentStreamingElement = document.createElement('div');
-                    this.currentStreamingElement.className = 'log-entry response-generated';
-                    const timestamp = new Date().toLocaleTimeString();
-                    this.currentStreamingElement.innerHTML = `
-                        <div class="log-header">
-                            <div class="log-title">Streaming Update</div>
-                            <div class="log-timestamp">${timestamp}</div>
-                        </div>
-                        <div id="streaming-content">${content}</div>
-                    `;
-                    this.outputContainer.appendChild(this.currentStreamingElement);
-                } else {
-                    const contentDiv = this.currentStreamingElement.querySelector('#streaming-content');
-                    if (contentDiv) {
-                        contentDiv.innerHTML = content;
-                    }
-                }
-                
-                this.debounceSyntaxHighlight();
-                this.outputContainer.scrollTop = this.outputContainer.scrollHeight;
+            this.scheduleStreamRender();
+        });
+        
+        this.socket.on('streaming_snapshot', (data) => {
+            if (data.session_id !== this.sessionId) return;
+            if (data.stream_id !== this.stream.id) {
+                this.currentStreamingElement = null;
             }
+            this.stream = { id: data.stream_id, seq: data.seq, fields: data.values, resyncPending: false, renderPending: false };
+            this.scheduleStreamRender();
         });
         
         this.socket.on('thinking_started', (data) => {
@@ -226,7 +214,21 @@ class AlphaBotWebUI {
                 this.skillSelectionElement.remove();
                 this.skillSelectionElement = null;
             }
-            this.addLogEntry('Executing Command', `Running: <strong>${this.escapeHtml(data.command)}</strong>`, 'info-message');
+            const entry = this.addLogEntry('Executing Command', `Running: <strong>${this.escapeHtml(data.command)}</strong>`, 'info-message');
+            this.liveOutputElement = document.createElement('div');
+            this.liveOutputElement.className = 'command-output';
+            this.liveOutputElement.style.display = 'none';
+            entry.querySelector('.log-content').appendChild(this.liveOutputElement);
+        });
+        
+        this.socket.on('command_output', (data) => {
+            if (data.session_id !== this.sessionId || !this.liveOutputElement) return;
+            // Keep only the latest output in the page, the final result has the rest
+            const text = (this.liveOutputElement.textContent + data.text).slice(-this.liveOutputLimit);
+            this.liveOutputElement.textContent = text;
+            this.liveOutputElement.style.display = '';
+            this.liveOutputElement.scrollTop = this.liveOutputElement.scrollHeight;
+            this.outputContainer.scrollTop = this.outputContainer.scrollHeight;
         });
         
         this.socket.on('skill_selection_started', (data) => {
@@ -286,6 +288,78 @@ class AlphaBotWebUI {
         });
     }
     
+    requestStreamResync() {
+        if (this.stream.resyncPending) return;
+        this.stream.resyncPending = true;
+        this.socket.emit('streaming_resync', { session_id: this.sessionId });
+    }
+    
+    scheduleStreamRender() {
+        // Render at most once per animation frame
+        if (this.stream.renderPending) return;
+        this.stream.renderPending = true;
+        requestAnimationFrame(() => {
+            this.stream.renderPending = false;
+            this.renderStream(this.stream.fields);
+        });
+    }
+    
+    renderStream(data) {
+        let content = '';
+        
+        if (data.thinking) {
+            content += `<div class="panel"><div class="panel-title">💡 Thinking Process</div>${this.escapeHtml(data.thinking)}</div>`;
+        }
+        
+        if (data.command) {
+            content += `<div class="panel panel-updating"><div class="panel-title">⚙️ Generated Command</div><pre class="shell-command"><code class="language-bash">${this.escapeHtml(data.command)}</code></pre></div>`;
+        }
+        
+        if (data.explanation) {
+            content += `<div class="panel"><div class="panel-title">💬 Explanation</div>${this.escapeHtml(data.explanation)}</div>`;
+        }
+        
+        if (data.next_step) {
+            content += `<div class="panel"><div class="panel-title">📋 Next Step</div>${this.escapeHtml(data.next_step)}</div>`;
+        }
+        
+        if (data.direct_response) {
+            content += `<div class="panel"><div class="panel-title">💡 AI Response</div>${this.escapeHtml(data.direct_response)}</div>`;
+        }
+        
+        if (data.error_analysis) {
+            content += `<div class="panel"><div class="panel-title">🔍 Error Analysis</div>${this.escapeHtml(data.error_analysis)}</div>`;
+        }
+        
+        if (data.code) {
+            content += `<div class="panel panel-updating"><div class="panel-title">💻 Generated Code</div><pre class="python-code"><code class="language-python">${this.escapeHtml(data.code)}</code></pre></div>`;
+        }
+        
+        if (content) {
+            if (!this.currentStreamingElement) {
+                this.currentStreamingElement = document.createElement('div');
+                this.currentStreamingElement.className = 'log-entry response-generated';
+                const timestamp = new Date().toLocaleTimeString();
+                this.currentStreamingElement.innerHTML = `
+                    <div class="log-header">
+                        <div class="log-title">Streaming Update</div>
+                        <div class="log-timestamp">${timestamp}</div>
+                    </div>
+                    <div id="streaming-content">${content}</div>
+                `;
+                this.outputContainer.appendChild(this.currentStreamingElement);
+            } else {
+                const contentDiv = this.currentStreamingElement.querySelector('#streaming-content');
+                if (contentDiv) {
+                    contentDiv.innerHTML = content;
+                }
+            }
+            
+            this.debounceSyntaxHighlight();
+            this.outputContainer.scrollTop = this.outputContainer.scrollHeight;
+        }
+    }
+    
     executeTask() {
         const task = this.taskInput.value.trim();
         if (!task) {
@@ -356,6 +430,7 @@ class AlphaBotWebUI {
         
         this.outputContainer.appendChild(entryDiv);
         this.outputContainer.scrollTop = this.outputContainer.scrollHeight;
+        return entryDiv;
     }
     
     loadTaskHistory() {
@@ -404,7 +479,7 @@ class AlphaBotWebUI {
                 </div>
             `;
                     
-            taskElement.addEventListener('click', () => this.showTaskDetail(task.id));
+            taskElement.addEventListener('click', () => this.showTaskDetail(task.record_id || task.id));
             this.taskHistoryList.appendChild(taskElement);
         });
     }
@@ -0,0 +1,81 @@
+"""Streaming updates for the web UI - per-field deltas, coalesced into frames"""
+
+import os
+import time
+import uuid
+import threading
+from typing import Callable, Dict, Optional
+
+from ..ui.streaming_json import StreamingJSONParser
+
+
+def _default_interval() -> float:
+    """Frame interval from WEB_STREAM_HZ (default 20 frames per second, <= 0 sends every token)"""
+    try:
+        hz = float(os.getenv("WEB_STREAM_HZ", "20"))
+    except ValueError:
+        hz = 20.0
+    return 1.0 / hz if hz > 0 else 0.0
+
+
+class StreamingFrameEmitter:
+    """
+    Turns an LLM token stream into delta frames for Socket.IO
+
+    Events (all carry stream_id):
+        streaming_delta     {seq, deltas: {field: appended text}}
+        streaming_snapshot  {seq, values: {field: full text}}   (reply to a resync request)
+        streaming_end       {seq}
+
+    Tokens are parsed incrementally and coalesced: at most one frame per interval,
+    plus a final frame when the stream closes. seq increases by one per frame, so a
+    client that sees a gap (or joins late) asks for a snapshot instead of guessing.
+    """
+
+    def __init__(self, emit: Callable[[str, dict], None], interval: Optional[float] = None):
+        """
+        Args:
+            emit: callback(event_type, data) used to send events
+            interval: minimum seconds between frames, defaults to 1 / WEB_STREAM_HZ
+        """
+        self.emit = emit
+        self.interval = _default_interval() if interval is None else interval
+        self.stream_id = uuid.uuid4().hex[:12]
+        self.parser = StreamingJSONParser()
+        self.seq = 0
+        self.closed = False
+        self._pending: Dict[str, str] = {}
+        self._last_flush = float("-inf")    # the first frame goes out immediately
+        self._lock = threading.Lock()
+
+    def add_token(self, token: str):
+        """Parse a token and send a frame if the interval has elapsed"""
+        with self._lock:
+            for name, delta in self.parser.feed(token).items():
+                self._pending[name] = self._pending.get(name, "") + delta
+            if self._pending and time.monotonic() - self._last_flush >= self.interval:
+                self._flush()
+
+    def _flush(self):
+        self.seq += 1
+        deltas, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        self.emit('streaming_delta', {'stream_id': self.stream_id, 'seq': self.seq, 'deltas': deltas})
+
+    def snapshot(self) -> dict:
+        """Full current values, for late joiners and clients that missed a frame"""
+        with self._lock:
+            # Pending deltas go out first so the snapshot's seq covers everything in it
+            if self._pending:
+                self._flush()
+            return {'stream_id': self.stream_id, 'seq': self.seq, 'values': self.parser.values}
+
+    def close(self):
+        """Send any pending deltas and mark the stream finished"""
+        with self._lock:
+            if self.closed:
+                return
+            if self._pending:
+                self._flush()
+            self.closed = True
+            self.emit('streaming_end', {'stream_id': self.stream_id, 'seq': self.seq})
@@ -35,6 +35,10 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        # asyncio Web 后端：alpha-bot --web --async
+        "web-async": ["python-socketio>=5.0.0", "uvicorn>=0.20.0"],
+    },
     entry_points={
         "console_scripts": [
             "alpha-bot=alpha_bot.cli:main",
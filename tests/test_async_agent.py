@@ -0,0 +1,253 @@
+"""Async LLM Client, SkillManager and Agent Tests
+
+The OpenAI SDK runs on an httpx MockTransport that answers like the chat
+completions API, so the whole async path is exercised without a network.
+"""
+
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import httpx
+from openai import AsyncOpenAI
+
+from alpha_bot.agent import AlphaBot
+from alpha_bot.llm.async_openai_client import AsyncOpenAIClient
+from alpha_bot.llm.registry import LLMClientRegistry, PoolConfig
+from alpha_bot.llm.usage import TokenUsage, track_usage
+from alpha_bot.context.task_context import TaskContext
+from alpha_bot.models.types import CommandSkillResponse, SkillResponse, TaskStatus
+from alpha_bot.skills.base_skill import BaseSkill
+from alpha_bot.skills.skill_manager import SkillManager
+
+
+class StubLLM:
+    """Chat completions endpoint answering from queues of canned replies"""
+
+    def __init__(self):
+        self.selections = []     # replies to the skill selector
+        self.replies = []        # replies to everything else (skills)
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        system = body["messages"][0]["content"]
+        queue = self.selections if system.startswith("You are a skill selector") else self.replies
+        content = json.dumps(queue.pop(0), ensure_ascii=False)
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                "id": "c", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+        # Stream the reply in small pieces, usage in a final chunk without choices
+        pieces = [content[i:i + 7] for i in range(0, len(content), 7)]
+        chunks = [
+            {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+             "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            for piece in pieces
+        ]
+        chunks.append({"id": "c", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        chunks.append({"id": "c", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                       "choices": [], "usage": usage})
+        sse = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, content=sse.encode(), headers={"content-type": "text/event-stream"})
+
+    def registry(self) -> LLMClientRegistry:
+        """A client registry whose connection pools go to this stub"""
+        registry = LLMClientRegistry(PoolConfig(http2=False))
+        registry._http_client = httpx.Client(transport=httpx.MockTransport(self.handler))
+        registry._async_http_client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return registry
+
+
+def stub_environment(test: unittest.TestCase) -> StubLLM:
+    """Route the global LLM registry to a StubLLM for the duration of a test"""
+    stub = StubLLM()
+    patches = [
+        mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test", "OPENAI_API_BASE": "http://llm.test/v1", "MODEL_NAME": "stub"}),
+        mock.patch("alpha_bot.llm.registry._registry", stub.registry()),
+        mock.patch("alpha_bot.llm.openai_client.get_llm_cache", return_value=None),
+        mock.patch("alpha_bot.llm.async_openai_client.get_llm_cache", return_value=None),
+        # No custom skill generation and no hint store access
+        mock.patch.object(SkillManager, "register_dynamic_skill", lambda self: None),
+        mock.patch.object(BaseSkill, "_load_auto_hints", lambda self, task="", context=None: ""),
+    ]
+    for patch in patches:
+        patch.start()
+        test.addCleanup(patch.stop)
+    return stub
+
+
+class TestAsyncOpenAIClient(unittest.TestCase):
+    """Test agenerate/astream against the stub transport"""
+
+    def setUp(self):
+        self.stub = StubLLM()
+        sdk_client = AsyncOpenAI(
+            api_key="test", base_url="http://llm.test/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.stub.handler))
+        )
+        self.client = AsyncOpenAIClient(model="stub", client=sdk_client)
+        patch = mock.patch("alpha_bot.llm.async_openai_client.get_llm_cache", return_value=None)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_agenerate_parses_response(self):
+        """Test a non-streamed call parsed into the response class, with usage recorded"""
+        self.stub.replies.append({"command": "ls -la", "explanation": "list"})
+        usage = TokenUsage()
+        with track_usage(usage):
+            response = asyncio.run(self.client.agenerate("system", "task", response_class=CommandSkillResponse))
+        self.assertIsInstance(response, CommandSkillResponse)
+        self.assertEqual(response.command, "ls -la")
+        self.assertEqual((usage.calls, usage.prompt_tokens), (1, 10))
+        self.assertEqual(self.stub.requests[0]["response_format"], {"type": "json_object"})
+
+    def test_agenerate_streams_tokens(self):
+        """Test that the stream callback receives the whole reply in order"""
+        self.stub.replies.append({"command": "echo streamed", "thinking": "x" * 40})
+        tokens = []
+        usage = TokenUsage()
+        with track_usage(usage):
+            response = asyncio.run(self.client.agenerate("system", "task", tokens.append, response_class=CommandSkillResponse))
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual(json.loads("".join(tokens))["command"], "echo streamed")
+        self.assertEqual(response.command, "echo streamed")
+        self.assertEqual(usage.calls, 1)
+
+    def test_astream(self):
+        """Test that astream yields content deltas only"""
+        self.stub.replies.append({"answer": "hello"})
+
+        async def collect():
+            return [token async for token in self.client.astream("system", ["stable", "task"])]
+
+        tokens = asyncio.run(collect())
+        self.assertEqual(json.loads("".join(tokens)), {"answer": "hello"})
+        self.assertTrue(self.stub.requests[0]["stream"])
+        self.assertEqual([m["role"] for m in self.stub.requests[0]["messages"]], ["system", "user", "user"])
+
+
+class TestSkillManagerAexecute(unittest.TestCase):
+    """Test SkillManager.aexecute selecting and running a skill on the event loop"""
+
+    def setUp(self):
+        self.stub = stub_environment(self)
+        self.manager = SkillManager(ui=mock.MagicMock(), enable_persistence=False)
+        self.manager.router.enabled = False
+
+    def test_selects_and_executes(self):
+        """Test that the selected skill's streamed output becomes the SkillResponse"""
+        self.stub.selections.append({"selected_skill": "CommandSkill", "confidence": 0.9, "reasoning": "shell"})
+        self.stub.replies.append({"command": "df -h", "explanation": "disk usage"})
+        response = asyncio.run(self.manager.aexecute("查看磁盘空间", {"iteration": 1, "history": []}))
+        self.assertEqual(response.skill_name, "CommandSkill")
+        self.assertEqual(response.command, "df -h")
+        self.assertFalse(response.task_complete)
+        self.assertTrue(self.stub.requests[1]["stream"])
+
+    def test_task_complete(self):
+        """Test that a completed selection skips the skill call"""
+        self.stub.selections.append({"selected_skill": "", "task_complete": True, "reasoning": "done"})
+        response = asyncio.run(self.manager.aexecute("查看磁盘空间", {"iteration": 2, "history": []}))
+        self.assertTrue(response.task_complete)
+        self.assertEqual(len(self.stub.requests), 1)
+
+
+class TestAgentArun(unittest.TestCase):
+    """Test AlphaBot.arun end to end"""
+
+    def setUp(self):
+        self.stub = stub_environment(self)
+        self.bot = AlphaBot(auto_execute=True, enable_persistence=False, executor="subprocess", working_dir=tempfile.mkdtemp())
+        self.addCleanup(self.bot.close)
+        self.bot.skill_manager.router.enabled = False
+
+    def test_runs_command_until_complete(self):
+        """Test that a step's command is executed and the next selection ends the task"""
+        self.stub.selections += [
+            {"selected_skill": "CommandSkill", "confidence": 0.9, "reasoning": "shell"},
+            {"selected_skill": "", "task_complete": True, "reasoning": "done"},
+        ]
+        self.stub.replies.append({"command": "echo arun-ok", "explanation": "print"})
+        with mock.patch.object(AlphaBot, "_trigger_auto_hint_learning"):
+            context = asyncio.run(self.bot.arun("打印 arun-ok"))
+        self.assertEqual(context.status, TaskStatus.COMPLETED)
+        self.assertEqual(context.history[0].command, "echo arun-ok")
+        self.assertIn("arun-ok", context.history[0].stdout)
+        self.assertEqual(context.usage.calls, 3)
+
+    def test_failure_handled_off_the_event_loop(self):
+        """Test that a skill failure and its hint learning do not run on the loop thread"""
+        threads = {}
+
+        def learn(bot, context, task):
+            threads["learning"] = threading.current_thread()
+
+        async def run():
+            threads["loop"] = threading.current_thread()
+            return await self.bot.arun("anything")
+
+        with mock.patch.object(SkillManager, "aexecute", side_effect=RuntimeError("boom")), \
+                mock.patch.object(AlphaBot, "_trigger_auto_hint_learning", learn):
+            context = asyncio.run(run())
+        self.assertEqual(context.status, TaskStatus.FAILED)
+        self.assertIsNot(threads["learning"], threads["loop"])
+
+
+class TestBatchedCommands(unittest.TestCase):
+    """Test confirmation and live output of a step with several commands"""
+
+    def setUp(self):
+        stub_environment(self)
+        self.bot = AlphaBot(enable_persistence=False, executor="subprocess", working_dir=tempfile.mkdtemp())
+        self.addCleanup(self.bot.close)
+        self.bot.ui = mock.MagicMock()
+        self.context = TaskContext(task_description="batch")
+
+    def test_dangerous_batch_is_confirmed_per_command(self):
+        """Test that each command of a dangerous batch is confirmed, skipped or edited on its own"""
+        self.bot.ui.prompt_action.side_effect = ["y", "n", "e"]
+        self.bot.ui.prompt_edit_command.return_value = "echo edited"
+        response = SkillResponse(commands=["echo one", "echo two", "echo three"], is_dangerous=True, danger_reason="writes")
+
+        self.assertFalse(self.bot._handle_skill_response(self.context, "batch", response))
+        warnings = [call.args[0] for call in self.bot.ui.print_danger_warning.call_args_list]
+        self.assertEqual(len(warnings), 3)
+        self.assertIn("[2/3] echo two", warnings[1])
+        self.bot.ui.prompt_edit_command.assert_called_once_with("echo three")
+
+        results = {result.command: result for result in self.context.history}
+        self.assertEqual(set(results), {"echo one", "echo two", "echo edited"})
+        self.assertEqual(results["echo two"].returncode, -1)
+        self.assertEqual(results["echo edited"].stdout, "edited\n")
+
+    def test_quit_stops_before_running_any_command(self):
+        """Test that quitting at the second command runs none of the batch"""
+        self.bot.ui.prompt_action.side_effect = ["y", "q"]
+        response = SkillResponse(commands=["echo one", "echo two"], is_dangerous=True)
+        with mock.patch.object(AlphaBot, "_trigger_auto_hint_learning"):
+            self.assertTrue(self.bot._handle_skill_response(self.context, "batch", response))
+        self.assertEqual(self.context.status, TaskStatus.CANCELLED)
+        self.assertEqual(self.context.history, [])
+
+    def test_streamed_output_is_labeled(self):
+        """Test that live output of parallel commands carries the command index"""
+        self.bot.auto_execute = True
+        response = SkillResponse(commands=["echo one; echo more", "echo two >&2"])
+        self.bot._handle_skill_response(self.context, "batch", response)
+
+        chunks = [call.args for call in self.bot.ui.print_output_chunk.call_args_list]
+        lines = [(stream, line) for stream, text in chunks for line in text.splitlines()]
+        self.assertEqual(sorted(lines), [("stderr", "[2] two"), ("stdout", "[1] more"), ("stdout", "[1] one")])
+
+
+if __name__ == "__main__":
+    unittest.main()
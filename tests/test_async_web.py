@@ -0,0 +1,98 @@
+"""Async Web Server Tests"""
+
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+from alpha_bot.web.async_server import AsyncTaskPool, AsyncWebUI, EmitQueue
+from alpha_bot.web.scheduler import TaskScheduler
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.events = []
+
+    async def emit(self, event, data=None, to=None):
+        self.events.append(event)
+
+
+class TestAsyncWebServer(unittest.TestCase):
+    """Test the bounded worker pool and the back-pressured emitter"""
+
+    def test_pool_bounds_concurrency_and_queue(self):
+        """Test that at most max_workers tasks run and a full queue rejects new tasks"""
+        async def scenario():
+            scheduler = TaskScheduler(max_running=2, max_queue=3, session_limit=1)
+            peak = 0
+
+            async def run(task):
+                nonlocal peak
+                peak = max(peak, scheduler.running)
+                await asyncio.sleep(0.01)
+
+            pool = AsyncTaskPool(scheduler, run)
+            pool.start()
+            await asyncio.sleep(0)      # let the workers start waiting
+            admitted = [pool.submit(f"session-{i}", i) for i in range(8)]
+            while scheduler.queue_depth or scheduler.running:
+                await asyncio.sleep(0.005)
+            await pool.stop()
+            return admitted, peak, scheduler.get_stats()
+
+        admitted, peak, stats = asyncio.run(scenario())
+        self.assertEqual(sum(task is not None for task in admitted), 3)
+        self.assertEqual(peak, 2)
+        self.assertEqual(stats['completed'], 3)
+        self.assertEqual(stats['rejected'], 5)
+
+    def test_emit_queue_drops_only_stream_frames(self):
+        """Test that streaming_delta frames are dropped above the high-water mark"""
+        async def scenario():
+            sio = FakeSocketIO()
+            emitter = EmitQueue(sio, high_water=2)
+            emitter.start()
+            emitter._sender.cancel()    # hold the queue so it fills up
+            for _ in range(5):
+                emitter.emit('streaming_delta', {})
+            emitter.emit('task_complete', {})
+            await asyncio.sleep(0)
+            return emitter
+
+        emitter = asyncio.run(scenario())
+        self.assertEqual(emitter.dropped, 3)
+        self.assertEqual(emitter.pending, 3)
+
+    def test_idle_agents_swept_in_background(self):
+        """Test that the server's background task evicts idle agents without any task traffic"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        env = {
+            "WEB_HISTORY_PATH": os.path.join(temp_dir.name, "history.sqlite3"),
+            "WEB_SESSION_IDLE_TTL": "0.02",
+            "WEB_SESSION_SWEEP_INTERVAL": "0.01",
+        }
+        with mock.patch.dict("os.environ", env):
+            ui = AsyncWebUI()
+        evicted = []
+        ui.agents.on_evict = evicted.append
+
+        async def scenario():
+            await ui._startup()
+            ui.agents.release("idle", object())
+            for _ in range(200):
+                if evicted:
+                    break
+                await asyncio.sleep(0.01)
+            await ui.pool.stop()
+            await ui.socketio.stop()
+            ui._sweeper.cancel()
+
+        asyncio.run(scenario())
+        self.assertEqual(evicted, ["idle"])
+        self.assertEqual(len(ui.agents), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+"""Browser Worker Tests
+
+The worker runs as a real subprocess with a stub page in place of Playwright,
+so the socket protocol, the client script and restarts are exercised as in production.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import socket
+import tempfile
+import textwrap
+import unittest
+import subprocess
+
+from alpha_bot.skills.browser_worker import (
+    BrowserWorkerClient, CLIENT_SCRIPT, PROJECT_ROOT, _send,
+)
+
+# Worker with a fake page: no Playwright and no browser needed
+STUB_WORKER = textwrap.dedent('''
+    import sys
+    from alpha_bot.skills import browser_worker
+    from alpha_bot.skills.browser_skill import BrowserSkill
+
+    class FakePage:
+        url = "https://example.com/"
+
+        def title(self):
+            return "Example Domain"
+
+    BrowserSkill._browser_page = FakePage()
+    BrowserSkill.get_current_page_structure = classmethod(lambda cls: "<h1>Example</h1>")
+    BrowserSkill.cleanup_browser = classmethod(lambda cls: None)
+    browser_worker.main(sys.argv[1:])
+''')
+
+
+class TestBrowserWorker(unittest.TestCase):
+    """Test request framing, the client script, timeouts and restarts"""
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.workdir = tempfile.mkdtemp()
+        self.code_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.state_dir, "worker.sock")
+        self.env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT, os.getenv("PYTHONPATH")]))}
+        self.client = BrowserWorkerClient(self.socket_path)
+        self.client.enabled = True          # playwright is not needed by the stub worker
+        self.worker = None
+
+    def tearDown(self):
+        self.client.shutdown(timeout=5)
+        if self.worker is not None and self.worker.poll() is None:
+            self.worker.kill()
+            self.worker.wait()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+        shutil.rmtree(self.code_dir, ignore_errors=True)
+
+    def start_stub_worker(self):
+        script = os.path.join(self.state_dir, "stub_worker.py")
+        with open(script, "w") as f:
+            f.write(STUB_WORKER)
+        self.worker = subprocess.Popen(
+            [sys.executable, script, "--socket", self.socket_path, "--idle-timeout", "60"],
+            env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.wait_for_worker()
+
+    def wait_for_worker(self, timeout=15.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.client.is_alive():
+                return
+            time.sleep(0.05)
+        self.fail("browser worker did not start")
+
+    def write_code(self, source):
+        fd, path = tempfile.mkstemp(suffix=".py", dir=self.code_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write(textwrap.dedent(source))
+        return path
+
+    def run_client(self, code_file, timeout="10", cwd=None):
+        """Run the client script the way ShellExecutor runs build_command()"""
+        return subprocess.run(
+            [sys.executable, CLIENT_SCRIPT, self.socket_path, code_file, timeout],
+            cwd=cwd or self.workdir, env=self.env, capture_output=True, text=True, timeout=30,
+        )
+
+    def test_ping_and_page_info(self):
+        """Test that every request ends with one result message"""
+        self.start_stub_worker()
+        self.assertEqual(self.client.request("ping")["pid"], self.worker.pid)
+        info = self.client.page_info()
+        self.assertEqual(
+            (info["url"], info["title"], info["structure"]),
+            ("https://example.com/", "Example Domain", "<h1>Example</h1>"),
+        )
+        self.assertIn("unknown op", self.client.request("bogus")["error"])
+
+    def test_exec_streams_output_before_result(self):
+        """Test that stdout/stderr arrive as separate messages and the exit code in the result"""
+        self.start_stub_worker()
+        code_file = self.write_code('''
+            import sys
+            print("to stdout")
+            print("to stderr", file=sys.stderr)
+            sys.exit(3)
+        ''')
+        messages = []
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(10)
+            sock.connect(self.socket_path)
+            stream = sock.makefile("rwb")
+            _send(stream, {"op": "exec", "path": code_file, "timeout": 10})
+            for line in stream:
+                messages.append(json.loads(line))
+        self.assertEqual(messages[-1], {"type": "result", "returncode": 3})
+        output = [(m["type"], m["data"]) for m in messages[:-1] if m["data"].strip()]
+        self.assertEqual(output, [("stdout", "to stdout"), ("stderr", "to stderr")])
+
+    def test_client_runs_step_in_its_working_directory(self):
+        """Test that relative paths, argv and sys.path[0] behave like python3 CODE_FILE"""
+        self.start_stub_worker()
+        code_file = self.write_code('''
+            import os, sys
+            with open("result.txt", "w") as f:
+                f.write("saved")
+            print(sys.argv[0], sys.path[0], sep="\\n")
+        ''')
+        result = self.run_client(code_file)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.splitlines(), [code_file, self.code_dir])
+        with open(os.path.join(self.workdir, "result.txt")) as f:
+            self.assertEqual(f.read(), "saved")
+
+        # The next step from another directory does not see the previous cwd, argv or path
+        other = tempfile.mkdtemp(dir=self.workdir)
+        code_file = self.write_code('''
+            import os, sys
+            print(os.getcwd(), sys.path.count(os.path.dirname(sys.argv[0])), sep="\\n")
+        ''')
+        result = self.run_client(code_file, cwd=other)
+        self.assertEqual(result.stdout.splitlines(), [os.path.realpath(other), "1"])
+
+    def test_exec_timeout_keeps_worker_alive(self):
+        """Test that a step over its timeout is interrupted without killing the worker"""
+        self.start_stub_worker()
+        code_file = self.write_code('''
+            import time
+            try:
+                time.sleep(30)
+            except Exception:
+                print("swallowed")
+        ''')
+        started = time.time()
+        result = self.run_client(code_file, timeout="0.5")
+        self.assertLess(time.time() - started, 10)
+        self.assertEqual(result.returncode, 255)
+        self.assertIn("执行超时", result.stderr)
+        self.assertNotIn("swallowed", result.stdout)
+        self.assertTrue(self.client.is_alive())
+
+    def test_request_timeout_returns_none(self):
+        """Test that a request the worker does not answer in time gives up with None"""
+        self.start_stub_worker()
+        code_file = self.write_code("import time; time.sleep(3)")
+        self.assertIsNone(self.client.request("exec", timeout=0.3, path=code_file))
+
+    def test_client_falls_back_after_worker_crash(self):
+        """Test that the client script runs the step itself when the worker has died"""
+        self.start_stub_worker()
+        with open(self.client.pid_file, "w") as f:
+            f.write(str(self.worker.pid))
+        self.worker.send_signal(signal.SIGKILL)
+        self.worker.wait()
+        self.assertTrue(os.path.exists(self.socket_path))      # stale socket left behind
+
+        code_file = self.write_code('import os; print("local", os.getcwd())')
+        result = self.run_client(code_file)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), f"local {os.path.realpath(self.workdir)}")
+
+    def test_ensure_started_restarts_crashed_worker(self):
+        """Test that a crashed worker is replaced on the next step"""
+        self.assertTrue(self.client.ensure_started())
+        self.wait_for_worker()
+        first_pid = self.client.request("ping")["pid"]
+
+        os.kill(first_pid, signal.SIGKILL)
+        self.client._process.wait()
+        self.assertFalse(self.client.is_alive())
+
+        self.assertTrue(self.client.ensure_started())
+        self.wait_for_worker()
+        self.assertNotEqual(self.client.request("ping")["pid"], first_pid)
+        with open(self.client.pid_file) as f:
+            self.assertEqual(int(f.read()), self.client._process.pid)
+
+    def test_disabled_client_does_not_start(self):
+        """Test that a disabled client neither starts a worker nor answers page_info"""
+        self.client.enabled = False
+        self.assertFalse(self.client.ensure_started())
+        self.assertIsNone(self.client.page_info())
+
+
+if __name__ == "__main__":
+    unittest.main()
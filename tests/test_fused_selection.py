@@ -0,0 +1,168 @@
+"""Fused Select-and-Act Tests"""
+
+import unittest
+from unittest import mock
+
+from alpha_bot.auto_hint.system import AutoHintSystem
+from alpha_bot.models.types import CommandSkillResponse, FusedSelectionResponse
+from alpha_bot.skills.base_skill import BaseSkill, SkillExecutionResponse
+from alpha_bot.skills.skill_manager import SkillManager
+from alpha_bot.skills.skill_selector import SkillSelector
+
+
+class FakeSkill(BaseSkill):
+    """A skill with one hint; fused unless fused=False"""
+
+    FUSED_RESPONSE_CLASS = CommandSkillResponse
+
+    def __init__(self, name, hint_id, fused=True):
+        super().__init__()
+        self.name = name
+        self.hint_id = hint_id
+        self.fused = fused
+
+    @property
+    def supports_fused_selection(self):
+        return self.fused
+
+    def get_capabilities(self):
+        return ["command_generation"]
+
+    def get_description(self):
+        return f"{self.name} skill"
+
+    def get_fused_instructions(self):
+        return f"{self.name} instructions"
+
+    def _build_hints_info(self, task="", context=None):
+        self.auto_hint_system.record_hint_usage(self.hint_id)
+        return f"{self.name} hint"
+
+    def _to_execution_response(self, llm_response):
+        return SkillExecutionResponse(thinking=llm_response.thinking, command=llm_response.command)
+
+    def execute(self, task, context=None, **kwargs):
+        return SkillExecutionResponse(command=f"echo {self.name}")
+
+
+class FusedTestCase(unittest.TestCase):
+    """Skills sharing an auto hint system whose usage updates are recorded"""
+
+    def setUp(self):
+        self.hints = AutoHintSystem(enable_persistence=False)
+        self.hints.enable_persistence = True
+        self.hints.persistence = mock.MagicMock()
+
+        self.command = FakeSkill("Command", "hint-command")
+        self.direct = FakeSkill("Direct", "hint-direct")
+        self.browser = FakeSkill("Browser", "hint-browser", fused=False)
+        self.skills = [self.command, self.direct, self.browser]
+        for skill in self.skills:
+            skill.auto_hint_system = self.hints
+
+    def recorded_hints(self):
+        return [call.args[0] for call in self.hints.persistence.update_hint_usage.call_args_list]
+
+
+class TestSkillSelectorFused(FusedTestCase):
+    """Test SkillSelector.select_and_act and the parsing of its response"""
+
+    def setUp(self):
+        super().setUp()
+        with mock.patch("alpha_bot.skills.skill_selector.get_llm_client"):
+            self.selector = SkillSelector()
+
+    def answer(self, **response):
+        self.selector.llm.generate.return_value = FusedSelectionResponse.from_dict(response)
+
+    def test_prompt_includes_fused_skill_hints(self):
+        """Test that the fused skills' hint blocks are in the prompt, after the task"""
+        self.answer(selected_skill="Command", payload={"command": "ls"})
+        self.selector.select_and_act("task", self.skills)
+
+        prompt = self.selector.llm.generate.call_args.args[1]
+        self.assertEqual(prompt[1], "用户任务：task")
+        self.assertIn("Command hint", prompt[2])
+        self.assertIn("Direct hint", prompt[2])
+        self.assertNotIn("Browser hint", "\n".join(prompt))
+        self.assertNotIn("hint", prompt[0])
+
+    def test_hint_usage_recorded_for_selected_skill_only(self):
+        """Test that only the hints of the skill whose payload is used are recorded"""
+        self.answer(selected_skill="Direct", payload={"command": "ls"})
+        self.selector.select_and_act("task", self.skills)
+        self.assertEqual(self.recorded_hints(), ["hint-direct"])
+
+    def test_payload_dropped_for_non_fused_skill(self):
+        """Test that a non-fused skill is selected without its payload"""
+        self.answer(selected_skill="Browser", confidence=0.9, reasoning="web", payload={"command": "ls"})
+        skill, confidence, reasoning, task_complete, payload = self.selector.select_and_act("task", self.skills)
+        self.assertIs(skill, self.browser)
+        self.assertEqual((confidence, reasoning, task_complete, payload), (0.9, "web", False, None))
+        self.assertEqual(self.recorded_hints(), [])
+
+    def test_unknown_skill_falls_back_to_default(self):
+        """Test that an unknown skill name falls back to the first skill without payload"""
+        self.answer(selected_skill="Nope", payload={"command": "ls"})
+        skill, confidence, _, task_complete, payload = self.selector.select_and_act("task", self.skills)
+        self.assertIs(skill, self.command)
+        self.assertEqual((confidence, task_complete, payload), (0.7, False, None))
+
+    def test_task_complete(self):
+        """Test that task_complete wins over any selected skill or payload"""
+        self.answer(selected_skill="Command", task_complete=True, confidence=1.0, payload={"command": "ls"})
+        skill, confidence, _, task_complete, payload = self.selector.select_and_act("task", self.skills)
+        self.assertEqual((skill, confidence, task_complete, payload), (None, 1.0, True, None))
+        self.assertEqual(self.recorded_hints(), [])
+
+
+class TestSkillManagerFused(FusedTestCase):
+    """Test SkillManager._from_fused_selection and BaseSkill.from_fused_payload"""
+
+    def setUp(self):
+        super().setUp()
+        with mock.patch.object(SkillManager, "register_dynamic_skill"), \
+                mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test"}):
+            self.manager = SkillManager(ui=mock.MagicMock(), enable_persistence=False)
+
+    def test_payload_used_as_skill_output(self):
+        """Test that a valid payload becomes the execution response"""
+        select_response, exec_response = self.manager._from_fused_selection(
+            self.command, 0.9, "shell", False, {"command": "ls", "thinking": "list"}
+        )
+        self.assertIs(select_response.skill, self.command)
+        self.assertEqual((exec_response.command, exec_response.thinking), ("ls", "list"))
+        self.assertEqual(self.manager.fused_stats["fused"], 1)
+
+    def test_missing_payload_falls_back_to_execute(self):
+        """Test that no payload leaves the execution to the skill's own call"""
+        select_response, exec_response = self.manager._from_fused_selection(self.browser, 0.9, "web", False, None)
+        self.assertIs(select_response.skill, self.browser)
+        self.assertIsNone(exec_response)
+        self.assertEqual(self.manager.fused_stats["fallback"], 1)
+
+    def test_invalid_payload_falls_back_to_execute(self):
+        """Test that a payload the skill cannot convert falls back to execute"""
+        with mock.patch.object(self.command, "from_fused_payload", side_effect=TypeError("bad payload")):
+            select_response, exec_response = self.manager._from_fused_selection(
+                self.command, 0.9, "shell", False, {"command": ["not", "a", "string"]}
+            )
+        self.assertIs(select_response.skill, self.command)
+        self.assertIsNone(exec_response)
+        self.assertEqual((self.manager.fused_stats["fused"], self.manager.fused_stats["fallback"]), (0, 1))
+
+    def test_task_complete_is_not_a_fallback(self):
+        """Test that a completed task has nothing to execute and is not counted as a fallback"""
+        select_response, exec_response = self.manager._from_fused_selection(None, 1.0, "done", True, None)
+        self.assertTrue(select_response.task_complete)
+        self.assertIsNone(exec_response)
+        self.assertEqual(self.manager.fused_stats["fallback"], 0)
+
+    def test_from_fused_payload_ignores_unknown_fields(self):
+        """Test that extra payload keys are dropped before building the response class"""
+        response = self.command.from_fused_payload({"command": "pwd", "thinking": "where", "selected_skill": "Command"})
+        self.assertEqual((response.command, response.thinking), ("pwd", "where"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""Hint Index Tests"""
+
+import json
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from alpha_bot.auto_hint.index import HintIndex
+from alpha_bot.auto_hint.persistence import HintPersistenceManager
+from alpha_bot.auto_hint.system import AutoHintSystem
+from alpha_bot.auto_hint.types import HintMetadata
+
+
+def make_meta(hint_id, skill="CommandSkill", effectiveness=0.0, usage=0):
+    return {"id": hint_id, "skill_name": skill, "effectiveness_score": effectiveness, "usage_count": usage}
+
+
+class TestHintIndex(unittest.TestCase):
+    """Test ranking and content caching"""
+
+    def setUp(self):
+        self.loads = []
+        self.index = HintIndex(lambda meta: self.loads.append(meta["id"]) or f"content {meta['id']}", 2)
+
+    def test_ranked_by_effectiveness_then_usage(self):
+        """Test that top() returns the best hints of the skill only"""
+        self.index.put(make_meta("low", effectiveness=0.1, usage=9))
+        self.index.put(make_meta("used", effectiveness=0.5, usage=3))
+        self.index.put(make_meta("best", effectiveness=0.9))
+        self.index.put(make_meta("fresh", effectiveness=0.5))
+        self.index.put(make_meta("other", skill="BrowserSkill", effectiveness=1.0))
+        ids = [hint["metadata"]["id"] for hint in self.index.top("CommandSkill", 3)]
+        self.assertEqual(ids, ["best", "used", "fresh"])
+        self.assertEqual(self.index.top("Missing", 3), [])
+
+    def test_ties_keep_insertion_order(self):
+        """Test that equal hints come back in the order they were added"""
+        for hint_id in ("a", "b", "c"):
+            self.index.put(make_meta(hint_id))
+        self.index.put(make_meta("a"))     # re-ranking does not move it behind newer hints
+        self.assertEqual([hint["metadata"]["id"] for hint in self.index.top("CommandSkill")], ["a", "b", "c"])
+
+    def test_rerank_and_remove(self):
+        """Test that updates move a hint and removal drops it"""
+        self.index.put(make_meta("a", effectiveness=0.5))
+        self.index.put(make_meta("b", effectiveness=0.4))
+        self.index.put(make_meta("b", effectiveness=0.6))
+        self.assertEqual(self.index.top("CommandSkill", 1)[0]["metadata"]["id"], "b")
+        self.index.remove("b")
+        self.assertEqual([hint["metadata"]["id"] for hint in self.index.top("CommandSkill")], ["a"])
+        self.index.remove("a")
+        self.assertEqual(self.index.skills(), [])
+        self.assertEqual(len(self.index), 0)
+
+    def test_content_lru(self):
+        """Test that warm lookups do not reload and the cache is bounded"""
+        for hint_id in ("a", "b", "c"):
+            self.index.put(make_meta(hint_id))
+        self.index.top("CommandSkill", 2)
+        self.index.top("CommandSkill", 2)
+        self.assertEqual(self.loads, ["a", "b"])
+        self.index.top("CommandSkill", 3)
+        self.assertEqual(self.loads, ["a", "b", "c"])
+        self.assertEqual(self.index.get_stats()["cached_contents"], 2)
+
+    def test_missing_content_is_skipped(self):
+        """Test that a hint without content does not use up a slot"""
+        index = HintIndex(lambda meta: None if meta["id"] == "gone" else "text")
+        index.put(make_meta("gone", effectiveness=1.0))
+        index.put(make_meta("kept"))
+        self.assertEqual([hint["metadata"]["id"] for hint in index.top("CommandSkill", 1)], ["kept"])
+
+
+class TestIndexedPersistence(unittest.TestCase):
+    """Test that persistence keeps the index in step with its metadata"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.persistence = HintPersistenceManager(self.temp_dir)
+        for i, title in enumerate(["first", "second", "third"]):
+            metadata = HintMetadata(id=title, title=title, skill_name="CommandSkill", effectiveness_score=i / 10)
+            self.persistence.save_hint({"metadata": metadata, "content": title})
+
+    def test_warm_lookup_reads_no_files(self):
+        """Test that lookups after saving are served from memory"""
+        with patch("builtins.open", side_effect=AssertionError("disk read")):
+            hints = self.persistence.top_hints_for_skill("CommandSkill", 2)
+        self.assertEqual([hint["metadata"]["id"] for hint in hints], ["third", "second"])
+
+    def test_updates_rerank(self):
+        """Test that usage and effectiveness updates change the order"""
+        self.persistence.update_hint_effectiveness("first", 0.9)
+        self.assertEqual(self.persistence.top_hints_for_skill("CommandSkill", 1)[0]["metadata"]["id"], "first")
+        self.persistence.delete_hint("first")
+        self.assertEqual(self.persistence.top_hints_for_skill("CommandSkill", 1)[0]["metadata"]["id"], "third")
+
+    def test_index_rebuilt_on_load(self):
+        """Test that a new manager indexes the saved metadata and reads content lazily"""
+        reloaded = HintPersistenceManager(self.temp_dir)
+        self.assertEqual(len(reloaded.index), 3)
+        hints = reloaded.top_hints_for_skill("CommandSkill", 1)
+        self.assertIn("third", hints[0]["content"])
+        self.assertEqual(reloaded.index.get_stats()["content_misses"], 1)
+
+    def test_system_uses_index(self):
+        """Test that the hint system returns the ranked top hints"""
+        system = AutoHintSystem(enable_persistence=True, hints_path=self.temp_dir)
+        self.addCleanup(system.shutdown)
+        hints = system.get_hints_for_skill("CommandSkill", max_hints=2)
+        self.assertEqual([hint["metadata"]["id"] for hint in hints], ["third", "second"])
+        self.assertEqual(system.get_hints_for_skill("CommandSkill", max_hints=0), [])
+
+
+class TestWriteBehindUsage(unittest.TestCase):
+    """Test that usage updates are buffered and written in batches"""
+
+    def make_persistence(self, **kwargs):
+        persistence = HintPersistenceManager(tempfile.mkdtemp(), **kwargs)
+        self.addCleanup(persistence.flush)
+        persistence.save_hint({"metadata": HintMetadata(id="hint", title="hint", skill_name="general"), "content": "text"})
+        return persistence
+
+    def saved_usage(self, persistence):
+        return json.loads(persistence.metadata_file.read_text(encoding="utf-8"))["hint"]["usage_count"]
+
+    def test_updates_buffered_until_threshold(self):
+        """Test that the file is rewritten once per threshold updates"""
+        persistence = self.make_persistence(flush_interval=0, flush_threshold=5)
+        writes = persistence.flush_count
+        for _ in range(4):
+            persistence.update_hint_usage("hint")
+        self.assertEqual(persistence.flush_count, writes)
+        self.assertEqual(persistence.pending_updates, 4)
+        self.assertEqual(self.saved_usage(persistence), 0)
+        # Ranking sees the new count before it is written
+        self.assertEqual(persistence.top_hints_for_skill("general", 1)[0]["metadata"]["usage_count"], 4)
+        persistence.update_hint_usage("hint")
+        self.assertEqual(persistence.flush_count, writes + 1)
+        self.assertEqual(self.saved_usage(persistence), 5)
+
+    def test_interval_flush(self):
+        """Test that buffered updates are written after the interval"""
+        persistence = self.make_persistence(flush_interval=0.05, flush_threshold=100)
+        persistence.update_hint_effectiveness("hint", 0.8)
+        persistence.update_hint_usage("hint")
+        deadline = time.monotonic() + 5
+        while persistence.pending_updates and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(persistence.pending_updates, 0)
+        self.assertEqual(self.saved_usage(persistence), 1)
+
+    def test_explicit_flush_and_reload(self):
+        """Test that flush() persists buffered updates and leaves no temporary file"""
+        persistence = self.make_persistence(flush_interval=0, flush_threshold=100)
+        persistence.update_hint_usage("hint")
+        self.assertTrue(persistence.flush())
+        self.assertFalse(persistence.flush())
+        reloaded = HintPersistenceManager(str(persistence.base_path))
+        self.assertEqual(reloaded.metadata["hint"]["usage_count"], 1)
+        self.assertEqual(list(persistence.base_path.glob("*.tmp")), [])
+
+    def test_threshold_one_writes_through(self):
+        """Test that a threshold of 1 keeps the write-per-update behaviour"""
+        persistence = self.make_persistence(flush_interval=0, flush_threshold=1)
+        persistence.update_hint_usage("hint")
+        self.assertEqual(self.saved_usage(persistence), 1)
+        self.assertEqual(persistence.pending_updates, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
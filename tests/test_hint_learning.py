@@ -0,0 +1,182 @@
+"""Background Hint Learning Tests"""
+
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+from alpha_bot.auto_hint.generator import HintGenerator
+from alpha_bot.auto_hint.system import AutoHintSystem
+from alpha_bot.auto_hint.types import ExecutionAnalysisResult, HintCategory, HintPattern
+from alpha_bot.auto_hint.worker import HintLearningWorker, LearningJob
+from alpha_bot.models.types import ExecutionResult, SkillResponse
+
+
+def make_history(length: int = 6):
+    return [ExecutionResult(command=f"echo {i}", returncode=0, stdout=str(i), stderr="") for i in range(length)]
+
+
+class TestHintLearningWorker(unittest.TestCase):
+    """Test the bounded background learning queue"""
+
+    def test_batches_jobs(self):
+        """Test that jobs submitted together are learned in one pass"""
+        batches = []
+        worker = HintLearningWorker(lambda jobs: batches.append(len(jobs)) or 1, batch_size=8, batch_wait=0.2)
+        self.addCleanup(worker.shutdown)
+        for i in range(3):
+            self.assertTrue(worker.submit(make_history(), [], f"task {i}"))
+        self.assertTrue(worker.drain(timeout=5))
+        self.assertEqual(sum(batches), 3)
+        self.assertLess(len(batches), 3)
+        self.assertEqual(worker.get_stats()["hints_saved"], len(batches))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that submit never waits when the queue is full"""
+        release = threading.Event()
+        worker = HintLearningWorker(lambda jobs: release.wait(5) and 0, max_queue=1, batch_size=1, batch_wait=0)
+        self.addCleanup(worker.shutdown)
+        self.addCleanup(release.set)
+        worker.submit(make_history(), [])
+        time.sleep(0.1)     # the worker is now busy with the first job
+        self.assertTrue(worker.submit(make_history(), []))
+        start = time.monotonic()
+        self.assertFalse(worker.submit(make_history(), []))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(worker.dropped, 1)
+
+    def test_shutdown_finishes_queued_jobs(self):
+        """Test that shutdown drains the queue and rejects new jobs"""
+        processed = []
+        worker = HintLearningWorker(lambda jobs: processed.extend(jobs) or 0, batch_size=1, batch_wait=0)
+        for _ in range(4):
+            worker.submit(make_history(), [])
+        self.assertTrue(worker.shutdown(timeout=5))
+        self.assertEqual(len(processed), 4)
+        self.assertFalse(worker.submit(make_history(), []))
+
+    def test_failing_pass_keeps_worker_alive(self):
+        """Test that an exception in a pass is recorded and later jobs still run"""
+        calls = []
+
+        def learn(jobs):
+            calls.append(len(jobs))
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return 0
+
+        worker = HintLearningWorker(learn, batch_size=1, batch_wait=0)
+        self.addCleanup(worker.shutdown)
+        worker.submit(make_history(), [])
+        worker.drain(timeout=5)
+        worker.submit(make_history(), [])
+        self.assertTrue(worker.drain(timeout=5))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(worker.last_error, "boom")
+
+
+class TestBackgroundLearning(unittest.TestCase):
+    """Test that task completion does not wait for learning"""
+
+    def test_submit_returns_before_learning(self):
+        """Test that submit_task_completion only enqueues"""
+        system = AutoHintSystem(enable_persistence=True, hints_path=tempfile.mkdtemp())
+        self.addCleanup(system.shutdown)
+        started = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_analysis(histories, skills):
+            started.set()
+            release.wait(5)
+            return ExecutionAnalysisResult()
+
+        system.analyzer.analyze_histories = slow_analysis
+        start = time.monotonic()
+        self.assertTrue(system.submit_task_completion(make_history(), [], "task"))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertTrue(started.wait(5))
+        release.set()
+        self.assertTrue(system.drain(timeout=5))
+
+    def test_short_history_is_not_queued(self):
+        """Test that histories below min_history_length are skipped"""
+        system = AutoHintSystem(enable_persistence=False)
+        self.addCleanup(system.shutdown)
+        self.assertFalse(system.submit_task_completion(make_history(2), [], "task"))
+        self.assertEqual(system.learning_worker.submitted, 0)
+
+
+class TestBatchedAnalysis(unittest.TestCase):
+    """Test that a batch of jobs keeps task boundaries"""
+
+    @staticmethod
+    def steps(successes: int, failures: int, failures_first: bool = False):
+        response = SkillResponse(skill_name="CommandSkill")
+        ok = [ExecutionResult(command="ls -la", returncode=0, stdout="x", stderr="", skill_response=response)
+              for _ in range(successes)]
+        failed = [ExecutionResult(command="cat missing.txt", returncode=1, stdout="",
+                                  stderr="cat: missing.txt: No such file or directory", skill_response=response)
+                  for _ in range(failures)]
+        return failed + ok if failures_first else ok + failed
+
+    def test_two_jobs_in_one_batch(self):
+        """Test that counts merge across jobs but sequences and descriptions stay per task"""
+        system = AutoHintSystem(enable_persistence=False)
+        self.addCleanup(system.shutdown)
+        system.generator = Mock(generate_hints_from_analysis=Mock(return_value=[]))
+        first, second = self.steps(4, 2), self.steps(4, 2, failures_first=True)
+
+        system._learn_from_jobs([LearningJob(first, [], "list files"), LearningJob(second, [], "read notes")])
+        analysis, description = system.generator.generate_hints_from_analysis.call_args.args
+
+        command_pattern = next(p for p in analysis.patterns if p.pattern_description == "Command pattern: ls -la")
+        self.assertEqual(command_pattern.frequency, 8)
+        # 2 failures ending one task and 2 starting the next are not 4 in a row
+        self.assertFalse(any("consecutive failures" in o for o in analysis.improvement_opportunities))
+        self.assertEqual(description, "2 separate tasks\n- list files\n- read notes")
+
+        sequences = system.analyzer._extract_success_patterns([self.steps(2, 0), self.steps(2, 0)])
+        self.assertEqual([len(p.examples) for p in sequences], [2, 2])
+
+    def test_single_job_description(self):
+        """Test that a single task is described as before"""
+        self.assertEqual(AutoHintSystem._describe_tasks([LearningJob([], [], "list files")] * 2), "list files")
+
+
+class TestConcurrentGeneration(unittest.TestCase):
+    """Test that hint contents are generated concurrently"""
+
+    def test_llm_calls_overlap(self):
+        """Test that several content LLM calls run at the same time"""
+        generator = HintGenerator(enable_llm=False, max_workers=4)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def generate(system_prompt, user_input):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.1)
+            with lock:
+                active.pop()
+            return Mock(raw_json="content")
+
+        generator.llm = Mock(generate=generate)
+        patterns = [
+            HintPattern(category=HintCategory.FAILURE_PATTERN, skill_name=f"Skill{i}", pattern_description=desc)
+            for i, desc in enumerate(["permission denied", "no such file", "timeout"])
+        ]
+        analysis = ExecutionAnalysisResult(patterns=patterns, failure_patterns=patterns)
+        start = time.monotonic()
+        hints = generator.generate_hints_from_analysis(analysis, "task")
+        self.assertEqual(len(hints), 6)     # 3 failure hints + 3 troubleshooting guides
+        self.assertTrue(all(hint["content"] == "content" and "generate" not in hint for hint in hints))
+        self.assertGreater(max(peak), 1)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
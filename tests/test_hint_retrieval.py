@@ -0,0 +1,200 @@
+"""Hint Retrieval Tests
+
+Run directly (python -m tests.test_hint_retrieval --benchmark) to measure index
+build time and per-lookup retrieval time at 1k, 10k and 50k hints.
+"""
+
+import sys
+import time
+import random
+import tempfile
+import unittest
+
+from alpha_bot.auto_hint.retrieval import HintRetriever, tokenize
+from alpha_bot.auto_hint.system import AutoHintSystem
+from alpha_bot.auto_hint.types import HintMetadata
+from alpha_bot.models.types import ExecutionResult
+from alpha_bot.skills.base_skill import BaseSkill
+
+
+def make_hint(hint_id, content, skill="CommandSkill", effectiveness=0.0, keywords=()):
+    metadata = {
+        "id": hint_id, "title": f"hint {hint_id}", "skill_name": skill,
+        "effectiveness_score": effectiveness, "keywords": list(keywords),
+    }
+    return {"metadata": metadata, "content": content}
+
+
+def ids(hints):
+    return [hint["metadata"]["id"] for hint in hints]
+
+
+class TestTokenize(unittest.TestCase):
+    """Test retrieval terms"""
+
+    def test_words_and_cjk_bigrams(self):
+        """Test that Latin text is split into words and Chinese into bigrams"""
+        self.assertEqual(tokenize("Run the pip install"), ["run", "pip", "install"])
+        self.assertEqual(tokenize("权限不足"), ["权限", "限不", "不足"])
+        self.assertEqual(tokenize("错"), ["错"])
+
+
+class TestHintRetriever(unittest.TestCase):
+    """Test BM25 ranking"""
+
+    def setUp(self):
+        self.retriever = HintRetriever({
+            "CommandSkill": [
+                make_hint("pip", "Use pip install --user when site-packages is not writable"),
+                make_hint("perm", "Permission denied usually means you need sudo or chmod"),
+                make_hint("git", "Run git status before committing", keywords=["repository"]),
+                make_hint("zh", "遇到权限不足时先检查文件所有者"),
+            ],
+            "BrowserSkill": [make_hint("login", "Wait for the login form before typing", skill="BrowserSkill")],
+        })
+
+    def test_relevant_hint_first(self):
+        """Test that the hint sharing the query's terms ranks first"""
+        self.assertEqual(ids(self.retriever.search("bash: ./deploy.sh: Permission denied", "CommandSkill", 2)), ["perm"])
+        self.assertEqual(ids(self.retriever.search("install requests with pip", "CommandSkill", 1)), ["pip"])
+        self.assertEqual(ids(self.retriever.search("运行脚本提示权限不足", "CommandSkill", 1)), ["zh"])
+
+    def test_keywords_are_indexed(self):
+        """Test that pattern keywords make a hint retrievable"""
+        self.assertEqual(ids(self.retriever.search("clone the repository", "CommandSkill", 3)), ["git"])
+
+    def test_skill_partition_and_no_match(self):
+        """Test that other skills' hints and unrelated queries return nothing"""
+        self.assertEqual(self.retriever.search("login form", "CommandSkill", 3), [])
+        self.assertEqual(ids(self.retriever.search("login form", "BrowserSkill", 3)), ["login"])
+        self.assertEqual(self.retriever.search("permission", "MissingSkill", 3), [])
+
+    def test_effectiveness_breaks_ties(self):
+        """Test that equally relevant hints are ordered by effectiveness"""
+        retriever = HintRetriever({"CommandSkill": [
+            make_hint("a", "check disk space", effectiveness=0.1),
+            make_hint("b", "check disk space", effectiveness=0.9),
+        ]})
+        self.assertEqual(ids(retriever.search("disk space", "CommandSkill", 2)), ["b", "a"])
+
+    def test_budget_keeps_rarest_terms(self):
+        """Test that an exhausted budget stops after the most informative term"""
+        hints = [make_hint(str(i), "common words everywhere") for i in range(50)]
+        hints.append(make_hint("rare", "common words plus zookeeper"))
+        retriever = HintRetriever({"CommandSkill": hints})
+        self.assertEqual(ids(retriever.search("zookeeper common words", "CommandSkill", 1, budget=0)), ["rare"])
+        self.assertEqual(retriever.budget_cuts, 1)
+
+    def test_scales_to_10k_hints(self):
+        """Test that a lookup over 10k hints stays within a few milliseconds"""
+        retriever = HintRetriever(synthetic_hints(10000))
+        queries = synthetic_queries(20)
+        start = time.perf_counter()
+        for query in queries:
+            retriever.search(query, "CommandSkill", 3)
+        per_query = (time.perf_counter() - start) / len(queries)
+        self.assertLess(per_query, 0.05, f"{per_query * 1000:.1f}ms per lookup")
+
+
+class TestRelevantHints(unittest.TestCase):
+    """Test AutoHintSystem.get_relevant_hints"""
+
+    def setUp(self):
+        self.system = AutoHintSystem(enable_persistence=True, hints_path=tempfile.mkdtemp())
+        self.addCleanup(self.system.shutdown)
+        self.system.retrieval = "bm25"
+        self.system.persistence.save_hints([
+            {"metadata": HintMetadata(id="pip", title="pip", skill_name="CommandSkill", effectiveness_score=0.9),
+             "content": "Use pip install --user"},
+            {"metadata": HintMetadata(id="perm", title="perm", skill_name="CommandSkill", keywords=["chmod"]),
+             "content": "Permission denied: try sudo"},
+        ])
+
+    def test_falls_back_until_index_is_built(self):
+        """Test that the first lookup does not wait for the index"""
+        self.system.rebuild_retrieval_index = lambda: None     # keep the background build from finishing
+        self.assertEqual(ids(self.system.get_relevant_hints("CommandSkill", "Permission denied", 1)), ["pip"])
+
+    def test_relevant_after_build(self):
+        """Test that once built, lookups return the hints relevant to the query"""
+        self.system.rebuild_retrieval_index()
+        self.assertEqual(ids(self.system.get_relevant_hints("CommandSkill", "chmod: Permission denied", 2)), ["perm"])
+        self.assertEqual(self.system.get_relevant_hints("CommandSkill", "draw a chart", 2), [])
+        # Without a query the effectiveness order is used
+        self.assertEqual(ids(self.system.get_relevant_hints("CommandSkill", "", 1)), ["pip"])
+
+    def test_saving_hints_marks_index_stale(self):
+        """Test that learned hints trigger a rebuild"""
+        self.system.rebuild_retrieval_index()
+        self.system._clear_cache()
+        self.system.get_relevant_hints("CommandSkill", "pip", 1)
+        self.system._retriever_thread.join(5)
+        self.assertFalse(self.system._retriever_stale)
+
+    def test_effectiveness_mode(self):
+        """Test that retrieval can be switched off"""
+        self.system.retrieval = "effectiveness"
+        self.system.rebuild_retrieval_index()
+        self.assertEqual(ids(self.system.get_relevant_hints("CommandSkill", "Permission denied", 1)), ["pip"])
+
+
+class TestHintQuery(unittest.TestCase):
+    """Test the query skills build for hint lookup"""
+
+    def test_failed_step_adds_error(self):
+        """Test that a failed last step adds its command and error output"""
+        failed = ExecutionResult(command="./run.sh", returncode=126, stdout="", stderr="Permission denied")
+        query = BaseSkill._hint_query("deploy the app", {"last_result": failed})
+        self.assertIn("deploy the app", query)
+        self.assertIn("./run.sh", query)
+        self.assertIn("Permission denied", query)
+
+    def test_successful_step_keeps_task_only(self):
+        """Test that the query stays the same while steps succeed"""
+        ok = ExecutionResult(command="ls", returncode=0, stdout="a b", stderr="")
+        self.assertEqual(BaseSkill._hint_query("deploy the app", {"last_result": ok}), "deploy the app")
+        self.assertEqual(BaseSkill._hint_query("deploy the app", None), "deploy the app")
+
+
+_VOCABULARY = [f"term{i}" for i in range(3000)]
+
+
+def synthetic_hints(count, skills=("CommandSkill", "BrowserSkill", "general", "WeChatSkill")):
+    rng = random.Random(count)
+    hints_by_skill = {skill: [] for skill in skills}
+    for i in range(count):
+        skill = skills[i % len(skills)]
+        # Zipf-like word choice, as in real text some terms are in most hints
+        words = [_VOCABULARY[min(int(rng.paretovariate(1.1)) - 1, len(_VOCABULARY) - 1)] for _ in range(80)]
+        hints_by_skill[skill].append(make_hint(str(i), " ".join(words), skill, rng.random()))
+    return hints_by_skill
+
+
+def synthetic_queries(count):
+    rng = random.Random(0)
+    return [" ".join(rng.choice(_VOCABULARY[:500]) for _ in range(25)) for _ in range(count)]
+
+
+def benchmark(hint_counts=(1000, 10000, 50000)):
+    queries = synthetic_queries(200)
+    print(f"{'hints':>8} {'build':>10} {'p50':>9} {'p95':>9} {'max':>9}")
+    for count in hint_counts:
+        hints = synthetic_hints(count)
+        start = time.perf_counter()
+        retriever = HintRetriever(hints)
+        build = time.perf_counter() - start
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            retriever.search(query, "CommandSkill", 3)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p50, p95 = timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+        print(f"{count:>8} {build * 1000:>8.0f}ms {p50 * 1000:>7.2f}ms {p95 * 1000:>7.2f}ms {timings[-1] * 1000:>7.2f}ms")
+
+
+if __name__ == '__main__':
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,219 @@
+"""LLM Response Cache Tests"""
+
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+from alpha_bot.llm.cache import CacheConfig, LLMResponseCache
+from alpha_bot.llm.openai_client import OpenAIClient
+from alpha_bot.llm.async_openai_client import AsyncOpenAIClient
+from alpha_bot.models.types import CommandSkillResponse
+from alpha_bot.skills.skill_manager import _SpeculativeStream
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """Test the memory + SQLite LLM response cache"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "llm_cache.sqlite3")
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def _make_cache(self, **kwargs):
+        config = CacheConfig(enabled=True, path=self.path, **kwargs)
+        cache = LLMResponseCache(config)
+        self.addCleanup(cache.close)
+        return cache
+    
+    def test_key_depends_on_request(self):
+        """Test that every request field is part of the key"""
+        messages = [{"role": "user", "content": "hi"}]
+        key = LLMResponseCache.make_key("gpt-4", messages, 0.1, None)
+        
+        self.assertEqual(key, LLMResponseCache.make_key("gpt-4", list(messages), 0.1, None))
+        self.assertNotEqual(key, LLMResponseCache.make_key("gpt-4o", messages, 0.1, None))
+        self.assertNotEqual(key, LLMResponseCache.make_key("gpt-4", messages, 0.2, None))
+        self.assertNotEqual(key, LLMResponseCache.make_key("gpt-4", messages, 0.1, {"type": "json_object"}))
+    
+    def test_hit_and_miss_counters(self):
+        """Test get/set and hit/miss accounting"""
+        cache = self._make_cache()
+        
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", '{"a": 1}')
+        self.assertEqual(cache.get("k"), '{"a": 1}')
+        
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["disk_entries"], 1)
+    
+    def test_disk_tier_survives_restart(self):
+        """Test that entries are read back from SQLite by a new instance"""
+        self._make_cache().set("k", "cached")
+        
+        cache = self._make_cache()
+        self.assertEqual(cache.get("k"), "cached")
+        self.assertEqual(cache.get_stats()["memory_hits"], 0)
+    
+    def test_memory_lru_eviction(self):
+        """Test that the memory tier keeps only the most recently used entries"""
+        cache = self._make_cache(memory_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        
+        self.assertEqual(list(cache._memory.keys()), ["a", "c"])
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are treated as misses"""
+        cache = self._make_cache(ttl=0.01)
+        cache.set("k", "cached")
+        time.sleep(0.05)
+        
+        self.assertIsNone(cache.get("k"))
+    
+    def test_disk_size_eviction(self):
+        """Test that the disk tier is trimmed to its size limit"""
+        cache = self._make_cache(max_disk_mb=2048 / (1024 * 1024))
+        for i in range(4):
+            cache.set(f"k{i}", "x" * 1000)
+        
+        stats = cache.get_stats()
+        self.assertLessEqual(stats["disk_bytes"], 2048)
+        self.assertEqual(stats["disk_entries"], 2)
+
+
+
+def completion_handler(content: str, finish_reason: str):
+    """A chat completions endpoint that always answers content with the given finish_reason"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                "id": "c", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            })
+        chunks = [{"index": 0, "delta": {"content": content[i:i + 5]}, "finish_reason": None} for i in range(0, len(content), 5)]
+        chunks.append({"index": 0, "delta": {}, "finish_reason": finish_reason})
+        sse = "".join(
+            f"data: {json.dumps({'id': 'c', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'], 'choices': [choice]})}\n\n"
+            for choice in chunks
+        ) + "data: [DONE]\n\n"
+        return httpx.Response(200, content=sse.encode(), headers={"content-type": "text/event-stream"})
+    return handler
+
+
+class StalledStream(httpx.SyncByteStream):
+    """An SSE body that sends one chunk, then waits until the response is closed"""
+    
+    def __init__(self):
+        self.closed = threading.Event()
+    
+    def __iter__(self):
+        chunk = {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+                 "choices": [{"index": 0, "delta": {"content": '{"command": '}, "finish_reason": None}]}
+        yield f"data: {json.dumps(chunk)}\n\n".encode()
+        self.closed.wait(5)
+    
+    def close(self):
+        self.closed.set()
+
+
+class TestClientCacheWrites(unittest.TestCase):
+    """Test that the clients only cache complete, parseable responses"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache = LLMResponseCache(CacheConfig(enabled=True, path=os.path.join(self.temp_dir.name, "llm_cache.sqlite3")))
+        self.addCleanup(self.cache.close)
+    
+    def _client(self, content, finish_reason):
+        sdk_client = OpenAI(
+            api_key="test", base_url="http://llm.test/v1",
+            http_client=httpx.Client(transport=httpx.MockTransport(completion_handler(content, finish_reason)))
+        )
+        return OpenAIClient(model="stub", client=sdk_client, cache=self.cache)
+    
+    def _async_client(self, content, finish_reason):
+        sdk_client = AsyncOpenAI(
+            api_key="test", base_url="http://llm.test/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(completion_handler(content, finish_reason)))
+        )
+        return AsyncOpenAIClient(model="stub", client=sdk_client, cache=self.cache)
+    
+    def _disk_entries(self):
+        return self.cache.get_stats()["disk_entries"]
+    
+    def test_complete_response_is_cached(self):
+        """Test that a stream ending with finish_reason=stop is cached"""
+        client = self._client('{"command": "ls"}', "stop")
+        client.generate("system", "task", lambda token: None, response_class=CommandSkillResponse)
+        self.assertEqual(self._disk_entries(), 1)
+    
+    def test_invalid_json_is_not_cached(self):
+        """Test that output the response class cannot parse is not cached"""
+        client = self._client('{"command": "ls"', "stop")
+        for callback in (None, lambda token: None):
+            response = client.generate("system", "task", callback, response_class=CommandSkillResponse)
+            self.assertIn("Invalid JSON", response.direct_response)
+        self.assertEqual(self._disk_entries(), 0)
+    
+    def test_truncated_response_is_not_cached(self):
+        """Test that finish_reason=length output is not cached, streamed or not"""
+        client = self._client('{"command": "ls"}', "length")
+        client.generate("system", "task", lambda token: None, response_class=CommandSkillResponse)
+        client.generate("system", "task", response_class=CommandSkillResponse)
+        self.assertEqual(self._disk_entries(), 0)
+    
+    def test_cancelled_stream_is_not_cached(self):
+        """Test that a stream closed mid-way by a speculative miss is not cached"""
+        body = StalledStream()
+        sdk_client = OpenAI(
+            api_key="test", base_url="http://llm.test/v1",
+            http_client=httpx.Client(transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, stream=body, headers={"content-type": "text/event-stream"})
+            ))
+        )
+        client = OpenAIClient(model="stub", client=sdk_client, cache=self.cache)
+        stream = _SpeculativeStream()
+        
+        worker = threading.Thread(target=client.generate, args=("system", "task", stream), kwargs={"response_class": CommandSkillResponse})
+        worker.start()
+        deadline = time.time() + 5
+        while not stream._buffer and time.time() < deadline:
+            time.sleep(0.01)
+        stream.cancel()
+        worker.join(5)
+        
+        self.assertFalse(worker.is_alive())
+        self.assertTrue(body.closed.is_set())
+        self.assertEqual(self._disk_entries(), 0)
+    
+    def test_async_client_skips_bad_responses(self):
+        """Test the same rules in AsyncOpenAIClient.agenerate"""
+        for content, finish_reason in (('{"command": "ls"', "stop"), ('{"command": "ls"}', "length")):
+            client = self._async_client(content, finish_reason)
+            asyncio.run(client.agenerate("system", "task", lambda token: None, response_class=CommandSkillResponse))
+            asyncio.run(client.agenerate("system", "task", response_class=CommandSkillResponse))
+        self.assertEqual(self._disk_entries(), 0)
+        
+        client = self._async_client('{"command": "ls"}', "stop")
+        asyncio.run(client.agenerate("system", "task", lambda token: None, response_class=CommandSkillResponse))
+        self.assertEqual(self._disk_entries(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
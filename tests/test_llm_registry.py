@@ -0,0 +1,84 @@
+"""LLM Client Registry Tests"""
+
+import asyncio
+import unittest
+import threading
+
+from alpha_bot.llm.registry import LLMClientRegistry, PoolConfig
+
+
+class TestLLMClientRegistry(unittest.TestCase):
+    """Test that clients are shared per config and share one connection pool"""
+
+    def setUp(self):
+        self.registry = LLMClientRegistry(PoolConfig(http2=False))
+        self.addCleanup(self.registry.close)
+
+    def test_same_config_shares_client(self):
+        """Test that the same model/key/url returns the same client"""
+        first = self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1")
+        second = self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1")
+        self.assertIs(first, second)
+        self.assertEqual(self.registry.get_stats()["clients"], 1)
+
+    def test_different_configs_get_separate_clients(self):
+        """Test that each model, key and url gets its own client"""
+        base = self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1")
+        other_model = self.registry.get_client("gpt-4o", api_key="key", base_url="http://llm.local/v1")
+        other_key = self.registry.get_client("gpt-4", api_key="other", base_url="http://llm.local/v1")
+        other_url = self.registry.get_client("gpt-4", api_key="key", base_url="http://other.local/v1")
+
+        self.assertEqual(len({id(base), id(other_model), id(other_key), id(other_url)}), 4)
+        self.assertEqual(other_model.model, "gpt-4o")
+        # Models on the same endpoint share the SDK client, endpoints do not
+        self.assertIs(base.client, other_model.client)
+        self.assertIsNot(base.client, other_key.client)
+        self.assertIsNot(base.client, other_url.client)
+        self.assertEqual(self.registry.get_stats()["sdk_clients"], 3)
+
+    def test_one_connection_pool(self):
+        """Test that every SDK client uses the registry's single httpx pool"""
+        clients = [
+            self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1"),
+            self.registry.get_client("gpt-4", api_key="other", base_url="http://other.local/v1"),
+        ]
+        pools = {id(client.client._client) for client in clients}
+        self.assertEqual(pools, {id(self.registry._http_client)})
+
+    def test_concurrent_lookups_share_client(self):
+        """Test that threads racing on a new config all get the same client"""
+        results = []
+        barrier = threading.Barrier(8)
+
+        def lookup():
+            barrier.wait()
+            results.append(self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1"))
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(client) for client in results}), 1)
+
+    def test_async_clients(self):
+        """Test that async clients are shared per config on one async pool"""
+        first = self.registry.get_async_client("gpt-4", api_key="key", base_url="http://llm.local/v1")
+        self.assertIs(first, self.registry.get_async_client("gpt-4", api_key="key", base_url="http://llm.local/v1"))
+        other = self.registry.get_async_client("gpt-4", api_key="other", base_url="http://llm.local/v1")
+        self.assertIsNot(first, other)
+        self.assertIs(first.client._client, other.client._client)
+        asyncio.run(self.registry.aclose())
+        self.assertEqual(self.registry.get_stats()["async_clients"], 0)
+
+    def test_close_resets_pool(self):
+        """Test that clients created after close() use a new pool"""
+        before = self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1")
+        self.registry.close()
+        after = self.registry.get_client("gpt-4", api_key="key", base_url="http://llm.local/v1")
+        self.assertIsNot(before, after)
+        self.assertIsNot(before.client._client, after.client._client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Prompt Layout and LLM Usage Tests"""
+
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from alpha_bot.llm.base import build_messages
+from alpha_bot.llm.openai_client import OpenAIClient
+from alpha_bot.llm.usage import TokenUsage, cached_tokens, record_usage, track_usage
+
+
+class FakeCompletions:
+    """Records requests and answers with a fixed usage"""
+
+    def __init__(self, usage):
+        self.usage = usage
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        if kwargs.get("stream"):
+            return iter([
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="{}"), finish_reason="stop")], usage=None),
+                SimpleNamespace(choices=[], usage=self.usage),
+            ])
+        message = SimpleNamespace(content="{}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=self.usage)
+
+
+def make_usage(prompt=1000, completion=50, cached=768):
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached)
+    )
+
+
+class TestBuildMessages(unittest.TestCase):
+    """Test the message layouts"""
+
+    def test_split_layout(self):
+        """Test that each block becomes its own message, in order, skipping empty ones"""
+        messages = build_messages("system", ["hints", "", "task", "history"], layout="split")
+        self.assertEqual([m["role"] for m in messages], ["system", "user", "user", "user"])
+        self.assertEqual([m["content"] for m in messages[1:]], ["hints", "task", "history"])
+
+    def test_joined_layout(self):
+        """Test that blocks are merged into one user message"""
+        messages = build_messages("system", ["hints", "task"], layout="joined")
+        self.assertEqual(messages[1:], [{"role": "user", "content": "hints\n\ntask"}])
+
+    def test_plain_string(self):
+        """Test that a string prompt is sent as a single user message"""
+        self.assertEqual(build_messages("s", "hello", layout="split")[1:], [{"role": "user", "content": "hello"}])
+
+    def test_layout_from_env(self):
+        """Test that LLM_PROMPT_LAYOUT selects the layout"""
+        with mock.patch.dict(os.environ, {"LLM_PROMPT_LAYOUT": "joined"}):
+            self.assertEqual(len(build_messages("s", ["a", "b"])), 2)
+
+
+class TestTokenUsage(unittest.TestCase):
+    """Test per-task usage accounting"""
+
+    def test_add(self):
+        """Test that OpenAI and DeepSeek style usage are both understood"""
+        usage = TokenUsage()
+        usage.add(make_usage())
+        usage.add({"prompt_tokens": 500, "completion_tokens": 10, "prompt_cache_hit_tokens": 256})
+        self.assertEqual(usage.calls, 2)
+        self.assertEqual(usage.prompt_tokens, 1500)
+        self.assertEqual(usage.cached_tokens, 1024)
+        self.assertAlmostEqual(usage.cache_hit_rate, 1024 / 1500)
+        self.assertEqual(cached_tokens({"prompt_tokens": 5}), 0)
+
+    def test_record_outside_task_is_ignored(self):
+        """Test that recording without an active tracker is a no-op"""
+        record_usage(make_usage())
+        usage = TokenUsage()
+        with track_usage(usage):
+            record_usage(make_usage())
+        record_usage(make_usage())
+        self.assertEqual(usage.calls, 1)
+
+    def test_client_records_usage(self):
+        """Test that streamed and plain calls both record usage and send split messages"""
+        completions = FakeCompletions(make_usage())
+        client = OpenAIClient(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)), model="m")
+        usage = TokenUsage()
+        with mock.patch.dict(os.environ, {"LLM_PROMPT_LAYOUT": "split"}), track_usage(usage):
+            client.generate("system", ["hints", "task"])
+            client.generate("system", ["hints", "task"], stream_callback=lambda token: None)
+        self.assertEqual(usage.calls, 2)
+        self.assertEqual(usage.cached_tokens, 1536)
+        self.assertEqual(len(completions.requests[0]["messages"]), 3)
+        self.assertEqual(completions.requests[1]["stream_options"], {"include_usage": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Page Snapshot Tests"""
+
+import json
+import shutil
+import unittest
+import subprocess
+
+from alpha_bot.skills.page_snapshot import EXTRACT_JS, PageSnapshot, PageSnapshotter, diff_snapshots
+
+# Just enough DOM for EXTRACT_JS to run under node
+FAKE_DOM_JS = r"""
+class El {
+    constructor(tagName, props, attrs) {
+        Object.assign(this, {tagName, type: '', value: '', innerText: '', id: ''}, props);
+        this.attrs = attrs || {};
+    }
+    getAttribute(name) { return name in this.attrs ? this.attrs[name] : null; }
+    setAttribute(name, value) { this.attrs[name] = value; }
+    getBoundingClientRect() { return {width: 10, height: 10}; }
+}
+const inputs = JSON.parse(process.argv[1]).map(([tag, props, attrs]) => new El(tag, props, attrs));
+global.window = {};
+global.location = {href: 'https://example.com/login'};
+global.getComputedStyle = () => ({visibility: 'visible', display: 'block'});
+global.CSS = {escape: (value) => value};
+global.document = {title: 'Login', body: {innerText: 'Sign in'}, querySelectorAll: () => inputs};
+const extract = EXTRACT;
+console.log(JSON.stringify(extract([50, 1000])));
+"""
+
+
+def _snapshot(url="https://example.com/", title="Example", elements=None, text="Hello"):
+    return PageSnapshot.from_dict({
+        "url": url,
+        "title": title,
+        "elements": elements if elements is not None else [
+            {"id": 1, "role": "link", "name": "Home", "href": "/", "selector": "a#home"},
+            {"id": 2, "role": "textbox", "name": "Search", "selector": "input[name=\"q\"]"},
+            {"id": 3, "role": "button", "name": "Go"},
+        ],
+        "text": text,
+    })
+
+
+class TestPageSnapshot(unittest.TestCase):
+    """Test snapshot diffing and rendering (no browser needed)"""
+
+    def test_diff_by_stable_id(self):
+        """Test that elements are matched by id and compared by content"""
+        previous = _snapshot()
+        current = _snapshot(elements=[
+            {"id": 1, "role": "link", "name": "Home", "href": "/", "selector": "a#home"},
+            {"id": 2, "role": "textbox", "name": "Search", "selector": "input[name=\"q\"]", "value": "python"},
+            {"id": 4, "role": "link", "name": "Result"},
+        ])
+        diff = diff_snapshots(previous, current)
+
+        self.assertEqual([e.id for e in diff.unchanged], [1])
+        self.assertEqual([e.id for e in diff.changed], [2])
+        self.assertEqual([e.id for e in diff.added], [4])
+        self.assertEqual([e.id for e in diff.removed], [3])
+        self.assertFalse(diff.text_changed)
+        self.assertFalse(diff.is_empty)
+
+    def test_describe_full_then_diff(self):
+        """Test that the first snapshot is rendered in full and same-URL snapshots as diffs"""
+        snapshotter = PageSnapshotter()
+
+        full = snapshotter.describe_snapshot(_snapshot())
+        self.assertIn('[2] textbox "Search" css=input[name="q"]', full)
+        self.assertIn("Hello", full)
+
+        unchanged = snapshotter.describe_snapshot(_snapshot())
+        self.assertIn("与上一步相同", unchanged)
+        self.assertNotIn("css=", unchanged)
+        # The page text is always sent, even when nothing changed
+        self.assertIn("页面文本（未变化", unchanged)
+        self.assertIn("Hello", unchanged)
+
+        navigated = snapshotter.describe_snapshot(_snapshot(url="https://example.com/next"))
+        self.assertIn("=== 可交互元素", navigated)
+
+        snapshotter.reset()
+        self.assertIn("=== 可交互元素", snapshotter.describe_snapshot(_snapshot(url="https://example.com/next")))
+
+
+@unittest.skipUnless(shutil.which("node"), "node not available")
+class TestExtractJS(unittest.TestCase):
+    """Run EXTRACT_JS against a fake DOM"""
+
+    def extract(self, elements):
+        script = FAKE_DOM_JS.replace("EXTRACT", EXTRACT_JS.strip())
+        result = subprocess.run(["node", "-e", script, json.dumps(elements)],
+                                capture_output=True, text=True, timeout=30)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout)["elements"]
+
+    def test_credentials_are_masked(self):
+        """Test that password and credential-autocomplete values never reach the snapshot"""
+        elements = self.extract([
+            ["INPUT", {"type": "text", "value": "alice"}, {"name": "user"}],
+            ["INPUT", {"type": "password", "value": "hunter2"}, {}],
+            ["INPUT", {"type": "text", "value": "123456"}, {"autocomplete": "one-time-code"}],
+            ["INPUT", {"type": "tel", "value": "4111111111111111"}, {"autocomplete": "billing cc-number"}],
+            ["INPUT", {"type": "password", "value": ""}, {"placeholder": "Password"}],
+        ])
+        self.assertEqual(elements[0]["value"], "alice")
+        self.assertEqual([e.get("value") for e in elements[1:]], ["******", "******", "******", None])
+        self.assertEqual([e["name"] for e in elements[1:]], ["", "", "", "Password"])
+        self.assertNotIn("hunter2", json.dumps(elements))
+        self.assertNotIn("4111", json.dumps(elements))
+
+    def test_value_is_name_fallback_for_plain_inputs(self):
+        """Test that non-secret inputs still fall back to their value as the name"""
+        elements = self.extract([["INPUT", {"type": "submit", "value": "Sign in"}, {}]])
+        self.assertEqual((elements[0]["role"], elements[0]["name"]), ("button", "Sign in"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Persistent Shell Executor Tests"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from alpha_bot.executor import PersistentShellExecutor, create_executor
+
+
+@unittest.skipUnless(shutil.which("bash"), "bash not available")
+class TestPersistentShellExecutor(unittest.TestCase):
+    """Test state kept across commands, framing, timeouts and restarts"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.executor = PersistentShellExecutor(working_dir=self.workdir, timeout=10)
+
+    def tearDown(self):
+        self.executor.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_state_survives_between_commands(self):
+        """Test that cd, variables and functions carry over to the next command"""
+        os.mkdir(os.path.join(self.workdir, "sub"))
+        self.assertTrue(self.executor.execute("cd sub && export GREETING=hi && greet() { echo \"$GREETING $1\"; }").success)
+        result = self.executor.execute("greet there; pwd")
+        self.assertEqual(result.stdout, f"hi there\n{os.path.realpath(os.path.join(self.workdir, 'sub'))}\n")
+        self.assertEqual(os.path.realpath(self.executor.working_dir), os.path.realpath(os.path.join(self.workdir, "sub")))
+        self.assertEqual(self.executor.sessions_started, 1)
+
+    def test_exit_code_and_streams(self):
+        """Test that exit codes, stderr and output without a trailing newline are framed correctly"""
+        result = self.executor.execute("printf 'no newline'; echo oops >&2; false")
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, "no newline")
+        self.assertEqual(result.stderr, "oops\n")
+
+        result = self.executor.execute("echo 'unterminated")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertTrue(self.executor.execute("true").success)    # syntax errors stay in the script
+
+    def test_timeout_interrupts_without_losing_session(self):
+        """Test that a timed-out command is interrupted and the shell state is kept"""
+        self.executor.execute("export KEEP=1")
+        start = time.monotonic()
+        result = self.executor.execute("sleep 30", timeout=1)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(result.returncode, -1)
+        self.assertIn("超时", result.stderr)
+        self.assertEqual(self.executor.execute("echo $KEEP").stdout, "1\n")
+        self.assertEqual(self.executor.sessions_started, 1)
+
+    def test_exit_restarts_and_reset(self):
+        """Test that exit ends the session and the next command starts a fresh one"""
+        self.executor.execute("export GONE=1")
+        result = self.executor.execute("exit 4")
+        self.assertEqual(result.returncode, 4)
+        self.assertEqual(self.executor.execute("echo ${GONE:-unset}").stdout, "unset\n")
+        self.assertEqual(self.executor.sessions_started, 2)
+
+        self.executor.execute("cd /")
+        self.executor.reset()
+        self.assertEqual(self.executor.working_dir, self.workdir)
+        self.assertFalse(self.executor.alive)
+
+    def test_output_files_outlive_session_restarts(self):
+        """Test that a restarted session keeps the task's output files and close() deletes them"""
+        executor = PersistentShellExecutor(working_dir=self.workdir, timeout=10, buffer_bytes=1024)
+        path = executor.execute("seq 1 5000").output_file
+        executor.execute("exit 1")
+        self.assertTrue(executor.execute("true").success)
+        self.assertTrue(os.path.exists(path))
+
+        executor.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_create_executor(self):
+        """Test selecting the executor by name"""
+        self.assertIsInstance(create_executor("persistent"), PersistentShellExecutor)
+        self.assertNotIsInstance(create_executor("subprocess"), PersistentShellExecutor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Prompt Builder Tests"""
+
+import unittest
+
+from alpha_bot.context.prompt_builder import (
+    PromptBudget, PromptBuilder, count_tokens, step_fragment, truncate_tokens
+)
+from alpha_bot.memory.bank import MemoryBank
+from alpha_bot.memory.types import MemorySummary
+from alpha_bot.models.types import ExecutionResult, SkillResponse
+from alpha_bot.skills.utils import build_full_history_message
+
+
+def make_result(command: str, stdout: str = "ok", response: SkillResponse = None) -> ExecutionResult:
+    response = response or SkillResponse(skill_name="CommandSkill", select_reason="run it", thinking="think")
+    return ExecutionResult(command=command, returncode=0, stdout=stdout, stderr="", skill_response=response)
+
+
+class TestTokenHelpers(unittest.TestCase):
+    """Test token counting and truncation"""
+
+    def test_count_tokens(self):
+        """Test that counts grow with the text and empty text is free"""
+        self.assertEqual(count_tokens(""), 0)
+        self.assertGreater(count_tokens("hello world " * 100), count_tokens("hello world"))
+        self.assertGreater(count_tokens("你好世界"), 0)
+
+    def test_truncate_keeps_head_and_tail(self):
+        """Test that truncation keeps both ends within the budget"""
+        text = "HEAD " + "filler " * 2000 + " TAIL"
+        truncated = truncate_tokens(text, 100)
+        self.assertTrue(truncated.startswith("HEAD"))
+        self.assertTrue(truncated.endswith("TAIL"))
+        self.assertIn("输出已截断", truncated)
+        self.assertLess(count_tokens(truncated), 150)
+        self.assertEqual(truncate_tokens("short", 100), "short")
+
+
+class TestPromptBuilder(unittest.TestCase):
+    """Test budgeted history prompts"""
+
+    def test_empty_history(self):
+        """Test the messages without history"""
+        self.assertEqual(PromptBuilder([]).history_message(), "- 历史执行记录: 无\n")
+        self.assertEqual(PromptBuilder([]).history_message("task"), "请帮我完成以下任务: task")
+
+    def test_recent_steps_and_task(self):
+        """Test that the last steps and the task are included"""
+        history = [make_result(f"echo {i}") for i in range(5)]
+        message = PromptBuilder(history, budget=PromptBudget()).history_message("do it")
+        self.assertNotIn("第2步", message)
+        for step in (3, 4, 5):
+            self.assertIn(f"第{step}步", message)
+        self.assertTrue(message.endswith("用户当前的任务是：do it"))
+
+    def test_long_output_is_capped(self):
+        """Test that a step's output is cut to the per-step budget"""
+        history = [make_result("cat big", stdout="line\n" * 50000)]
+        budget = PromptBudget(step_output_tokens=500)
+        message = PromptBuilder(history, budget=budget).history_message("task")
+        self.assertLess(count_tokens(message), 700)
+
+    def test_older_steps_dropped_over_budget(self):
+        """Test that the oldest steps go first and the latest step always stays"""
+        history = [make_result(f"step{i}", stdout="x " * 2000) for i in range(3)]
+        budget = PromptBudget(history_tokens=1500, step_output_tokens=1000)
+        builder = PromptBuilder(history, budget=budget)
+        message = builder.history_message()
+        self.assertIn("step2", message)
+        self.assertNotIn("step0", message)
+        self.assertIn("省略了更早的", message)
+        self.assertLessEqual(builder.tokens[False], 1600)
+
+    def test_latest_step_shrinks_to_fit(self):
+        """Test that a single oversized step is compressed instead of dropped"""
+        history = [make_result("huge", stdout="y " * 20000)]
+        budget = PromptBudget(history_tokens=800, step_output_tokens=5000)
+        builder = PromptBuilder(history, budget=budget)
+        self.assertIn("huge", builder.history_message())
+        self.assertLessEqual(builder.tokens[False], 900)
+
+    def test_memory_summaries_for_selector(self):
+        """Test that memory summaries are only included when asked for"""
+        bank = MemoryBank()
+        bank.summaries.append(MemorySummary(title="earlier", content="installed deps"))
+        builder = PromptBuilder([make_result("ls")], bank)
+        self.assertIn("installed deps", builder.history_message(include_memory=True))
+        self.assertNotIn("installed deps", builder.history_message("task"))
+
+    def test_batch_shares_response(self):
+        """Test that batched commands show their shared response once"""
+        response = SkillResponse(skill_name="CommandSkill", select_reason="batch", thinking="parallel")
+        history = [make_result("a", response=response), make_result("b", response=response)]
+        message = PromptBuilder(history).history_message()
+        self.assertEqual(message.count("技能选择原因: batch"), 1)
+        self.assertIn("执行命令: b", message)
+
+    def test_history_blocks_task_first(self):
+        """Test that the task block is the same before and after the first step"""
+        first = PromptBuilder([]).history_blocks("do it")
+        history = [make_result("ls")]
+        later = PromptBuilder(history).history_blocks("do it")
+        self.assertEqual(first, ["请帮我完成以下任务: do it"])
+        self.assertEqual(later[0], first[0])
+        self.assertIn("执行命令: ls", later[1])
+
+    def test_fragments_cached_on_result(self):
+        """Test that rendered steps are cached on the ExecutionResult"""
+        result = make_result("ls")
+        text, tokens = step_fragment(result, True, 100)
+        self.assertIs(step_fragment(result, True, 100)[0], text)
+        self.assertEqual(tokens, count_tokens(text))
+        self.assertEqual(len(result.prompt_fragments), 1)
+
+    def test_shared_builder_from_context(self):
+        """Test that call sites reuse the iteration's builder while it matches the history"""
+        history = [make_result("ls")]
+        builder = PromptBuilder(history)
+        context = {'history': history, 'prompt_builder': builder}
+        first = build_full_history_message(history, "task", context=context)
+        self.assertIn(False, builder._cache)
+        self.assertEqual(build_full_history_message(history, "task", context=context), first)
+        # A builder made for an earlier state of the history is not reused
+        history.append(make_result("pwd"))
+        self.assertFalse(builder.matches(history))
+        self.assertIn("执行命令: pwd", build_full_history_message(history, "task", context=context))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Streaming Shell Executor Tests"""
+
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+from alpha_bot.executor.output import HeadTailBuffer, LabeledOutput
+from alpha_bot.executor.shell import ShellExecutor
+
+
+class TestHeadTailBuffer(unittest.TestCase):
+    """Test the bounded head+tail buffer"""
+
+    def test_keeps_head_and_tail(self):
+        """Test that the middle is dropped once the cap is exceeded"""
+        buffer = HeadTailBuffer(max_bytes=8)
+        for chunk in (b"abc", b"defgh", b"ijklmnop"):
+            buffer.write(chunk)
+        self.assertEqual(buffer.total_bytes, 16)
+        self.assertEqual(buffer.dropped_bytes, 8)
+        value = buffer.getvalue()
+        self.assertTrue(value.startswith("abcd\n"))
+        self.assertTrue(value.endswith("\nmnop"))
+
+    def test_small_output_is_intact(self):
+        """Test that multi-byte characters split across writes survive"""
+        buffer = HeadTailBuffer(max_bytes=64)
+        data = "你好".encode("utf-8")
+        buffer.write(data[:2])
+        buffer.write(data[2:])
+        self.assertFalse(buffer.truncated)
+        self.assertEqual(buffer.getvalue(), "你好")
+
+
+class TestStreamingExecutor(unittest.TestCase):
+    """Test Popen-based execution with live output"""
+
+    def test_live_chunks_and_result(self):
+        """Test that output is forwarded while running and returned at the end"""
+        chunks = []
+        executor = ShellExecutor(streaming=True)
+        result = executor.execute("echo out; echo err >&2; exit 3", on_output=lambda s, t: chunks.append((s, t)))
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(result.stdout, "out\n")
+        self.assertEqual(result.stderr, "err\n")
+        self.assertIsNone(result.output_file)
+        self.assertIn(("stdout", "out\n"), chunks)
+
+    def test_large_output_is_spooled(self):
+        """Test that output beyond the buffer is kept in a temp file"""
+        executor = ShellExecutor(streaming=True, buffer_bytes=1024)
+        result = executor.execute("seq 1 20000")
+        try:
+            self.assertTrue(result.success)
+            self.assertLess(len(result.stdout), 1200)
+            self.assertTrue(result.stdout.startswith("1\n2\n"))
+            self.assertTrue(result.stdout.endswith("19999\n20000\n"))
+            with open(result.output_file) as f:
+                self.assertEqual(len(f.read().splitlines()), 20000)
+            self.assertIn(result.output_file, result.get_output_for_llm())
+        finally:
+            os.unlink(result.output_file)
+
+    def test_spool_files_are_capped_and_deleted(self):
+        """Test that kept output files are bounded per executor and removed on reset/close"""
+        executor = ShellExecutor(streaming=True, buffer_bytes=1024, max_spool_files=2)
+        files = [executor.execute("seq 1 5000").output_file for _ in range(3)]
+        self.assertEqual([os.path.exists(path) for path in files], [False, True, True])
+
+        executor.reset()
+        self.assertFalse(any(os.path.exists(path) for path in files))
+
+        path = executor.execute("seq 1 5000").output_file
+        executor.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_spool_file_removed_when_popen_fails(self):
+        """Test that a command that cannot be started leaves no output file behind"""
+        with tempfile.TemporaryDirectory() as spool_dir, \
+                mock.patch.dict("os.environ", {"EXECUTOR_SPOOL_DIR": spool_dir}), \
+                mock.patch("alpha_bot.executor.shell.subprocess.Popen", side_effect=OSError("no shell")):
+            result = ShellExecutor(streaming=True).execute("echo hi")
+            self.assertEqual(result.returncode, -1)
+            self.assertIn("no shell", result.stderr)
+            self.assertEqual(os.listdir(spool_dir), [])
+
+    def test_output_limit_and_timeout_kill(self):
+        """Test that runaway commands are killed at the output cap or the timeout"""
+        executor = ShellExecutor(streaming=True, buffer_bytes=1024, max_output_bytes=64 * 1024)
+        result = executor.execute("yes")
+        os.unlink(result.output_file)
+        self.assertEqual(result.returncode, -1)
+        self.assertIn("命令已被终止", result.stderr)
+
+        result = executor.execute("echo started; sleep 5", timeout=1)
+        self.assertEqual(result.returncode, -1)
+        self.assertEqual(result.stdout, "started\n")
+        self.assertIn("超时", result.stderr)
+
+
+class TestParallelExecution(unittest.TestCase):
+    """Test batched execution of independent commands"""
+
+    def test_execute_many_runs_concurrently(self):
+        """Test that independent commands overlap, keep their order and are checked one by one"""
+        executor = ShellExecutor(streaming=True, max_parallel=4)
+        start = time.monotonic()
+        results = executor.execute_many(["sleep 0.5; echo a", "sleep 0.5; echo b", "rm -rf /", "sleep 0.5; echo c"])
+        elapsed = time.monotonic() - start
+        executor.close()
+
+        self.assertLess(elapsed, 1.2)
+        self.assertEqual([r.stdout for r in results[:2]] + [results[3].stdout], ["a\n", "b\n", "c\n"])
+        self.assertEqual(results[2].returncode, -1)
+        self.assertIn("危险", results[2].stderr)
+
+    def test_labeled_output(self):
+        """Test that every line gets the label once, also when split across chunks"""
+        chunks = []
+        output = LabeledOutput(lambda stream, text: chunks.append((stream, text)), "[2] ")
+        for stream, text in [("stdout", "a\nb"), ("stderr", "x"), ("stdout", "c\n"), ("stdout", "d\n\ne")]:
+            output(stream, text)
+        self.assertEqual("".join(text for stream, text in chunks if stream == "stdout"), "[2] a\n[2] bc\n[2] d\n[2] \n[2] e")
+        self.assertEqual(chunks[1], ("stderr", "[2] x"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Compiled Custom Skill Cache Tests"""
+
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from alpha_bot.skills.skill_generator import SkillGenerator
+from alpha_bot.skills.skill_manager import SkillManager
+from alpha_bot.skills.skill_persistence import SkillPersistence
+
+
+class FakeExtraction:
+    """Stands in for the LLM extraction call, counting calls and their overlap"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, markdown_text):
+        with self._lock:
+            self.calls.append(markdown_text)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        first_line = markdown_text.splitlines()[0]
+        return {
+            "name": first_line,
+            "description": first_line,
+            "capabilities": ["speech"],
+            "system_prompt": f"Follow: {markdown_text}",
+        }
+
+
+class TestSkillCache(unittest.TestCase):
+    """Test the source-hash keyed cache of compiled custom skills"""
+
+    def setUp(self):
+        self.markdown_dir = tempfile.mkdtemp()
+        self.skills_dir = tempfile.mkdtemp()
+        self.extraction = FakeExtraction()
+        patches = [
+            mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test", "SKILL_GENERATION_WORKERS": "4"}),
+            mock.patch.object(SkillGenerator, "_parse_markdown_with_llm", lambda generator, text: self.extraction(text)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def write_skill(self, name, text):
+        with open(os.path.join(self.markdown_dir, f"{name}.md"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def load_skills(self):
+        """Register the markdown directory's skills on a fresh manager"""
+        with mock.patch.object(SkillManager, "register_dynamic_skill"):
+            manager = SkillManager(ui=mock.MagicMock(), enable_persistence=False)
+        manager.enable_persistence = True
+        manager.persistence = SkillPersistence(self.skills_dir)
+        builtin = len(manager.skills)
+        manager.register_dynamic_skill(self.markdown_dir)
+        # Keyed by description: generated skills are named after the file, loaded ones after the class
+        return {skill.get_description(): skill for skill in manager.skills[builtin:]}
+
+    def test_unchanged_skill_is_a_cache_hit(self):
+        """Test that a second start loads the compiled skill without an LLM call"""
+        self.write_skill("mac_say", "MacSay\nSpeak text aloud with say")
+        first = self.load_skills()
+        self.assertEqual(len(self.extraction.calls), 1)
+
+        second = self.load_skills()
+        self.assertEqual(len(self.extraction.calls), 1)
+        self.assertEqual(set(second), set(first))
+        self.assertEqual(second["MacSay"].get_capabilities(), ["speech"])
+
+    def test_changed_markdown_regenerates(self):
+        """Test that editing the markdown (or bumping the generator) invalidates the cache"""
+        self.write_skill("mac_say", "MacSay\nSpeak text aloud with say")
+        self.load_skills()
+        persistence = SkillPersistence(self.skills_dir)
+        old_hash = persistence.get_source_hash("mac_say")
+
+        self.write_skill("mac_say", "MacSay v2\nSpeak text aloud with say -v Alex")
+        skills = self.load_skills()
+        self.assertEqual(len(self.extraction.calls), 2)
+        self.assertEqual(set(skills), {"MacSay v2"})
+        self.assertNotEqual(persistence.get_source_hash("mac_say"), old_hash)
+
+        # A new generator version regenerates even though the markdown is unchanged
+        with mock.patch.object(SkillGenerator, "GENERATOR_VERSION", "test-next"):
+            self.load_skills()
+        self.assertEqual(len(self.extraction.calls), 3)
+
+    def test_parallel_regeneration(self):
+        """Test that stale skills are regenerated concurrently and all cached"""
+        names = [f"skill_{i}" for i in range(6)]
+        for name in names:
+            self.write_skill(name, f"{name}\ndoes thing {name}")
+
+        skills = self.load_skills()
+        self.assertEqual(len(self.extraction.calls), 6)
+        self.assertGreater(self.extraction.max_active, 1)
+        self.assertEqual(len(skills), 6)
+
+        persistence = SkillPersistence(self.skills_dir)
+        generator = SkillGenerator(enable_persistence=False)
+        for name in names:
+            with open(os.path.join(self.markdown_dir, f"{name}.md"), encoding="utf-8") as f:
+                self.assertTrue(persistence.is_skill_fresh(name, generator.source_hash(f.read())))
+        self.load_skills()
+        self.assertEqual(len(self.extraction.calls), 6)
+
+    def test_concurrent_managers_leave_consistent_cache(self):
+        """Test that managers regenerating the same skills at once leave loadable, fresh files"""
+        names = [f"skill_{i}" for i in range(4)]
+        for name in names:
+            self.write_skill(name, f"{name}\n" + "long description line\n" * 200)
+
+        errors = []
+
+        def start():
+            try:
+                self.load_skills()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=start) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual([f for f in os.listdir(self.skills_dir) if f.endswith(".tmp")], [])
+
+        calls = len(self.extraction.calls)
+        skills = self.load_skills()
+        self.assertEqual(len(self.extraction.calls), calls)
+        self.assertEqual(set(skills), set(names))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Skill Router Tests"""
+
+import unittest
+
+from alpha_bot.models.types import ExecutionResult, SkillResponse
+from alpha_bot.skills.skill_registry import BUILTIN_SKILLS, LazySkill
+from alpha_bot.skills.skill_router import SkillRouter, RouteDecision, CompletedStepRule
+
+
+class TestSkillRouter(unittest.TestCase):
+    """Test the rule-based fast path in front of the LLM selector"""
+    
+    def setUp(self):
+        # Lazy skills describe themselves without being constructed
+        self.skills = [LazySkill(descriptor) for descriptor in BUILTIN_SKILLS]
+        self.router = SkillRouter(threshold=0.85)
+        self.router.enabled = True
+    
+    def _last_result(self, skill_name, command="ls", returncode=0, next_step="", direct_response=""):
+        return ExecutionResult(
+            command=command, returncode=returncode, stdout="", stderr="",
+            skill_response=SkillResponse(skill_name=skill_name, next_step=next_step, direct_response=direct_response)
+        )
+    
+    def test_direct_mode(self):
+        """Test that direct mode goes to DirectLLMSkill and completes after its answer"""
+        decision = self.router.route("翻译 hello", self.skills, {'direct_mode': True, 'iteration': 1})
+        self.assertEqual(decision.skill.name, "DirectLLMSkill")
+        
+        last_result = self._last_result("DirectLLMSkill", command="", direct_response="你好")
+        decision = self.router.route("翻译 hello", self.skills, {'direct_mode': True, 'iteration': 2, 'last_result': last_result})
+        self.assertTrue(decision.task_complete)
+        self.assertIsNone(decision.skill)
+    
+    def test_explicit_prefix(self):
+        """Test @skill prefixes on the first step"""
+        decision = self.router.route("@browser 打开 github", self.skills, {'iteration': 1})
+        self.assertEqual(decision.skill.name, "BrowserSkill")
+        self.assertIsNone(self.router.route("@browser 打开 github", self.skills, {'iteration': 2}))
+    
+    def test_completed_command_step(self):
+        """Test that a successful command with no next step completes the task once the rule is registered"""
+        self.router.add_rule(CompletedStepRule())
+        context = {'iteration': 2, 'last_result': self._last_result("CommandSkill")}
+        self.assertTrue(self.router.route("列出文件", self.skills, context).task_complete)
+        
+        context['last_result'] = self._last_result("CommandSkill", next_step="查看文件内容")
+        self.assertIsNone(self.router.route("列出文件", self.skills, context))
+        
+        context['last_result'] = self._last_result("CommandSkill", returncode=1)
+        self.assertIsNone(self.router.route("列出文件", self.skills, context))
+    
+    def test_data_gathering_step_does_not_complete(self):
+        """Test that by default a command without next_step leaves completion to the LLM selector"""
+        # CommandSkill's own example: cat README.md, then DirectLLMSkill summarizes
+        context = {'iteration': 2, 'last_result': self._last_result("CommandSkill", command="cat README.md")}
+        self.assertIsNone(self.router.route("总结README.md文件", self.skills, context))
+    
+    def test_keyword_scoring(self):
+        """Test that only unambiguous keyword matches are routed"""
+        self.assertEqual(self.router.route("帮我做一个介绍AI的PPT", self.skills, {'iteration': 1}).skill.name, "PPTSkill")
+        # Both browser and text-processing keywords match: defer to the LLM selector
+        self.assertIsNone(self.router.route("打开网页并翻译内容", self.skills, {'iteration': 1}))
+        self.assertIsNone(self.router.route("查看磁盘空间", self.skills, {'iteration': 1}))
+        self.assertEqual(self.router.route("用浏览器打开 https://github.com", self.skills, {'iteration': 1}).skill.name, "BrowserSkill")
+    
+    def test_keywords_with_file_or_shell_signals(self):
+        """Test that keyword hits are not trusted when the task involves files, paths or shell work"""
+        for task in [
+            "总结一下 README.md 然后翻译成英文",        # DirectLLMSkill cannot read the file
+            "把 ppt 目录下的文件打包成 zip",             # not a presentation
+            "把 images 目录里的图片转成 png 格式",       # not image generation
+            "总结 ~/notes/todo 的内容",
+            "帮我把 report.pptx 重命名",
+        ]:
+            self.assertIsNone(self.router.route(task, self.skills, {'iteration': 1}), task)
+    
+    def test_direct_llm_never_first_for_urls(self):
+        """Test that text processing of a URL is not routed to DirectLLMSkill"""
+        rule = self.router.rules[-1]
+        self.assertIsNone(rule("总结 https://example.com 的内容", self.skills, {'iteration': 1}))
+        self.assertIsNone(rule("翻译 www.example.com", self.skills, {'iteration': 1}))
+        self.assertEqual(rule("翻译并总结：你好世界", self.skills, {'iteration': 1}).skill.name, "DirectLLMSkill")
+    
+    def test_custom_rule_and_stats(self):
+        """Test pluggable rules and hit accounting"""
+        self.router.add_rule(lambda task, skills, context: RouteDecision(skills[0], 1.0, "always"), first=True)
+        self.router.route("anything", self.skills, {})
+        
+        stats = self.router.get_stats()
+        self.assertEqual(stats["routed"], 1)
+        self.assertEqual(stats["<lambda>"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""Speculative Skill Execution Tests"""
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from alpha_bot.auto_hint.system import AutoHintSystem
+from alpha_bot.models.types import CommandSkillResponse
+from alpha_bot.skills.base_skill import BaseSkill, SkillExecutionResponse
+from alpha_bot.skills.skill_manager import SkillManager
+
+
+class FakeResponseStream:
+    """Stands in for the SDK's streaming response"""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeSkill(BaseSkill):
+    """Streams a few tokens through an LLM-like response stream and uses one hint"""
+
+    FUSED_RESPONSE_CLASS = CommandSkillResponse
+
+    def __init__(self, name, hint_id, token_delay=0.0):
+        super().__init__()
+        self.name = name
+        self.hint_id = hint_id
+        self.token_delay = token_delay
+        self.response_stream = FakeResponseStream()
+        self.cancelled = False
+
+    def get_capabilities(self):
+        return ["command_generation"]
+
+    def _prepare(self, stream_callback):
+        self.auto_hint_system.record_hint_usage(self.hint_id)
+        bind_stream = getattr(stream_callback, "bind_stream", None)
+        if bind_stream is not None:
+            bind_stream(self.response_stream)
+
+    def execute(self, task, context=None, stream_callback=None, **kwargs):
+        self._prepare(stream_callback)
+        try:
+            for token in ["ec", "ho ", self.name]:
+                if self.response_stream.closed.wait(self.token_delay):
+                    raise ConnectionError("stream closed")
+                if stream_callback:
+                    stream_callback(token)
+        except Exception as e:
+            return SkillExecutionResponse(thinking=str(e))
+        return SkillExecutionResponse(command=f"echo {self.name}")
+
+    async def aexecute(self, task, context=None, stream_callback=None, **kwargs):
+        self._prepare(stream_callback)
+        try:
+            for token in ["ec", "ho ", self.name]:
+                await asyncio.sleep(self.token_delay)
+                if stream_callback:
+                    stream_callback(token)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return SkillExecutionResponse(command=f"echo {self.name}")
+
+
+class TestSpeculativeExecution(unittest.TestCase):
+    """Test hits, misses, cancellation and hint usage of speculative execution"""
+
+    def setUp(self):
+        with mock.patch.object(SkillManager, "register_dynamic_skill"), \
+                mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test"}):
+            self.manager = SkillManager(ui=mock.MagicMock(), enable_persistence=False)
+        self.manager.router.enabled = False
+        self.manager.speculative_execution = True
+
+        self.hints = AutoHintSystem(enable_persistence=False)
+        self.hints.enable_persistence = True
+        self.hints.persistence = mock.MagicMock()
+
+        self.predicted = FakeSkill("Predicted", "hint-predicted", token_delay=0.05)
+        self.other = FakeSkill("Other", "hint-other")
+        for skill in (self.predicted, self.other):
+            skill.auto_hint_system = self.hints
+        self.manager.skills = [self.predicted, self.other]
+        self.manager.default_skill = self.predicted
+
+    def select(self, skill):
+        selection = (skill, 0.9, "test", False)
+
+        async def aselect(*args):
+            await asyncio.sleep(0.01)     # the speculative task starts while the selector waits
+            return selection
+
+        self.manager.skill_selector.select_skill = mock.Mock(return_value=selection)
+        self.manager.skill_selector.aselect_skill = aselect
+
+    def recorded_hints(self):
+        return [call.args[0] for call in self.hints.persistence.update_hint_usage.call_args_list]
+
+    def test_hit_keeps_speculative_result(self):
+        """Test that a hit returns the speculative output and records its hint usage once"""
+        self.select(self.predicted)
+        response = self.manager.execute("task", {"iteration": 1})
+        self.assertEqual(response.command, "echo Predicted")
+        self.assertEqual(self.recorded_hints(), ["hint-predicted"])
+        self.assertEqual(self.manager.get_speculation_stats(), {"enabled": True, "hits": 1, "misses": 0, "hit_rate": 1.0})
+
+    def test_miss_cancels_stream_and_drops_hint_usage(self):
+        """Test that a miss closes the speculative LLM stream and records only the kept skill's hints"""
+        self.predicted.token_delay = 5
+        self.select(self.other)
+        response = self.manager.execute("task", {"iteration": 1})
+        self.assertEqual(response.command, "echo Other")
+        self.assertTrue(self.predicted.response_stream.closed.wait(1))
+        self.manager._speculation_pool.shutdown(wait=True)
+        self.assertEqual(self.recorded_hints(), ["hint-other"])
+        stats = self.manager.get_speculation_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (0, 1, 0.0))
+
+    def test_async_hit_and_miss(self):
+        """Test the coroutine variant: a miss cancels the speculative task"""
+        self.select(self.predicted)
+        response = asyncio.run(self.manager.aexecute("task", {"iteration": 1}))
+        self.assertEqual(response.command, "echo Predicted")
+
+        self.predicted.token_delay = 5
+        self.select(self.other)
+        response = asyncio.run(self.manager.aexecute("task", {"iteration": 1}))
+        self.assertEqual(response.command, "echo Other")
+        self.assertTrue(self.predicted.cancelled)
+        self.assertEqual(self.recorded_hints(), ["hint-predicted", "hint-other"])
+        self.assertEqual(self.manager.get_speculation_stats()["hit_rate"], 0.5)
+
+    def test_only_fused_capable_skills_are_predicted(self):
+        """Test that skills with side effects are never started speculatively"""
+        self.predicted.FUSED_RESPONSE_CLASS = None
+        self.select(self.predicted)
+        self.manager.execute("task", {"iteration": 1})
+        self.assertEqual(self.manager.get_speculation_stats()["hits"] + self.manager.get_speculation_stats()["misses"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""SQLite Hint Store Tests"""
+
+import os
+import tempfile
+import unittest
+import multiprocessing
+
+from alpha_bot.auto_hint.persistence import HintPersistenceManager
+from alpha_bot.auto_hint.sqlite_store import SQLiteHintStore
+from alpha_bot.auto_hint.storage import HintStore, create_hint_store, parse_hint_markdown
+from alpha_bot.auto_hint.system import AutoHintSystem
+from alpha_bot.auto_hint.types import HintCategory, HintMetadata
+
+
+def make_hint(hint_id, skill="CommandSkill", effectiveness=0.0, content="", category=HintCategory.BEST_PRACTICE):
+    metadata = HintMetadata(
+        id=hint_id, title=f"title {hint_id}", skill_name=skill,
+        effectiveness_score=effectiveness, category=category
+    )
+    return {"metadata": metadata, "content": content or f"content of {hint_id}"}
+
+
+def save_and_use(path, worker, count):
+    """Runs in a separate process: save hints and record usage of a shared one"""
+    store = SQLiteHintStore(path, flush_interval=0, flush_threshold=10)
+    store.save_hints([make_hint(f"w{worker}-{i}") for i in range(count)])
+    for _ in range(count):
+        store.update_hint_usage("shared")
+    store.close()
+
+
+class TestSQLiteHintStore(unittest.TestCase):
+    """Test the SQLite backend"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = SQLiteHintStore(self.temp_dir, flush_interval=0, flush_threshold=100)
+        self.addCleanup(self.store.close)
+
+    def test_path_and_factory(self):
+        """Test that a directory gets hints.sqlite3 and the factory picks the backend"""
+        self.assertEqual(self.store.path, os.path.join(self.temp_dir, "hints.sqlite3"))
+        store = create_hint_store(self.temp_dir, backend="sqlite")
+        self.addCleanup(store.close)
+        self.assertIsInstance(store, SQLiteHintStore)
+        self.assertIsInstance(create_hint_store(tempfile.mkdtemp(), backend="files"), HintPersistenceManager)
+
+    def test_ranked_lookup(self):
+        """Test that top hints come back best first with their content"""
+        self.store.save_hints([
+            make_hint("low", effectiveness=0.1),
+            make_hint("high", effectiveness=0.9),
+            make_hint("mid", effectiveness=0.5),
+            make_hint("other", skill="BrowserSkill", effectiveness=1.0),
+        ])
+        hints = self.store.top_hints_for_skill("CommandSkill", 2)
+        self.assertEqual([hint["metadata"]["id"] for hint in hints], ["high", "mid"])
+        self.assertEqual(hints[0]["content"], "content of high")
+        self.assertEqual(hints[0]["metadata"]["category"], "best_practice")
+        self.assertEqual(len(self.store.load_hints_for_skill("CommandSkill")), 3)
+        self.assertEqual(set(self.store.load_all_hints()), {"CommandSkill", "BrowserSkill"})
+
+    def test_buffered_usage_and_effectiveness(self):
+        """Test that updates are written on flush and change the ranking"""
+        self.store.save_hints([make_hint("a", effectiveness=0.5), make_hint("b", effectiveness=0.5)])
+        self.store.update_hint_usage("b")
+        self.store.update_hint_usage("b")
+        self.assertEqual(self.store.top_hints_for_skill("CommandSkill", 1)[0]["metadata"]["usage_count"], 0)
+        self.assertTrue(self.store.flush())
+        top = self.store.top_hints_for_skill("CommandSkill", 1)[0]["metadata"]
+        self.assertEqual((top["id"], top["usage_count"]), ("b", 2))
+        self.store.update_hint_effectiveness("a", 0.8)
+        self.store.flush()
+        self.assertEqual(self.store.top_hints_for_skill("CommandSkill", 1)[0]["metadata"]["id"], "a")
+
+    def test_full_text_search(self):
+        """Test that search matches content words and can be limited to a skill"""
+        self.store.save_hints([
+            make_hint("perm", content="Use sudo when you get permission denied"),
+            make_hint("pip", content="Run pip install with --user"),
+            make_hint("web", skill="BrowserSkill", content="Wait for the page before clicking; permission prompts block it"),
+        ])
+        self.assertTrue(self.store.fts)
+        self.assertEqual({hint["metadata"]["id"] for hint in self.store.search_hints("permission")}, {"perm", "web"})
+        self.assertEqual([hint["metadata"]["id"] for hint in self.store.search_hints("permission denied")], ["perm"])
+        self.assertEqual(self.store.search_hints("permission", skill_name="BrowserSkill")[0]["metadata"]["id"], "web")
+        # Content updates are re-indexed
+        self.store.save_hint(make_hint("pip", content="permission issues: use a virtualenv"))
+        self.assertEqual(len(self.store.search_hints("permission")), 3)
+        self.store.delete_hint("pip")
+        self.assertEqual(len(self.store.search_hints("permission")), 2)
+
+    def test_statistics_and_cleanup(self):
+        """Test counts by skill/category and cleanup of unused ineffective hints"""
+        self.store.save_hints([
+            make_hint("keep", effectiveness=0.9),
+            make_hint("drop", effectiveness=0.1, category=HintCategory.TROUBLESHOOTING),
+        ])
+        stats = self.store.get_hint_statistics()
+        self.assertEqual(stats["total_hints"], 2)
+        self.assertEqual(stats["hints_by_category"], {"best_practice": 1, "troubleshooting": 1})
+        self.assertEqual(self.store.cleanup_old_hints(), 1)
+        self.assertEqual(self.store.get_hint_statistics()["hints_by_skill"], {"CommandSkill": 1})
+
+    def test_markdown_round_trip(self):
+        """Test import from and export to the hint_*.md layout"""
+        source_dir = tempfile.mkdtemp()
+        files = HintPersistenceManager(source_dir, flush_interval=0, flush_threshold=1)
+        files.save_hint(make_hint("md", skill="BrowserSkill", effectiveness=0.7, content="line one\nline two"))
+        files.update_hint_usage("md")
+
+        self.assertEqual(self.store.import_markdown(source_dir), 1)
+        hint = self.store.top_hints_for_skill("BrowserSkill", 1)[0]
+        self.assertEqual(hint["content"], "line one\nline two")
+        self.assertEqual((hint["metadata"]["usage_count"], hint["metadata"]["effectiveness_score"]), (1, 0.7))
+
+        export_dir = tempfile.mkdtemp()
+        self.assertEqual(self.store.export_markdown(export_dir), 1)
+        exported = HintPersistenceManager(export_dir).top_hints_for_skill("BrowserSkill", 1)[0]
+        self.assertEqual(exported["metadata"]["id"], "md")
+        self.assertEqual(parse_hint_markdown(exported["content"]), "line one\nline two")
+
+    def test_system_with_sqlite_backend(self):
+        """Test that AutoHintSystem works on top of the SQLite store"""
+        system = AutoHintSystem(enable_persistence=False)
+        system.enable_persistence = True
+        system.persistence = self.store
+        self.store.save_hints([make_hint("a", effectiveness=0.3), make_hint("b", effectiveness=0.6)])
+        hints = system.get_hints_for_skill("CommandSkill", max_hints=1)
+        self.assertEqual(hints[0]["metadata"]["id"], "b")
+        system.record_hint_usage("b")
+        system.shutdown()
+        self.assertEqual(self.store.pending_updates, 0)
+
+
+class TestMultiProcess(unittest.TestCase):
+    """Test that several processes can share one database"""
+
+    def test_concurrent_processes(self):
+        """Test that concurrent saves and usage updates from processes are all kept"""
+        path = os.path.join(tempfile.mkdtemp(), "hints.sqlite3")
+        store = SQLiteHintStore(path, flush_interval=0, flush_threshold=1)
+        self.addCleanup(store.close)
+        store.save_hint(make_hint("shared"))
+
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=save_and_use, args=(path, worker, 40)) for worker in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertEqual(store.get_hint_statistics()["total_hints"], 121)
+        shared = [hint for hint in store.load_hints_for_skill("CommandSkill") if hint["metadata"]["id"] == "shared"]
+        self.assertEqual(shared[0]["metadata"]["usage_count"], 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Startup Cost Tests
+
+Run directly (python -m tests.test_startup --report) to print the slowest
+imports of `import alpha_bot` as measured by `python -X importtime`.
+"""
+
+import os
+import re
+import sys
+import subprocess
+import unittest
+
+from alpha_bot.skills.skill_registry import BUILTIN_SKILLS
+
+
+# Modules that must only be imported once a skill that needs them is selected
+HEAVY_MODULES = ("bs4", "lxml", "pptx", "playwright")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(statement: str = "import alpha_bot"):
+    """
+    Run statement in a fresh interpreter under -X importtime
+    
+    Returns:
+        Dict of module name -> cumulative import time in microseconds
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=root, capture_output=True, text=True, timeout=120
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+class TestStartupImports(unittest.TestCase):
+    """Guard against heavy imports creeping back onto the startup path"""
+    
+    def test_import_does_not_load_heavy_dependencies(self):
+        """Test that importing alpha_bot does not import skill-only dependencies"""
+        modules = measure_import("import alpha_bot")
+        
+        self.assertIn("alpha_bot", modules)
+        loaded = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        self.assertEqual(loaded, [], f"heavy modules imported at startup: {loaded}")
+    
+    def test_builtin_descriptors_match_skill_classes(self):
+        """Test that lazy descriptors describe the classes they point to"""
+        for descriptor in BUILTIN_SKILLS:
+            skill_class = descriptor.load_class()
+            # Describe the class without running __init__ (which creates LLM clients)
+            skill = skill_class.__new__(skill_class)
+            
+            self.assertEqual(descriptor.name, skill_class.__name__)
+            self.assertEqual(descriptor.capabilities, skill.get_capabilities())
+            self.assertEqual(descriptor.description, skill.get_description())
+            self.assertEqual(descriptor.fused, skill_class.FUSED_RESPONSE_CLASS is not None)
+
+
+if __name__ == '__main__':
+    if "--report" in sys.argv:
+        results = measure_import("import alpha_bot")
+        print(f"import alpha_bot: {results.get('alpha_bot', 0) / 1000:.1f} ms cumulative")
+        for name, cumulative in sorted(results.items(), key=lambda item: -item[1])[:20]:
+            print(f"{cumulative / 1000:10.1f} ms  {name}")
+    else:
+        unittest.main()
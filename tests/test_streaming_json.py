@@ -0,0 +1,143 @@
+"""Streaming JSON Parser Tests
+
+Run directly (python -m tests.test_streaming_json --benchmark) to compare the
+incremental parser with per-token regex re-extraction on long responses.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import unittest
+
+from alpha_bot.ui.streaming_json import StreamingJSONParser
+
+
+FIELD_PATTERN = r'"{}"\s*:\s*"((?:[^"\\]|\\.)*)'
+
+
+def _tokens(text, seed=0):
+    """Split text into LLM-sized tokens (1-6 characters)"""
+    rng = random.Random(seed)
+    tokens, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 6)
+        tokens.append(text[i:i + size])
+        i += size
+    return tokens
+
+
+def _response(code_lines):
+    code = "\n".join(f'    print("line {i}: \\u4f60\\u597d", value[{i}])  # 注释 \\\\ "q"' for i in range(code_lines))
+    return json.dumps({
+        "thinking": "先打开页面，再提取\n数据",
+        "code": code,
+        "explanation": "提取 \"标题\" 列表",
+        "title": "😀 emoji",
+    }, ensure_ascii=False)
+
+
+def _parse_incremental(tokens):
+    parser = StreamingJSONParser()
+    for token in tokens:
+        parser.feed(token)
+    return parser
+
+
+def _parse_regex(tokens, fields=StreamingJSONParser.DEFAULT_FIELDS):
+    """The per-token approach the parser replaces: re-scan the whole buffer every token"""
+    buffer, values = "", {}
+    for token in tokens:
+        buffer += token
+        for name in fields:
+            match = re.search(FIELD_PATTERN.format(name), buffer)
+            if match:
+                values[name] = match.group(1).replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+    return values
+
+
+class TestStreamingJSONParser(unittest.TestCase):
+    """Test incremental field extraction"""
+
+    def test_matches_json_loads(self):
+        """Test that fields decode exactly like json.loads regardless of token boundaries"""
+        text = _response(20)
+        expected = json.loads(text)
+        for seed in range(5):
+            parser = _parse_incremental(_tokens(text, seed))
+            for name in ("thinking", "code", "explanation", "title"):
+                self.assertEqual(parser.get(name), expected[name])
+
+    def test_deltas_and_partial_values(self):
+        """Test per-field deltas while a string is still open"""
+        parser = StreamingJSONParser()
+        self.assertEqual(parser.feed('```json\n{"thinking": "ab'), {"thinking": "ab"})
+        self.assertEqual(parser.feed('c\\'), {"thinking": "c"})
+        self.assertEqual(parser.feed('nd", "command": "ls'), {"thinking": "\nd", "command": "ls"})
+        self.assertEqual(parser.get("thinking"), "abc\nd")
+
+    def test_first_occurrence_and_raw_fields(self):
+        """Test that nested duplicates are ignored and outline is passed through raw"""
+        parser = StreamingJSONParser()
+        parser.feed('{"title": "Deck", "outline": [{"title": "Intro"}')
+        parser.feed(', {"title": "End"}]}')
+        self.assertEqual(parser.get("title"), "Deck")
+        self.assertEqual(parser.get("outline"), '"outline": [{"title": "Intro"}, {"title": "End"}]}')
+        self.assertEqual(parser.get("command"), "")
+
+    def test_get_between_lookup_and_append(self):
+        """Test that reading a field while feed() appends to it (rich Live refresh thread) loses no tokens"""
+        parser = StreamingJSONParser()
+
+        class RacingParts(dict):
+            def __getitem__(self, name):
+                parts = super().__getitem__(name)
+                parser.get(name)    # the render thread reads between _append's lookup and append
+                parser.buffer
+                return parts
+
+        parser._parts = RacingParts(parser._parts)
+        tokens = ['{"thinking": "', 'one ', 'two ', 'three', '", "command": "ls"}']
+        for token in tokens:
+            parser.feed(token)
+        self.assertEqual(parser.get("thinking"), "one two three")
+        self.assertEqual(parser.values["command"], "ls")
+        self.assertEqual(parser.buffer, "".join(tokens))
+
+    def test_linear_time(self):
+        """Test that parsing a 4x longer response takes roughly 4x as long"""
+        short_tokens = _tokens(_response(500))
+        long_tokens = _tokens(_response(2000))
+
+        def best_of(tokens, runs=3):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                _parse_incremental(tokens)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        ratio = best_of(long_tokens) / best_of(short_tokens)
+        self.assertLess(ratio, 8, f"parse time grew {ratio:.1f}x for 4x the input")
+
+
+def benchmark(token_counts=(2500, 5000, 10000, 20000)):
+    print(f"{'tokens':>8} {'incremental':>12} {'regex':>10}")
+    for count in token_counts:
+        text = _response(count)
+        tokens = _tokens(text)[:count]
+        start = time.perf_counter()
+        _parse_incremental(tokens)
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        _parse_regex(tokens)
+        regex = time.perf_counter() - start
+        print(f"{count:>8} {incremental * 1000:>10.1f}ms {regex * 1000:>8.0f}ms")
+
+
+if __name__ == '__main__':
+    if "--benchmark" in sys.argv:
+        benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,84 @@
+"""Task History Store Tests"""
+
+import os
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from alpha_bot.web.history import HistoryConfig, TaskHistoryStore, TaskRecord, history_page
+
+
+def _record(session_id="s1", task="list files", status="completed", days_ago=0, log=None):
+    start = (datetime.now() - timedelta(days=days_ago)).isoformat()
+    return TaskRecord(
+        id=session_id, task=task, status=status, start_time=start, end_time=start, duration=1.0,
+        iterations=1, success_count=1, failure_count=0,
+        execution_log=log if log is not None else [{"type": "command", "data": {"command": "ls"}}],
+        summary={"iterations": 1},
+    )
+
+
+class TestTaskHistoryStore(unittest.TestCase):
+    """Test append, queries, lazy logs and retention"""
+
+    def setUp(self):
+        self.store = TaskHistoryStore(HistoryConfig(path=":memory:"))
+
+    def test_query_filters_and_lazy_logs(self):
+        """Test that listing skips logs, filters apply and detail loads the log"""
+        self.store.append(_record(task="list files", days_ago=2))
+        self.store.append(_record(task="Download 100% of report", status="failed", days_ago=1))
+        record_id = self.store.append(_record(session_id="s2", task="list dirs"))
+
+        tasks, total = self.store.query(per_page=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([t.task for t in tasks], ["list dirs", "Download 100% of report"])
+        self.assertEqual(tasks[0].execution_log, [])
+
+        self.assertEqual(self.store.query(status="failed")[1], 1)
+        self.assertEqual(self.store.query(search="100%")[1], 1)
+        self.assertEqual(self.store.query(search="LIST")[1], 2)
+        since = (datetime.now() - timedelta(hours=36)).isoformat()
+        self.assertEqual(self.store.query(since=since)[1], 2)
+
+        detail = self.store.get(str(record_id))
+        self.assertEqual(detail.id, "s2")
+        self.assertEqual(detail.execution_log[0]["data"]["command"], "ls")
+        self.assertEqual(self.store.get("s2").record_id, record_id)
+
+        page = history_page(self.store, {"page": "2", "per_page": "2"})
+        self.assertEqual((page["total"], page["total_pages"], len(page["tasks"])), (3, 2, 1))
+
+    def test_retention_by_age_count_and_size(self):
+        """Test that retention drops old records, extra records and oversized logs"""
+        store = TaskHistoryStore(HistoryConfig(path=":memory:", max_age_days=7, max_records=3, max_log_mb=0))
+        store.append(_record(task="old", days_ago=30))
+        for i in range(4):
+            store.append(_record(task=f"task {i}"))
+        self.assertEqual(store.apply_retention(), 2)
+        self.assertEqual([t.task for t in store.query()[0]], ["task 3", "task 2", "task 1"])
+
+        store.config.max_log_mb = 200 / (1024 * 1024)    # room for about one log
+        store.append(_record(task="big", log=[{"message": "x" * 150}]))
+        store.apply_retention()
+        self.assertEqual([t.task for t in store.query()[0]], ["big"])
+
+    def test_delete_and_import_json(self):
+        """Test deleting by record id and importing the legacy JSON file"""
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy = os.path.join(tmp, "task_history.json")
+            with open(legacy, "w", encoding="utf-8") as f:
+                json.dump([vars(_record(task="a")), vars(_record(task="b"))], f)
+            self.assertEqual(self.store.import_json(legacy), 2)
+
+        first = self.store.query()[0][0]
+        self.assertTrue(self.store.delete(str(first.record_id)))
+        self.assertFalse(self.store.delete(str(first.record_id)))
+        self.assertEqual(self.store.count(), 1)
+        self.store.clear()
+        self.assertEqual(self.store.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
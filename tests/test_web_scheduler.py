@@ -0,0 +1,155 @@
+"""Web Scheduler Tests"""
+
+import time
+import unittest
+from unittest import mock
+
+from alpha_bot.web.scheduler import BATCH, INTERACTIVE, SessionAgentPool, TaskScheduler
+from alpha_bot.web.server import WebUIWrapper
+
+
+class TestTaskScheduler(unittest.TestCase):
+    """Test dispatch order, limits and wait statistics"""
+
+    def test_interactive_before_batch(self):
+        """Test that interactive tasks are dispatched first, FIFO within a lane"""
+        scheduler = TaskScheduler(max_running=4, max_queue=10, session_limit=1)
+        scheduler.submit("a", "batch-1", BATCH)
+        scheduler.submit("b", "batch-2", BATCH)
+        scheduler.submit("c", "chat-1", INTERACTIVE)
+        scheduler.submit("d", "chat-2", INTERACTIVE)
+
+        order = [scheduler.next_task().payload for _ in range(4)]
+        self.assertEqual(order, ["chat-1", "chat-2", "batch-1", "batch-2"])
+        self.assertIsNone(scheduler.next_task())
+        self.assertEqual(scheduler.get_stats()['wait_time'][INTERACTIVE]['count'], 2)
+
+    def test_session_limit_and_global_cap(self):
+        """Test that a busy session does not block other sessions and the global cap holds"""
+        scheduler = TaskScheduler(max_running=2, max_queue=10, session_limit=1)
+        scheduler.submit("a", 1)
+        scheduler.submit("a", 2)
+        scheduler.submit("b", 3)
+        scheduler.submit("c", 4)
+
+        first = scheduler.next_task()
+        second = scheduler.next_task()
+        self.assertEqual((first.payload, second.payload), (1, 3))
+        self.assertIsNone(scheduler.next_task())    # global cap reached
+
+        scheduler.done(first)
+        self.assertEqual(scheduler.next_task().payload, 2)
+        self.assertTrue(scheduler.session_busy("c"))
+        self.assertEqual(scheduler.cancel_queued("c"), 1)
+        self.assertFalse(scheduler.session_busy("c"))
+
+    def test_queue_full_rejects(self):
+        """Test that submit returns None beyond max_queue"""
+        scheduler = TaskScheduler(max_running=1, max_queue=2)
+        self.assertIsNotNone(scheduler.submit("a", 1))
+        self.assertIsNotNone(scheduler.submit("b", 2))
+        self.assertIsNone(scheduler.submit("c", 3))
+        self.assertEqual(scheduler.get_stats()['rejected'], 1)
+
+
+class TestSessionAgentPool(unittest.TestCase):
+    """Test agent reuse and eviction"""
+
+    def test_reuse_and_lru_eviction(self):
+        """Test that idle agents are reused and the least recently used ones evicted"""
+        evicted = []
+        pool = SessionAgentPool(object, max_agents=2, idle_ttl=0, on_evict=evicted.append)
+
+        for session_id in ("a", "b"):
+            pool.release(session_id, pool.acquire(session_id))
+        agent_a = pool.acquire("a")
+        pool.release("a", agent_a)
+        self.assertIs(pool.acquire("a"), agent_a)
+        pool.release("a", agent_a)
+
+        pool.release("c", pool.acquire("c"))
+        self.assertEqual(evicted, ["b"])
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.created, 3)
+
+    def test_busy_agents_are_not_evicted(self):
+        """Test that agents in use survive eviction and idle ones expire after idle_ttl"""
+        evicted = []
+        pool = SessionAgentPool(object, max_agents=1, idle_ttl=0.01, on_evict=evicted.append)
+        agent_a = pool.acquire("a")
+        agent_b = pool.acquire("b")
+        self.assertEqual(pool.running_agents("a"), [agent_a])
+        self.assertEqual(len(pool), 2)
+
+        pool.release("b", agent_b)
+        self.assertEqual(evicted, ["b"])    # over max_agents, only the idle one can go
+
+        pool.release("a", agent_a)
+        time.sleep(0.02)
+        pool.evict()
+        self.assertEqual(evicted, ["b", "a"])
+        self.assertEqual(len(pool), 0)
+
+    def test_evicted_agents_are_closed(self):
+        """Test that dropped agents are closed, and agents in use are not"""
+        class FakeAgent:
+            def __init__(self):
+                self.closed = 0
+
+            def close(self):
+                self.closed += 1
+
+        pool = SessionAgentPool(FakeAgent, max_agents=1, idle_ttl=0)
+        agent_a = pool.acquire("a")
+        agent_b = pool.acquire("b")
+        pool.release("b", agent_b)
+        self.assertEqual((agent_a.closed, agent_b.closed), (0, 1))
+
+        pool.release("a", agent_a)
+        self.assertEqual(agent_a.closed, 0)     # back under max_agents, kept for reuse
+        self.assertIs(pool.acquire("a"), agent_a)
+
+    def test_sweeper_evicts_without_traffic(self):
+        """Test that the sweeper thread expires idle agents while no task acquires or releases"""
+        evicted = []
+        pool = SessionAgentPool(object, idle_ttl=0.02, sweep_interval=0.01, on_evict=evicted.append)
+        pool.release("a", pool.acquire("a"))
+        busy = pool.acquire("b")
+        pool.start_sweeper()
+        self.addCleanup(pool.stop_sweeper)
+
+        deadline = time.monotonic() + 2
+        while not evicted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(evicted, ["a"])
+        self.assertEqual(pool.running_agents("b"), [busy])
+
+        pool.stop_sweeper()
+        self.assertIsNone(pool._sweeper)
+
+    def test_no_sweeper_without_idle_ttl(self):
+        """Test that no sweeper thread is started when idle agents never expire"""
+        pool = SessionAgentPool(object, idle_ttl=0, sweep_interval=0.01)
+        pool.start_sweeper()
+        self.assertIsNone(pool._sweeper)
+
+
+class TestExecutionLog(unittest.TestCase):
+    """Test that execution logs are collected per task"""
+
+    def test_concurrent_tasks_of_one_session_keep_separate_logs(self):
+        """Test that a second task of the same session does not wipe the first one's log"""
+        parent = mock.MagicMock(active_streams={})
+        first = WebUIWrapper(mock.MagicMock(), "s", mock.MagicMock(), parent)
+        first.print_task("first task")
+        second = WebUIWrapper(mock.MagicMock(), "s", mock.MagicMock(), parent)
+        second.print_task("second task")
+        first.print_step(1)
+
+        self.assertEqual([entry['event_type'] for entry in first.execution_log], ['task_received', 'step_started'])
+        self.assertEqual(first.execution_log[0]['data']['task'], "first task")
+        self.assertEqual([entry['data']['task'] for entry in second.execution_log], ["second task"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Web Streaming Frame Tests"""
+
+import unittest
+
+from alpha_bot.web.streaming import StreamingFrameEmitter
+
+
+class TestStreamingFrameEmitter(unittest.TestCase):
+    """Test delta frames, coalescing and resync snapshots"""
+
+    def setUp(self):
+        self.events = []
+        self.emit = lambda event_type, data: self.events.append((event_type, data))
+
+    def _rebuild(self):
+        """Apply delta frames the way the browser client does"""
+        fields, seq = {}, 0
+        for event_type, data in self.events:
+            if event_type == 'streaming_delta':
+                self.assertEqual(data['seq'], seq + 1)
+                seq = data['seq']
+                for name, delta in data['deltas'].items():
+                    fields[name] = fields.get(name, "") + delta
+        return fields
+
+    def test_coalesces_tokens_into_frames(self):
+        """Test that tokens within one interval share a frame and close flushes the rest"""
+        emitter = StreamingFrameEmitter(self.emit, interval=3600)
+        for token in ['{"thinking": "a', 'b', 'c", "command": "l', 's"}']:
+            emitter.add_token(token)
+        emitter.close()
+
+        frames = [data for event_type, data in self.events if event_type == 'streaming_delta']
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(self._rebuild(), {"thinking": "abc", "command": "ls"})
+        self.assertEqual(self.events[-1], ('streaming_end', {'stream_id': emitter.stream_id, 'seq': 2}))
+
+    def test_every_token_without_throttle(self):
+        """Test that interval 0 sends one frame per token that changes a field"""
+        emitter = StreamingFrameEmitter(self.emit, interval=0)
+        for token in ['{"code": "x', '\\n', 'y"', '}']:
+            emitter.add_token(token)
+        self.assertEqual(len(self.events), 3)
+        self.assertEqual(self._rebuild(), {"code": "x\ny"})
+
+    def test_snapshot_includes_pending(self):
+        """Test that a resync snapshot flushes pending deltas and reports their seq"""
+        emitter = StreamingFrameEmitter(self.emit, interval=3600)
+        emitter.add_token('{"thinking": "he')
+        emitter.add_token('llo')
+        snapshot = emitter.snapshot()
+        self.assertEqual(snapshot['values']['thinking'], "hello")
+        self.assertEqual(snapshot['seq'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()